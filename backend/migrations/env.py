@@ -5,8 +5,18 @@ from logging.config import fileConfig
 from alembic import context
 from sqlalchemy import engine_from_config, pool
 
+from sportolo.models.background_job import (  # noqa: F401
+    BackgroundJob,
+    BackgroundJobAttempt,
+    BackgroundJobCoalescedRequest,
+    BackgroundJobMetricRollup,
+)
 from sportolo.models.base import Base
+from sportolo.models.fatigue_history_session import FatigueHistorySession  # noqa: F401
+from sportolo.models.fatigue_region import FatigueRegion, FatigueSnapshotRegionalAxis  # noqa: F401
 from sportolo.models.fatigue_snapshot import FatigueSnapshot  # noqa: F401
+from sportolo.models.idempotency_record import IdempotencyRecord  # noqa: F401
+from sportolo.models.wahoo_bulk_sync_checkpoint import WahooBulkSyncCheckpoint  # noqa: F401
 
 config = context.config
 
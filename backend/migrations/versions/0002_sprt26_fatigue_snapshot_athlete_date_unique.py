@@ -0,0 +1,32 @@
+"""Enforce one fatigue snapshot per athlete and day.
+
+Revision ID: 0002_sprt26
+Revises: 0001_sprt26
+Create Date: 2026-10-19 09:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0002_sprt26"
+down_revision = "0001_sprt26"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ux_fatigue_snapshots_athlete_id_snapshot_date",
+        "fatigue_snapshots",
+        ["athlete_id", "snapshot_date"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ux_fatigue_snapshots_athlete_id_snapshot_date",
+        table_name="fatigue_snapshots",
+    )
@@ -0,0 +1,31 @@
+"""Drop the single-column athlete index now covered by the composite unique index.
+
+`ux_fatigue_snapshots_athlete_id_snapshot_date` has `athlete_id` as its leading
+column, so athlete-only lookups and per-athlete date range scans both use it.
+
+Revision ID: 0003_sprt26
+Revises: 0002_sprt26
+Create Date: 2026-10-19 10:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0003_sprt26"
+down_revision = "0002_sprt26"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_index("ix_fatigue_snapshots_athlete_id", table_name="fatigue_snapshots")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_fatigue_snapshots_athlete_id",
+        "fatigue_snapshots",
+        ["athlete_id"],
+    )
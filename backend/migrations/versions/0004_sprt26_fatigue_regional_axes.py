@@ -0,0 +1,121 @@
+"""Add columnar regional axis storage and backfill it from the JSON payloads.
+
+Revision ID: 0004_sprt26
+Revises: 0003_sprt26
+Create Date: 2026-10-19 11:00:00.000000
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0004_sprt26"
+down_revision = "0003_sprt26"
+branch_labels = None
+depends_on = None
+
+_AXIS_COLUMNS = (
+    ("regional_recruitment", "recruitment"),
+    ("regional_metabolic", "metabolic"),
+    ("regional_mechanical", "mechanical"),
+)
+_BACKFILL_BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    regions = op.create_table(
+        "fatigue_regions",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("region_key", sa.String(length=64), nullable=False, unique=True),
+    )
+    regional_axes = op.create_table(
+        "fatigue_snapshot_regional_axes",
+        sa.Column(
+            "snapshot_id",
+            sa.String(length=36),
+            sa.ForeignKey("fatigue_snapshots.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column(
+            "region_id",
+            sa.Integer(),
+            sa.ForeignKey("fatigue_regions.id"),
+            primary_key=True,
+        ),
+        sa.Column("recruitment", sa.Float(), nullable=True),
+        sa.Column("metabolic", sa.Float(), nullable=True),
+        sa.Column("mechanical", sa.Float(), nullable=True),
+    )
+    _backfill_regional_axes(regions, regional_axes)
+
+
+def downgrade() -> None:
+    op.drop_table("fatigue_snapshot_regional_axes")
+    op.drop_table("fatigue_regions")
+
+
+def _backfill_regional_axes(regions: sa.Table, regional_axes: sa.Table) -> None:
+    connection = op.get_bind()
+
+    region_keys = sorted(
+        {region_key for _, by_region in _iter_snapshot_axes(connection) for region_key in by_region}
+    )
+    if not region_keys:
+        return
+
+    connection.execute(regions.insert(), [{"region_key": key} for key in region_keys])
+    region_ids = {
+        row.region_key: row.id
+        for row in connection.execute(sa.select(regions.c.id, regions.c.region_key))
+    }
+
+    pending: list[dict[str, object]] = []
+    for snapshot_id, by_region in _iter_snapshot_axes(connection):
+        for region_key, values in sorted(by_region.items()):
+            pending.append(
+                {
+                    "snapshot_id": snapshot_id,
+                    "region_id": region_ids[region_key],
+                    "recruitment": values.get("recruitment"),
+                    "metabolic": values.get("metabolic"),
+                    "mechanical": values.get("mechanical"),
+                }
+            )
+        if len(pending) >= _BACKFILL_BATCH_SIZE:
+            connection.execute(regional_axes.insert(), pending)
+            pending = []
+    if pending:
+        connection.execute(regional_axes.insert(), pending)
+
+
+def _iter_snapshot_axes(
+    connection: sa.Connection,
+) -> Iterator[tuple[str, dict[str, dict[str, float]]]]:
+    snapshots = sa.table(
+        "fatigue_snapshots",
+        sa.column("id", sa.String()),
+        *(sa.column(json_column, sa.JSON()) for json_column, _ in _AXIS_COLUMNS),
+    )
+    last_id: str | None = None
+    while True:
+        statement = sa.select(snapshots).order_by(snapshots.c.id).limit(_BACKFILL_BATCH_SIZE)
+        if last_id is not None:
+            statement = statement.where(snapshots.c.id > last_id)
+        rows = connection.execute(statement).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        for row in rows:
+            by_region: dict[str, dict[str, float]] = {}
+            for json_column, axis in _AXIS_COLUMNS:
+                payload = getattr(row, json_column)
+                if isinstance(payload, str):
+                    payload = json.loads(payload)
+                for region_key, value in (payload or {}).items():
+                    by_region.setdefault(region_key, {})[axis] = float(value)
+            yield row.id, by_region
@@ -0,0 +1,76 @@
+"""Create durable background job queue tables.
+
+Revision ID: 0005_sprt14
+Revises: 0004_sprt26
+Create Date: 2026-10-19 12:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0005_sprt14"
+down_revision = "0004_sprt26"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "background_jobs",
+        sa.Column("job_id", sa.String(length=64), primary_key=True),
+        sa.Column("athlete_id", sa.String(length=64), nullable=False),
+        sa.Column("pipeline", sa.String(length=32), nullable=False),
+        sa.Column("idempotency_key", sa.String(length=255), nullable=False),
+        sa.Column("correlation_id", sa.String(length=128), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("payload_fingerprint", sa.String(length=64), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("attempt_count", sa.Integer(), nullable=False),
+        sa.Column("max_attempts", sa.Integer(), nullable=False),
+        sa.Column("retry_delay_seconds", sa.Integer(), nullable=False),
+        sa.Column("enqueued_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("available_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error_code", sa.String(length=64), nullable=True),
+        sa.Column("last_error_message", sa.Text(), nullable=True),
+        sa.Column("last_failed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("lease_owner", sa.String(length=128), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ux_background_jobs_athlete_id_idempotency_key",
+        "background_jobs",
+        ["athlete_id", "idempotency_key"],
+        unique=True,
+    )
+    op.create_index(
+        "ix_background_jobs_status_available_at",
+        "background_jobs",
+        ["status", "available_at"],
+    )
+    op.create_table(
+        "background_job_attempts",
+        sa.Column(
+            "job_id",
+            sa.String(length=64),
+            sa.ForeignKey("background_jobs.job_id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("attempt_number", sa.Integer(), primary_key=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("latency_ms", sa.Float(), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("error_code", sa.String(length=64), nullable=True),
+        sa.Column("error_message", sa.Text(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("background_job_attempts")
+    op.drop_index("ix_background_jobs_status_available_at", table_name="background_jobs")
+    op.drop_index("ux_background_jobs_athlete_id_idempotency_key", table_name="background_jobs")
+    op.drop_table("background_jobs")
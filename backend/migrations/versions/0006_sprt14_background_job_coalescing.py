@@ -0,0 +1,68 @@
+"""Add per-athlete coalescing and serialization to background jobs.
+
+Revision ID: 0006_sprt14
+Revises: 0005_sprt14
+Create Date: 2026-10-19 15:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0006_sprt14"
+down_revision = "0005_sprt14"
+branch_labels = None
+depends_on = None
+
+SERIALIZED_PROCESSING_WHERE = "status = 'processing' AND serialized"
+
+
+def upgrade() -> None:
+    op.add_column(
+        "background_jobs",
+        sa.Column("serialized", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+    op.add_column(
+        "background_jobs",
+        sa.Column("coalesced_request_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_index(
+        "ux_background_jobs_serialized_processing",
+        "background_jobs",
+        ["athlete_id", "pipeline"],
+        unique=True,
+        sqlite_where=sa.text(SERIALIZED_PROCESSING_WHERE),
+        postgresql_where=sa.text(SERIALIZED_PROCESSING_WHERE),
+    )
+    op.create_table(
+        "background_job_coalesced_requests",
+        sa.Column("athlete_id", sa.String(length=64), primary_key=True),
+        sa.Column("idempotency_key", sa.String(length=255), primary_key=True),
+        sa.Column(
+            "job_id",
+            sa.String(length=64),
+            sa.ForeignKey("background_jobs.job_id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("correlation_id", sa.String(length=128), nullable=False),
+        sa.Column("payload_fingerprint", sa.String(length=64), nullable=False),
+        sa.Column("coalesced_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_background_job_coalesced_requests_job_id",
+        "background_job_coalesced_requests",
+        ["job_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_background_job_coalesced_requests_job_id",
+        table_name="background_job_coalesced_requests",
+    )
+    op.drop_table("background_job_coalesced_requests")
+    op.drop_index("ux_background_jobs_serialized_processing", table_name="background_jobs")
+    op.drop_column("background_jobs", "coalesced_request_count")
+    op.drop_column("background_jobs", "serialized")
@@ -0,0 +1,34 @@
+"""Track queue wait per background job attempt for latency histograms.
+
+Revision ID: 0007_sprt14
+Revises: 0006_sprt14
+Create Date: 2026-10-19 16:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0007_sprt14"
+down_revision = "0006_sprt14"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "background_job_attempts",
+        sa.Column("queue_wait_ms", sa.Float(), nullable=True),
+    )
+    op.create_index(
+        "ix_background_job_attempts_finished_at",
+        "background_job_attempts",
+        ["finished_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_background_job_attempts_finished_at", table_name="background_job_attempts")
+    op.drop_column("background_job_attempts", "queue_wait_ms")
@@ -0,0 +1,40 @@
+"""Create shared idempotency replay store for Wahoo endpoints.
+
+Revision ID: 0008_sprt46
+Revises: 0007_sprt14
+Create Date: 2026-10-19 18:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0008_sprt46"
+down_revision = "0007_sprt14"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "idempotency_records",
+        sa.Column("scope", sa.String(length=32), primary_key=True),
+        sa.Column("owner_id", sa.String(length=64), primary_key=True),
+        sa.Column("idempotency_key", sa.String(length=255), primary_key=True),
+        sa.Column("request_fingerprint", sa.String(length=64), nullable=False),
+        sa.Column("response_body", sa.LargeBinary(), nullable=False),
+        sa.Column("stored_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_idempotency_records_expires_at",
+        "idempotency_records",
+        ["expires_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_idempotency_records_expires_at", table_name="idempotency_records")
+    op.drop_table("idempotency_records")
@@ -0,0 +1,45 @@
+"""Create per-athlete checkpoints for bulk Wahoo sync runs.
+
+Revision ID: 0009_sprt46
+Revises: 0008_sprt46
+Create Date: 2026-10-19 20:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0009_sprt46"
+down_revision = "0008_sprt46"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "wahoo_bulk_sync_checkpoints",
+        sa.Column("run_id", sa.String(length=64), primary_key=True),
+        sa.Column("athlete_id", sa.String(length=64), primary_key=True),
+        sa.Column("shard_index", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("attempt_count", sa.Integer(), nullable=False),
+        sa.Column("imported_count", sa.Integer(), nullable=False),
+        sa.Column("planned_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+    )
+    op.create_index(
+        "ix_wahoo_bulk_sync_checkpoints_run_id_shard_index",
+        "wahoo_bulk_sync_checkpoints",
+        ["run_id", "shard_index"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_wahoo_bulk_sync_checkpoints_run_id_shard_index",
+        table_name="wahoo_bulk_sync_checkpoints",
+    )
+    op.drop_table("wahoo_bulk_sync_checkpoints")
@@ -0,0 +1,44 @@
+"""Persist the training sessions fatigue snapshot recomputes read.
+
+Revision ID: 0010_sprt26
+Revises: 0009_sprt46
+Create Date: 2026-10-20 09:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0010_sprt26"
+down_revision = "0009_sprt46"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "fatigue_history_sessions",
+        sa.Column("athlete_id", sa.String(length=64), primary_key=True),
+        sa.Column("session_id", sa.String(length=128), primary_key=True),
+        sa.Column("state", sa.String(length=16), nullable=False),
+        sa.Column("ended_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("raw_neural", sa.Float(), nullable=False),
+        sa.Column("raw_metabolic", sa.Float(), nullable=False),
+        sa.Column("raw_mechanical", sa.Float(), nullable=False),
+        sa.Column("regional_distribution", sa.JSON(), nullable=False),
+    )
+    op.create_index(
+        "ix_fatigue_history_sessions_athlete_id_ended_at",
+        "fatigue_history_sessions",
+        ["athlete_id", "ended_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_fatigue_history_sessions_athlete_id_ended_at",
+        table_name="fatigue_history_sessions",
+    )
+    op.drop_table("fatigue_history_sessions")
@@ -0,0 +1,149 @@
+"""Roll up background job metrics so reads no longer scan the attempt log.
+
+Revision ID: 0011_sprt14
+Revises: 0010_sprt26
+Create Date: 2026-10-20 11:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0011_sprt14"
+down_revision = "0010_sprt26"
+branch_labels = None
+depends_on = None
+
+# Frozen copy of LATENCY_BUCKET_BOUNDS_MS at the time of this migration.
+_LATENCY_BUCKET_BOUNDS_MS = (
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    25.0,
+    50.0,
+    100.0,
+    250.0,
+    500.0,
+    1_000.0,
+    2_000.0,
+    5_000.0,
+    10_000.0,
+    30_000.0,
+    60_000.0,
+    120_000.0,
+    300_000.0,
+)
+
+_jobs = sa.table(
+    "background_jobs",
+    sa.column("job_id", sa.String()),
+    sa.column("pipeline", sa.String()),
+)
+_attempts = sa.table(
+    "background_job_attempts",
+    sa.column("job_id", sa.String()),
+    sa.column("status", sa.String()),
+    sa.column("latency_ms", sa.Float()),
+    sa.column("queue_wait_ms", sa.Float()),
+)
+_coalesced_requests = sa.table(
+    "background_job_coalesced_requests",
+    sa.column("job_id", sa.String()),
+)
+
+
+def _bucket_index(column: sa.ColumnElement[float]) -> sa.ColumnElement[int]:
+    return sa.case(
+        *((column <= bound, index) for index, bound in enumerate(_LATENCY_BUCKET_BOUNDS_MS)),
+        else_=len(_LATENCY_BUCKET_BOUNDS_MS),
+    )
+
+
+def upgrade() -> None:
+    rollups = op.create_table(
+        "background_job_metric_rollups",
+        sa.Column("pipeline", sa.String(length=32), primary_key=True),
+        sa.Column("series", sa.String(length=16), primary_key=True),
+        sa.Column("status", sa.String(length=16), primary_key=True),
+        sa.Column("bucket_index", sa.Integer(), primary_key=True),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.Column("sum_ms", sa.Float(), nullable=False),
+        sa.Column("max_ms", sa.Float(), nullable=False),
+    )
+    columns = ["pipeline", "series", "status", "bucket_index", "count", "sum_ms", "max_ms"]
+
+    # Backfill from the existing tables so counters continue where the scans left off.
+    op.execute(
+        sa.insert(rollups).from_select(
+            columns,
+            sa.select(
+                _jobs.c.pipeline,
+                sa.literal("enqueued"),
+                sa.literal(""),
+                sa.literal(0),
+                sa.func.count(),
+                sa.literal(0.0),
+                sa.literal(0.0),
+            ).group_by(_jobs.c.pipeline),
+        )
+    )
+    op.execute(
+        sa.insert(rollups).from_select(
+            columns,
+            sa.select(
+                _jobs.c.pipeline,
+                sa.literal("coalesced"),
+                sa.literal(""),
+                sa.literal(0),
+                sa.func.count(),
+                sa.literal(0.0),
+                sa.literal(0.0),
+            )
+            .select_from(
+                _coalesced_requests.join(_jobs, _jobs.c.job_id == _coalesced_requests.c.job_id)
+            )
+            .group_by(_jobs.c.pipeline),
+        )
+    )
+    processing_bucket = _bucket_index(_attempts.c.latency_ms)
+    op.execute(
+        sa.insert(rollups).from_select(
+            columns,
+            sa.select(
+                _jobs.c.pipeline,
+                sa.literal("processing"),
+                _attempts.c.status,
+                processing_bucket,
+                sa.func.count(),
+                sa.func.sum(_attempts.c.latency_ms),
+                sa.func.max(_attempts.c.latency_ms),
+            )
+            .select_from(_attempts.join(_jobs, _jobs.c.job_id == _attempts.c.job_id))
+            .group_by(_jobs.c.pipeline, _attempts.c.status, processing_bucket),
+        )
+    )
+    queue_wait_bucket = _bucket_index(_attempts.c.queue_wait_ms)
+    op.execute(
+        sa.insert(rollups).from_select(
+            columns,
+            sa.select(
+                _jobs.c.pipeline,
+                sa.literal("queue_wait"),
+                sa.literal(""),
+                queue_wait_bucket,
+                sa.func.count(),
+                sa.func.sum(_attempts.c.queue_wait_ms),
+                sa.func.max(_attempts.c.queue_wait_ms),
+            )
+            .select_from(_attempts.join(_jobs, _jobs.c.job_id == _attempts.c.job_id))
+            .where(_attempts.c.queue_wait_ms.is_not(None))
+            .group_by(_jobs.c.pipeline, queue_wait_bucket),
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("background_job_metric_rollups")
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from sportolo.services.computation_cache_service import ComputationResultCache
+
+
+def cached_computation_response(
+    *,
+    cache: ComputationResultCache,
+    http_request: Request,
+    namespace: str,
+    policy_version: str,
+    scope: str,
+    request: BaseModel,
+    compute: Callable[[], BaseModel],
+) -> Response:
+    key = cache.cache_key(
+        namespace=namespace,
+        policy_version=policy_version,
+        scope=scope,
+        request=request,
+    )
+    # The validator hashes the response bytes, so the lookup runs before the check; a
+    # hit still skips computation and serialization.
+    cached = cache.get_or_compute(key, compute)
+    if cache.matches_etag(cached, http_request.headers.get("if-none-match")):
+        return Response(status_code=304, headers={"ETag": cached.etag})
+    return Response(
+        content=cached.body,
+        media_type="application/json",
+        headers={"ETag": cached.etag},
+    )
@@ -1,57 +1,249 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
+
 from sportolo.api.schemas.wahoo_integration import PipelineDispatch
+from sportolo.config import Settings, get_settings
+from sportolo.database import build_session_factory, create_database_engine
 from sportolo.services.axis_scoring_service import AxisScoringService
 from sportolo.services.background_job_queue_service import (
     BackgroundJobEnqueueRequest,
+    BackgroundJobHandler,
+    BackgroundJobPayloadCoalescer,
+    BackgroundJobPipeline,
+    BackgroundJobQueue,
+    BackgroundJobRecord,
     InMemoryBackgroundJobQueue,
 )
+from sportolo.services.background_job_retry_service import (
+    BackgroundJobBackoffPolicy,
+    BackgroundJobRetryController,
+    BackgroundJobWorkerCircuitBreakerPolicy,
+    BackgroundJobWorkerRetryBudget,
+)
+from sportolo.services.computation_cache_service import ComputationResultCache
 from sportolo.services.exercise_catalog_service import ExerciseCatalogService
 from sportolo.services.exercise_zone_mapping_service import ExerciseZoneMappingService
+from sportolo.services.fatigue_snapshot_service import (
+    FatigueHistoryStore,
+    FatigueSnapshotService,
+    InMemoryFatigueHistorySource,
+    SqlFatigueHistorySource,
+    fatigue_session_from_ride,
+)
 from sportolo.services.goal_priority_service import GoalPriorityService
+from sportolo.services.idempotency_store_service import (
+    IdempotencyStore,
+    InMemoryIdempotencyStore,
+    SqlIdempotencyStore,
+)
 from sportolo.services.muscle_usage_service import MuscleUsageService
+from sportolo.services.sql_background_job_queue_service import SqlBackgroundJobQueue
 from sportolo.services.today_accumulation_service import TodayAccumulationService
-from sportolo.services.wahoo_control_service import WahooControlService
+from sportolo.services.wahoo_bulk_sync_service import (
+    InMemoryWahooAccessTokenSource,
+    InMemoryWahooBulkSyncCheckpointStore,
+    SqlWahooBulkSyncCheckpointStore,
+    WahooBulkSyncCheckpointStore,
+    WahooBulkSyncOrchestrator,
+)
+from sportolo.services.wahoo_control_service import (
+    SimulatedWahooTrainerProtocolAdapter,
+    WahooControlService,
+)
 from sportolo.services.wahoo_integration_service import WahooIntegrationService
+from sportolo.services.wahoo_provider_client import WahooProviderActivity
 
 
 class BackgroundJobQueueDispatchSink:
-    def __init__(self, queue: InMemoryBackgroundJobQueue) -> None:
+    def __init__(self, queue: BackgroundJobQueue) -> None:
         self._queue = queue
 
     def enqueue(self, athlete_id: str, dispatch: PipelineDispatch) -> None:
-        self._queue.enqueue(
-            BackgroundJobEnqueueRequest(
-                athlete_id=athlete_id,
-                pipeline=dispatch.pipeline,
-                idempotency_key=(
-                    f"{dispatch.pipeline}:"
-                    f"{dispatch.external_activity_id}:"
-                    f"{dispatch.sequence_number}"
+        self.enqueue_many(athlete_id, [dispatch])
+
+    def enqueue_many(self, athlete_id: str, dispatches: Sequence[PipelineDispatch]) -> None:
+        self._queue.enqueue_many(
+            [self._to_enqueue_request(athlete_id, dispatch) for dispatch in dispatches],
+            return_records=False,
+        )
+
+    @staticmethod
+    def _to_enqueue_request(
+        athlete_id: str,
+        dispatch: PipelineDispatch,
+    ) -> BackgroundJobEnqueueRequest:
+        return BackgroundJobEnqueueRequest(
+            athlete_id=athlete_id,
+            pipeline=dispatch.pipeline,
+            idempotency_key=(
+                f"{dispatch.pipeline}:{dispatch.external_activity_id}:{dispatch.sequence_number}"
+            ),
+            correlation_id=dispatch.dispatch_id,
+            payload={
+                "externalActivityId": dispatch.external_activity_id,
+                "plannedWorkoutId": dispatch.planned_workout_id,
+                "sequenceNumber": dispatch.sequence_number,
+                "activityStartedAt": (
+                    dispatch.activity_started_at.isoformat()
+                    if dispatch.activity_started_at is not None
+                    else None
                 ),
-                correlation_id=dispatch.dispatch_id,
-                payload={
-                    "externalActivityId": dispatch.external_activity_id,
-                    "plannedWorkoutId": dispatch.planned_workout_id,
-                    "sequenceNumber": dispatch.sequence_number,
-                },
-            )
+            },
         )
 
     def reset(self) -> None:
         self._queue.reset_for_testing()
 
 
+def _build_retry_controller(settings: Settings) -> BackgroundJobRetryController:
+    backoff = BackgroundJobBackoffPolicy(
+        base_delay_seconds=settings.background_job_retry_base_delay_seconds,
+        max_delay_seconds=settings.background_job_retry_max_delay_seconds,
+    )
+    return BackgroundJobRetryController(
+        backoff_policies={
+            "workout_sync": backoff,
+            "fatigue_recompute": backoff,
+            "wahoo_bulk_sync": backoff,
+        },
+        retry_budget=BackgroundJobWorkerRetryBudget(
+            ratio=settings.background_job_worker_retry_budget_ratio
+        ),
+        circuit_breaker=BackgroundJobWorkerCircuitBreakerPolicy(
+            failure_threshold=settings.background_job_worker_circuit_breaker_threshold
+        ),
+    )
+
+
+def _build_background_job_queue(
+    default_handlers: dict[BackgroundJobPipeline, BackgroundJobHandler],
+    payload_coalescers: dict[BackgroundJobPipeline, BackgroundJobPayloadCoalescer],
+) -> BackgroundJobQueue:
+    settings = get_settings()
+    backend = settings.background_job_queue_backend
+    if backend == "sql":
+        return SqlBackgroundJobQueue(
+            session_factory=_session_factory,
+            default_handlers=default_handlers,
+            payload_coalescers=payload_coalescers,
+            retry_controller=_build_retry_controller(settings),
+            attempt_retention_seconds=settings.background_job_attempt_retention_seconds,
+        )
+    if backend == "memory":
+        return InMemoryBackgroundJobQueue(
+            default_handlers=default_handlers,
+            payload_coalescers=payload_coalescers,
+            succeeded_retention_seconds=settings.background_job_succeeded_retention_seconds,
+            retry_controller=_build_retry_controller(settings),
+        )
+    raise ValueError(f"unsupported background job queue backend: {backend}")
+
+
+def _build_idempotency_store() -> IdempotencyStore:
+    settings = get_settings()
+    backend = settings.idempotency_store_backend
+    if backend == "sql":
+        return SqlIdempotencyStore(
+            session_factory=_session_factory,
+            ttl_seconds=settings.idempotency_ttl_seconds,
+            max_entries=settings.idempotency_max_entries,
+        )
+    if backend == "memory":
+        return InMemoryIdempotencyStore(
+            ttl_seconds=settings.idempotency_ttl_seconds,
+            max_entries=settings.idempotency_max_entries,
+        )
+    raise ValueError(f"unsupported idempotency store backend: {backend}")
+
+
+def _build_fatigue_history_source() -> FatigueHistoryStore:
+    backend = get_settings().fatigue_history_backend
+    if backend == "sql":
+        return SqlFatigueHistorySource(session_factory=_session_factory)
+    if backend == "memory":
+        return InMemoryFatigueHistorySource()
+    raise ValueError(f"unsupported fatigue history backend: {backend}")
+
+
+def _record_imported_activities(
+    athlete_id: str,
+    activities: Sequence[WahooProviderActivity],
+) -> None:
+    _fatigue_history_source.record_sessions(
+        athlete_id,
+        [
+            fatigue_session_from_ride(
+                session_id=activity.external_activity_id,
+                ended_at=activity.completed_at,
+                duration_seconds=activity.duration_seconds,
+            )
+            for activity in activities
+        ],
+    )
+
+
+def _build_wahoo_bulk_sync_checkpoint_store() -> WahooBulkSyncCheckpointStore:
+    backend = get_settings().wahoo_bulk_sync_checkpoint_backend
+    if backend == "sql":
+        return SqlWahooBulkSyncCheckpointStore(session_factory=_session_factory)
+    if backend == "memory":
+        return InMemoryWahooBulkSyncCheckpointStore()
+    raise ValueError(f"unsupported Wahoo bulk sync checkpoint backend: {backend}")
+
+
+def _handle_wahoo_bulk_sync_job(record: BackgroundJobRecord) -> None:
+    # The orchestrator is built after the queue it enqueues shard jobs on.
+    _wahoo_bulk_sync_orchestrator.handle_shard_job(record)
+
+
 _exercise_catalog_service = ExerciseCatalogService()
 _exercise_zone_mapping_service = ExerciseZoneMappingService()
 _muscle_usage_service = MuscleUsageService()
 _today_accumulation_service = TodayAccumulationService()
 _axis_scoring_service = AxisScoringService()
 _goal_priority_service = GoalPriorityService()
-_background_job_queue = InMemoryBackgroundJobQueue()
+# No shared cache tier is deployed yet, so only the bounded in-process LRU is used.
+_computation_cache = ComputationResultCache()
+_database_engine = create_database_engine(get_settings().database_url)
+_session_factory = build_session_factory(_database_engine)
+_fatigue_history_source = _build_fatigue_history_source()
+_fatigue_snapshot_service = FatigueSnapshotService(
+    session_factory=_session_factory,
+    history_source=_fatigue_history_source,
+    axis_scoring_service=_axis_scoring_service,
+)
+_background_job_queue = _build_background_job_queue(
+    {
+        "fatigue_recompute": _fatigue_snapshot_service.handle_recompute_job,
+        "wahoo_bulk_sync": _handle_wahoo_bulk_sync_job,
+    },
+    {"fatigue_recompute": _fatigue_snapshot_service.coalesce_recompute_payloads},
+)
 _wahoo_dispatch_sink = BackgroundJobQueueDispatchSink(_background_job_queue)
-_wahoo_integration_service = WahooIntegrationService(dispatch_sink=_wahoo_dispatch_sink)
-_wahoo_control_service = WahooControlService()
+_idempotency_store = _build_idempotency_store()
+_wahoo_integration_service = WahooIntegrationService(
+    dispatch_sink=_wahoo_dispatch_sink,
+    idempotency_store=_idempotency_store,
+    activity_recorder=_record_imported_activities,
+)
+_wahoo_control_service = WahooControlService(
+    SimulatedWahooTrainerProtocolAdapter(
+        latency_seconds=get_settings().wahoo_simulated_trainer_latency_ms / 1000,
+        loss_rate=get_settings().wahoo_simulated_trainer_loss_rate,
+    ),
+    idempotency_store=_idempotency_store,
+    mailbox_capacity=get_settings().wahoo_control_mailbox_capacity,
+    command_deadline_seconds=get_settings().wahoo_control_deadline_seconds,
+)
+_wahoo_access_token_source = InMemoryWahooAccessTokenSource()
+_wahoo_bulk_sync_orchestrator = WahooBulkSyncOrchestrator(
+    queue=_background_job_queue,
+    integration_service=_wahoo_integration_service,
+    checkpoint_store=_build_wahoo_bulk_sync_checkpoint_store(),
+    access_token_source=_wahoo_access_token_source,
+    shard_count=get_settings().wahoo_bulk_sync_shard_count,
+)
 
 
 def get_exercise_catalog_service() -> ExerciseCatalogService:
@@ -78,7 +270,19 @@ def get_goal_priority_service() -> GoalPriorityService:
     return _goal_priority_service
 
 
-def get_background_job_queue() -> InMemoryBackgroundJobQueue:
+def get_computation_cache() -> ComputationResultCache:
+    return _computation_cache
+
+
+def get_fatigue_history_source() -> FatigueHistoryStore:
+    return _fatigue_history_source
+
+
+def get_fatigue_snapshot_service() -> FatigueSnapshotService:
+    return _fatigue_snapshot_service
+
+
+def get_background_job_queue() -> BackgroundJobQueue:
     return _background_job_queue
 
 
@@ -88,3 +292,11 @@ def get_wahoo_integration_service() -> WahooIntegrationService:
 
 def get_wahoo_control_service() -> WahooControlService:
     return _wahoo_control_service
+
+
+def get_wahoo_access_token_source() -> InMemoryWahooAccessTokenSource:
+    return _wahoo_access_token_source
+
+
+def get_wahoo_bulk_sync_orchestrator() -> WahooBulkSyncOrchestrator:
+    return _wahoo_bulk_sync_orchestrator
@@ -4,6 +4,8 @@ from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 
+from sportolo.services.wahoo_control_service import WahooControlMailboxFullError
+
 
 def _validation_error_payload(message: str) -> dict[str, str]:
     return {
@@ -32,3 +34,14 @@ def register_exception_handlers(app: FastAPI) -> None:
     ) -> JSONResponse:
         del request
         return JSONResponse(status_code=422, content=_validation_error_payload(str(exc)))
+
+    @app.exception_handler(WahooControlMailboxFullError)
+    async def handle_wahoo_control_mailbox_full(  # noqa: RUF029
+        request: Request, exc: WahooControlMailboxFullError
+    ) -> JSONResponse:
+        del request
+        return JSONResponse(
+            status_code=429,
+            content={"code": "WAHOO_CONTROL_MAILBOX_FULL", "message": str(exc)},
+            headers={"Retry-After": str(exc.retry_after_seconds)},
+        )
@@ -1,11 +1,16 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Path
+from fastapi import APIRouter, Depends, Path, Request, Response
 
-from sportolo.api.dependencies import get_axis_scoring_service
+from sportolo.api.computation_cache import cached_computation_response
+from sportolo.api.dependencies import get_axis_scoring_service, get_computation_cache
 from sportolo.api.schemas.axis_scoring import AxisSeriesRequest, AxisSeriesResponse
 from sportolo.api.schemas.common import ValidationError
-from sportolo.services.axis_scoring_service import AxisScoringService
+from sportolo.services.axis_scoring_service import (
+    AXIS_SCORING_POLICY_VERSION,
+    AxisScoringService,
+)
+from sportolo.services.computation_cache_service import ComputationResultCache
 
 router = APIRouter(tags=["Fatigue"])
 
@@ -14,12 +19,21 @@ router = APIRouter(tags=["Fatigue"])
     "/v1/athletes/{athleteId}/fatigue/axis-series",
     response_model=AxisSeriesResponse,
     operation_id="computeAxisSeries",
-    responses={422: {"model": ValidationError}},
+    responses={304: {"description": "Not Modified"}, 422: {"model": ValidationError}},
 )
 async def compute_axis_series(
     request: AxisSeriesRequest,
+    http_request: Request,
     service: Annotated[AxisScoringService, Depends(get_axis_scoring_service)],
+    cache: Annotated[ComputationResultCache, Depends(get_computation_cache)],
     athlete_id: str = Path(alias="athleteId"),
-) -> AxisSeriesResponse:
-    del athlete_id
-    return service.compute_axis_series(request)
+) -> Response:
+    return cached_computation_response(
+        cache=cache,
+        http_request=http_request,
+        namespace="axis_series",
+        policy_version=AXIS_SCORING_POLICY_VERSION,
+        scope=athlete_id,
+        request=request,
+        compute=lambda: service.compute_axis_series(request),
+    )
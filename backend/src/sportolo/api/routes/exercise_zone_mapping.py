@@ -2,15 +2,20 @@ from __future__ import annotations
 
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Path
+from fastapi import APIRouter, Depends, Path, Request, Response
 
-from sportolo.api.dependencies import get_exercise_zone_mapping_service
+from sportolo.api.computation_cache import cached_computation_response
+from sportolo.api.dependencies import get_computation_cache, get_exercise_zone_mapping_service
 from sportolo.api.schemas.common import ValidationError
 from sportolo.api.schemas.exercise_zone_mapping import (
     AxisEffectMappingRequest,
     AxisEffectMappingResponse,
 )
-from sportolo.services.exercise_zone_mapping_service import ExerciseZoneMappingService
+from sportolo.services.computation_cache_service import ComputationResultCache
+from sportolo.services.exercise_zone_mapping_service import (
+    EXERCISE_ZONE_MAPPING_POLICY_VERSION,
+    ExerciseZoneMappingService,
+)
 
 router = APIRouter(tags=["Scoring"])
 
@@ -19,11 +24,21 @@ router = APIRouter(tags=["Scoring"])
     "/v1/athletes/{athleteId}/axis-effects/map",
     response_model=AxisEffectMappingResponse,
     operation_id="mapExerciseZoneAxisEffects",
-    responses={422: {"model": ValidationError}},
+    responses={304: {"description": "Not Modified"}, 422: {"model": ValidationError}},
 )
 async def map_exercise_zone_axis_effects(
     request: AxisEffectMappingRequest,
+    http_request: Request,
     service: Annotated[ExerciseZoneMappingService, Depends(get_exercise_zone_mapping_service)],
+    cache: Annotated[ComputationResultCache, Depends(get_computation_cache)],
     athlete_id: str = Path(alias="athleteId"),
-) -> AxisEffectMappingResponse:
-    return service.map_axis_effects(athlete_id=athlete_id, request=request)
+) -> Response:
+    return cached_computation_response(
+        cache=cache,
+        http_request=http_request,
+        namespace="axis_effect_mapping",
+        policy_version=EXERCISE_ZONE_MAPPING_POLICY_VERSION,
+        scope=athlete_id,
+        request=request,
+        compute=lambda: service.map_axis_effects(athlete_id=athlete_id, request=request),
+    )
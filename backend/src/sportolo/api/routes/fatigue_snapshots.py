@@ -0,0 +1,26 @@
+from datetime import date
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Path, Query
+
+from sportolo.api.dependencies import get_fatigue_snapshot_service
+from sportolo.api.schemas.common import ValidationError
+from sportolo.api.schemas.fatigue_snapshot import FatigueSnapshotListResponse
+from sportolo.services.fatigue_snapshot_service import FatigueSnapshotService
+
+router = APIRouter(tags=["Fatigue"])
+
+
+@router.get(
+    "/v1/athletes/{athleteId}/fatigue/snapshots",
+    response_model=FatigueSnapshotListResponse,
+    operation_id="listFatigueSnapshots",
+    responses={422: {"model": ValidationError}},
+)
+async def list_fatigue_snapshots(
+    service: Annotated[FatigueSnapshotService, Depends(get_fatigue_snapshot_service)],
+    start_date: Annotated[date, Query(alias="startDate")],
+    end_date: Annotated[date, Query(alias="endDate")],
+    athlete_id: str = Path(alias="athleteId"),
+) -> FatigueSnapshotListResponse:
+    return service.list_snapshots(athlete_id, start_date=start_date, end_date=end_date)
@@ -1,11 +1,16 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Path
+from fastapi import APIRouter, Depends, Path, Request, Response
 
-from sportolo.api.dependencies import get_today_accumulation_service
+from sportolo.api.computation_cache import cached_computation_response
+from sportolo.api.dependencies import get_computation_cache, get_today_accumulation_service
 from sportolo.api.schemas.common import ValidationError
 from sportolo.api.schemas.fatigue_today import TodayAccumulationRequest, TodayAccumulationResponse
-from sportolo.services.today_accumulation_service import TodayAccumulationService
+from sportolo.services.computation_cache_service import ComputationResultCache
+from sportolo.services.today_accumulation_service import (
+    TODAY_ACCUMULATION_POLICY_VERSION,
+    TodayAccumulationService,
+)
 
 router = APIRouter(tags=["Fatigue"])
 
@@ -14,12 +19,21 @@ router = APIRouter(tags=["Fatigue"])
     "/v1/athletes/{athleteId}/fatigue/today/accumulation",
     response_model=TodayAccumulationResponse,
     operation_id="computeTodayAccumulation",
-    responses={422: {"model": ValidationError}},
+    responses={304: {"description": "Not Modified"}, 422: {"model": ValidationError}},
 )
 async def compute_today_accumulation(
     request: TodayAccumulationRequest,
+    http_request: Request,
     service: Annotated[TodayAccumulationService, Depends(get_today_accumulation_service)],
+    cache: Annotated[ComputationResultCache, Depends(get_computation_cache)],
     athlete_id: str = Path(alias="athleteId"),
-) -> TodayAccumulationResponse:
-    del athlete_id
-    return service.compute_today_accumulation(request)
+) -> Response:
+    return cached_computation_response(
+        cache=cache,
+        http_request=http_request,
+        namespace="today_accumulation",
+        policy_version=TODAY_ACCUMULATION_POLICY_VERSION,
+        scope=athlete_id,
+        request=request,
+        compute=lambda: service.compute_today_accumulation(request),
+    )
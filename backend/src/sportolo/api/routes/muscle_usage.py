@@ -1,14 +1,16 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Path
+from fastapi import APIRouter, Depends, Path, Request, Response
 
-from sportolo.api.dependencies import get_muscle_usage_service
+from sportolo.api.computation_cache import cached_computation_response
+from sportolo.api.dependencies import get_computation_cache, get_muscle_usage_service
 from sportolo.api.schemas.common import ValidationError
 from sportolo.api.schemas.muscle_usage import (
     MicrocycleUsageRequest,
     MicrocycleUsageResponse,
 )
-from sportolo.services.muscle_usage_service import MuscleUsageService
+from sportolo.services.computation_cache_service import ComputationResultCache
+from sportolo.services.muscle_usage_service import MUSCLE_USAGE_POLICY_VERSION, MuscleUsageService
 
 router = APIRouter(tags=["Analytics"])
 
@@ -17,12 +19,21 @@ router = APIRouter(tags=["Analytics"])
     "/v1/athletes/{athleteId}/muscle-usage/aggregate",
     response_model=MicrocycleUsageResponse,
     operation_id="aggregateMuscleUsage",
-    responses={422: {"model": ValidationError}},
+    responses={304: {"description": "Not Modified"}, 422: {"model": ValidationError}},
 )
 async def aggregate_muscle_usage(
     request: MicrocycleUsageRequest,
+    http_request: Request,
     service: Annotated[MuscleUsageService, Depends(get_muscle_usage_service)],
+    cache: Annotated[ComputationResultCache, Depends(get_computation_cache)],
     athlete_id: str = Path(alias="athleteId"),
-) -> MicrocycleUsageResponse:
-    del athlete_id
-    return service.aggregate_microcycle(request)
+) -> Response:
+    return cached_computation_response(
+        cache=cache,
+        http_request=http_request,
+        namespace="muscle_usage",
+        policy_version=MUSCLE_USAGE_POLICY_VERSION,
+        scope=athlete_id,
+        request=request,
+        compute=lambda: service.aggregate_microcycle(request),
+    )
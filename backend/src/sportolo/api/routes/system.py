@@ -1,17 +1,44 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
 from datetime import UTC, datetime
 from typing import Annotated
 
 from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import Field
 
-from sportolo.api.dependencies import get_background_job_queue
-from sportolo.api.schemas.common import ApiEnvelope, ApiMeta, CamelModel
+from sportolo.api.dependencies import (
+    get_background_job_queue,
+    get_computation_cache,
+    get_wahoo_bulk_sync_orchestrator,
+)
+from sportolo.api.schemas.common import ApiEnvelope, ApiMeta, CamelModel, ValidationError
 from sportolo.config import Settings, get_settings
+from sportolo.services.background_job_metrics_service import (
+    BackgroundJobPipelineMetrics,
+    LatencyHistogramSnapshot,
+    render_prometheus_metrics,
+)
 from sportolo.services.background_job_queue_service import (
+    BackgroundJobDeadLetterFilter,
     BackgroundJobMetrics,
+    BackgroundJobPipeline,
+    BackgroundJobQueue,
     BackgroundJobRecord,
-    InMemoryBackgroundJobQueue,
+)
+from sportolo.services.background_job_redrive_service import (
+    BackgroundJobRedriveOptions,
+    BackgroundJobRedriveProgress,
+    BackgroundJobRedriver,
+)
+from sportolo.services.computation_cache_service import (
+    ComputationCacheMetrics,
+    ComputationResultCache,
+)
+from sportolo.services.wahoo_bulk_sync_service import (
+    WahooBulkSyncOrchestrator,
+    WahooBulkSyncRunMetrics,
 )
 
 router = APIRouter(tags=["System"])
@@ -24,6 +51,32 @@ class SmokePayload(CamelModel):
     feature_flags: dict[str, bool]
 
 
+class LatencyPercentilesPayload(CamelModel):
+    count: int
+    average_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+class ThroughputWindowPayload(CamelModel):
+    window_seconds: int
+    attempts_per_second: float
+
+
+class BackgroundJobPipelineMetricsPayload(CamelModel):
+    pipeline: str
+    processed_attempt_count: int
+    succeeded_count: int
+    failed_attempt_count: int
+    retry_count: int
+    dead_letter_count: int
+    processing_latency: LatencyPercentilesPayload
+    queue_wait: LatencyPercentilesPayload
+    throughput: list[ThroughputWindowPayload]
+
+
 class BackgroundJobMetricsPayload(CamelModel):
     queue_depth: int
     total_enqueued_count: int
@@ -34,6 +87,10 @@ class BackgroundJobMetricsPayload(CamelModel):
     dead_letter_count: int
     failure_rate: float
     average_processing_latency_ms: float
+    coalesced_request_count: int
+    worker_shed_retry_count: int
+    worker_open_circuit_error_codes: list[str]
+    pipelines: list[BackgroundJobPipelineMetricsPayload]
 
 
 class BackgroundJobDeadLetterPayload(CamelModel):
@@ -53,6 +110,70 @@ class BackgroundJobDeadLetterListPayload(CamelModel):
     jobs: list[BackgroundJobDeadLetterPayload]
 
 
+class BackgroundJobRedriveRequest(CamelModel):
+    pipeline: BackgroundJobPipeline | None = None
+    error_code: str | None = None
+    athlete_id: str | None = None
+    failed_after: datetime | None = None
+    failed_before: datetime | None = None
+    attempt_budget: int = Field(default=3, ge=1, le=50)
+    batch_size: int = Field(default=500, ge=1, le=5_000)
+    max_jobs_per_second: float | None = Field(default=200.0, gt=0)
+    max_queue_depth: int | None = Field(default=None, ge=0)
+    limit: int | None = Field(default=None, ge=1)
+
+
+class BackgroundJobRedriveProgressPayload(CamelModel):
+    batch_number: int
+    job_ids: list[str]
+    redriven_count: int
+    skipped_count: int
+    elapsed_seconds: float
+    done: bool
+
+
+class WahooBulkSyncStartRequest(CamelModel):
+    run_id: str | None = Field(default=None, min_length=1, max_length=64)
+    athlete_ids: list[str] | None = None
+    shard_count: int | None = Field(default=None, ge=1, le=1_024)
+
+
+class WahooBulkSyncRunPayload(CamelModel):
+    run_id: str
+    athlete_count: int
+    shard_job_ids: list[str]
+
+
+class WahooBulkSyncRunMetricsPayload(CamelModel):
+    run_id: str
+    shard_count: int
+    athlete_count: int
+    pending_count: int
+    completed_count: int
+    failed_count: int
+    skipped_count: int
+    imported_activity_count: int
+    started_at: datetime
+    finished_at: datetime | None
+    elapsed_seconds: float
+    athletes_per_second: float
+    activities_per_second: float
+    max_completion_lag_seconds: float
+    oldest_pending_lag_seconds: float
+    done: bool
+
+
+class ComputationCacheMetricsPayload(CamelModel):
+    lookup_count: int
+    local_hit_count: int
+    external_hit_count: int
+    miss_count: int
+    not_modified_count: int
+    eviction_count: int
+    local_entry_count: int
+    hit_rate: float
+
+
 @router.get(
     "/v1/system/smoke",
     response_model=ApiEnvelope[SmokePayload],
@@ -80,7 +201,7 @@ async def smoke(
     operation_id="systemBackgroundJobMetrics",
 )
 async def background_job_metrics(
-    queue: Annotated[InMemoryBackgroundJobQueue, Depends(get_background_job_queue)],
+    queue: Annotated[BackgroundJobQueue, Depends(get_background_job_queue)],
 ) -> ApiEnvelope[BackgroundJobMetricsPayload]:
     metrics = queue.metrics_snapshot()
     return ApiEnvelope(
@@ -89,13 +210,27 @@ async def background_job_metrics(
     )
 
 
+@router.get(
+    "/v1/system/background-jobs/metrics/prometheus",
+    response_class=PlainTextResponse,
+    operation_id="systemBackgroundJobPrometheusMetrics",
+)
+async def background_job_prometheus_metrics(
+    queue: Annotated[BackgroundJobQueue, Depends(get_background_job_queue)],
+) -> PlainTextResponse:
+    return PlainTextResponse(
+        render_prometheus_metrics(queue.metrics_snapshot()),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
 @router.get(
     "/v1/system/background-jobs/dead-letters",
     response_model=ApiEnvelope[BackgroundJobDeadLetterListPayload],
     operation_id="systemBackgroundJobDeadLetters",
 )
 async def background_job_dead_letters(
-    queue: Annotated[InMemoryBackgroundJobQueue, Depends(get_background_job_queue)],
+    queue: Annotated[BackgroundJobQueue, Depends(get_background_job_queue)],
 ) -> ApiEnvelope[BackgroundJobDeadLetterListPayload]:
     dead_letters = queue.list_dead_letters()
     return ApiEnvelope(
@@ -106,6 +241,95 @@ async def background_job_dead_letters(
     )
 
 
+@router.post(
+    "/v1/system/background-jobs/dead-letters/redrive",
+    response_class=StreamingResponse,
+    operation_id="systemBackgroundJobRedriveDeadLetters",
+    responses={422: {"model": ValidationError}},
+)
+async def redrive_background_job_dead_letters(
+    request: BackgroundJobRedriveRequest,
+    queue: Annotated[BackgroundJobQueue, Depends(get_background_job_queue)],
+) -> StreamingResponse:
+    progress = BackgroundJobRedriver(queue).iter_redrive(
+        BackgroundJobDeadLetterFilter(
+            pipeline=request.pipeline,
+            error_code=request.error_code,
+            athlete_id=request.athlete_id,
+            failed_after=request.failed_after,
+            failed_before=request.failed_before,
+        ),
+        BackgroundJobRedriveOptions(
+            attempt_budget=request.attempt_budget,
+            batch_size=request.batch_size,
+            max_jobs_per_second=request.max_jobs_per_second,
+            max_queue_depth=request.max_queue_depth,
+            limit=request.limit,
+        ),
+    )
+    # A sync iterator is drained in the threadpool, so rate-limit sleeps and queue
+    # writes never block the event loop.
+    return StreamingResponse(_to_ndjson(progress), media_type="application/x-ndjson")
+
+
+@router.post(
+    "/v1/system/wahoo/bulk-sync-runs",
+    response_model=ApiEnvelope[WahooBulkSyncRunPayload],
+    operation_id="systemStartWahooBulkSync",
+    responses={422: {"model": ValidationError}},
+)
+def start_wahoo_bulk_sync(
+    request: WahooBulkSyncStartRequest,
+    orchestrator: Annotated[WahooBulkSyncOrchestrator, Depends(get_wahoo_bulk_sync_orchestrator)],
+) -> ApiEnvelope[WahooBulkSyncRunPayload]:
+    # Plain `def`: checkpoint writes and the shard enqueue are synchronous (SQL in
+    # production), so FastAPI runs planning in the threadpool.
+    run = orchestrator.start_run(
+        request.athlete_ids,
+        run_id=request.run_id,
+        shard_count=request.shard_count,
+    )
+    return ApiEnvelope(
+        data=WahooBulkSyncRunPayload(
+            run_id=run.run_id,
+            athlete_count=run.athlete_count,
+            shard_job_ids=list(run.shard_job_ids),
+        ),
+        meta=ApiMeta(status="ok", timestamp=datetime.now(UTC)),
+    )
+
+
+@router.get(
+    "/v1/system/wahoo/bulk-sync-runs/{run_id}/metrics",
+    response_model=ApiEnvelope[WahooBulkSyncRunMetricsPayload],
+    operation_id="systemWahooBulkSyncMetrics",
+    responses={422: {"model": ValidationError}},
+)
+def wahoo_bulk_sync_metrics(
+    run_id: str,
+    orchestrator: Annotated[WahooBulkSyncOrchestrator, Depends(get_wahoo_bulk_sync_orchestrator)],
+) -> ApiEnvelope[WahooBulkSyncRunMetricsPayload]:
+    # Reads the run's checkpoints synchronously, so this also runs in the threadpool.
+    return ApiEnvelope(
+        data=_to_bulk_sync_metrics_payload(orchestrator.run_metrics(run_id)),
+        meta=ApiMeta(status="ok", timestamp=datetime.now(UTC)),
+    )
+
+
+@router.get(
+    "/v1/system/computation-cache/metrics",
+    response_model=ApiEnvelope[ComputationCacheMetricsPayload],
+    operation_id="systemComputationCacheMetrics",
+)
+async def computation_cache_metrics(
+    cache: Annotated[ComputationResultCache, Depends(get_computation_cache)],
+) -> ApiEnvelope[ComputationCacheMetricsPayload]:
+    return ApiEnvelope(
+        data=_to_cache_metrics_payload(cache.metrics_snapshot()),
+        meta=ApiMeta(status="ok", timestamp=datetime.now(UTC)),
+    )
+
+
 def _to_metrics_payload(metrics: BackgroundJobMetrics) -> BackgroundJobMetricsPayload:
     return BackgroundJobMetricsPayload(
         queue_depth=metrics.queue_depth,
@@ -117,6 +341,43 @@ def _to_metrics_payload(metrics: BackgroundJobMetrics) -> BackgroundJobMetricsPa
         dead_letter_count=metrics.dead_letter_count,
         failure_rate=metrics.failure_rate,
         average_processing_latency_ms=metrics.average_processing_latency_ms,
+        coalesced_request_count=metrics.coalesced_request_count,
+        worker_shed_retry_count=metrics.worker_shed_retry_count,
+        worker_open_circuit_error_codes=list(metrics.worker_open_circuit_error_codes),
+        pipelines=[
+            _to_pipeline_metrics_payload(pipeline_metrics)
+            for pipeline_metrics in metrics.pipelines.values()
+        ],
+    )
+
+
+def _to_pipeline_metrics_payload(
+    metrics: BackgroundJobPipelineMetrics,
+) -> BackgroundJobPipelineMetricsPayload:
+    return BackgroundJobPipelineMetricsPayload(
+        pipeline=metrics.pipeline,
+        processed_attempt_count=metrics.processed_attempt_count,
+        succeeded_count=metrics.succeeded_count,
+        failed_attempt_count=metrics.failed_attempt_count,
+        retry_count=metrics.retry_count,
+        dead_letter_count=metrics.dead_letter_count,
+        processing_latency=_to_latency_payload(metrics.processing_latency),
+        queue_wait=_to_latency_payload(metrics.queue_wait),
+        throughput=[
+            ThroughputWindowPayload(window_seconds=window, attempts_per_second=rate)
+            for window, rate in sorted(metrics.throughput_per_second.items())
+        ],
+    )
+
+
+def _to_latency_payload(histogram: LatencyHistogramSnapshot) -> LatencyPercentilesPayload:
+    return LatencyPercentilesPayload(
+        count=histogram.count,
+        average_ms=histogram.average_ms,
+        p50_ms=histogram.p50_ms,
+        p95_ms=histogram.p95_ms,
+        p99_ms=histogram.p99_ms,
+        max_ms=histogram.max_ms,
     )
 
 
@@ -133,3 +394,52 @@ def _to_dead_letter_payload(record: BackgroundJobRecord) -> BackgroundJobDeadLet
         last_error_message=record.last_error_message,
         last_failed_at=record.last_failed_at,
     )
+
+
+def _to_ndjson(progress: Iterator[BackgroundJobRedriveProgress]) -> Iterator[str]:
+    for item in progress:
+        payload = BackgroundJobRedriveProgressPayload(
+            batch_number=item.batch_number,
+            job_ids=list(item.job_ids),
+            redriven_count=item.redriven_count,
+            skipped_count=item.skipped_count,
+            elapsed_seconds=item.elapsed_seconds,
+            done=item.done,
+        )
+        yield payload.model_dump_json(by_alias=True) + "\n"
+
+
+def _to_bulk_sync_metrics_payload(
+    metrics: WahooBulkSyncRunMetrics,
+) -> WahooBulkSyncRunMetricsPayload:
+    return WahooBulkSyncRunMetricsPayload(
+        run_id=metrics.run_id,
+        shard_count=metrics.shard_count,
+        athlete_count=metrics.athlete_count,
+        pending_count=metrics.pending_count,
+        completed_count=metrics.completed_count,
+        failed_count=metrics.failed_count,
+        skipped_count=metrics.skipped_count,
+        imported_activity_count=metrics.imported_activity_count,
+        started_at=metrics.started_at,
+        finished_at=metrics.finished_at,
+        elapsed_seconds=metrics.elapsed_seconds,
+        athletes_per_second=metrics.athletes_per_second,
+        activities_per_second=metrics.activities_per_second,
+        max_completion_lag_seconds=metrics.max_completion_lag_seconds,
+        oldest_pending_lag_seconds=metrics.oldest_pending_lag_seconds,
+        done=metrics.done,
+    )
+
+
+def _to_cache_metrics_payload(metrics: ComputationCacheMetrics) -> ComputationCacheMetricsPayload:
+    return ComputationCacheMetricsPayload(
+        lookup_count=metrics.lookup_count,
+        local_hit_count=metrics.local_hit_count,
+        external_hit_count=metrics.external_hit_count,
+        miss_count=metrics.miss_count,
+        not_modified_count=metrics.not_modified_count,
+        eviction_count=metrics.eviction_count,
+        local_entry_count=metrics.local_entry_count,
+        hit_rate=metrics.hit_rate,
+    )
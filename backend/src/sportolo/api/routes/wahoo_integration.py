@@ -1,62 +1,153 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Path
+from fastapi import APIRouter, Depends, Header, Path, Query, Response
+from fastapi.responses import StreamingResponse
 
-from sportolo.api.dependencies import get_wahoo_control_service, get_wahoo_integration_service
-from sportolo.api.schemas.common import ValidationError
+from sportolo.api.dependencies import (
+    get_wahoo_access_token_source,
+    get_wahoo_control_service,
+    get_wahoo_integration_service,
+)
+from sportolo.api.schemas.common import RetryLaterError, ValidationError
 from sportolo.api.schemas.wahoo_integration import (
+    WahooConnectionRequest,
+    WahooExecutionHistorySyncPage,
     WahooExecutionHistorySyncRequest,
     WahooExecutionHistorySyncResponse,
+    WahooExecutionHistorySyncSummary,
+    WahooSyncView,
     WahooTrainerControlRequest,
     WahooTrainerControlResponse,
     WahooWorkoutPushRequest,
     WahooWorkoutPushResponse,
 )
+from sportolo.services.wahoo_bulk_sync_service import InMemoryWahooAccessTokenSource
 from sportolo.services.wahoo_control_service import WahooControlService
 from sportolo.services.wahoo_integration_service import WahooIntegrationService
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
 router = APIRouter(tags=["Integrations"])
+# Push, sync and sync-entry routes are plain `def`: the integration service reads and
+# writes the idempotency store synchronously (over SQL in production), so FastAPI runs
+# them in its threadpool instead of on the event loop.
 service = get_wahoo_integration_service()
 control_service = get_wahoo_control_service()
 
 
+@router.put(
+    "/v1/athletes/{athleteId}/integrations/wahoo/connection",
+    status_code=204,
+    operation_id="connectWahoo",
+    responses={422: {"model": ValidationError}},
+)
+async def connect_wahoo(
+    request: WahooConnectionRequest,
+    token_source: Annotated[InMemoryWahooAccessTokenSource, Depends(get_wahoo_access_token_source)],
+    athlete_id: str = Path(alias="athleteId"),
+) -> Response:
+    # Tokens are held by this API process; bulk sync shard jobs run on its in-process
+    # worker, never on the standalone worker.
+    token_source.connect(athlete_id, request.access_token)
+    return Response(status_code=204)
+
+
+@router.delete(
+    "/v1/athletes/{athleteId}/integrations/wahoo/connection",
+    status_code=204,
+    operation_id="disconnectWahoo",
+    responses={422: {"model": ValidationError}},
+)
+async def disconnect_wahoo(
+    token_source: Annotated[InMemoryWahooAccessTokenSource, Depends(get_wahoo_access_token_source)],
+    athlete_id: str = Path(alias="athleteId"),
+) -> Response:
+    token_source.disconnect(athlete_id)
+    return Response(status_code=204)
+
+
 @router.post(
     "/v1/athletes/{athleteId}/integrations/wahoo/workouts/push",
     response_model=WahooWorkoutPushResponse,
     operation_id="pushWahooWorkout",
     responses={422: {"model": ValidationError}},
 )
-async def push_wahoo_workout(
+def push_wahoo_workout(
     request: WahooWorkoutPushRequest,
     service: Annotated[WahooIntegrationService, Depends(get_wahoo_integration_service)],
     athlete_id: str = Path(alias="athleteId"),
-) -> WahooWorkoutPushResponse:
-    return service.push_workout(athlete_id=athlete_id, request=request)
+) -> Response:
+    return Response(
+        content=service.push_workout_response_body(athlete_id=athlete_id, request=request),
+        media_type="application/json",
+    )
 
 
 @router.post(
     "/v1/athletes/{athleteId}/integrations/wahoo/execution-history/sync",
-    response_model=WahooExecutionHistorySyncResponse,
+    response_model=WahooExecutionHistorySyncResponse | WahooExecutionHistorySyncSummary,
     operation_id="syncWahooExecutionHistory",
-    responses={422: {"model": ValidationError}},
+    responses={
+        200: {"content": {NDJSON_MEDIA_TYPE: {}}},
+        422: {"model": ValidationError},
+    },
 )
-async def sync_wahoo_execution_history(
+def sync_wahoo_execution_history(
     request: WahooExecutionHistorySyncRequest,
     service: Annotated[WahooIntegrationService, Depends(get_wahoo_integration_service)],
     athlete_id: str = Path(alias="athleteId"),
-) -> WahooExecutionHistorySyncResponse:
-    return service.sync_execution_history(athlete_id=athlete_id, request=request)
+    view: Annotated[WahooSyncView, Query()] = "full",
+    accept: str | None = Header(default=None),
+) -> Response:
+    if accept is not None and NDJSON_MEDIA_TYPE in accept:
+        # The sync completes before streaming starts, so a client that disconnects
+        # mid-stream can page through the rest by `syncId`.
+        summary = service.sync_execution_history_summary(athlete_id=athlete_id, request=request)
+        return StreamingResponse(
+            service.iter_sync_execution_history_ndjson(athlete_id, summary),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    if view == "summary":
+        content = service.sync_execution_history_summary_body(
+            athlete_id=athlete_id, request=request
+        )
+    else:
+        content = service.sync_execution_history_response_body(
+            athlete_id=athlete_id, request=request
+        )
+    return Response(content=content, media_type="application/json")
+
+
+@router.get(
+    "/v1/athletes/{athleteId}/integrations/wahoo/execution-history/syncs/{syncId}/entries",
+    response_model=WahooExecutionHistorySyncPage,
+    operation_id="listWahooSyncEntries",
+    responses={422: {"model": ValidationError}},
+)
+def list_wahoo_sync_entries(
+    service: Annotated[WahooIntegrationService, Depends(get_wahoo_integration_service)],
+    athlete_id: str = Path(alias="athleteId"),
+    sync_id: str = Path(alias="syncId"),
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=100, ge=1, le=1_000),
+) -> WahooExecutionHistorySyncPage:
+    return service.sync_result_page(athlete_id, sync_id, cursor=cursor, limit=limit)
 
 
 @router.post(
     "/v1/athletes/{athleteId}/integrations/wahoo/trainers/control",
     response_model=WahooTrainerControlResponse,
     operation_id="controlWahooTrainer",
-    responses={422: {"model": ValidationError}},
+    responses={422: {"model": ValidationError}, 429: {"model": RetryLaterError}},
 )
 async def control_wahoo_trainer(
     request: WahooTrainerControlRequest,
     control_service: Annotated[WahooControlService, Depends(get_wahoo_control_service)],
     athlete_id: str = Path(alias="athleteId"),
-) -> WahooTrainerControlResponse:
-    return control_service.send_control_command(athlete_id=athlete_id, request=request)
+) -> Response:
+    return Response(
+        content=await control_service.submit_control_command_response_body(
+            athlete_id=athlete_id, request=request
+        ),
+        media_type="application/json",
+    )
@@ -44,3 +44,8 @@ class ValidationError(BaseModel):
     phase: Literal["parse", "validate", "compile", "guardrail"] = "validate"
     line: int | None = None
     column: int | None = None
+
+
+class RetryLaterError(BaseModel):
+    code: Literal["WAHOO_CONTROL_MAILBOX_FULL"]
+    message: str
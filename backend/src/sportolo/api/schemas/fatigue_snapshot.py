@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from datetime import date
+
+from pydantic import Field
+
+from sportolo.api.schemas.common import CamelModel
+
+
+class FatigueSnapshotSystemCapacity(CamelModel):
+    sleep: int | None = Field(default=None, ge=1, le=5)
+    fuel: int = Field(ge=1, le=5)
+    stress: int = Field(ge=1, le=5)
+
+
+class FatigueSnapshotDay(CamelModel):
+    snapshot_date: date
+    global_neural: float
+    global_metabolic: float
+    derived_recruitment: float | None = None
+    regional_recruitment: dict[str, float]
+    regional_metabolic: dict[str, float]
+    regional_mechanical: dict[str, float]
+    system_capacity: FatigueSnapshotSystemCapacity
+
+
+class FatigueSnapshotListResponse(CamelModel):
+    athlete_id: str
+    start_date: date
+    end_date: date
+    snapshots: list[FatigueSnapshotDay]
@@ -9,16 +9,20 @@ WahooStepType = Literal["warmup", "interval", "recovery", "cooldown", "steady"]
 WahooTargetType = Literal["power", "pace", "heart_rate", "cadence"]
 WahooPushStatus = Literal["accepted", "failed"]
 WahooSyncStatus = Literal["completed"]
+WahooSyncMode = Literal["full", "incremental"]
+WahooSyncView = Literal["full", "summary"]
+WahooSyncStreamLineType = Literal["page", "summary"]
 WahooDedupStatus = Literal["new_linked", "duplicate_linked", "new_unlinked", "duplicate_unlinked"]
 PipelineName = Literal["workout_sync", "fatigue_recompute"]
 PipelineDispatchStatus = Literal["queued"]
 WahooControlMode = Literal["erg", "resistance", "slope"]
-WahooControlStatus = Literal["applied", "safety_fallback", "failed"]
+WahooControlStatus = Literal["applied", "safety_fallback", "failed", "superseded"]
 WahooControlTransition = Literal[
     "mode_changed",
     "reconnected_mode_changed",
     "fallback_applied",
     "failed",
+    "superseded",
 ]
 WahooConnectionState = Literal["connected", "disconnected"]
 WahooControlTelemetryEventType = Literal[
@@ -50,6 +54,23 @@ class WahooWorkoutStep(CamelModel):
     target_value: float = Field(gt=0)
     target_unit: str = Field(min_length=1, max_length=32)
 
+    @model_validator(mode="after")
+    def validate_relative_target(self) -> WahooWorkoutStep:
+        if self.target_unit == "percent_ftp" and self.target_type != "power":
+            raise ValueError("percent_ftp targets require targetType power")
+        if self.target_unit == "percent_threshold_pace" and self.target_type != "pace":
+            raise ValueError("percent_threshold_pace targets require targetType pace")
+        return self
+
+
+class WahooConnectionRequest(CamelModel):
+    access_token: str = Field(min_length=1, max_length=4096)
+
+
+class WahooAthleteTargets(CamelModel):
+    ftp_watts: float | None = Field(default=None, gt=0)
+    threshold_pace_seconds_per_km: float | None = Field(default=None, gt=0)
+
 
 class WahooWorkoutPushRequest(CamelModel):
     idempotency_key: str = Field(min_length=1, max_length=128)
@@ -58,6 +79,21 @@ class WahooWorkoutPushRequest(CamelModel):
     workout_name: str = Field(min_length=1, max_length=160)
     planned_start_at: datetime | None = None
     steps: list[WahooWorkoutStep] = Field(min_length=1, max_length=200)
+    athlete_targets: WahooAthleteTargets | None = None
+
+    @model_validator(mode="after")
+    def validate_athlete_targets(self) -> WahooWorkoutPushRequest:
+        targets = self.athlete_targets
+        units = {step.target_unit for step in self.steps}
+        if "percent_ftp" in units and (targets is None or targets.ftp_watts is None):
+            raise ValueError("percent_ftp targets require athleteTargets.ftpWatts")
+        if "percent_threshold_pace" in units and (
+            targets is None or targets.threshold_pace_seconds_per_km is None
+        ):
+            raise ValueError(
+                "percent_threshold_pace targets require athleteTargets.thresholdPaceSecondsPerKm"
+            )
+        return self
 
 
 class WahooWorkoutPushResponse(CamelModel):
@@ -67,6 +103,7 @@ class WahooWorkoutPushResponse(CamelModel):
     idempotency_key: str
     planned_workout_id: str
     external_workout_id: str | None = None
+    template_id: str | None = None
     step_count: int = Field(ge=0)
     total_duration_seconds: int = Field(ge=0)
     received_at: datetime
@@ -77,6 +114,7 @@ class WahooExecutionHistorySyncRequest(CamelModel):
     idempotency_key: str = Field(min_length=1, max_length=128)
     started_after: datetime | None = None
     started_before: datetime | None = None
+    mode: WahooSyncMode = "full"
 
     @model_validator(mode="after")
     def validate_window(self) -> WahooExecutionHistorySyncRequest:
@@ -104,6 +142,7 @@ class PipelineDispatch(CamelModel):
     external_activity_id: str
     planned_workout_id: str | None = None
     sequence_number: int = Field(ge=1)
+    activity_started_at: datetime | None = None
     status: PipelineDispatchStatus = "queued"
 
 
@@ -112,14 +151,48 @@ class WahooExecutionHistorySyncResponse(CamelModel):
     provider: Literal["wahoo"] = "wahoo"
     status: WahooSyncStatus = "completed"
     idempotency_key: str
+    mode: WahooSyncMode = "full"
     started_after: datetime | None = None
     started_before: datetime | None = None
+    cursor_started_at: datetime | None = None
     imported_count: int = Field(ge=0)
     duplicate_count: int = Field(ge=0)
     entries: list[WahooExecutionHistoryEntry]
     pipeline_dispatches: list[PipelineDispatch]
 
 
+class WahooExecutionHistorySyncSummary(CamelModel):
+    """A completed sync without its entries; page through them by `syncId`."""
+
+    sync_id: str
+    provider: Literal["wahoo"] = "wahoo"
+    status: WahooSyncStatus = "completed"
+    idempotency_key: str
+    mode: WahooSyncMode = "full"
+    started_after: datetime | None = None
+    started_before: datetime | None = None
+    cursor_started_at: datetime | None = None
+    imported_count: int = Field(ge=0)
+    duplicate_count: int = Field(ge=0)
+    entry_count: int = Field(ge=0)
+    dispatch_count: int = Field(ge=0)
+
+
+class WahooExecutionHistorySyncPage(CamelModel):
+    sync_id: str
+    entries: list[WahooExecutionHistoryEntry]
+    pipeline_dispatches: list[PipelineDispatch]
+    next_cursor: str | None = None
+
+
+class WahooExecutionHistorySyncStreamLine(CamelModel):
+    """One NDJSON line of a streamed sync: entry pages, then one closing summary."""
+
+    type: WahooSyncStreamLineType
+    page: WahooExecutionHistorySyncPage | None = None
+    summary: WahooExecutionHistorySyncSummary | None = None
+
+
 class WahooControlTelemetryEvent(CamelModel):
     event_id: str
     event_type: WahooControlTelemetryEventType
@@ -175,5 +248,6 @@ class WahooTrainerControlResponse(CamelModel):
     connection_state: WahooConnectionState
     transition: WahooControlTransition
     failure_reason: str | None = None
+    superseded_by_idempotency_key: str | None = None
     issued_at: datetime
     telemetry_events: list[WahooControlTelemetryEvent]
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+
 from fastapi import FastAPI
 
+from sportolo.api.dependencies import get_background_job_queue
 from sportolo.api.error_handlers import register_exception_handlers
 from sportolo.api.router_registry import register_routers
 from sportolo.config import Settings, get_settings
+from sportolo.services.background_worker_service import AsyncBackgroundWorker
 
 
 def create_app(settings: Settings | None = None) -> FastAPI:
@@ -12,7 +17,31 @@ def create_app(settings: Settings | None = None) -> FastAPI:
     app = FastAPI(
         title=resolved_settings.app_name,
         version=resolved_settings.app_version,
+        lifespan=_build_lifespan(resolved_settings),
     )
     register_exception_handlers(app)
     register_routers(app, settings=resolved_settings)
     return app
+
+
+def _build_lifespan(
+    settings: Settings,
+) -> Callable[[FastAPI], AbstractAsyncContextManager[None]]:
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        del app
+        if not settings.background_workers_enabled:
+            yield
+            return
+
+        worker = AsyncBackgroundWorker(
+            get_background_job_queue(),
+            concurrency=settings.background_worker_concurrency,
+        )
+        await worker.start()
+        try:
+            yield
+        finally:
+            await worker.stop()
+
+    return lifespan
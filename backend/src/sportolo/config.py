@@ -28,6 +28,26 @@ class Settings:
     app_name: str
     app_version: str
     environment: str
+    database_url: str
+    background_job_queue_backend: str
+    background_job_succeeded_retention_seconds: int
+    background_job_attempt_retention_seconds: int
+    background_job_retry_base_delay_seconds: float
+    background_job_retry_max_delay_seconds: float
+    background_job_worker_retry_budget_ratio: float
+    background_job_worker_circuit_breaker_threshold: int
+    background_workers_enabled: bool
+    background_worker_concurrency: int
+    fatigue_history_backend: str
+    idempotency_store_backend: str
+    idempotency_ttl_seconds: int
+    idempotency_max_entries: int
+    wahoo_bulk_sync_checkpoint_backend: str
+    wahoo_bulk_sync_shard_count: int
+    wahoo_control_mailbox_capacity: int
+    wahoo_control_deadline_seconds: float
+    wahoo_simulated_trainer_latency_ms: float
+    wahoo_simulated_trainer_loss_rate: float
     feature_flags: FeatureFlags
 
 
@@ -37,6 +57,55 @@ def get_settings() -> Settings:
         app_name=os.getenv("SPORTOLO_APP_NAME", "Sportolo API"),
         app_version=os.getenv("SPORTOLO_APP_VERSION", "0.1.0"),
         environment=os.getenv("SPORTOLO_ENV", "development"),
+        database_url=os.getenv("SPORTOLO_DATABASE_URL", "sqlite+pysqlite:///:memory:"),
+        background_job_queue_backend=os.getenv(
+            "SPORTOLO_BACKGROUND_JOB_QUEUE_BACKEND",
+            "memory",
+        ),
+        background_job_succeeded_retention_seconds=int(
+            os.getenv("SPORTOLO_BACKGROUND_JOB_SUCCEEDED_RETENTION_SECONDS", "86400")
+        ),
+        background_job_attempt_retention_seconds=int(
+            os.getenv("SPORTOLO_BACKGROUND_JOB_ATTEMPT_RETENTION_SECONDS", "604800")
+        ),
+        background_job_retry_base_delay_seconds=float(
+            os.getenv("SPORTOLO_BACKGROUND_JOB_RETRY_BASE_DELAY_SECONDS", "1")
+        ),
+        background_job_retry_max_delay_seconds=float(
+            os.getenv("SPORTOLO_BACKGROUND_JOB_RETRY_MAX_DELAY_SECONDS", "300")
+        ),
+        background_job_worker_retry_budget_ratio=float(
+            os.getenv("SPORTOLO_BACKGROUND_JOB_WORKER_RETRY_BUDGET_RATIO", "0.2")
+        ),
+        background_job_worker_circuit_breaker_threshold=int(
+            os.getenv("SPORTOLO_BACKGROUND_JOB_WORKER_CIRCUIT_BREAKER_THRESHOLD", "20")
+        ),
+        background_workers_enabled=_read_bool_env(
+            "SPORTOLO_BACKGROUND_WORKERS_ENABLED",
+            default=False,
+        ),
+        background_worker_concurrency=int(os.getenv("SPORTOLO_BACKGROUND_WORKER_CONCURRENCY", "4")),
+        fatigue_history_backend=os.getenv("SPORTOLO_FATIGUE_HISTORY_BACKEND", "memory"),
+        idempotency_store_backend=os.getenv("SPORTOLO_IDEMPOTENCY_STORE_BACKEND", "memory"),
+        idempotency_ttl_seconds=int(os.getenv("SPORTOLO_IDEMPOTENCY_TTL_SECONDS", "86400")),
+        idempotency_max_entries=int(os.getenv("SPORTOLO_IDEMPOTENCY_MAX_ENTRIES", "100000")),
+        wahoo_bulk_sync_checkpoint_backend=os.getenv(
+            "SPORTOLO_WAHOO_BULK_SYNC_CHECKPOINT_BACKEND",
+            "memory",
+        ),
+        wahoo_bulk_sync_shard_count=int(os.getenv("SPORTOLO_WAHOO_BULK_SYNC_SHARD_COUNT", "8")),
+        wahoo_control_mailbox_capacity=int(
+            os.getenv("SPORTOLO_WAHOO_CONTROL_MAILBOX_CAPACITY", "8")
+        ),
+        wahoo_control_deadline_seconds=float(
+            os.getenv("SPORTOLO_WAHOO_CONTROL_DEADLINE_SECONDS", "2.0")
+        ),
+        wahoo_simulated_trainer_latency_ms=float(
+            os.getenv("SPORTOLO_WAHOO_SIMULATED_TRAINER_LATENCY_MS", "0")
+        ),
+        wahoo_simulated_trainer_loss_rate=float(
+            os.getenv("SPORTOLO_WAHOO_SIMULATED_TRAINER_LOSS_RATE", "0")
+        ),
         feature_flags=FeatureFlags(
             wahoo_integration=_read_bool_env(
                 "SPORTOLO_FEATURE_WAHOO_ENABLED",
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from sportolo.models import Base
+
+
+def is_ephemeral_database(database_url: str) -> bool:
+    return database_url.startswith("sqlite") and (
+        database_url.endswith(":memory:") or database_url.endswith("://")
+    )
+
+
+def create_database_engine(database_url: str) -> Engine:
+    if is_ephemeral_database(database_url):
+        # A single shared connection keeps the in-memory database alive for the process
+        # and visible to every request thread.
+        engine = create_engine(
+            database_url,
+            future=True,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(engine)
+        return engine
+
+    return create_engine(database_url, future=True, pool_pre_ping=True)
+
+
+def build_session_factory(engine: Engine) -> sessionmaker[Session]:
+    return sessionmaker(bind=engine, expire_on_commit=False)
@@ -1,4 +1,26 @@
+from sportolo.models.background_job import (
+    BackgroundJob,
+    BackgroundJobAttempt,
+    BackgroundJobCoalescedRequest,
+    BackgroundJobMetricRollup,
+)
 from sportolo.models.base import Base
+from sportolo.models.fatigue_history_session import FatigueHistorySession
+from sportolo.models.fatigue_region import FatigueRegion, FatigueSnapshotRegionalAxis
 from sportolo.models.fatigue_snapshot import FatigueSnapshot
+from sportolo.models.idempotency_record import IdempotencyRecord
+from sportolo.models.wahoo_bulk_sync_checkpoint import WahooBulkSyncCheckpoint
 
-__all__ = ["Base", "FatigueSnapshot"]
+__all__ = [
+    "BackgroundJob",
+    "BackgroundJobAttempt",
+    "BackgroundJobCoalescedRequest",
+    "BackgroundJobMetricRollup",
+    "Base",
+    "FatigueHistorySession",
+    "FatigueRegion",
+    "FatigueSnapshot",
+    "FatigueSnapshotRegionalAxis",
+    "IdempotencyRecord",
+    "WahooBulkSyncCheckpoint",
+]
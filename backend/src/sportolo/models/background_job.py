@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Boolean,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    false,
+    text,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from sportolo.models.base import Base
+
+
+class BackgroundJob(Base):
+    __tablename__ = "background_jobs"
+    __table_args__ = (
+        Index(
+            "ux_background_jobs_athlete_id_idempotency_key",
+            "athlete_id",
+            "idempotency_key",
+            unique=True,
+        ),
+        Index("ix_background_jobs_status_available_at", "status", "available_at"),
+        # At most one processing job per (athlete, pipeline) for serialized pipelines.
+        Index(
+            "ux_background_jobs_serialized_processing",
+            "athlete_id",
+            "pipeline",
+            unique=True,
+            sqlite_where=text("status = 'processing' AND serialized"),
+            postgresql_where=text("status = 'processing' AND serialized"),
+        ),
+    )
+
+    job_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    athlete_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    pipeline: Mapped[str] = mapped_column(String(32), nullable=False)
+    idempotency_key: Mapped[str] = mapped_column(String(255), nullable=False)
+    correlation_id: Mapped[str] = mapped_column(String(128), nullable=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    payload_fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    status: Mapped[str] = mapped_column(String(16), nullable=False)
+    attempt_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False)
+    retry_delay_seconds: Mapped[int] = mapped_column(Integer, nullable=False)
+    serialized: Mapped[bool] = mapped_column(
+        Boolean,
+        nullable=False,
+        default=False,
+        server_default=false(),
+    )
+    coalesced_request_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default="0",
+    )
+
+    enqueued_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    available_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    last_error_code: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    last_error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
+    last_failed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    lease_owner: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+
+class BackgroundJobAttempt(Base):
+    __tablename__ = "background_job_attempts"
+    __table_args__ = (Index("ix_background_job_attempts_finished_at", "finished_at"),)
+
+    job_id: Mapped[str] = mapped_column(
+        String(64),
+        ForeignKey("background_jobs.job_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    attempt_number: Mapped[int] = mapped_column(Integer, primary_key=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    finished_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    latency_ms: Mapped[float] = mapped_column(Float, nullable=False)
+    # Null for attempts recorded before queue wait was tracked.
+    queue_wait_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    status: Mapped[str] = mapped_column(String(16), nullable=False)
+    error_code: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+
+class BackgroundJobCoalescedRequest(Base):
+    """An enqueue request that was merged into an existing pending job."""
+
+    __tablename__ = "background_job_coalesced_requests"
+    __table_args__ = (Index("ix_background_job_coalesced_requests_job_id", "job_id"),)
+
+    athlete_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    idempotency_key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    job_id: Mapped[str] = mapped_column(
+        String(64),
+        ForeignKey("background_jobs.job_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    correlation_id: Mapped[str] = mapped_column(String(128), nullable=False)
+    payload_fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    coalesced_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class BackgroundJobMetricRollup(Base):
+    """Running per-pipeline counters behind the SQL queue's metrics.
+
+    `series` is `enqueued`, `coalesced`, `processing` (keyed by attempt `status` and
+    latency bucket) or `queue_wait` (keyed by latency bucket). Rows are incremented in
+    the transaction that writes the counted job or attempt, so metrics reads stay
+    constant-size and survive attempt-log retention.
+    """
+
+    __tablename__ = "background_job_metric_rollups"
+
+    pipeline: Mapped[str] = mapped_column(String(32), primary_key=True)
+    series: Mapped[str] = mapped_column(String(16), primary_key=True)
+    status: Mapped[str] = mapped_column(String(16), primary_key=True)
+    bucket_index: Mapped[int] = mapped_column(Integer, primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    sum_ms: Mapped[float] = mapped_column(Float, nullable=False)
+    max_ms: Mapped[float] = mapped_column(Float, nullable=False)
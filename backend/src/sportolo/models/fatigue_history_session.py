@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, Float, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from sportolo.models.base import Base
+
+
+class FatigueHistorySession(Base):
+    """A completed training session that feeds fatigue snapshot recomputes."""
+
+    __tablename__ = "fatigue_history_sessions"
+    __table_args__ = (
+        Index(
+            "ix_fatigue_history_sessions_athlete_id_ended_at",
+            "athlete_id",
+            "ended_at",
+        ),
+    )
+
+    athlete_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    session_id: Mapped[str] = mapped_column(String(128), primary_key=True)
+    state: Mapped[str] = mapped_column(String(16), nullable=False)
+    ended_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    raw_neural: Mapped[float] = mapped_column(Float, nullable=False)
+    raw_metabolic: Mapped[float] = mapped_column(Float, nullable=False)
+    raw_mechanical: Mapped[float] = mapped_column(Float, nullable=False)
+    regional_distribution: Mapped[dict[str, float]] = mapped_column(JSON, nullable=False)
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from sqlalchemy import Float, ForeignKey, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from sportolo.models.base import Base
+
+
+class FatigueRegion(Base):
+    __tablename__ = "fatigue_regions"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    region_key: Mapped[str] = mapped_column(String(64), nullable=False, unique=True)
+
+
+class FatigueSnapshotRegionalAxis(Base):
+    __tablename__ = "fatigue_snapshot_regional_axes"
+
+    snapshot_id: Mapped[str] = mapped_column(
+        String(36),
+        ForeignKey("fatigue_snapshots.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    region_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("fatigue_regions.id"),
+        primary_key=True,
+    )
+
+    recruitment: Mapped[float | None] = mapped_column(Float, nullable=True)
+    metabolic: Mapped[float | None] = mapped_column(Float, nullable=True)
+    mechanical: Mapped[float | None] = mapped_column(Float, nullable=True)
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import date, datetime
 from uuid import uuid4
 
-from sqlalchemy import JSON, Date, DateTime, Float, Integer, String, func
+from sqlalchemy import JSON, Date, DateTime, Float, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from sportolo.models.base import Base
@@ -11,9 +11,17 @@ from sportolo.models.base import Base
 
 class FatigueSnapshot(Base):
     __tablename__ = "fatigue_snapshots"
+    __table_args__ = (
+        Index(
+            "ux_fatigue_snapshots_athlete_id_snapshot_date",
+            "athlete_id",
+            "snapshot_date",
+            unique=True,
+        ),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
-    athlete_id: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    athlete_id: Mapped[str] = mapped_column(String(64), nullable=False)
     snapshot_date: Mapped[date] = mapped_column(Date, nullable=False)
 
     global_neural: Mapped[float] = mapped_column(Float, nullable=False)
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from sportolo.models.base import Base
+
+
+class WahooBulkSyncCheckpoint(Base):
+    """Progress of one athlete within a bulk Wahoo sync run."""
+
+    __tablename__ = "wahoo_bulk_sync_checkpoints"
+    __table_args__ = (
+        Index(
+            "ix_wahoo_bulk_sync_checkpoints_run_id_shard_index",
+            "run_id",
+            "shard_index",
+        ),
+    )
+
+    run_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    athlete_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    shard_index: Mapped[int] = mapped_column(Integer, nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False)
+    attempt_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    imported_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    planned_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from collections.abc import Sequence
+from datetime import datetime
+from typing import cast, get_args
+
+from sportolo.api.dependencies import get_background_job_queue
+from sportolo.config import get_settings
+from sportolo.services.background_job_queue_service import (
+    BackgroundJobDeadLetterFilter,
+    BackgroundJobPipeline,
+)
+from sportolo.services.background_job_redrive_service import (
+    BackgroundJobRedriveOptions,
+    BackgroundJobRedriver,
+)
+
+_PIPELINES = cast(tuple[BackgroundJobPipeline, ...], get_args(BackgroundJobPipeline))
+
+
+def _parse_aware_datetime(raw_value: str) -> datetime:
+    try:
+        value = datetime.fromisoformat(raw_value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError("expected an ISO 8601 timestamp") from exc
+    if value.tzinfo is None:
+        raise argparse.ArgumentTypeError("timestamp must include a UTC offset")
+    return value
+
+
+def _parse_args(argv: Sequence[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Requeue dead-lettered background jobs from the shared SQL job queue in "
+            "rate-limited batches, printing one JSON progress line per batch."
+        )
+    )
+    parser.add_argument("--pipeline", choices=_PIPELINES, default=None)
+    parser.add_argument("--error-code", default=None)
+    parser.add_argument("--athlete-id", default=None)
+    parser.add_argument(
+        "--failed-after",
+        type=_parse_aware_datetime,
+        default=None,
+        help="Only jobs whose last failure is at or after this timestamp.",
+    )
+    parser.add_argument(
+        "--failed-before",
+        type=_parse_aware_datetime,
+        default=None,
+        help="Only jobs whose last failure is before this timestamp.",
+    )
+    parser.add_argument(
+        "--attempt-budget",
+        type=int,
+        default=3,
+        help="Fresh attempts granted to each redriven job.",
+    )
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument(
+        "--max-jobs-per-second",
+        type=float,
+        default=200.0,
+        help="Requeue rate limit across batches.",
+    )
+    parser.add_argument(
+        "--max-queue-depth",
+        type=int,
+        default=None,
+        help="Pause between batches while more jobs than this are queued.",
+    )
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many jobs.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = _parse_args(argv)
+    if get_settings().background_job_queue_backend != "sql":
+        print(
+            "Redrive needs a shared queue; set SPORTOLO_BACKGROUND_JOB_QUEUE_BACKEND=sql.",
+            file=sys.stderr,
+        )
+        return 2
+
+    try:
+        options = BackgroundJobRedriveOptions(
+            attempt_budget=args.attempt_budget,
+            batch_size=args.batch_size,
+            max_jobs_per_second=args.max_jobs_per_second,
+            max_queue_depth=args.max_queue_depth,
+            limit=args.limit,
+        )
+    except ValueError as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+
+    logging.basicConfig(level=logging.INFO)
+    redriver = BackgroundJobRedriver(get_background_job_queue())
+    for progress in redriver.iter_redrive(
+        BackgroundJobDeadLetterFilter(
+            pipeline=args.pipeline,
+            error_code=args.error_code,
+            athlete_id=args.athlete_id,
+            failed_after=args.failed_after,
+            failed_before=args.failed_before,
+        ),
+        options,
+    ):
+        print(
+            json.dumps(
+                {
+                    "batchNumber": progress.batch_number,
+                    "redrivenCount": progress.redriven_count,
+                    "skippedCount": progress.skipped_count,
+                    "batchJobCount": len(progress.job_ids),
+                    "elapsedSeconds": progress.elapsed_seconds,
+                    "done": progress.done,
+                }
+            ),
+            flush=True,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
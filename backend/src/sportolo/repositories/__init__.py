@@ -1,3 +1,13 @@
-from sportolo.repositories.fatigue_snapshot_repository import FatigueSnapshotRepository
+from sportolo.repositories.fatigue_snapshot_repository import (
+    FatigueRegionalAxisPoint,
+    FatigueSnapshotRangeRow,
+    FatigueSnapshotRepository,
+    FatigueSnapshotUpsert,
+)
 
-__all__ = ["FatigueSnapshotRepository"]
+__all__ = [
+    "FatigueRegionalAxisPoint",
+    "FatigueSnapshotRangeRow",
+    "FatigueSnapshotRepository",
+    "FatigueSnapshotUpsert",
+]
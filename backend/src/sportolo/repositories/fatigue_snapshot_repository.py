@@ -1,11 +1,72 @@
 from __future__ import annotations
 
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
 from datetime import date
+from typing import Any, cast
+from uuid import uuid4
 
+from sqlalchemy import ColumnElement, delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
+from sportolo.models.fatigue_region import FatigueRegion, FatigueSnapshotRegionalAxis
 from sportolo.models.fatigue_snapshot import FatigueSnapshot
 
+_UPSERT_COLUMNS = (
+    "global_neural",
+    "global_metabolic",
+    "regional_recruitment",
+    "regional_metabolic",
+    "regional_mechanical",
+    "derived_recruitment",
+    "system_capacity_sleep",
+    "system_capacity_fuel",
+    "system_capacity_stress",
+)
+_REGIONAL_AXES = ("recruitment", "metabolic", "mechanical")
+_REGIONAL_AXIS_INSERT_BATCH_SIZE = 1000
+
+_RegionalAxisPayloads = tuple[dict[str, float], dict[str, float], dict[str, float]]
+
+
+@dataclass(frozen=True)
+class FatigueSnapshotUpsert:
+    athlete_id: str
+    snapshot_date: date
+    global_neural: float
+    global_metabolic: float
+    regional_recruitment: dict[str, float]
+    regional_metabolic: dict[str, float]
+    regional_mechanical: dict[str, float]
+    system_capacity_sleep: int | None
+    system_capacity_fuel: int
+    system_capacity_stress: int
+    derived_recruitment: float | None
+
+
+@dataclass(frozen=True)
+class FatigueSnapshotRangeRow:
+    athlete_id: str
+    snapshot_date: date
+    global_neural: float
+    global_metabolic: float
+    derived_recruitment: float | None
+    system_capacity_sleep: int | None
+    system_capacity_fuel: int
+    system_capacity_stress: int
+    regional_recruitment: dict[str, float] | None = None
+    regional_metabolic: dict[str, float] | None = None
+    regional_mechanical: dict[str, float] | None = None
+
+
+@dataclass(frozen=True)
+class FatigueRegionalAxisPoint:
+    snapshot_date: date
+    recruitment: float | None
+    metabolic: float | None
+    mechanical: float | None
+
 
 class FatigueSnapshotRepository:
     def __init__(self, session: Session) -> None:
@@ -49,13 +110,308 @@ class FatigueSnapshotRepository:
         )
 
         self._session.add(snapshot)
+        self._session.flush()
+        self._write_regional_axes(
+            {
+                snapshot.id: (recruitment_payload, metabolic_payload, mechanical_payload),
+            }
+        )
         self._session.commit()
         self._session.refresh(snapshot)
         return snapshot
 
+    def bulk_upsert_snapshots(
+        self,
+        rows: Sequence[FatigueSnapshotUpsert],
+        *,
+        batch_size: int = 500,
+    ) -> list[str]:
+        """Insert or update snapshots keyed by `(athlete_id, snapshot_date)`.
+
+        The whole input is validated before anything is written; each chunk of
+        `batch_size` rows is then written with one multi-row
+        `INSERT ... ON CONFLICT DO UPDATE` statement in its own transaction.
+        The columnar regional axis rows for each written snapshot are replaced in
+        the same transaction. Returns the persisted snapshot ids in input order.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        values_by_key: dict[tuple[str, date], dict[str, object]] = {}
+        for row in rows:
+            values_by_key[(row.athlete_id, row.snapshot_date)] = self._row_values(row)
+        if not values_by_key:
+            return []
+
+        insert = self._dialect_insert()
+        pending = list(values_by_key.values())
+        id_by_key: dict[tuple[str, date], str] = {}
+        for offset in range(0, len(pending), batch_size):
+            statement = insert(FatigueSnapshot).values(pending[offset : offset + batch_size])
+            statement = statement.on_conflict_do_update(
+                index_elements=[FatigueSnapshot.athlete_id, FatigueSnapshot.snapshot_date],
+                set_={column: statement.excluded[column] for column in _UPSERT_COLUMNS},
+            ).returning(
+                FatigueSnapshot.id,
+                FatigueSnapshot.athlete_id,
+                FatigueSnapshot.snapshot_date,
+            )
+            try:
+                axes_by_snapshot_id: dict[str, _RegionalAxisPayloads] = {}
+                for returned in self._session.execute(statement):
+                    key = (returned.athlete_id, returned.snapshot_date)
+                    id_by_key[key] = returned.id
+                    values = values_by_key[key]
+                    axes_by_snapshot_id[returned.id] = (
+                        cast(dict[str, float], values["regional_recruitment"]),
+                        cast(dict[str, float], values["regional_metabolic"]),
+                        cast(dict[str, float], values["regional_mechanical"]),
+                    )
+                self._write_regional_axes(axes_by_snapshot_id)
+                self._session.commit()
+            except Exception:
+                self._session.rollback()
+                raise
+
+        return [id_by_key[(row.athlete_id, row.snapshot_date)] for row in rows]
+
     def get_snapshot(self, snapshot_id: str) -> FatigueSnapshot | None:
         return self._session.get(FatigueSnapshot, snapshot_id)
 
+    def list_range(
+        self,
+        *,
+        athlete_ids: Sequence[str],
+        start_date: date,
+        end_date: date,
+        include_regional: bool = True,
+    ) -> list[FatigueSnapshotRangeRow]:
+        """Read snapshot rows for one or more athletes over an inclusive date range.
+
+        Ordering matches the `(athlete_id, snapshot_date)` index so the read is a
+        single range scan; `include_regional=False` skips the JSON columns.
+        """
+        if not athlete_ids:
+            return []
+
+        statement = (
+            select(*self._range_columns(include_regional=include_regional))
+            .where(
+                FatigueSnapshot.athlete_id.in_(sorted(set(athlete_ids))),
+                FatigueSnapshot.snapshot_date >= start_date,
+                FatigueSnapshot.snapshot_date <= end_date,
+            )
+            .order_by(FatigueSnapshot.athlete_id, FatigueSnapshot.snapshot_date)
+        )
+        return [
+            self._range_row(row, include_regional=include_regional)
+            for row in self._session.execute(statement)
+        ]
+
+    def latest_for_athletes(
+        self,
+        athlete_ids: Sequence[str],
+        *,
+        on_or_before: date | None = None,
+        include_regional: bool = True,
+    ) -> dict[str, FatigueSnapshotRangeRow]:
+        """Return each athlete's most recent snapshot (optionally as of a date) in one query."""
+        if not athlete_ids:
+            return {}
+
+        latest_conditions: list[ColumnElement[bool]] = [
+            FatigueSnapshot.athlete_id.in_(sorted(set(athlete_ids)))
+        ]
+        if on_or_before is not None:
+            latest_conditions.append(FatigueSnapshot.snapshot_date <= on_or_before)
+        latest_dates = (
+            select(
+                FatigueSnapshot.athlete_id.label("athlete_id"),
+                func.max(FatigueSnapshot.snapshot_date).label("snapshot_date"),
+            )
+            .where(*latest_conditions)
+            .group_by(FatigueSnapshot.athlete_id)
+            .subquery()
+        )
+        statement = (
+            select(*self._range_columns(include_regional=include_regional))
+            .join(
+                latest_dates,
+                (FatigueSnapshot.athlete_id == latest_dates.c.athlete_id)
+                & (FatigueSnapshot.snapshot_date == latest_dates.c.snapshot_date),
+            )
+            .order_by(FatigueSnapshot.athlete_id)
+        )
+        return {
+            row.athlete_id: self._range_row(row, include_regional=include_regional)
+            for row in self._session.execute(statement)
+        }
+
+    def list_region_series(
+        self,
+        *,
+        athlete_id: str,
+        region: str,
+        start_date: date,
+        end_date: date,
+    ) -> list[FatigueRegionalAxisPoint]:
+        """Read one region's axis values over a date range from the columnar table.
+
+        Days on which the region carried no load have no row and are omitted.
+        """
+        statement = (
+            select(
+                FatigueSnapshot.snapshot_date,
+                FatigueSnapshotRegionalAxis.recruitment,
+                FatigueSnapshotRegionalAxis.metabolic,
+                FatigueSnapshotRegionalAxis.mechanical,
+            )
+            .join(
+                FatigueSnapshotRegionalAxis,
+                FatigueSnapshotRegionalAxis.snapshot_id == FatigueSnapshot.id,
+            )
+            .join(FatigueRegion, FatigueRegion.id == FatigueSnapshotRegionalAxis.region_id)
+            .where(
+                FatigueSnapshot.athlete_id == athlete_id,
+                FatigueSnapshot.snapshot_date >= start_date,
+                FatigueSnapshot.snapshot_date <= end_date,
+                FatigueRegion.region_key == region,
+            )
+            .order_by(FatigueSnapshot.snapshot_date)
+        )
+        return [
+            FatigueRegionalAxisPoint(
+                snapshot_date=row.snapshot_date,
+                recruitment=row.recruitment,
+                metabolic=row.metabolic,
+                mechanical=row.mechanical,
+            )
+            for row in self._session.execute(statement)
+        ]
+
+    @staticmethod
+    def _range_columns(*, include_regional: bool) -> list[Any]:
+        columns: list[Any] = [
+            FatigueSnapshot.athlete_id,
+            FatigueSnapshot.snapshot_date,
+            FatigueSnapshot.global_neural,
+            FatigueSnapshot.global_metabolic,
+            FatigueSnapshot.derived_recruitment,
+            FatigueSnapshot.system_capacity_sleep,
+            FatigueSnapshot.system_capacity_fuel,
+            FatigueSnapshot.system_capacity_stress,
+        ]
+        if include_regional:
+            columns.extend(
+                [
+                    FatigueSnapshot.regional_recruitment,
+                    FatigueSnapshot.regional_metabolic,
+                    FatigueSnapshot.regional_mechanical,
+                ]
+            )
+        return columns
+
+    @staticmethod
+    def _range_row(row: Any, *, include_regional: bool) -> FatigueSnapshotRangeRow:
+        return FatigueSnapshotRangeRow(
+            athlete_id=row.athlete_id,
+            snapshot_date=row.snapshot_date,
+            global_neural=row.global_neural,
+            global_metabolic=row.global_metabolic,
+            derived_recruitment=row.derived_recruitment,
+            system_capacity_sleep=row.system_capacity_sleep,
+            system_capacity_fuel=row.system_capacity_fuel,
+            system_capacity_stress=row.system_capacity_stress,
+            regional_recruitment=row.regional_recruitment if include_regional else None,
+            regional_metabolic=row.regional_metabolic if include_regional else None,
+            regional_mechanical=row.regional_mechanical if include_regional else None,
+        )
+
+    def _write_regional_axes(self, axes_by_snapshot_id: dict[str, _RegionalAxisPayloads]) -> None:
+        if not axes_by_snapshot_id:
+            return
+
+        values_by_snapshot: dict[str, dict[str, dict[str, float]]] = {}
+        for snapshot_id, payloads in axes_by_snapshot_id.items():
+            by_region: dict[str, dict[str, float]] = {}
+            for axis, payload in zip(_REGIONAL_AXES, payloads, strict=True):
+                for region_key, value in payload.items():
+                    by_region.setdefault(region_key, {})[axis] = value
+            values_by_snapshot[snapshot_id] = by_region
+
+        region_ids = self._resolve_region_ids(
+            {region_key for by_region in values_by_snapshot.values() for region_key in by_region}
+        )
+        self._session.execute(
+            delete(FatigueSnapshotRegionalAxis).where(
+                FatigueSnapshotRegionalAxis.snapshot_id.in_(list(values_by_snapshot))
+            )
+        )
+        pending = [
+            {
+                "snapshot_id": snapshot_id,
+                "region_id": region_ids[region_key],
+                "recruitment": values.get("recruitment"),
+                "metabolic": values.get("metabolic"),
+                "mechanical": values.get("mechanical"),
+            }
+            for snapshot_id, by_region in values_by_snapshot.items()
+            for region_key, values in sorted(by_region.items())
+        ]
+        for offset in range(0, len(pending), _REGIONAL_AXIS_INSERT_BATCH_SIZE):
+            self._session.execute(
+                insert(FatigueSnapshotRegionalAxis),
+                pending[offset : offset + _REGIONAL_AXIS_INSERT_BATCH_SIZE],
+            )
+
+    def _resolve_region_ids(self, region_keys: set[str]) -> dict[str, int]:
+        if not region_keys:
+            return {}
+
+        lookup = select(FatigueRegion.region_key, FatigueRegion.id).where(
+            FatigueRegion.region_key.in_(sorted(region_keys))
+        )
+        region_ids = {row.region_key: row.id for row in self._session.execute(lookup)}
+        missing = sorted(region_keys - region_ids.keys())
+        if missing:
+            statement = self._dialect_insert()(FatigueRegion).values(
+                [{"region_key": region_key} for region_key in missing]
+            )
+            self._session.execute(
+                statement.on_conflict_do_nothing(index_elements=[FatigueRegion.region_key])
+            )
+            region_ids = {row.region_key: row.id for row in self._session.execute(lookup)}
+        return region_ids
+
+    def _row_values(self, row: FatigueSnapshotUpsert) -> dict[str, object]:
+        self._validate_capacity("sleep", row.system_capacity_sleep, allow_none=True)
+        self._validate_capacity("fuel", row.system_capacity_fuel)
+        self._validate_capacity("stress", row.system_capacity_stress)
+        return {
+            "id": str(uuid4()),
+            "athlete_id": row.athlete_id,
+            "snapshot_date": row.snapshot_date,
+            "global_neural": float(row.global_neural),
+            "global_metabolic": float(row.global_metabolic),
+            "regional_recruitment": self._normalize_axis_payload(row.regional_recruitment),
+            "regional_metabolic": self._normalize_axis_payload(row.regional_metabolic),
+            "regional_mechanical": self._normalize_axis_payload(row.regional_mechanical),
+            "derived_recruitment": (
+                None if row.derived_recruitment is None else float(row.derived_recruitment)
+            ),
+            "system_capacity_sleep": row.system_capacity_sleep,
+            "system_capacity_fuel": row.system_capacity_fuel,
+            "system_capacity_stress": row.system_capacity_stress,
+        }
+
+    def _dialect_insert(self) -> Callable[..., Any]:
+        dialect_name = self._session.get_bind().dialect.name
+        if dialect_name == "postgresql":
+            return postgresql.insert
+        if dialect_name == "sqlite":
+            return sqlite.insert
+        raise ValueError(f"bulk snapshot upsert is not supported for dialect {dialect_name}")
+
     @staticmethod
     def _validate_capacity(name: str, value: int | None, *, allow_none: bool = False) -> None:
         if value is None:
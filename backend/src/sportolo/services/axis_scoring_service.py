@@ -11,11 +11,13 @@ from sportolo.api.schemas.axis_scoring import (
     AxisSessionSpike,
 )
 
+AXIS_SCORING_POLICY_VERSION = "v1-axis-decay"
+
 
 class AxisScoringService:
     """Deterministic axis scoring and daily decay series generation."""
 
-    _POLICY_VERSION = "v1-axis-decay"
+    _POLICY_VERSION = AXIS_SCORING_POLICY_VERSION
 
     _SPIKE_LOG_REFERENCE_LOADS = {
         "neural": 40.0,
@@ -0,0 +1,390 @@
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+from collections import deque
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sportolo.services.background_job_queue_service import BackgroundJobMetrics
+
+# Fixed bucket upper bounds; they bracket the spec's p95 budgets (1-2s request paths,
+# 60s reconnect sync) with roughly 2.5x spacing so interpolated percentiles stay close.
+LATENCY_BUCKET_BOUNDS_MS: tuple[float, ...] = (
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    25.0,
+    50.0,
+    100.0,
+    250.0,
+    500.0,
+    1_000.0,
+    2_000.0,
+    5_000.0,
+    10_000.0,
+    30_000.0,
+    60_000.0,
+    120_000.0,
+    300_000.0,
+)
+THROUGHPUT_WINDOWS_SECONDS: tuple[int, ...] = (60, 300, 900)
+
+
+@dataclass(frozen=True)
+class LatencyHistogramSnapshot:
+    """Fixed-bucket latency distribution.
+
+    `bucket_counts` has one entry per bound plus a trailing overflow bucket; counts are
+    per bucket, not cumulative.
+    """
+
+    bucket_bounds_ms: tuple[float, ...]
+    bucket_counts: tuple[int, ...]
+    count: int
+    sum_ms: float
+    max_ms: float
+
+    @classmethod
+    def empty(
+        cls, bucket_bounds_ms: tuple[float, ...] = LATENCY_BUCKET_BOUNDS_MS
+    ) -> LatencyHistogramSnapshot:
+        return cls(
+            bucket_bounds_ms=bucket_bounds_ms,
+            bucket_counts=(0,) * (len(bucket_bounds_ms) + 1),
+            count=0,
+            sum_ms=0.0,
+            max_ms=0.0,
+        )
+
+    @classmethod
+    def from_cumulative_counts(
+        cls,
+        cumulative_counts: Sequence[int],
+        *,
+        count: int,
+        sum_ms: float,
+        max_ms: float,
+        bucket_bounds_ms: tuple[float, ...] = LATENCY_BUCKET_BOUNDS_MS,
+    ) -> LatencyHistogramSnapshot:
+        """Build a snapshot from `<= bound` counts, as SQL aggregates produce them."""
+        bucket_counts: list[int] = []
+        previous = 0
+        for cumulative in cumulative_counts:
+            bucket_counts.append(cumulative - previous)
+            previous = cumulative
+        bucket_counts.append(count - previous)
+        return cls(
+            bucket_bounds_ms=bucket_bounds_ms,
+            bucket_counts=tuple(bucket_counts),
+            count=count,
+            sum_ms=sum_ms,
+            max_ms=max_ms,
+        )
+
+    @property
+    def average_ms(self) -> float:
+        return self.sum_ms / self.count if self.count else 0.0
+
+    @property
+    def p50_ms(self) -> float:
+        return self.quantile(0.5)
+
+    @property
+    def p95_ms(self) -> float:
+        return self.quantile(0.95)
+
+    @property
+    def p99_ms(self) -> float:
+        return self.quantile(0.99)
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside the bucket that holds it."""
+        if not 0.0 <= q <= 1.0:
+            raise ValueError("quantile must be between 0 and 1")
+        if self.count == 0:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for index, bucket_count in enumerate(self.bucket_counts):
+            upper = (
+                self.bucket_bounds_ms[index]
+                if index < len(self.bucket_bounds_ms)
+                else max(self.max_ms, lower)
+            )
+            if bucket_count and seen + bucket_count >= rank:
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return round(min(estimate, self.max_ms), 3)
+            seen += bucket_count
+            lower = upper
+        return round(self.max_ms, 3)
+
+
+@dataclass(frozen=True)
+class BackgroundJobPipelineMetrics:
+    """Per-pipeline attempt counters, latency histograms, and sliding-window throughput.
+
+    `queue_wait` measures from when an attempt became claimable (`available_at`, which is
+    `enqueued_at` for first attempts) to when it started, so retry delays are not counted.
+    """
+
+    pipeline: str
+    processed_attempt_count: int
+    succeeded_count: int
+    retry_count: int
+    dead_letter_count: int
+    processing_latency: LatencyHistogramSnapshot
+    queue_wait: LatencyHistogramSnapshot
+    # Window length in seconds -> finished attempts per second over that window.
+    throughput_per_second: Mapping[int, float] = field(default_factory=dict)
+
+    @property
+    def failed_attempt_count(self) -> int:
+        return self.processed_attempt_count - self.succeeded_count
+
+
+def latency_bucket_index(
+    value_ms: float,
+    bucket_bounds_ms: tuple[float, ...] = LATENCY_BUCKET_BOUNDS_MS,
+) -> int:
+    """The bucket a latency falls in; `len(bucket_bounds_ms)` is the overflow bucket."""
+    return bisect.bisect_left(bucket_bounds_ms, max(value_ms, 0.0))
+
+
+class LatencyHistogram:
+    """Mutable fixed-bucket histogram; callers provide their own locking."""
+
+    def __init__(self, bucket_bounds_ms: tuple[float, ...] = LATENCY_BUCKET_BOUNDS_MS) -> None:
+        self._bucket_bounds_ms = bucket_bounds_ms
+        self._bucket_counts = [0] * (len(bucket_bounds_ms) + 1)
+        self._count = 0
+        self._sum_ms = 0.0
+        self._max_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        value_ms = max(value_ms, 0.0)
+        self._bucket_counts[latency_bucket_index(value_ms, self._bucket_bounds_ms)] += 1
+        self._count += 1
+        self._sum_ms += value_ms
+        self._max_ms = max(self._max_ms, value_ms)
+
+    def snapshot(self) -> LatencyHistogramSnapshot:
+        return LatencyHistogramSnapshot(
+            bucket_bounds_ms=self._bucket_bounds_ms,
+            bucket_counts=tuple(self._bucket_counts),
+            count=self._count,
+            sum_ms=self._sum_ms,
+            max_ms=self._max_ms,
+        )
+
+
+class SlidingWindowCounter:
+    """Event counter bucketed per second and trimmed to the longest window."""
+
+    def __init__(self, windows_seconds: tuple[int, ...] = THROUGHPUT_WINDOWS_SECONDS) -> None:
+        self._windows_seconds = windows_seconds
+        self._horizon_seconds = max(windows_seconds)
+        self._buckets: deque[list[int]] = deque()
+
+    def add(self, at: datetime, count: int = 1) -> None:
+        second = math.floor(at.timestamp())
+        if self._buckets and self._buckets[-1][0] == second:
+            self._buckets[-1][1] += count
+        elif not self._buckets or self._buckets[-1][0] < second:
+            self._buckets.append([second, count])
+        else:
+            # Out-of-order completions from concurrent workers land in their own second.
+            for offset, bucket in enumerate(reversed(self._buckets)):
+                if bucket[0] == second:
+                    bucket[1] += count
+                    break
+                if bucket[0] < second:
+                    self._buckets.insert(len(self._buckets) - offset, [second, count])
+                    break
+            else:
+                self._buckets.appendleft([second, count])
+        self._trim(second)
+
+    def rates(self, now: datetime) -> dict[int, float]:
+        current = math.floor(now.timestamp())
+        self._trim(current)
+        return {
+            window: sum(count for second, count in self._buckets if second > current - window)
+            / window
+            for window in self._windows_seconds
+        }
+
+    def _trim(self, current: int) -> None:
+        while self._buckets and self._buckets[0][0] <= current - self._horizon_seconds:
+            self._buckets.popleft()
+
+
+@dataclass
+class _PipelineAccumulator:
+    processing_latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    queue_wait: LatencyHistogram = field(default_factory=LatencyHistogram)
+    throughput: SlidingWindowCounter = field(default_factory=SlidingWindowCounter)
+    processed_attempt_count: int = 0
+    succeeded_count: int = 0
+    retry_count: int = 0
+    dead_letter_count: int = 0
+
+
+class PipelineMetricsRecorder:
+    """Thread-safe per-pipeline attempt metrics for in-process queues."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pipelines: dict[str, _PipelineAccumulator] = {}
+
+    def record_attempt(
+        self,
+        pipeline: str,
+        *,
+        status: str,
+        processing_latency_ms: float,
+        queue_wait_ms: float,
+        finished_at: datetime,
+    ) -> None:
+        with self._lock:
+            accumulator = self._pipelines.setdefault(pipeline, _PipelineAccumulator())
+            accumulator.processed_attempt_count += 1
+            if status == "succeeded":
+                accumulator.succeeded_count += 1
+            elif status == "retry_scheduled":
+                accumulator.retry_count += 1
+            elif status == "dead_letter":
+                accumulator.dead_letter_count += 1
+            accumulator.processing_latency.observe(processing_latency_ms)
+            accumulator.queue_wait.observe(queue_wait_ms)
+            accumulator.throughput.add(finished_at)
+
+    def snapshot(self, now: datetime) -> dict[str, BackgroundJobPipelineMetrics]:
+        with self._lock:
+            return {
+                pipeline: BackgroundJobPipelineMetrics(
+                    pipeline=pipeline,
+                    processed_attempt_count=accumulator.processed_attempt_count,
+                    succeeded_count=accumulator.succeeded_count,
+                    retry_count=accumulator.retry_count,
+                    dead_letter_count=accumulator.dead_letter_count,
+                    processing_latency=accumulator.processing_latency.snapshot(),
+                    queue_wait=accumulator.queue_wait.snapshot(),
+                    throughput_per_second=accumulator.throughput.rates(now),
+                )
+                for pipeline, accumulator in sorted(self._pipelines.items())
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pipelines.clear()
+
+
+def render_prometheus_metrics(metrics: BackgroundJobMetrics) -> str:
+    """Render queue metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines: list[str] = []
+
+    def family(name: str, metric_type: str, help_text: str) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+    family("sportolo_background_job_queue_depth", "gauge", "Jobs waiting to be claimed.")
+    lines.append(f"sportolo_background_job_queue_depth {metrics.queue_depth}")
+    family("sportolo_background_job_enqueued_total", "counter", "Distinct jobs enqueued.")
+    lines.append(f"sportolo_background_job_enqueued_total {metrics.total_enqueued_count}")
+    family(
+        "sportolo_background_job_coalesced_requests_total",
+        "counter",
+        "Enqueue requests merged into a pending job.",
+    )
+    lines.append(
+        f"sportolo_background_job_coalesced_requests_total {metrics.coalesced_request_count}"
+    )
+
+    family(
+        "sportolo_background_job_worker_retries_shed_total",
+        "counter",
+        "Retryable failures dead-lettered by this process's retry budget.",
+    )
+    lines.append(
+        f"sportolo_background_job_worker_retries_shed_total {metrics.worker_shed_retry_count}"
+    )
+    family(
+        "sportolo_background_job_worker_circuit_open",
+        "gauge",
+        "Error codes whose circuit breaker is currently open in this process.",
+    )
+    for error_code in metrics.worker_open_circuit_error_codes:
+        label = f'error_code="{_label_value(error_code)}"'
+        lines.append(f"sportolo_background_job_worker_circuit_open{{{label}}} 1")
+
+    pipelines = list(metrics.pipelines.values())
+    family(
+        "sportolo_background_job_attempts_total",
+        "counter",
+        "Finished job attempts by pipeline and outcome.",
+    )
+    for pipeline_metrics in pipelines:
+        for status, value in (
+            ("succeeded", pipeline_metrics.succeeded_count),
+            ("retry_scheduled", pipeline_metrics.retry_count),
+            ("dead_letter", pipeline_metrics.dead_letter_count),
+        ):
+            lines.append(
+                "sportolo_background_job_attempts_total"
+                f'{{pipeline="{_label_value(pipeline_metrics.pipeline)}",status="{status}"}}'
+                f" {value}"
+            )
+
+    for name, help_text, attribute in (
+        (
+            "sportolo_background_job_processing_seconds",
+            "Handler execution time per attempt.",
+            "processing_latency",
+        ),
+        (
+            "sportolo_background_job_queue_wait_seconds",
+            "Time from an attempt becoming claimable to it starting.",
+            "queue_wait",
+        ),
+    ):
+        family(name, "histogram", help_text)
+        for pipeline_metrics in pipelines:
+            histogram: LatencyHistogramSnapshot = getattr(pipeline_metrics, attribute)
+            label = f'pipeline="{_label_value(pipeline_metrics.pipeline)}"'
+            cumulative = 0
+            for bound_ms, bucket_count in zip(
+                histogram.bucket_bounds_ms, histogram.bucket_counts, strict=False
+            ):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{{{label},le="{bound_ms / 1000:g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{label},le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum{{{label}}} {histogram.sum_ms / 1000:.6f}")
+            lines.append(f"{name}_count{{{label}}} {histogram.count}")
+
+    family(
+        "sportolo_background_job_throughput_per_second",
+        "gauge",
+        "Finished attempts per second over a trailing window.",
+    )
+    for pipeline_metrics in pipelines:
+        for window, rate in sorted(pipeline_metrics.throughput_per_second.items()):
+            lines.append(
+                "sportolo_background_job_throughput_per_second"
+                f'{{pipeline="{_label_value(pipeline_metrics.pipeline)}",window="{window}s"}}'
+                f" {rate:.6f}"
+            )
+
+    return "\n".join(lines) + "\n"
+
+
+def _label_value(value: str) -> str:
+    # Label values escape backslash, double quote and line feed in the text format.
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -1,16 +1,25 @@
 from __future__ import annotations
 
 import hashlib
-import json
+import heapq
+import itertools
 import logging
+import threading
 import time
-from collections import deque
-from collections.abc import Callable
+from collections import Counter, OrderedDict, deque
+from collections.abc import Callable, Collection, Iterator, Mapping, Sequence
 from dataclasses import dataclass, field
 from datetime import UTC, datetime, timedelta
-from typing import Any, Literal
+from typing import Any, Literal, Protocol, overload
 
-BackgroundJobPipeline = Literal["workout_sync", "fatigue_recompute"]
+from sportolo.services.background_job_metrics_service import (
+    BackgroundJobPipelineMetrics,
+    PipelineMetricsRecorder,
+)
+from sportolo.services.background_job_retry_service import BackgroundJobRetryController
+from sportolo.services.fingerprint_service import FingerprintAlgorithm, fingerprint_json
+
+BackgroundJobPipeline = Literal["workout_sync", "fatigue_recompute", "wahoo_bulk_sync"]
 BackgroundJobStatus = Literal["queued", "processing", "succeeded", "dead_letter"]
 BackgroundJobAttemptStatus = Literal["succeeded", "retry_scheduled", "dead_letter"]
 
@@ -49,14 +58,110 @@ class BackgroundJobAttemptRecord:
     error_message: str | None = None
 
 
+class _FrozenPayload(Mapping[str, Any]):
+    """Read-only JSON object; unlike `MappingProxyType` it pickles for process workers."""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: dict[str, Any]) -> None:
+        self._data = data
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return repr(self._data)
+
+    def __getstate__(self) -> dict[str, Any]:
+        return self._data
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self._data = state
+
+
+class LazyAttemptHistory(Sequence[BackgroundJobAttemptRecord]):
+    """Attempt history that is loaded on first access and cached.
+
+    Pickling materializes the history, so records still cross process boundaries.
+    """
+
+    __slots__ = ("_load", "_attempts")
+
+    def __init__(self, load: Callable[[], Sequence[BackgroundJobAttemptRecord]]) -> None:
+        self._load = load
+        self._attempts: tuple[BackgroundJobAttemptRecord, ...] | None = None
+
+    def _materialize(self) -> tuple[BackgroundJobAttemptRecord, ...]:
+        if self._attempts is None:
+            self._attempts = tuple(self._load())
+        return self._attempts
+
+    @overload
+    def __getitem__(self, index: int) -> BackgroundJobAttemptRecord: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[BackgroundJobAttemptRecord]: ...
+
+    def __getitem__(
+        self, index: int | slice
+    ) -> BackgroundJobAttemptRecord | Sequence[BackgroundJobAttemptRecord]:
+        return self._materialize()[index]
+
+    def __len__(self) -> int:
+        return len(self._materialize())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Sequence):
+            return self._materialize() == tuple(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return repr(self._materialize())
+
+    def __reduce__(self) -> tuple[type[tuple[BackgroundJobAttemptRecord, ...]], tuple[Any, ...]]:
+        return (tuple, (self._materialize(),))
+
+
+def freeze_job_payload(payload: Mapping[str, Any]) -> Mapping[str, Any]:
+    """Deep-freeze a JSON payload once so snapshots can share it by reference.
+
+    Objects become read-only mappings and arrays become tuples.
+    """
+    if isinstance(payload, _FrozenPayload):
+        return payload
+    return _FrozenPayload({key: _freeze_value(value) for key, value in payload.items()})
+
+
+def _freeze_value(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return freeze_job_payload(value)
+    if isinstance(value, list | tuple):
+        return tuple(_freeze_value(item) for item in value)
+    return value
+
+
 @dataclass(frozen=True)
 class BackgroundJobRecord:
+    """Read-only view of a job.
+
+    `payload` is frozen at enqueue time and shared by every snapshot of the job;
+    `attempt_history` may load lazily on first access.
+    """
+
     job_id: str
     athlete_id: str
     pipeline: BackgroundJobPipeline
     idempotency_key: str
     correlation_id: str
-    payload: dict[str, Any]
+    payload: Mapping[str, Any]
     status: BackgroundJobStatus
     attempt_count: int
     max_attempts: int
@@ -67,7 +172,32 @@ class BackgroundJobRecord:
     last_error_code: str | None
     last_error_message: str | None
     last_failed_at: datetime | None
-    attempt_history: tuple[BackgroundJobAttemptRecord, ...]
+    attempt_history: Sequence[BackgroundJobAttemptRecord]
+    coalesced_request_count: int = 0
+
+
+@dataclass(frozen=True)
+class BackgroundJobDeadLetterFilter:
+    """Conjunctive dead-letter filter; the time range applies to `last_failed_at`.
+
+    `failed_after` is inclusive and `failed_before` is exclusive.
+    """
+
+    pipeline: BackgroundJobPipeline | None = None
+    error_code: str | None = None
+    athlete_id: str | None = None
+    failed_after: datetime | None = None
+    failed_before: datetime | None = None
+
+    def matches(self, record: BackgroundJobRecord) -> bool:
+        failed_at = record.last_failed_at or record.enqueued_at
+        return (
+            (self.pipeline is None or record.pipeline == self.pipeline)
+            and (self.error_code is None or record.last_error_code == self.error_code)
+            and (self.athlete_id is None or record.athlete_id == self.athlete_id)
+            and (self.failed_after is None or failed_at >= self.failed_after)
+            and (self.failed_before is None or failed_at < self.failed_before)
+        )
 
 
 @dataclass(frozen=True)
@@ -92,6 +222,10 @@ class BackgroundJobMetrics:
     dead_letter_count: int
     failure_rate: float
     average_processing_latency_ms: float
+    coalesced_request_count: int = 0
+    pipelines: Mapping[str, BackgroundJobPipelineMetrics] = field(default_factory=dict)
+    worker_shed_retry_count: int = 0
+    worker_open_circuit_error_codes: tuple[str, ...] = ()
 
 
 @dataclass
@@ -101,7 +235,7 @@ class _StoredBackgroundJob:
     pipeline: BackgroundJobPipeline
     idempotency_key: str
     correlation_id: str
-    payload: dict[str, Any]
+    payload: Mapping[str, Any]
     payload_fingerprint: str
     status: BackgroundJobStatus
     attempt_count: int
@@ -113,21 +247,276 @@ class _StoredBackgroundJob:
     last_error_code: str | None
     last_error_message: str | None
     last_failed_at: datetime | None
-    attempt_history: list[BackgroundJobAttemptRecord] = field(default_factory=list)
+    # Replaced rather than appended so snapshots can share the tuple.
+    attempt_history: tuple[BackgroundJobAttemptRecord, ...] = ()
+    coalesced_idempotency_keys: list[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True, slots=True)
+class _EvictedJobTombstone:
+    job_id: str
+    payload_digest: bytes
+    enqueued_at: datetime
+    completed_at: datetime
+    attempt_count: int
+
+
+BackgroundJobHandler = Callable[[BackgroundJobRecord], None]
+# Merges an incoming payload into a pending job's payload; returning None enqueues separately.
+BackgroundJobPayloadCoalescer = Callable[
+    [Mapping[str, Any], Mapping[str, Any]],
+    dict[str, Any] | None,
+]
+
+
+class BackgroundJobQueue(Protocol):
+    def register_handler(
+        self,
+        pipeline: BackgroundJobPipeline,
+        handler: BackgroundJobHandler,
+    ) -> None: ...
+
+    def enqueue(self, request: BackgroundJobEnqueueRequest) -> BackgroundJobRecord: ...
+
+    def enqueue_many(
+        self,
+        requests: Sequence[BackgroundJobEnqueueRequest],
+        *,
+        return_records: bool = True,
+    ) -> list[BackgroundJobRecord]: ...
+
+    def get_job(self, job_id: str) -> BackgroundJobRecord | None: ...
+
+    def list_dead_letters(
+        self,
+        dead_letter_filter: BackgroundJobDeadLetterFilter | None = None,
+        *,
+        limit: int | None = None,
+    ) -> list[BackgroundJobRecord]: ...
+
+    def redrive_dead_letters(
+        self,
+        job_ids: Sequence[str],
+        *,
+        attempt_budget: int,
+    ) -> list[BackgroundJobRecord]: ...
+
+    def metrics_snapshot(self) -> BackgroundJobMetrics: ...
+
+    def handler_for(self, pipeline: BackgroundJobPipeline) -> BackgroundJobHandler: ...
+
+    def claim_next(
+        self,
+        pipelines: Collection[BackgroundJobPipeline] | None = None,
+    ) -> BackgroundJobRecord | None: ...
+
+    def extend_lease(self, record: BackgroundJobRecord) -> bool: ...
+
+    def complete_claim(
+        self,
+        record: BackgroundJobRecord,
+        failure: BackgroundJobExecutionError | None,
+        *,
+        started_at: datetime,
+        finished_at: datetime,
+        latency_ms: float,
+    ) -> BackgroundJobProcessOutcome: ...
+
+    def process_next(self) -> BackgroundJobProcessOutcome | None: ...
+
+    def process_until_idle(self, max_attempts: int = 500) -> list[BackgroundJobProcessOutcome]: ...
+
+    def reset_for_testing(self) -> None: ...
+
+
+def build_default_handlers(
+    overrides: Mapping[BackgroundJobPipeline, BackgroundJobHandler] | None = None,
+) -> dict[BackgroundJobPipeline, BackgroundJobHandler]:
+    handlers: dict[BackgroundJobPipeline, BackgroundJobHandler] = {
+        "workout_sync": lambda _: None,
+        "fatigue_recompute": lambda _: None,
+        "wahoo_bulk_sync": lambda _: None,
+    }
+    if overrides is not None:
+        handlers.update(overrides)
+    return handlers
+
+
+def validate_enqueue_request(request: BackgroundJobEnqueueRequest) -> None:
+    if request.max_attempts < 1:
+        raise ValueError("max_attempts must be at least 1")
+    if request.retry_delay_seconds < 0:
+        raise ValueError("retry_delay_seconds must be zero or greater")
+
+
+def validate_attempt_budget(attempt_budget: int) -> None:
+    if attempt_budget < 1:
+        raise ValueError("attempt_budget must be at least 1")
+
+
+def fingerprint_enqueue_request(
+    request: BackgroundJobEnqueueRequest,
+    *,
+    algorithm: FingerprintAlgorithm = "sha256",
+) -> str:
+    return fingerprint_json(
+        {"pipeline": request.pipeline, "payload": request.payload},
+        algorithm=algorithm,
+    )
+
+
+def execute_background_job_handler(
+    handler: BackgroundJobHandler,
+    record: BackgroundJobRecord,
+) -> BackgroundJobExecutionError | None:
+    """Run a handler and normalize any failure into a `BackgroundJobExecutionError`."""
+    try:
+        handler(record)
+    except BackgroundJobExecutionError as exc:
+        return exc
+    except Exception as exc:  # pragma: no cover - defensive safety path
+        return BackgroundJobExecutionError(
+            code="UNEXPECTED_ERROR",
+            message=str(exc),
+            retryable=False,
+        )
+    return None
+
+
+def run_claimed_job(
+    queue: BackgroundJobQueue,
+    record: BackgroundJobRecord,
+    handler: BackgroundJobHandler | None = None,
+) -> BackgroundJobProcessOutcome:
+    """Execute a claimed job on the calling thread and record its attempt."""
+    started_at = datetime.now(tz=UTC)
+    started_perf = time.perf_counter()
+    failure = execute_background_job_handler(
+        handler or queue.handler_for(record.pipeline),
+        record,
+    )
+    return queue.complete_claim(
+        record,
+        failure,
+        started_at=started_at,
+        finished_at=datetime.now(tz=UTC),
+        latency_ms=(time.perf_counter() - started_perf) * 1000,
+    )
+
+
+class _BackgroundJobScheduler:
+    """Per-pipeline ready heaps ordered by (pipeline priority, arrival) plus a delayed min-heap.
+
+    Jobs whose `available_at` is in the future wait in the delayed heap and are only
+    promoted once due, so delayed retries never sit in the dequeue hot path. Dequeue
+    compares the heads of the eligible pipeline heaps, so filtering by pipeline stays
+    O(pipelines + log n).
+    """
+
+    def __init__(self, pipeline_priorities: Mapping[BackgroundJobPipeline, int]) -> None:
+        self._pipeline_priorities = dict(pipeline_priorities)
+        self._sequence = itertools.count()
+        self._ready: dict[BackgroundJobPipeline, list[tuple[int, int, str]]] = {}
+        self._delayed: list[tuple[datetime, int, BackgroundJobPipeline, str]] = []
+
+    def push(
+        self,
+        job_id: str,
+        pipeline: BackgroundJobPipeline,
+        *,
+        available_at: datetime,
+        now: datetime,
+    ) -> None:
+        if available_at > now:
+            heapq.heappush(self._delayed, (available_at, next(self._sequence), pipeline, job_id))
+            return
+        self._push_ready(job_id, pipeline)
+
+    def pop_ready(
+        self,
+        now: datetime,
+        pipelines: Collection[BackgroundJobPipeline] | None = None,
+    ) -> str | None:
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, pipeline, job_id = heapq.heappop(self._delayed)
+            self._push_ready(job_id, pipeline)
+
+        selected: list[tuple[int, int, str]] | None = None
+        for pipeline, ready in self._ready.items():
+            if not ready or (pipelines is not None and pipeline not in pipelines):
+                continue
+            if selected is None or ready[0] < selected[0]:
+                selected = ready
+        if selected is None:
+            return None
+        return heapq.heappop(selected)[2]
+
+    def _push_ready(self, job_id: str, pipeline: BackgroundJobPipeline) -> None:
+        priority = self._pipeline_priorities.get(pipeline, 0)
+        heapq.heappush(
+            self._ready.setdefault(pipeline, []),
+            (priority, next(self._sequence), job_id),
+        )
 
 
 class InMemoryBackgroundJobQueue:
-    def __init__(self) -> None:
+    """In-process queue; `pipeline_priorities` orders ready jobs across pipelines.
+
+    Lower priorities run first, pipelines without an entry share priority 0, and jobs
+    of equal priority run FIFO.
+
+    With `succeeded_retention_seconds` set, succeeded jobs are evicted once that long
+    past completion. Their idempotency keys survive as compact digests (at most
+    `max_idempotency_tombstones`, oldest dropped first) so replays are still deduplicated.
+
+    Pipelines with an entry in `payload_coalescers` are coalesced and serialized per
+    athlete: a request for an athlete that already has a not-yet-started job is merged
+    into that job's payload, and at most one job per athlete runs at a time.
+    """
+
+    def __init__(
+        self,
+        default_handlers: Mapping[BackgroundJobPipeline, BackgroundJobHandler] | None = None,
+        pipeline_priorities: Mapping[BackgroundJobPipeline, int] | None = None,
+        *,
+        payload_coalescers: Mapping[BackgroundJobPipeline, BackgroundJobPayloadCoalescer]
+        | None = None,
+        succeeded_retention_seconds: int | None = None,
+        max_idempotency_tombstones: int = 100_000,
+        retry_controller: BackgroundJobRetryController | None = None,
+    ) -> None:
+        if succeeded_retention_seconds is not None and succeeded_retention_seconds < 0:
+            raise ValueError("succeeded_retention_seconds must be zero or greater")
+        if max_idempotency_tombstones < 0:
+            raise ValueError("max_idempotency_tombstones must be zero or greater")
+        self._default_handlers = build_default_handlers(default_handlers)
+        self._pipeline_priorities = dict(pipeline_priorities or {})
+        self._payload_coalescers = dict(payload_coalescers or {})
+        self._succeeded_retention = (
+            timedelta(seconds=succeeded_retention_seconds)
+            if succeeded_retention_seconds is not None
+            else None
+        )
+        self._max_idempotency_tombstones = max_idempotency_tombstones
+        self._retry_controller = retry_controller or BackgroundJobRetryController()
+        self._lock = threading.RLock()
         self._reset_state()
 
     def _reset_state(self) -> None:
         self._jobs: dict[str, _StoredBackgroundJob] = {}
         self._jobs_by_idempotency: dict[tuple[str, str], str] = {}
-        self._queued_job_ids: deque[str] = deque()
-        self._handlers: dict[BackgroundJobPipeline, Callable[[BackgroundJobRecord], None]] = {
-            "workout_sync": lambda _: None,
-            "fatigue_recompute": lambda _: None,
-        }
+        self._coalesced_requests: dict[tuple[str, str], tuple[str, str]] = {}
+        self._pending_coalesce_targets: dict[tuple[str, BackgroundJobPipeline], str] = {}
+        self._running_athlete_keys: set[tuple[str, BackgroundJobPipeline]] = set()
+        self._blocked_job_ids: dict[tuple[str, BackgroundJobPipeline], list[str]] = {}
+        self._scheduler = _BackgroundJobScheduler(self._pipeline_priorities)
+        self._status_counts: Counter[BackgroundJobStatus] = Counter()
+        self._dead_letter_job_ids: dict[str, None] = {}
+        self._succeeded_job_ids: deque[str] = deque()
+        self._idempotency_tombstones: OrderedDict[bytes, _EvictedJobTombstone] = OrderedDict()
+        self._handlers: dict[BackgroundJobPipeline, BackgroundJobHandler] = dict(
+            self._default_handlers
+        )
 
         self._job_counter = 0
 
@@ -137,34 +526,110 @@ class InMemoryBackgroundJobQueue:
         self._failed_attempt_count = 0
         self._retry_count = 0
         self._dead_letter_count = 0
+        self._coalesced_request_count = 0
         self._total_processing_latency_ms = 0.0
+        self._pipeline_metrics = PipelineMetricsRecorder()
+        self._retry_controller.reset()
 
     def reset_for_testing(self) -> None:
-        self._reset_state()
+        with self._lock:
+            self._reset_state()
 
     def register_handler(
         self,
         pipeline: BackgroundJobPipeline,
-        handler: Callable[[BackgroundJobRecord], None],
+        handler: BackgroundJobHandler,
     ) -> None:
         self._handlers[pipeline] = handler
 
+    def handler_for(self, pipeline: BackgroundJobPipeline) -> BackgroundJobHandler:
+        return self._handlers[pipeline]
+
     def enqueue(self, request: BackgroundJobEnqueueRequest) -> BackgroundJobRecord:
-        if request.max_attempts < 1:
-            raise ValueError("max_attempts must be at least 1")
-        if request.retry_delay_seconds < 0:
-            raise ValueError("retry_delay_seconds must be zero or greater")
+        return self.enqueue_many([request])[0]
+
+    def enqueue_many(
+        self,
+        requests: Sequence[BackgroundJobEnqueueRequest],
+        *,
+        return_records: bool = True,
+    ) -> list[BackgroundJobRecord]:
+        """Enqueue a batch under one lock acquisition.
 
+        Every request is validated and replay-checked before any is enqueued, so a
+        rejected request leaves the queue untouched. With `return_records=False` no
+        snapshots are built and an empty list is returned.
+        """
+        for request in requests:
+            validate_enqueue_request(request)
+        fingerprints = [self._fingerprint_request(request) for request in requests]
+
+        with self._lock:
+            now = datetime.now(tz=UTC)
+            self.compact(now)
+            if len(requests) > 1:
+                self._assert_consistent_replays_locked(requests, fingerprints)
+            records = [
+                self._enqueue_locked(request, fingerprint, now, snapshot=return_records)
+                for request, fingerprint in zip(requests, fingerprints, strict=True)
+            ]
+        return [record for record in records if record is not None]
+
+    def _assert_consistent_replays_locked(
+        self,
+        requests: Sequence[BackgroundJobEnqueueRequest],
+        fingerprints: Sequence[str],
+    ) -> None:
+        batch_fingerprints: dict[tuple[str, str], str] = {}
+        for request, fingerprint in zip(requests, fingerprints, strict=True):
+            replay_key = (request.athlete_id, request.idempotency_key)
+            stored_fingerprint = batch_fingerprints.setdefault(replay_key, fingerprint)
+            replay_job_id = self._jobs_by_idempotency.get(replay_key)
+            coalesced = self._coalesced_requests.get(replay_key)
+            if replay_job_id is not None:
+                stored_fingerprint = self._jobs[replay_job_id].payload_fingerprint
+            elif coalesced is not None:
+                stored_fingerprint = coalesced[1]
+            else:
+                tombstone = self._idempotency_tombstones.get(_tombstone_key(replay_key))
+                if tombstone is not None and tombstone.payload_digest != _payload_digest(
+                    fingerprint
+                ):
+                    raise ValueError("idempotency key already used with a different payload")
+            if stored_fingerprint != fingerprint:
+                raise ValueError("idempotency key already used with a different payload")
+
+    def _enqueue_locked(
+        self,
+        request: BackgroundJobEnqueueRequest,
+        fingerprint: str,
+        now: datetime,
+        *,
+        snapshot: bool,
+    ) -> BackgroundJobRecord | None:
         replay_key = (request.athlete_id, request.idempotency_key)
-        fingerprint = self._fingerprint_request(request)
         replay_job_id = self._jobs_by_idempotency.get(replay_key)
         if replay_job_id is not None:
             replay_job = self._jobs[replay_job_id]
             if replay_job.payload_fingerprint != fingerprint:
                 raise ValueError("idempotency key already used with a different payload")
-            return self._snapshot(replay_job)
+            return self._snapshot(replay_job) if snapshot else None
+        coalesced = self._coalesced_requests.get(replay_key)
+        if coalesced is not None:
+            coalesced_job_id, coalesced_fingerprint = coalesced
+            if coalesced_fingerprint != fingerprint:
+                raise ValueError("idempotency key already used with a different payload")
+            return self._snapshot(self._jobs[coalesced_job_id]) if snapshot else None
+        tombstone = self._idempotency_tombstones.get(_tombstone_key(replay_key))
+        if tombstone is not None:
+            if tombstone.payload_digest != _payload_digest(fingerprint):
+                raise ValueError("idempotency key already used with a different payload")
+            return self._tombstone_snapshot(tombstone, request) if snapshot else None
+
+        coalesced_job = self._coalesce_locked(request, fingerprint)
+        if coalesced_job is not None:
+            return self._snapshot(coalesced_job) if snapshot else None
 
-        now = datetime.now(tz=UTC)
         self._job_counter += 1
         job = _StoredBackgroundJob(
             job_id=f"bg-job-{self._job_counter:06d}",
@@ -172,7 +637,7 @@ class InMemoryBackgroundJobQueue:
             pipeline=request.pipeline,
             idempotency_key=request.idempotency_key,
             correlation_id=request.correlation_id,
-            payload=_clone_payload(request.payload),
+            payload=freeze_job_payload(request.payload),
             payload_fingerprint=fingerprint,
             status="queued",
             attempt_count=0,
@@ -188,7 +653,10 @@ class InMemoryBackgroundJobQueue:
 
         self._jobs[job.job_id] = job
         self._jobs_by_idempotency[replay_key] = job.job_id
-        self._queued_job_ids.append(job.job_id)
+        if job.pipeline in self._payload_coalescers:
+            self._pending_coalesce_targets.setdefault((job.athlete_id, job.pipeline), job.job_id)
+        self._scheduler.push(job.job_id, job.pipeline, available_at=now, now=now)
+        self._status_counts["queued"] += 1
         self._total_enqueued_count += 1
 
         logger.info(
@@ -201,21 +669,108 @@ class InMemoryBackgroundJobQueue:
             },
         )
 
-        return self._snapshot(job)
+        return self._snapshot(job) if snapshot else None
 
-    def get_job(self, job_id: str) -> BackgroundJobRecord | None:
-        job = self._jobs.get(job_id)
-        if job is None:
+    def _coalesce_locked(
+        self,
+        request: BackgroundJobEnqueueRequest,
+        fingerprint: str,
+    ) -> _StoredBackgroundJob | None:
+        coalescer = self._payload_coalescers.get(request.pipeline)
+        if coalescer is None:
+            return None
+        target_id = self._pending_coalesce_targets.get((request.athlete_id, request.pipeline))
+        if target_id is None:
             return None
-        return self._snapshot(job)
 
-    def list_dead_letters(self) -> list[BackgroundJobRecord]:
-        dead_letters = [job for job in self._jobs.values() if job.status == "dead_letter"]
-        dead_letters.sort(key=lambda job: (job.last_failed_at or job.enqueued_at, job.job_id))
-        return [self._snapshot(job) for job in dead_letters]
+        target = self._jobs[target_id]
+        merged = coalescer(target.payload, request.payload)
+        if merged is None:
+            return None
+
+        target.payload = freeze_job_payload(merged)
+        target.coalesced_idempotency_keys.append(request.idempotency_key)
+        self._coalesced_requests[(request.athlete_id, request.idempotency_key)] = (
+            target.job_id,
+            fingerprint,
+        )
+        self._coalesced_request_count += 1
+
+        logger.info(
+            "background_job_coalesced",
+            extra={
+                "job_id": target.job_id,
+                "pipeline": target.pipeline,
+                "athlete_id": target.athlete_id,
+                "correlation_id": request.correlation_id,
+                "coalesced_request_count": len(target.coalesced_idempotency_keys),
+            },
+        )
+        return target
+
+    def get_job(self, job_id: str) -> BackgroundJobRecord | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return self._snapshot(job)
+
+    def list_dead_letters(
+        self,
+        dead_letter_filter: BackgroundJobDeadLetterFilter | None = None,
+        *,
+        limit: int | None = None,
+    ) -> list[BackgroundJobRecord]:
+        # The index is kept in dead-letter order, which is last_failed_at order.
+        with self._lock:
+            records: list[BackgroundJobRecord] = []
+            for job_id in self._dead_letter_job_ids:
+                if limit is not None and len(records) >= limit:
+                    break
+                record = self._snapshot(self._jobs[job_id])
+                if dead_letter_filter is None or dead_letter_filter.matches(record):
+                    records.append(record)
+            return records
+
+    def redrive_dead_letters(
+        self,
+        job_ids: Sequence[str],
+        *,
+        attempt_budget: int,
+    ) -> list[BackgroundJobRecord]:
+        """Requeue dead-lettered jobs with `attempt_budget` fresh attempts.
+
+        Job ids that are unknown or no longer dead-lettered are skipped, so a redrive
+        batch can be retried safely.
+        """
+        validate_attempt_budget(attempt_budget)
+        now = datetime.now(tz=UTC)
+        redriven: list[BackgroundJobRecord] = []
+        with self._lock:
+            for job_id in job_ids:
+                job = self._jobs.get(job_id)
+                if job is None or job.status != "dead_letter":
+                    continue
+                del self._dead_letter_job_ids[job_id]
+                self._set_status(job, "queued")
+                job.max_attempts = job.attempt_count + attempt_budget
+                job.available_at = now
+                job.completed_at = None
+                self._scheduler.push(job.job_id, job.pipeline, available_at=now, now=now)
+                redriven.append(self._snapshot(job))
+
+        if redriven:
+            logger.info("background_job_dead_letters_redriven", extra={"count": len(redriven)})
+        return redriven
 
     def metrics_snapshot(self) -> BackgroundJobMetrics:
-        queue_depth = sum(1 for job in self._jobs.values() if job.status == "queued")
+        with self._lock:
+            return self._metrics_snapshot_locked()
+
+    def _metrics_snapshot_locked(self) -> BackgroundJobMetrics:
+        now = datetime.now(tz=UTC)
+        retry_control = self._retry_controller.metrics_snapshot(now)
+        queue_depth = self._status_counts["queued"]
         failure_rate = 0.0
         average_processing_latency_ms = 0.0
         if self._processed_attempt_count > 0:
@@ -234,42 +789,103 @@ class InMemoryBackgroundJobQueue:
             dead_letter_count=self._dead_letter_count,
             failure_rate=failure_rate,
             average_processing_latency_ms=average_processing_latency_ms,
+            coalesced_request_count=self._coalesced_request_count,
+            pipelines=self._pipeline_metrics.snapshot(now),
+            worker_shed_retry_count=retry_control.worker_shed_retry_count,
+            worker_open_circuit_error_codes=retry_control.worker_open_circuit_error_codes,
         )
 
+    def compact(self, now: datetime | None = None) -> int:
+        """Evict succeeded jobs past the retention window; returns the eviction count."""
+        if self._succeeded_retention is None:
+            return 0
+
+        cutoff = (now or datetime.now(tz=UTC)) - self._succeeded_retention
+        evicted = 0
+        with self._lock:
+            while self._succeeded_job_ids:
+                job = self._jobs[self._succeeded_job_ids[0]]
+                if job.completed_at is None or job.completed_at > cutoff:
+                    break
+                self._succeeded_job_ids.popleft()
+                self._evict(job)
+                evicted += 1
+        return evicted
+
+    def claim_next(
+        self,
+        pipelines: Collection[BackgroundJobPipeline] | None = None,
+    ) -> BackgroundJobRecord | None:
+        with self._lock:
+            job = self._select_next_ready_job(pipelines)
+            if job is None:
+                return None
+            if job.pipeline in self._payload_coalescers:
+                athlete_key = (job.athlete_id, job.pipeline)
+                self._running_athlete_keys.add(athlete_key)
+                if self._pending_coalesce_targets.get(athlete_key) == job.job_id:
+                    del self._pending_coalesce_targets[athlete_key]
+            self._set_status(job, "processing")
+            job.attempt_count += 1
+            return self._snapshot(job)
+
     def process_next(self) -> BackgroundJobProcessOutcome | None:
-        job = self._select_next_ready_job()
-        if job is None:
+        record = self.claim_next()
+        if record is None:
             return None
+        return run_claimed_job(self, record)
+
+    def extend_lease(self, record: BackgroundJobRecord) -> bool:
+        # In-process claims never expire; this only reports whether the claim is current.
+        with self._lock:
+            job = self._jobs.get(record.job_id)
+            return (
+                job is not None
+                and job.status == "processing"
+                and job.attempt_count == record.attempt_count
+            )
+
+    def complete_claim(
+        self,
+        record: BackgroundJobRecord,
+        failure: BackgroundJobExecutionError | None,
+        *,
+        started_at: datetime,
+        finished_at: datetime,
+        latency_ms: float,
+    ) -> BackgroundJobProcessOutcome:
+        with self._lock:
+            return self._complete_claim_locked(
+                self._jobs[record.job_id],
+                failure,
+                started_at=started_at,
+                finished_at=finished_at,
+                latency_ms=latency_ms,
+            )
+
+    def _complete_claim_locked(
+        self,
+        job: _StoredBackgroundJob,
+        failure: BackgroundJobExecutionError | None,
+        *,
+        started_at: datetime,
+        finished_at: datetime,
+        latency_ms: float,
+    ) -> BackgroundJobProcessOutcome:
+        retryable = failure.retryable if failure is not None else False
+        error_code = failure.code if failure is not None else None
+        error_message = failure.message if failure is not None else None
+        queue_wait_ms = (started_at - job.available_at).total_seconds() * 1000
 
-        started_at = datetime.now(tz=UTC)
-        started_perf = time.perf_counter()
-
-        job.status = "processing"
-        job.attempt_count += 1
-        retryable = False
-        error_code: str | None = None
-        error_message: str | None = None
-
-        try:
-            handler = self._handlers[job.pipeline]
-            handler(self._snapshot(job))
-        except BackgroundJobExecutionError as exc:
-            retryable = exc.retryable
-            error_code = exc.code
-            error_message = exc.message
-        except Exception as exc:  # pragma: no cover - defensive safety path
-            retryable = False
-            error_code = "UNEXPECTED_ERROR"
-            error_message = str(exc)
-
-        finished_at = datetime.now(tz=UTC)
-        latency_ms = (time.perf_counter() - started_perf) * 1000
         self._processed_attempt_count += 1
         self._total_processing_latency_ms += latency_ms
+        self._release_athlete_key(job, finished_at)
+        self._retry_controller.record_attempt(job.pipeline, error_code=error_code, now=finished_at)
 
         if error_code is None:
-            job.status = "succeeded"
+            self._set_status(job, "succeeded")
             job.completed_at = finished_at
+            self._succeeded_job_ids.append(job.job_id)
             job.last_error_code = None
             job.last_error_message = None
             job.last_failed_at = None
@@ -281,10 +897,24 @@ class InMemoryBackgroundJobQueue:
             job.last_error_message = error_message
             job.last_failed_at = finished_at
 
+            decision = None
             if retryable and job.attempt_count < job.max_attempts:
-                job.status = "queued"
-                job.available_at = finished_at + timedelta(seconds=job.retry_delay_seconds)
-                self._queued_job_ids.append(job.job_id)
+                decision = self._retry_controller.decide_retry(
+                    job.pipeline,
+                    error_code=error_code,
+                    attempt_count=job.attempt_count,
+                    retry_delay_seconds=job.retry_delay_seconds,
+                    now=finished_at,
+                )
+            if decision is not None and decision.retry:
+                self._set_status(job, "queued")
+                job.available_at = finished_at + timedelta(seconds=decision.delay_seconds)
+                self._scheduler.push(
+                    job.job_id,
+                    job.pipeline,
+                    available_at=job.available_at,
+                    now=finished_at,
+                )
                 self._retry_count += 1
                 attempt_status = "retry_scheduled"
 
@@ -295,11 +925,25 @@ class InMemoryBackgroundJobQueue:
                         "pipeline": job.pipeline,
                         "attempt_count": job.attempt_count,
                         "error_code": error_code,
+                        "retry_reason": decision.reason,
+                        "retry_delay_seconds": decision.delay_seconds,
                     },
                 )
             else:
-                job.status = "dead_letter"
+                if decision is not None:
+                    logger.warning(
+                        "background_job_retry_shed",
+                        extra={
+                            "job_id": job.job_id,
+                            "pipeline": job.pipeline,
+                            "attempt_count": job.attempt_count,
+                            "error_code": error_code,
+                            "retry_reason": decision.reason,
+                        },
+                    )
+                self._set_status(job, "dead_letter")
                 job.completed_at = finished_at
+                self._dead_letter_job_ids[job.job_id] = None
                 self._dead_letter_count += 1
                 attempt_status = "dead_letter"
 
@@ -313,7 +957,8 @@ class InMemoryBackgroundJobQueue:
                     },
                 )
 
-        job.attempt_history.append(
+        job.attempt_history = (
+            *job.attempt_history,
             BackgroundJobAttemptRecord(
                 attempt_number=job.attempt_count,
                 started_at=started_at,
@@ -322,7 +967,15 @@ class InMemoryBackgroundJobQueue:
                 status=attempt_status,
                 error_code=error_code,
                 error_message=error_message,
-            )
+            ),
+        )
+
+        self._pipeline_metrics.record_attempt(
+            job.pipeline,
+            status=attempt_status,
+            processing_latency_ms=latency_ms,
+            queue_wait_ms=queue_wait_ms,
+            finished_at=finished_at,
         )
 
         if attempt_status == "succeeded":
@@ -354,31 +1007,67 @@ class InMemoryBackgroundJobQueue:
             outcomes.append(outcome)
         return outcomes
 
-    def _select_next_ready_job(self) -> _StoredBackgroundJob | None:
-        if not self._queued_job_ids:
-            return None
+    def _release_athlete_key(self, job: _StoredBackgroundJob, now: datetime) -> None:
+        athlete_key = (job.athlete_id, job.pipeline)
+        if athlete_key not in self._running_athlete_keys:
+            return
+        self._running_athlete_keys.discard(athlete_key)
+        for blocked_job_id in self._blocked_job_ids.pop(athlete_key, []):
+            self._scheduler.push(blocked_job_id, job.pipeline, available_at=now, now=now)
+
+    def _set_status(self, job: _StoredBackgroundJob, status: BackgroundJobStatus) -> None:
+        self._status_counts[job.status] -= 1
+        self._status_counts[status] += 1
+        job.status = status
+
+    def _evict(self, job: _StoredBackgroundJob) -> None:
+        del self._jobs[job.job_id]
+        replay_key = (job.athlete_id, job.idempotency_key)
+        del self._jobs_by_idempotency[replay_key]
+        self._status_counts[job.status] -= 1
+        replay_fingerprints = [(replay_key, job.payload_fingerprint)]
+        for idempotency_key in job.coalesced_idempotency_keys:
+            coalesced_key = (job.athlete_id, idempotency_key)
+            _, coalesced_fingerprint = self._coalesced_requests.pop(coalesced_key)
+            replay_fingerprints.append((coalesced_key, coalesced_fingerprint))
+
+        if self._max_idempotency_tombstones == 0 or job.completed_at is None:
+            return
+        for tombstone_replay_key, fingerprint in replay_fingerprints:
+            self._idempotency_tombstones[_tombstone_key(tombstone_replay_key)] = (
+                _EvictedJobTombstone(
+                    job_id=job.job_id,
+                    payload_digest=_payload_digest(fingerprint),
+                    enqueued_at=job.enqueued_at,
+                    completed_at=job.completed_at,
+                    attempt_count=job.attempt_count,
+                )
+            )
+        while len(self._idempotency_tombstones) > self._max_idempotency_tombstones:
+            self._idempotency_tombstones.popitem(last=False)
 
+    def _select_next_ready_job(
+        self,
+        pipelines: Collection[BackgroundJobPipeline] | None = None,
+    ) -> _StoredBackgroundJob | None:
         now = datetime.now(tz=UTC)
-        queue_length = len(self._queued_job_ids)
-        for _ in range(queue_length):
-            job_id = self._queued_job_ids.popleft()
+        self.compact(now)
+        while (job_id := self._scheduler.pop_ready(now, pipelines)) is not None:
             job = self._jobs[job_id]
             if job.status != "queued":
                 continue
-            if job.available_at > now:
-                self._queued_job_ids.append(job_id)
+            athlete_key = (job.athlete_id, job.pipeline)
+            if athlete_key in self._running_athlete_keys:
+                # Parked until the athlete's running job finishes; see _release_athlete_key.
+                self._blocked_job_ids.setdefault(athlete_key, []).append(job.job_id)
                 continue
             return job
         return None
 
     @staticmethod
     def _fingerprint_request(request: BackgroundJobEnqueueRequest) -> str:
-        normalized = {
-            "pipeline": request.pipeline,
-            "payload": request.payload,
-        }
-        serialized = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
-        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+        # Fingerprints never leave this process, so the cheaper checksum is enough.
+        return fingerprint_enqueue_request(request, algorithm="fast")
 
     @staticmethod
     def _snapshot(job: _StoredBackgroundJob) -> BackgroundJobRecord:
@@ -388,7 +1077,7 @@ class InMemoryBackgroundJobQueue:
             pipeline=job.pipeline,
             idempotency_key=job.idempotency_key,
             correlation_id=job.correlation_id,
-            payload=_clone_payload(job.payload),
+            payload=job.payload,
             status=job.status,
             attempt_count=job.attempt_count,
             max_attempts=job.max_attempts,
@@ -399,9 +1088,44 @@ class InMemoryBackgroundJobQueue:
             last_error_code=job.last_error_code,
             last_error_message=job.last_error_message,
             last_failed_at=job.last_failed_at,
-            attempt_history=tuple(job.attempt_history),
+            attempt_history=job.attempt_history,
+            coalesced_request_count=len(job.coalesced_idempotency_keys),
         )
 
+    @staticmethod
+    def _tombstone_snapshot(
+        tombstone: _EvictedJobTombstone,
+        request: BackgroundJobEnqueueRequest,
+    ) -> BackgroundJobRecord:
+        # The evicted job had the same fingerprint, so the replayed request carries its payload.
+        return BackgroundJobRecord(
+            job_id=tombstone.job_id,
+            athlete_id=request.athlete_id,
+            pipeline=request.pipeline,
+            idempotency_key=request.idempotency_key,
+            correlation_id=request.correlation_id,
+            payload=freeze_job_payload(request.payload),
+            status="succeeded",
+            attempt_count=tombstone.attempt_count,
+            max_attempts=request.max_attempts,
+            retry_delay_seconds=request.retry_delay_seconds,
+            enqueued_at=tombstone.enqueued_at,
+            available_at=tombstone.enqueued_at,
+            completed_at=tombstone.completed_at,
+            last_error_code=None,
+            last_error_message=None,
+            last_failed_at=None,
+            attempt_history=(),
+        )
+
+
+def _tombstone_key(replay_key: tuple[str, str]) -> bytes:
+    athlete_id, idempotency_key = replay_key
+    return hashlib.blake2b(
+        f"{athlete_id}\x1f{idempotency_key}".encode(),
+        digest_size=16,
+    ).digest()
+
 
-def _clone_payload(payload: dict[str, Any]) -> dict[str, Any]:
-    return json.loads(json.dumps(payload))
+def _payload_digest(fingerprint: str) -> bytes:
+    return bytes.fromhex(fingerprint)[:16]
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import dataclasses
+import logging
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from sportolo.services.background_job_queue_service import (
+    BackgroundJobDeadLetterFilter,
+    BackgroundJobQueue,
+    validate_attempt_budget,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BackgroundJobRedriveOptions:
+    """How a redrive paces itself.
+
+    `max_jobs_per_second` rate-limits requeues across batches, and `max_queue_depth`
+    pauses between batches until workers have drained the queue below that depth.
+    """
+
+    attempt_budget: int = 3
+    batch_size: int = 500
+    max_jobs_per_second: float | None = 200.0
+    max_queue_depth: int | None = None
+    limit: int | None = None
+    queue_depth_poll_seconds: float = 1.0
+
+    def __post_init__(self) -> None:
+        validate_attempt_budget(self.attempt_budget)
+        if self.batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if self.max_jobs_per_second is not None and self.max_jobs_per_second <= 0:
+            raise ValueError("max_jobs_per_second must be greater than zero")
+        if self.max_queue_depth is not None and self.max_queue_depth < 0:
+            raise ValueError("max_queue_depth must be zero or greater")
+        if self.limit is not None and self.limit < 1:
+            raise ValueError("limit must be at least 1")
+
+
+@dataclass(frozen=True)
+class BackgroundJobRedriveProgress:
+    """One redriven batch; counts are cumulative and the last item has `done=True`."""
+
+    batch_number: int
+    job_ids: tuple[str, ...]
+    redriven_count: int
+    skipped_count: int
+    elapsed_seconds: float
+    done: bool
+
+
+class BackgroundJobRedriver:
+    """Requeues matching dead letters in rate-limited batches and reports each batch.
+
+    Only jobs that were dead-lettered before the redrive started are considered, so a
+    job that fails again during the run is not picked up a second time.
+    """
+
+    def __init__(
+        self,
+        queue: BackgroundJobQueue,
+        *,
+        sleep: Callable[[float], None] = time.sleep,
+        monotonic: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._queue = queue
+        self._sleep = sleep
+        self._monotonic = monotonic
+
+    def iter_redrive(
+        self,
+        dead_letter_filter: BackgroundJobDeadLetterFilter,
+        options: BackgroundJobRedriveOptions,
+    ) -> Iterator[BackgroundJobRedriveProgress]:
+        started_at = datetime.now(tz=UTC)
+        if (
+            dead_letter_filter.failed_before is None
+            or dead_letter_filter.failed_before > started_at
+        ):
+            dead_letter_filter = dataclasses.replace(dead_letter_filter, failed_before=started_at)
+
+        started = self._monotonic()
+        batch_number = 0
+        redriven_count = 0
+        skipped_count = 0
+        while options.limit is None or redriven_count + skipped_count < options.limit:
+            batch_size = options.batch_size
+            if options.limit is not None:
+                batch_size = min(batch_size, options.limit - redriven_count - skipped_count)
+            batch = self._queue.list_dead_letters(dead_letter_filter, limit=batch_size)
+            if not batch:
+                break
+
+            self._wait_for_queue_capacity(options)
+            redriven = self._queue.redrive_dead_letters(
+                [record.job_id for record in batch],
+                attempt_budget=options.attempt_budget,
+            )
+            batch_number += 1
+            redriven_count += len(redriven)
+            skipped_count += len(batch) - len(redriven)
+            self._throttle(options, started, redriven_count)
+            yield BackgroundJobRedriveProgress(
+                batch_number=batch_number,
+                job_ids=tuple(record.job_id for record in redriven),
+                redriven_count=redriven_count,
+                skipped_count=skipped_count,
+                elapsed_seconds=round(self._monotonic() - started, 3),
+                done=False,
+            )
+
+        logger.info(
+            "background_job_redrive_finished",
+            extra={
+                "batch_count": batch_number,
+                "redriven_count": redriven_count,
+                "skipped_count": skipped_count,
+            },
+        )
+        yield BackgroundJobRedriveProgress(
+            batch_number=batch_number,
+            job_ids=(),
+            redriven_count=redriven_count,
+            skipped_count=skipped_count,
+            elapsed_seconds=round(self._monotonic() - started, 3),
+            done=True,
+        )
+
+    def _wait_for_queue_capacity(self, options: BackgroundJobRedriveOptions) -> None:
+        if options.max_queue_depth is None:
+            return
+        while self._queue.metrics_snapshot().queue_depth > options.max_queue_depth:
+            self._sleep(options.queue_depth_poll_seconds)
+
+    def _throttle(
+        self,
+        options: BackgroundJobRedriveOptions,
+        started: float,
+        redriven_count: int,
+    ) -> None:
+        if options.max_jobs_per_second is None:
+            return
+        ahead_seconds = redriven_count / options.max_jobs_per_second - (self._monotonic() - started)
+        if ahead_seconds > 0:
+            self._sleep(ahead_seconds)
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import random
+import threading
+from collections import deque
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Literal
+
+BackoffJitter = Literal["none", "full", "equal"]
+RetryDecisionReason = Literal["backoff", "circuit_open", "retry_budget_exhausted"]
+
+
+@dataclass(frozen=True)
+class BackgroundJobBackoffPolicy:
+    """Exponential retry delay: `base * multiplier**(attempt - 1)`, capped and jittered.
+
+    `full` jitter draws uniformly from `[0, delay]`; `equal` keeps half the delay and
+    jitters the other half. A job's own `retry_delay_seconds` acts as a floor.
+    """
+
+    base_delay_seconds: float
+    multiplier: float = 2.0
+    max_delay_seconds: float = 300.0
+    jitter: BackoffJitter = "full"
+
+    def __post_init__(self) -> None:
+        if self.base_delay_seconds < 0:
+            raise ValueError("base_delay_seconds must be zero or greater")
+        if self.multiplier < 1:
+            raise ValueError("multiplier must be at least 1")
+        if self.max_delay_seconds < self.base_delay_seconds:
+            raise ValueError("max_delay_seconds must be at least base_delay_seconds")
+
+    def delay_seconds(self, attempt_count: int, random_fraction: float) -> float:
+        exponent = max(attempt_count - 1, 0)
+        # Cap before multiplying out so large attempt counts cannot overflow.
+        delay = self.base_delay_seconds
+        for _ in range(exponent):
+            delay *= self.multiplier
+            if delay >= self.max_delay_seconds:
+                break
+        delay = min(delay, self.max_delay_seconds)
+        if self.jitter == "full":
+            return delay * random_fraction
+        if self.jitter == "equal":
+            return delay / 2 + delay / 2 * random_fraction
+        return delay
+
+
+@dataclass(frozen=True)
+class BackgroundJobWorkerRetryBudget:
+    """Per-worker cap on scheduled retries over a sliding window.
+
+    Retries are allowed while the window holds fewer than
+    `min_retries_per_window + ratio * attempts_in_window` of them, so a failure spike
+    sheds retries instead of multiplying load. Only the attempts this worker finished
+    count, so a fleet of N workers allows up to N times the retries.
+    """
+
+    ratio: float = 0.2
+    min_retries_per_window: int = 10
+    window_seconds: int = 60
+
+    def __post_init__(self) -> None:
+        if self.ratio < 0:
+            raise ValueError("ratio must be zero or greater")
+        if self.min_retries_per_window < 0:
+            raise ValueError("min_retries_per_window must be zero or greater")
+        if self.window_seconds < 1:
+            raise ValueError("window_seconds must be at least 1")
+
+
+@dataclass(frozen=True)
+class BackgroundJobWorkerCircuitBreakerPolicy:
+    """Per-worker, per-`error_code` breaker: opens after `failure_threshold` failures
+    this worker saw in the window.
+
+    While open, retries for that code are parked until the breaker half-opens; the next
+    failure reopens it and the next success on an affected pipeline closes it.
+    """
+
+    failure_threshold: int = 20
+    window_seconds: int = 60
+    open_seconds: int = 30
+
+    def __post_init__(self) -> None:
+        if self.failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        if self.window_seconds < 1 or self.open_seconds < 1:
+            raise ValueError("window_seconds and open_seconds must be at least 1")
+
+
+@dataclass(frozen=True)
+class BackgroundJobRetryDecision:
+    retry: bool
+    delay_seconds: float
+    reason: RetryDecisionReason
+
+
+@dataclass(frozen=True)
+class BackgroundJobRetryControlMetrics:
+    worker_shed_retry_count: int
+    worker_open_circuit_error_codes: tuple[str, ...]
+
+
+@dataclass
+class _CircuitState:
+    failures: deque[datetime] = field(default_factory=deque)
+    pipelines: set[str] = field(default_factory=set)
+    opened_until: datetime | None = None
+
+
+class BackgroundJobRetryController:
+    """Decides when, and whether, a retryable failure is retried.
+
+    Queues consult it only for failures whose `BackgroundJobExecutionError.retryable` is
+    true and that still have attempts left; a shed retry dead-letters the job so it can
+    be redriven once the incident is over. State is per process and is not shared
+    through the queue backend: with the SQL backend each worker enforces its own budget
+    and breakers, and metrics report only the calling process's state.
+    """
+
+    def __init__(
+        self,
+        *,
+        backoff_policies: Mapping[str, BackgroundJobBackoffPolicy] | None = None,
+        retry_budget: BackgroundJobWorkerRetryBudget | None = None,
+        circuit_breaker: BackgroundJobWorkerCircuitBreakerPolicy | None = None,
+        random_fraction: Callable[[], float] = random.random,
+    ) -> None:
+        self._backoff_policies = dict(backoff_policies or {})
+        self._retry_budget = retry_budget
+        self._circuit_breaker = circuit_breaker
+        self._random_fraction = random_fraction
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._attempt_times: deque[datetime] = deque()
+            self._retry_times: deque[datetime] = deque()
+            self._circuits: dict[str, _CircuitState] = {}
+            self._shed_retry_count = 0
+
+    def record_attempt(self, pipeline: str, *, error_code: str | None, now: datetime) -> None:
+        """Feed every finished attempt into the retry budget and circuit breakers."""
+        with self._lock:
+            if self._retry_budget is not None:
+                self._attempt_times.append(now)
+                _trim(
+                    self._attempt_times,
+                    now - timedelta(seconds=self._retry_budget.window_seconds),
+                )
+            if self._circuit_breaker is None:
+                return
+            if error_code is None:
+                self._close_recovered_circuits(pipeline, now)
+                return
+
+            circuit = self._circuits.setdefault(error_code, _CircuitState())
+            circuit.pipelines.add(pipeline)
+            if circuit.opened_until is not None:
+                if now >= circuit.opened_until:
+                    # Half-open probe failed.
+                    circuit.opened_until = now + timedelta(
+                        seconds=self._circuit_breaker.open_seconds
+                    )
+                return
+
+            circuit.failures.append(now)
+            _trim(circuit.failures, now - timedelta(seconds=self._circuit_breaker.window_seconds))
+            if len(circuit.failures) >= self._circuit_breaker.failure_threshold:
+                circuit.opened_until = now + timedelta(seconds=self._circuit_breaker.open_seconds)
+                circuit.failures.clear()
+
+    def decide_retry(
+        self,
+        pipeline: str,
+        *,
+        error_code: str,
+        attempt_count: int,
+        retry_delay_seconds: float,
+        now: datetime,
+    ) -> BackgroundJobRetryDecision:
+        with self._lock:
+            delay_seconds = float(retry_delay_seconds)
+            policy = self._backoff_policies.get(pipeline)
+            if policy is not None:
+                delay_seconds = max(
+                    delay_seconds,
+                    policy.delay_seconds(attempt_count, self._random_fraction()),
+                )
+
+            circuit = self._circuits.get(error_code)
+            if circuit is not None and circuit.opened_until is not None:
+                if now < circuit.opened_until:
+                    # Park the retry past the open window; the jittered backoff spreads
+                    # parked jobs out so the half-open probe is not a stampede.
+                    remaining = (circuit.opened_until - now).total_seconds()
+                    return BackgroundJobRetryDecision(
+                        retry=True,
+                        delay_seconds=remaining + delay_seconds,
+                        reason="circuit_open",
+                    )
+
+            budget = self._retry_budget
+            if budget is not None:
+                cutoff = now - timedelta(seconds=budget.window_seconds)
+                _trim(self._attempt_times, cutoff)
+                _trim(self._retry_times, cutoff)
+                allowance = budget.min_retries_per_window + budget.ratio * len(self._attempt_times)
+                if len(self._retry_times) >= allowance:
+                    self._shed_retry_count += 1
+                    return BackgroundJobRetryDecision(
+                        retry=False,
+                        delay_seconds=0.0,
+                        reason="retry_budget_exhausted",
+                    )
+                self._retry_times.append(now)
+
+            return BackgroundJobRetryDecision(
+                retry=True,
+                delay_seconds=delay_seconds,
+                reason="backoff",
+            )
+
+    def metrics_snapshot(self, now: datetime) -> BackgroundJobRetryControlMetrics:
+        with self._lock:
+            return BackgroundJobRetryControlMetrics(
+                worker_shed_retry_count=self._shed_retry_count,
+                worker_open_circuit_error_codes=tuple(
+                    sorted(
+                        error_code
+                        for error_code, circuit in self._circuits.items()
+                        if circuit.opened_until is not None and now < circuit.opened_until
+                    )
+                ),
+            )
+
+    def _close_recovered_circuits(self, pipeline: str, now: datetime) -> None:
+        for circuit in self._circuits.values():
+            if (
+                circuit.opened_until is not None
+                and now >= circuit.opened_until
+                and pipeline in circuit.pipelines
+            ):
+                circuit.opened_until = None
+
+
+def _trim(timestamps: deque[datetime], cutoff: datetime) -> None:
+    while timestamps and timestamps[0] <= cutoff:
+        timestamps.popleft()
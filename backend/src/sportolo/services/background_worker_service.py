@@ -0,0 +1,580 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable, Mapping
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from functools import partial
+from typing import cast, get_args
+
+from sportolo.services.background_job_queue_service import (
+    BackgroundJobExecutionError,
+    BackgroundJobHandler,
+    BackgroundJobPipeline,
+    BackgroundJobProcessOutcome,
+    BackgroundJobQueue,
+    BackgroundJobRecord,
+    execute_background_job_handler,
+    run_claimed_job,
+)
+
+logger = logging.getLogger(__name__)
+
+AsyncBackgroundJobHandler = Callable[[BackgroundJobRecord], Awaitable[None]]
+ProcessHandlerFactory = Callable[[], Mapping[BackgroundJobPipeline, BackgroundJobHandler]]
+
+_PIPELINES = cast(tuple[BackgroundJobPipeline, ...], get_args(BackgroundJobPipeline))
+
+
+@dataclass(frozen=True)
+class BackgroundWorkerConfig:
+    """Runtime sizing for a background worker.
+
+    Claimed-but-unfinished jobs are the worker's local backlog. Claiming pauses once
+    the backlog reaches `backlog_high_watermark` and resumes when it falls back to
+    `backlog_low_watermark`, so a burst stays in the shared queue (where other workers
+    can take it) instead of piling up in one worker's executors.
+
+    Leases on in-flight jobs are renewed every `lease_heartbeat_seconds`, which must be
+    well below the queue's lease period. Only jobs in `pipelines` are claimed, so a
+    worker can leave pipelines whose handlers need state it does not have.
+    """
+
+    thread_workers: int = 4
+    process_workers: int = 0
+    pipelines: frozenset[BackgroundJobPipeline] = frozenset(_PIPELINES)
+    process_pipelines: frozenset[BackgroundJobPipeline] = frozenset({"fatigue_recompute"})
+    pipeline_concurrency: Mapping[BackgroundJobPipeline, int] = field(default_factory=dict)
+    backlog_high_watermark: int | None = None
+    backlog_low_watermark: int | None = None
+    poll_interval_seconds: float = 0.05
+    lease_heartbeat_seconds: float = 60.0
+
+    def __post_init__(self) -> None:
+        if self.thread_workers < 1:
+            raise ValueError("thread_workers must be at least 1")
+        if self.process_workers < 0:
+            raise ValueError("process_workers must be zero or greater")
+        if not self.pipelines:
+            raise ValueError("pipelines must name at least one pipeline")
+        if any(limit < 1 for limit in self.pipeline_concurrency.values()):
+            raise ValueError("pipeline concurrency limits must be at least 1")
+        if self.poll_interval_seconds <= 0:
+            raise ValueError("poll_interval_seconds must be greater than 0")
+        if self.lease_heartbeat_seconds <= 0:
+            raise ValueError("lease_heartbeat_seconds must be greater than 0")
+        if self.high_watermark < 1:
+            raise ValueError("backlog_high_watermark must be at least 1")
+        if not 0 <= self.low_watermark < self.high_watermark:
+            raise ValueError("backlog_low_watermark must be below backlog_high_watermark")
+
+    @property
+    def total_workers(self) -> int:
+        return self.thread_workers + self.process_workers
+
+    @property
+    def high_watermark(self) -> int:
+        if self.backlog_high_watermark is not None:
+            return self.backlog_high_watermark
+        return 2 * self.total_workers
+
+    @property
+    def low_watermark(self) -> int:
+        if self.backlog_low_watermark is not None:
+            return self.backlog_low_watermark
+        return max(self.high_watermark // 2, 0)
+
+
+@dataclass(frozen=True)
+class _ProcessAttemptResult:
+    started_at: datetime
+    finished_at: datetime
+    latency_ms: float
+    error_code: str | None = None
+    error_message: str | None = None
+    retryable: bool = True
+
+    def failure(self) -> BackgroundJobExecutionError | None:
+        if self.error_code is None:
+            return None
+        return BackgroundJobExecutionError(
+            code=self.error_code,
+            message=self.error_message or "",
+            retryable=self.retryable,
+        )
+
+
+_process_handlers: dict[BackgroundJobPipeline, BackgroundJobHandler] = {}
+
+
+def _initialize_process_handlers(factory: ProcessHandlerFactory) -> None:
+    _process_handlers.clear()
+    _process_handlers.update(factory())
+
+
+def _run_in_process(record: BackgroundJobRecord) -> _ProcessAttemptResult:
+    # Failures cross the process boundary as plain fields; the dataclass exception
+    # itself does not survive pickling.
+    started_at = datetime.now(tz=UTC)
+    started_perf = time.perf_counter()
+    handler = _process_handlers.get(record.pipeline)
+    if handler is None:
+        failure: BackgroundJobExecutionError | None = BackgroundJobExecutionError(
+            code="WORKER_HANDLER_MISSING",
+            message=f"no process handler registered for {record.pipeline}",
+            retryable=False,
+        )
+    else:
+        failure = execute_background_job_handler(handler, record)
+    return _ProcessAttemptResult(
+        started_at=started_at,
+        finished_at=datetime.now(tz=UTC),
+        latency_ms=(time.perf_counter() - started_perf) * 1000,
+        error_code=failure.code if failure is not None else None,
+        error_message=failure.message if failure is not None else None,
+        retryable=failure.retryable if failure is not None else True,
+    )
+
+
+class BackgroundWorkerPool:
+    """Drains a `BackgroundJobQueue` on a thread pool, with an optional process pool.
+
+    A dispatcher thread claims ready jobs while per-pipeline limits and the backlog
+    watermark allow it, and hands them to a `ThreadPoolExecutor`. Pipelines listed in
+    `process_pipelines` run on a `ProcessPoolExecutor` when `process_workers > 0`;
+    their handlers come from `process_handler_factory`, which must be picklable and
+    is called once per worker process.
+    """
+
+    def __init__(
+        self,
+        queue: BackgroundJobQueue,
+        config: BackgroundWorkerConfig | None = None,
+        *,
+        process_handler_factory: ProcessHandlerFactory | None = None,
+    ) -> None:
+        self._queue = queue
+        self._config = config or BackgroundWorkerConfig()
+        if self._config.process_workers > 0 and process_handler_factory is None:
+            raise ValueError("process_handler_factory is required when process_workers > 0")
+        self._process_handler_factory = process_handler_factory
+
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._idle = threading.Event()
+        self._backpressure_engaged = False
+        self._in_flight: Counter[BackgroundJobPipeline] = Counter()
+        self._pending_futures: set[Future[object]] = set()
+        self._running: dict[str, BackgroundJobRecord] = {}
+        self._outcomes: Counter[str] = Counter()
+
+        self._thread_executor: ThreadPoolExecutor | None = None
+        self._process_executor: ProcessPoolExecutor | None = None
+        self._dispatcher: threading.Thread | None = None
+        self._heartbeat: threading.Thread | None = None
+        self._heartbeat_stopped = threading.Event()
+
+    @property
+    def backlog(self) -> int:
+        with self._condition:
+            return sum(self._in_flight.values())
+
+    @property
+    def outcome_counts(self) -> dict[str, int]:
+        with self._condition:
+            return dict(self._outcomes)
+
+    def start(self) -> None:
+        if self._dispatcher is not None:
+            raise RuntimeError("worker pool already started")
+
+        self._thread_executor = ThreadPoolExecutor(
+            max_workers=self._config.thread_workers,
+            thread_name_prefix="sportolo-job",
+        )
+        if self._process_handler_factory is not None and self._config.process_workers > 0:
+            self._process_executor = ProcessPoolExecutor(
+                max_workers=self._config.process_workers,
+                initializer=partial(_initialize_process_handlers, self._process_handler_factory),
+            )
+        self._dispatcher = threading.Thread(
+            target=self._dispatch_loop,
+            name="sportolo-job-dispatcher",
+            daemon=True,
+        )
+        self._dispatcher.start()
+        self._heartbeat = threading.Thread(
+            target=self._heartbeat_loop,
+            name="sportolo-job-heartbeat",
+            daemon=True,
+        )
+        self._heartbeat.start()
+        logger.info(
+            "background_worker_started",
+            extra={
+                "thread_workers": self._config.thread_workers,
+                "process_workers": self._config.process_workers,
+            },
+        )
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop claiming, wait for in-flight jobs to finish, and release the executors.
+
+        Jobs that were never claimed stay queued for the next worker. Once `timeout`
+        expires the executors are shut down without waiting; jobs still running are
+        abandoned and their leases expire, so another worker retries them.
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._dispatcher is not None:
+            self._dispatcher.join(timeout)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        drained = True
+        with self._condition:
+            while self._pending_futures:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    drained = False
+                    break
+                self._condition.wait(remaining)
+
+        if not drained:
+            logger.warning(
+                "background_worker_stop_timed_out",
+                extra={"abandoned_jobs": sorted(self._running)},
+            )
+        if self._thread_executor is not None:
+            self._thread_executor.shutdown(wait=drained, cancel_futures=not drained)
+        if self._process_executor is not None:
+            self._process_executor.shutdown(wait=drained, cancel_futures=not drained)
+        self._heartbeat_stopped.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+        logger.info("background_worker_stopped", extra={"outcomes": dict(self._outcomes)})
+
+    def wait_until_idle(self, timeout: float | None = None) -> bool:
+        """Block until the queue has no claimable job and nothing is in flight."""
+        return self._idle.wait(timeout)
+
+    def __enter__(self) -> BackgroundWorkerPool:
+        self.start()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.stop()
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            with self._condition:
+                eligible = self._wait_for_capacity()
+                if eligible is None:
+                    return
+
+            try:
+                record = self._queue.claim_next(eligible)
+            except Exception:
+                # A transient queue failure (e.g. the database is unreachable) must not
+                # kill the dispatcher; back off and try again.
+                logger.exception("background_worker_claim_failed")
+                with self._condition:
+                    self._condition.wait(self._config.poll_interval_seconds)
+                continue
+            if record is None:
+                with self._condition:
+                    if not self._pending_futures:
+                        self._idle.set()
+                    self._condition.wait(self._config.poll_interval_seconds)
+                continue
+
+            self._idle.clear()
+            self._submit(record)
+
+    def _heartbeat_loop(self) -> None:
+        while not self._heartbeat_stopped.wait(self._config.lease_heartbeat_seconds):
+            with self._condition:
+                running = list(self._running.values())
+            for record in running:
+                try:
+                    self._queue.extend_lease(record)
+                except Exception:
+                    logger.exception(
+                        "background_worker_heartbeat_failed",
+                        extra={"job_id": record.job_id, "pipeline": record.pipeline},
+                    )
+
+    def _wait_for_capacity(self) -> set[BackgroundJobPipeline] | None:
+        """Return the pipelines that may be claimed now, or None once stopping."""
+        while not self._stopping:
+            backlog = sum(self._in_flight.values())
+            if backlog >= self._config.high_watermark and not self._backpressure_engaged:
+                self._backpressure_engaged = True
+                logger.info("background_worker_backpressure_engaged", extra={"backlog": backlog})
+            elif backlog <= self._config.low_watermark and self._backpressure_engaged:
+                self._backpressure_engaged = False
+                logger.info("background_worker_backpressure_released", extra={"backlog": backlog})
+
+            if not self._backpressure_engaged:
+                eligible: set[BackgroundJobPipeline] = {
+                    pipeline
+                    for pipeline in self._config.pipelines
+                    if self._in_flight[pipeline]
+                    < self._config.pipeline_concurrency.get(pipeline, self._config.high_watermark)
+                }
+                if eligible:
+                    return eligible
+            self._condition.wait()
+        return None
+
+    def _submit(self, record: BackgroundJobRecord) -> None:
+        future: Future[object]
+        with self._condition:
+            self._in_flight[record.pipeline] += 1
+            self._running[record.job_id] = record
+            if (
+                self._process_executor is not None
+                and record.pipeline in self._config.process_pipelines
+            ):
+                future = self._process_executor.submit(_run_in_process, record)
+            else:
+                assert self._thread_executor is not None
+                future = self._thread_executor.submit(run_claimed_job, self._queue, record)
+            self._pending_futures.add(future)
+        future.add_done_callback(lambda done: self._on_done(record, done))
+
+    def _on_done(self, record: BackgroundJobRecord, future: Future[object]) -> None:
+        status = "error"
+        with self._condition:
+            self._running.pop(record.job_id, None)
+        try:
+            status = self._record_result(record, future).status
+        except Exception:
+            logger.exception(
+                "background_worker_completion_failed",
+                extra={"job_id": record.job_id, "pipeline": record.pipeline},
+            )
+        finally:
+            with self._condition:
+                self._in_flight[record.pipeline] -= 1
+                self._outcomes[status] += 1
+                self._pending_futures.discard(future)
+                self._condition.notify_all()
+
+    def _record_result(
+        self,
+        record: BackgroundJobRecord,
+        future: Future[object],
+    ) -> BackgroundJobProcessOutcome:
+        try:
+            result = future.result()
+        except Exception as exc:
+            # The executor itself failed (e.g. a crashed worker process); retry the job.
+            now = datetime.now(tz=UTC)
+            return self._queue.complete_claim(
+                record,
+                BackgroundJobExecutionError(
+                    code="WORKER_EXECUTION_FAILED",
+                    message=str(exc),
+                    retryable=True,
+                ),
+                started_at=now,
+                finished_at=now,
+                latency_ms=0.0,
+            )
+
+        if isinstance(result, _ProcessAttemptResult):
+            return self._queue.complete_claim(
+                record,
+                result.failure(),
+                started_at=result.started_at,
+                finished_at=result.finished_at,
+                latency_ms=result.latency_ms,
+            )
+        return cast(BackgroundJobProcessOutcome, result)
+
+
+class AsyncBackgroundWorker:
+    """Asyncio-native worker for running inside an event loop (e.g. FastAPI lifespan).
+
+    Pipelines with an entry in `async_handlers` run as coroutines on the loop; all
+    other pipelines run their queue handler via `asyncio.to_thread`. Queue calls are
+    offloaded to threads so a SQL-backed queue never blocks the loop. Each running job's
+    lease is renewed every `lease_heartbeat_seconds`.
+    """
+
+    def __init__(
+        self,
+        queue: BackgroundJobQueue,
+        *,
+        concurrency: int = 4,
+        pipeline_concurrency: Mapping[BackgroundJobPipeline, int] | None = None,
+        async_handlers: Mapping[BackgroundJobPipeline, AsyncBackgroundJobHandler] | None = None,
+        poll_interval_seconds: float = 0.05,
+        lease_heartbeat_seconds: float = 60.0,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if lease_heartbeat_seconds <= 0:
+            raise ValueError("lease_heartbeat_seconds must be greater than 0")
+        self._queue = queue
+        self._concurrency = concurrency
+        self._pipeline_concurrency = dict(pipeline_concurrency or {})
+        self._async_handlers = dict(async_handlers or {})
+        self._poll_interval_seconds = poll_interval_seconds
+        self._lease_heartbeat_seconds = lease_heartbeat_seconds
+
+        self._in_flight: Counter[BackgroundJobPipeline] = Counter()
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._outcomes: Counter[str] = Counter()
+        self._dispatcher: asyncio.Task[None] | None = None
+        self._stopping: asyncio.Event | None = None
+        self._capacity: asyncio.Condition | None = None
+        self._idle: asyncio.Event | None = None
+
+    @property
+    def outcome_counts(self) -> dict[str, int]:
+        return dict(self._outcomes)
+
+    async def start(self) -> None:
+        if self._dispatcher is not None:
+            raise RuntimeError("worker already started")
+        self._stopping = asyncio.Event()
+        self._capacity = asyncio.Condition()
+        self._idle = asyncio.Event()
+        self._dispatcher = asyncio.create_task(self._dispatch_loop())
+
+    async def stop(self, timeout: float | None = None) -> None:
+        """Stop claiming and wait (up to `timeout`) for in-flight jobs to finish."""
+        if self._dispatcher is None or self._stopping is None or self._capacity is None:
+            return
+        self._stopping.set()
+        async with self._capacity:
+            self._capacity.notify_all()
+        await self._dispatcher
+        if self._tasks:
+            await asyncio.wait(set(self._tasks), timeout=timeout)
+
+    async def wait_until_idle(self, timeout: float | None = None) -> bool:
+        assert self._idle is not None
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except TimeoutError:
+            return False
+        return True
+
+    async def _dispatch_loop(self) -> None:
+        assert self._stopping is not None and self._capacity is not None
+        assert self._idle is not None
+        while not self._stopping.is_set():
+            async with self._capacity:
+                await self._capacity.wait_for(
+                    lambda: (
+                        self._stopping is not None
+                        and (self._stopping.is_set() or bool(self._eligible_pipelines()))
+                    )
+                )
+                if self._stopping.is_set():
+                    return
+                eligible = self._eligible_pipelines()
+
+            try:
+                record = await asyncio.to_thread(self._queue.claim_next, eligible)
+            except Exception:
+                # A transient queue failure must not kill the dispatcher; back off and retry.
+                logger.exception("background_worker_claim_failed")
+                await self._wait_for_poll_interval()
+                continue
+            if record is None:
+                if not self._tasks:
+                    self._idle.set()
+                await self._wait_for_poll_interval()
+                continue
+
+            self._idle.clear()
+            self._in_flight[record.pipeline] += 1
+            task = asyncio.create_task(self._run(record))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _wait_for_poll_interval(self) -> None:
+        assert self._stopping is not None
+        try:
+            await asyncio.wait_for(self._stopping.wait(), self._poll_interval_seconds)
+        except TimeoutError:
+            pass
+
+    def _eligible_pipelines(self) -> set[BackgroundJobPipeline]:
+        if sum(self._in_flight.values()) >= self._concurrency:
+            return set()
+        return {
+            pipeline
+            for pipeline in _PIPELINES
+            if self._in_flight[pipeline]
+            < self._pipeline_concurrency.get(pipeline, self._concurrency)
+        }
+
+    async def _run(self, record: BackgroundJobRecord) -> None:
+        assert self._capacity is not None
+        heartbeat = asyncio.create_task(self._heartbeat(record))
+        try:
+            async_handler = self._async_handlers.get(record.pipeline)
+            if async_handler is None:
+                outcome = await asyncio.to_thread(run_claimed_job, self._queue, record)
+            else:
+                outcome = await self._run_async_handler(async_handler, record)
+            self._outcomes[outcome.status] += 1
+        except Exception:
+            self._outcomes["error"] += 1
+            logger.exception(
+                "background_worker_completion_failed",
+                extra={"job_id": record.job_id, "pipeline": record.pipeline},
+            )
+        finally:
+            heartbeat.cancel()
+            async with self._capacity:
+                self._in_flight[record.pipeline] -= 1
+                self._capacity.notify_all()
+
+    async def _heartbeat(self, record: BackgroundJobRecord) -> None:
+        while True:
+            await asyncio.sleep(self._lease_heartbeat_seconds)
+            try:
+                await asyncio.to_thread(self._queue.extend_lease, record)
+            except Exception:
+                logger.exception(
+                    "background_worker_heartbeat_failed",
+                    extra={"job_id": record.job_id, "pipeline": record.pipeline},
+                )
+
+    async def _run_async_handler(
+        self,
+        handler: AsyncBackgroundJobHandler,
+        record: BackgroundJobRecord,
+    ) -> BackgroundJobProcessOutcome:
+        started_at = datetime.now(tz=UTC)
+        started_perf = time.perf_counter()
+        failure: BackgroundJobExecutionError | None = None
+        try:
+            await handler(record)
+        except BackgroundJobExecutionError as exc:
+            failure = exc
+        except Exception as exc:  # pragma: no cover - defensive safety path
+            failure = BackgroundJobExecutionError(
+                code="UNEXPECTED_ERROR",
+                message=str(exc),
+                retryable=False,
+            )
+        return await asyncio.to_thread(
+            self._queue.complete_claim,
+            record,
+            failure,
+            started_at=started_at,
+            finished_at=datetime.now(tz=UTC),
+            latency_ms=(time.perf_counter() - started_perf) * 1000,
+        )
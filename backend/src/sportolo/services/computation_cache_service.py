@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+from typing import Protocol
+
+from pydantic import BaseModel
+
+from sportolo.services.fingerprint_service import fingerprint_bytes, fingerprint_json
+
+
+class ComputationCacheBackend(Protocol):
+    def get(self, key: str) -> bytes | None: ...
+
+    def set(self, key: str, value: bytes) -> None: ...
+
+
+class InMemoryComputationCacheBackend:
+    """Process-local stand-in for a shared external cache tier (e.g. Redis).
+
+    Like a real cache tier it is bounded: past `max_entries` the least recently used
+    entry is dropped.
+    """
+
+    def __init__(self, *, max_entries: int = 4096) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+
+    def get(self, key: str) -> bytes | None:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def reset(self) -> None:
+        self._entries = OrderedDict()
+
+
+@dataclass(frozen=True)
+class CachedComputation:
+    """A serialized response and its validator.
+
+    The ETag is a hash of `body`, so two different representations never share one.
+    `cache_hit` is False when the body was just computed.
+    """
+
+    key: str
+    etag: str
+    body: bytes
+    cache_hit: bool = True
+
+
+@dataclass(frozen=True)
+class ComputationCacheMetrics:
+    lookup_count: int
+    local_hit_count: int
+    external_hit_count: int
+    miss_count: int
+    not_modified_count: int
+    eviction_count: int
+    local_entry_count: int
+    hit_rate: float
+
+
+class ComputationResultCache:
+    """Content-addressed memoization for deterministic compute endpoints.
+
+    Keys are derived from the endpoint namespace, the scoring policy version, the
+    request scope, and the canonical JSON form of the request, so a policy bump
+    invalidates every prior entry without an explicit flush. Values are the
+    serialized response bytes, which lets repeat requests skip both computation
+    and response-model construction. ETags hash those bytes, not the request.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_local_entries: int = 1024,
+        external_backend: ComputationCacheBackend | None = None,
+    ) -> None:
+        if max_local_entries < 1:
+            raise ValueError("max_local_entries must be at least 1")
+        self._max_local_entries = max_local_entries
+        self._external_backend = external_backend
+        self._reset_state()
+
+    def _reset_state(self) -> None:
+        self._local_entries: OrderedDict[str, CachedComputation] = OrderedDict()
+        self._lookup_count = 0
+        self._local_hit_count = 0
+        self._external_hit_count = 0
+        self._miss_count = 0
+        self._not_modified_count = 0
+        self._eviction_count = 0
+
+    def reset_for_testing(self) -> None:
+        self._reset_state()
+        backend_reset = getattr(self._external_backend, "reset", None)
+        if callable(backend_reset):
+            backend_reset()
+
+    @staticmethod
+    def cache_key(
+        *,
+        namespace: str,
+        policy_version: str,
+        scope: str,
+        request: BaseModel,
+    ) -> str:
+        return fingerprint_json(
+            {
+                "namespace": namespace,
+                "policyVersion": policy_version,
+                "scope": scope,
+                "request": request.model_dump(by_alias=True, mode="json", exclude_none=False),
+            }
+        )
+
+    @staticmethod
+    def etag_for_body(body: bytes) -> str:
+        return f'"{fingerprint_bytes(body)}"'
+
+    def matches_etag(self, cached: CachedComputation, if_none_match: str | None) -> bool:
+        """Whether `If-None-Match` lets the response be a 304 for `cached`.
+
+        `*` matches only a representation that was already cached before this request.
+        """
+        if if_none_match is None:
+            return False
+        candidates = {candidate.strip() for candidate in if_none_match.split(",")}
+        matched = (
+            ("*" in candidates and cached.cache_hit)
+            or cached.etag in candidates
+            or f"W/{cached.etag}" in candidates
+        )
+        if matched:
+            self._not_modified_count += 1
+        return matched
+
+    def get_or_compute(self, key: str, compute: Callable[[], BaseModel]) -> CachedComputation:
+        self._lookup_count += 1
+
+        cached = self._local_entries.get(key)
+        if cached is not None:
+            self._local_entries.move_to_end(key)
+            self._local_hit_count += 1
+            return cached
+
+        if self._external_backend is not None:
+            body = self._external_backend.get(key)
+            if body is not None:
+                self._external_hit_count += 1
+                cached = CachedComputation(key=key, etag=self.etag_for_body(body), body=body)
+                self._store_local(cached)
+                return cached
+
+        self._miss_count += 1
+        body = compute().model_dump_json(by_alias=True).encode("utf-8")
+        cached = CachedComputation(key=key, etag=self.etag_for_body(body), body=body)
+        self._store_local(cached)
+        if self._external_backend is not None:
+            self._external_backend.set(key, body)
+        return replace(cached, cache_hit=False)
+
+    def metrics_snapshot(self) -> ComputationCacheMetrics:
+        hit_count = self._local_hit_count + self._external_hit_count
+        hit_rate = 0.0
+        if self._lookup_count > 0:
+            hit_rate = hit_count / self._lookup_count
+
+        return ComputationCacheMetrics(
+            lookup_count=self._lookup_count,
+            local_hit_count=self._local_hit_count,
+            external_hit_count=self._external_hit_count,
+            miss_count=self._miss_count,
+            not_modified_count=self._not_modified_count,
+            eviction_count=self._eviction_count,
+            local_entry_count=len(self._local_entries),
+            hit_rate=hit_rate,
+        )
+
+    def _store_local(self, cached: CachedComputation) -> None:
+        self._local_entries[cached.key] = cached
+        self._local_entries.move_to_end(cached.key)
+        while len(self._local_entries) > self._max_local_entries:
+            self._local_entries.popitem(last=False)
+            self._eviction_count += 1
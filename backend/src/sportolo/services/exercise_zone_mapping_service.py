@@ -13,6 +13,8 @@ from sportolo.api.schemas.exercise_zone_mapping import (
     RegionalAxisEffects,
 )
 
+EXERCISE_ZONE_MAPPING_POLICY_VERSION = "v1-exercise-zone-mapping"
+
 
 @dataclass(frozen=True)
 class StrengthMapping:
@@ -0,0 +1,617 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, time, timedelta
+from typing import Any, Protocol, cast
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from sportolo.api.schemas.axis_scoring import (
+    AxisRawLoad,
+    AxisSeriesRequest,
+    AxisSessionInput,
+    SessionState,
+    SleepEventInput,
+)
+from sportolo.api.schemas.fatigue_snapshot import (
+    FatigueSnapshotDay,
+    FatigueSnapshotListResponse,
+    FatigueSnapshotSystemCapacity,
+)
+from sportolo.api.schemas.fatigue_today import SystemCapacityInput
+from sportolo.models.fatigue_history_session import FatigueHistorySession
+from sportolo.repositories.fatigue_snapshot_repository import (
+    FatigueSnapshotRepository,
+    FatigueSnapshotUpsert,
+)
+from sportolo.services.axis_scoring_service import AxisScoringService
+from sportolo.services.background_job_queue_service import (
+    BackgroundJobExecutionError,
+    BackgroundJobRecord,
+)
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_REGIONAL_DISTRIBUTION = {"global_other": 1.0}
+# Raw load per minute of an imported ride. Provider power data is not imported yet, so
+# ride load is estimated from duration alone.
+_RIDE_LOAD_PER_MINUTE = AxisRawLoad(neural=0.15, metabolic=0.5, mechanical=0.2)
+_RIDE_REGIONAL_DISTRIBUTION = {"lower_body": 0.85, "core": 0.15}
+
+
+@dataclass(frozen=True)
+class FatigueSessionRecord:
+    session: AxisSessionInput
+    regional_distribution: dict[str, float] = field(
+        default_factory=lambda: dict(_DEFAULT_REGIONAL_DISTRIBUTION)
+    )
+
+
+class FatigueHistorySource(Protocol):
+    def list_sessions(
+        self,
+        athlete_id: str,
+        *,
+        ended_after: datetime,
+        ended_before: datetime,
+    ) -> list[FatigueSessionRecord]: ...
+
+    def list_sleep_events(
+        self,
+        athlete_id: str,
+        *,
+        ended_after: datetime,
+        ended_before: datetime,
+    ) -> list[SleepEventInput]: ...
+
+    def get_system_capacity(self, athlete_id: str, day: date) -> SystemCapacityInput | None: ...
+
+
+class FatigueHistoryStore(FatigueHistorySource, Protocol):
+    def record_session(self, athlete_id: str, record: FatigueSessionRecord) -> None: ...
+
+    def record_sessions(self, athlete_id: str, records: Sequence[FatigueSessionRecord]) -> None: ...
+
+    def reset(self) -> None: ...
+
+
+def fatigue_session_from_ride(
+    *,
+    session_id: str,
+    ended_at: datetime,
+    duration_seconds: int,
+) -> FatigueSessionRecord:
+    """A completed ride's fatigue session, with its raw load estimated from duration."""
+    minutes = duration_seconds / 60
+    return FatigueSessionRecord(
+        session=AxisSessionInput(
+            session_id=session_id,
+            state="completed",
+            ended_at=ended_at,
+            raw_load=AxisRawLoad(
+                neural=round(_RIDE_LOAD_PER_MINUTE.neural * minutes, 4),
+                metabolic=round(_RIDE_LOAD_PER_MINUTE.metabolic * minutes, 4),
+                mechanical=round(_RIDE_LOAD_PER_MINUTE.mechanical * minutes, 4),
+            ),
+        ),
+        regional_distribution=dict(_RIDE_REGIONAL_DISTRIBUTION),
+    )
+
+
+class InMemoryFatigueHistorySource:
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self._sessions_by_athlete: dict[str, dict[str, FatigueSessionRecord]] = {}
+        self._sleep_events_by_athlete: dict[str, list[SleepEventInput]] = {}
+        self._capacity_by_key: dict[tuple[str, date], SystemCapacityInput] = {}
+
+    def record_session(self, athlete_id: str, record: FatigueSessionRecord) -> None:
+        self.record_sessions(athlete_id, [record])
+
+    def record_sessions(self, athlete_id: str, records: Sequence[FatigueSessionRecord]) -> None:
+        sessions = self._sessions_by_athlete.setdefault(athlete_id, {})
+        for record in records:
+            sessions[record.session.session_id] = record
+
+    def record_sleep_event(self, athlete_id: str, event: SleepEventInput) -> None:
+        self._sleep_events_by_athlete.setdefault(athlete_id, []).append(event)
+
+    def record_system_capacity(
+        self, athlete_id: str, day: date, capacity: SystemCapacityInput
+    ) -> None:
+        self._capacity_by_key[(athlete_id, day)] = capacity
+
+    def list_sessions(
+        self,
+        athlete_id: str,
+        *,
+        ended_after: datetime,
+        ended_before: datetime,
+    ) -> list[FatigueSessionRecord]:
+        return [
+            record
+            for record in self._sessions_by_athlete.get(athlete_id, {}).values()
+            if record.session.ended_at is not None
+            and ended_after <= record.session.ended_at <= ended_before
+        ]
+
+    def list_sleep_events(
+        self,
+        athlete_id: str,
+        *,
+        ended_after: datetime,
+        ended_before: datetime,
+    ) -> list[SleepEventInput]:
+        return [
+            event
+            for event in self._sleep_events_by_athlete.get(athlete_id, [])
+            if ended_after <= event.sleep_ended_at <= ended_before
+        ]
+
+    def get_system_capacity(self, athlete_id: str, day: date) -> SystemCapacityInput | None:
+        return self._capacity_by_key.get((athlete_id, day))
+
+
+class SqlFatigueHistorySource:
+    """`FatigueHistoryStore` over the `fatigue_history_sessions` table.
+
+    The API and every worker process read the same sessions. Sleep events and system
+    capacity are not persisted yet, so recomputes use no sleep events and the default
+    capacity.
+    """
+
+    def __init__(self, *, session_factory: Callable[[], Session]) -> None:
+        self._session_factory = session_factory
+
+    def record_session(self, athlete_id: str, record: FatigueSessionRecord) -> None:
+        self.record_sessions(athlete_id, [record])
+
+    def record_sessions(self, athlete_id: str, records: Sequence[FatigueSessionRecord]) -> None:
+        if not records:
+            return
+        with self._session_factory() as session, session.begin():
+            for record in records:
+                if record.session.ended_at is None:
+                    raise ValueError("fatigue history sessions require endedAt")
+                raw_load = record.session.raw_load
+                # Re-imports of the same session replace its row.
+                session.merge(
+                    FatigueHistorySession(
+                        athlete_id=athlete_id,
+                        session_id=record.session.session_id,
+                        state=record.session.state,
+                        ended_at=record.session.ended_at.astimezone(UTC),
+                        raw_neural=raw_load.neural,
+                        raw_metabolic=raw_load.metabolic,
+                        raw_mechanical=raw_load.mechanical,
+                        regional_distribution=dict(record.regional_distribution),
+                    )
+                )
+
+    def list_sessions(
+        self,
+        athlete_id: str,
+        *,
+        ended_after: datetime,
+        ended_before: datetime,
+    ) -> list[FatigueSessionRecord]:
+        with self._session_factory() as session:
+            rows = session.scalars(
+                select(FatigueHistorySession)
+                .where(
+                    FatigueHistorySession.athlete_id == athlete_id,
+                    FatigueHistorySession.ended_at >= ended_after.astimezone(UTC),
+                    FatigueHistorySession.ended_at <= ended_before.astimezone(UTC),
+                )
+                .order_by(FatigueHistorySession.ended_at, FatigueHistorySession.session_id)
+            ).all()
+        return [
+            FatigueSessionRecord(
+                session=AxisSessionInput(
+                    session_id=row.session_id,
+                    state=cast(SessionState, row.state),
+                    ended_at=_as_utc(row.ended_at),
+                    raw_load=AxisRawLoad(
+                        neural=row.raw_neural,
+                        metabolic=row.raw_metabolic,
+                        mechanical=row.raw_mechanical,
+                    ),
+                ),
+                regional_distribution=dict(row.regional_distribution),
+            )
+            for row in rows
+        ]
+
+    def list_sleep_events(
+        self,
+        athlete_id: str,
+        *,
+        ended_after: datetime,
+        ended_before: datetime,
+    ) -> list[SleepEventInput]:
+        del athlete_id, ended_after, ended_before
+        return []
+
+    def get_system_capacity(self, athlete_id: str, day: date) -> SystemCapacityInput | None:
+        del athlete_id, day
+        return None
+
+    def reset(self) -> None:
+        with self._session_factory() as session, session.begin():
+            session.execute(delete(FatigueHistorySession))
+
+
+@dataclass(frozen=True)
+class _ScoredSnapshotDay:
+    snapshot_date: date
+    global_neural: float
+    global_metabolic: float
+    regional_recruitment: dict[str, float]
+    regional_metabolic: dict[str, float]
+    regional_mechanical: dict[str, float]
+    derived_recruitment: float
+    capacity: SystemCapacityInput
+
+
+@dataclass(frozen=True)
+class FatigueRecomputeResult:
+    athlete_id: str
+    start_date: date
+    end_date: date
+    snapshot_ids: tuple[str, ...]
+
+
+class FatigueSnapshotService:
+    """Materializes daily fatigue snapshots so reads become indexed table scans.
+
+    Each recompute chunk scores up to `_CHUNK_DAYS` dates with an axis series that
+    starts `_WARMUP_DAYS` earlier, so decay carried in from prior sessions is
+    reflected without exceeding the axis-series lookback limit.
+    """
+
+    _CHUNK_DAYS = 15
+    _WARMUP_DAYS = 15
+    _RECOMPUTE_HORIZON_DAYS = 28
+
+    def __init__(
+        self,
+        *,
+        session_factory: Callable[[], Session],
+        history_source: FatigueHistorySource,
+        axis_scoring_service: AxisScoringService | None = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._history_source = history_source
+        self._axis_scoring_service = axis_scoring_service or AxisScoringService()
+
+    def recompute_range(
+        self,
+        athlete_id: str,
+        *,
+        start_date: date,
+        end_date: date,
+        timezone: str = "UTC",
+    ) -> FatigueRecomputeResult:
+        if start_date > end_date:
+            raise ValueError("start_date must be before or equal to end_date")
+        zone = self._resolve_zone(timezone)
+
+        rows: list[FatigueSnapshotUpsert] = []
+        chunk_start = start_date
+        while chunk_start <= end_date:
+            chunk_end = min(chunk_start + timedelta(days=self._CHUNK_DAYS - 1), end_date)
+            for scored in self._score_chunk(
+                athlete_id=athlete_id,
+                chunk_start=chunk_start,
+                chunk_end=chunk_end,
+                timezone=timezone,
+                zone=zone,
+            ):
+                rows.append(
+                    FatigueSnapshotUpsert(
+                        athlete_id=athlete_id,
+                        snapshot_date=scored.snapshot_date,
+                        global_neural=scored.global_neural,
+                        global_metabolic=scored.global_metabolic,
+                        regional_recruitment=scored.regional_recruitment,
+                        regional_metabolic=scored.regional_metabolic,
+                        regional_mechanical=scored.regional_mechanical,
+                        system_capacity_sleep=scored.capacity.sleep,
+                        system_capacity_fuel=scored.capacity.fuel,
+                        system_capacity_stress=scored.capacity.stress,
+                        derived_recruitment=scored.derived_recruitment,
+                    )
+                )
+            chunk_start = chunk_end + timedelta(days=1)
+
+        with self._session_factory() as session:
+            snapshot_ids = FatigueSnapshotRepository(session).bulk_upsert_snapshots(rows)
+
+        logger.info(
+            "fatigue_snapshots_recomputed",
+            extra={
+                "athlete_id": athlete_id,
+                "start_date": start_date.isoformat(),
+                "end_date": end_date.isoformat(),
+                "snapshot_count": len(snapshot_ids),
+            },
+        )
+        return FatigueRecomputeResult(
+            athlete_id=athlete_id,
+            start_date=start_date,
+            end_date=end_date,
+            snapshot_ids=tuple(snapshot_ids),
+        )
+
+    def handle_recompute_job(self, record: BackgroundJobRecord) -> None:
+        timezone = str(record.payload.get("timezone") or "UTC")
+        try:
+            zone = self._resolve_zone(timezone)
+            windows = self._resolve_job_windows(record.payload, zone)
+        except ValueError as exc:
+            raise BackgroundJobExecutionError(
+                code="FATIGUE_RECOMPUTE_INVALID_PAYLOAD",
+                message=str(exc),
+                retryable=False,
+            ) from exc
+
+        for start_date, end_date in windows:
+            self.recompute_range(
+                record.athlete_id,
+                start_date=start_date,
+                end_date=end_date,
+                timezone=timezone,
+            )
+
+    def coalesce_recompute_payloads(
+        self,
+        pending: Mapping[str, Any],
+        incoming: Mapping[str, Any],
+    ) -> dict[str, Any] | None:
+        """Merge two recompute payloads into one covering the union of their date windows.
+
+        Returns None when the payloads cannot share a job (different timezones or an
+        unresolvable window), so the incoming request is queued on its own.
+        """
+        timezone = str(pending.get("timezone") or "UTC")
+        if str(incoming.get("timezone") or "UTC") != timezone:
+            return None
+        try:
+            zone = self._resolve_zone(timezone)
+            windows = [
+                *self._resolve_job_windows(pending, zone),
+                *self._resolve_job_windows(incoming, zone),
+            ]
+        except ValueError:
+            return None
+
+        return {
+            "timezone": timezone,
+            "recomputeWindows": [
+                {"from": start_date.isoformat(), "to": end_date.isoformat()}
+                for start_date, end_date in _merge_date_windows(windows)
+            ],
+        }
+
+    def list_snapshots(
+        self,
+        athlete_id: str,
+        *,
+        start_date: date,
+        end_date: date,
+    ) -> FatigueSnapshotListResponse:
+        if start_date > end_date:
+            raise ValueError("startDate must be before or equal to endDate")
+
+        with self._session_factory() as session:
+            rows = FatigueSnapshotRepository(session).list_range(
+                athlete_ids=[athlete_id],
+                start_date=start_date,
+                end_date=end_date,
+            )
+
+        days = [
+            FatigueSnapshotDay(
+                snapshot_date=row.snapshot_date,
+                global_neural=row.global_neural,
+                global_metabolic=row.global_metabolic,
+                derived_recruitment=row.derived_recruitment,
+                regional_recruitment=row.regional_recruitment or {},
+                regional_metabolic=row.regional_metabolic or {},
+                regional_mechanical=row.regional_mechanical or {},
+                system_capacity=FatigueSnapshotSystemCapacity(
+                    sleep=row.system_capacity_sleep,
+                    fuel=row.system_capacity_fuel,
+                    stress=row.system_capacity_stress,
+                ),
+            )
+            for row in rows
+        ]
+
+        return FatigueSnapshotListResponse(
+            athlete_id=athlete_id,
+            start_date=start_date,
+            end_date=end_date,
+            snapshots=days,
+        )
+
+    def _score_chunk(
+        self,
+        *,
+        athlete_id: str,
+        chunk_start: date,
+        chunk_end: date,
+        timezone: str,
+        zone: ZoneInfo,
+    ) -> list[_ScoredSnapshotDay]:
+        window_start = chunk_start - timedelta(days=self._WARMUP_DAYS)
+        window_start_at = datetime.combine(window_start, time.min, tzinfo=zone)
+        as_of = datetime.combine(chunk_end, time.max, tzinfo=zone)
+
+        session_records = self._history_source.list_sessions(
+            athlete_id,
+            ended_after=window_start_at,
+            ended_before=as_of,
+        )
+        sessions = [record.session for record in session_records]
+        sleep_events = self._history_source.list_sleep_events(
+            athlete_id,
+            ended_after=window_start_at,
+            ended_before=as_of,
+        )
+        lookback_days = (chunk_end - window_start).days + 1
+        series = self._axis_scoring_service.compute_axis_series(
+            AxisSeriesRequest(
+                as_of=as_of,
+                timezone=timezone,
+                lookback_days=lookback_days,
+                sessions=sessions,
+                sleep_events=sleep_events,
+            )
+        )
+        # Each region is scored from its own share of every session's raw load, so its
+        # values carry the same spike and decay curves as the global axes.
+        regional_daily = {
+            region: {
+                daily.date: daily
+                for daily in self._axis_scoring_service.compute_axis_series(
+                    AxisSeriesRequest(
+                        as_of=as_of,
+                        timezone=timezone,
+                        lookback_days=lookback_days,
+                        sessions=regional_sessions,
+                        sleep_events=sleep_events,
+                    )
+                ).daily_series
+            }
+            for region, regional_sessions in sorted(_sessions_by_region(session_records).items())
+        }
+
+        scored_days: list[_ScoredSnapshotDay] = []
+        for daily in series.daily_series:
+            if daily.date < chunk_start:
+                continue
+            capacity = (
+                self._history_source.get_system_capacity(athlete_id, daily.date)
+                or SystemCapacityInput()
+            )
+            region_days = {
+                region: days[daily.date]
+                for region, days in regional_daily.items()
+                if daily.date in days
+            }
+            scored_days.append(
+                _ScoredSnapshotDay(
+                    snapshot_date=daily.date,
+                    global_neural=daily.neural,
+                    global_metabolic=daily.metabolic,
+                    regional_recruitment={
+                        region: day.recruitment for region, day in region_days.items()
+                    },
+                    regional_metabolic={
+                        region: day.metabolic for region, day in region_days.items()
+                    },
+                    regional_mechanical={
+                        region: day.mechanical for region, day in region_days.items()
+                    },
+                    derived_recruitment=daily.recruitment,
+                    capacity=capacity,
+                )
+            )
+        return scored_days
+
+    def _resolve_job_windows(
+        self,
+        payload: Mapping[str, Any],
+        zone: ZoneInfo,
+    ) -> list[tuple[date, date]]:
+        raw_windows = payload.get("recomputeWindows")
+        if raw_windows is None:
+            return [self._resolve_job_window(payload, zone)]
+        if isinstance(raw_windows, str) or not isinstance(raw_windows, Sequence) or not raw_windows:
+            raise ValueError("recomputeWindows must be a non-empty list")
+
+        windows: list[tuple[date, date]] = []
+        for raw_window in raw_windows:
+            if not isinstance(raw_window, Mapping):
+                raise ValueError("recomputeWindows entries must have from/to dates")
+            start_date = date.fromisoformat(str(raw_window.get("from")))
+            end_date = date.fromisoformat(str(raw_window.get("to")))
+            if start_date > end_date:
+                raise ValueError("recomputeWindows entries must have from before or equal to to")
+            windows.append((start_date, end_date))
+        return windows
+
+    def _resolve_job_window(
+        self, payload: Mapping[str, object], zone: ZoneInfo
+    ) -> tuple[date, date]:
+        explicit_start = payload.get("recomputeFrom")
+        explicit_end = payload.get("recomputeTo")
+        if explicit_start is not None and explicit_end is not None:
+            return date.fromisoformat(str(explicit_start)), date.fromisoformat(str(explicit_end))
+
+        activity_started_at = payload.get("activityStartedAt")
+        if activity_started_at is None:
+            raise ValueError("recompute payload requires activityStartedAt or recomputeFrom/To")
+        started_at = datetime.fromisoformat(str(activity_started_at))
+        if started_at.tzinfo is None:
+            raise ValueError("activityStartedAt must include timezone information")
+
+        start_date = started_at.astimezone(zone).date()
+        today = datetime.now(tz=UTC).astimezone(zone).date()
+        horizon_end = start_date + timedelta(days=self._RECOMPUTE_HORIZON_DAYS)
+        return start_date, max(start_date, min(today, horizon_end))
+
+    @staticmethod
+    def _resolve_zone(timezone: str) -> ZoneInfo:
+        try:
+            return ZoneInfo(timezone)
+        except ZoneInfoNotFoundError as exc:
+            raise ValueError("timezone must be a valid IANA timezone") from exc
+
+
+def _sessions_by_region(
+    records: Sequence[FatigueSessionRecord],
+) -> dict[str, list[AxisSessionInput]]:
+    """Per region, every session with its raw load scaled by that region's share."""
+    sessions: dict[str, list[AxisSessionInput]] = {}
+    for record in records:
+        raw_load = record.session.raw_load
+        for region, share in record.regional_distribution.items():
+            if share <= 0:
+                continue
+            sessions.setdefault(region, []).append(
+                record.session.model_copy(
+                    update={
+                        "raw_load": AxisRawLoad(
+                            neural=raw_load.neural * share,
+                            metabolic=raw_load.metabolic * share,
+                            mechanical=raw_load.mechanical * share,
+                        )
+                    }
+                )
+            )
+    return sessions
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite drops tzinfo on round-trip; every stored timestamp is written in UTC.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value.astimezone(UTC)
+
+
+def _merge_date_windows(windows: list[tuple[date, date]]) -> list[tuple[date, date]]:
+    merged: list[tuple[date, date]] = []
+    for start_date, end_date in sorted(windows):
+        if merged and start_date <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end_date))
+        else:
+            merged.append((start_date, end_date))
+    return merged
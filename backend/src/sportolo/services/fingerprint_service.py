@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import zlib
+from typing import Any, Literal
+
+from pydantic import BaseModel
+
+# `sha256` for fingerprints that are persisted or shared between processes; `fast` is a
+# non-cryptographic 64-bit checksum for process-local tiers, where a fingerprint only has
+# to detect payload drift between requests that reuse one idempotency key.
+FingerprintAlgorithm = Literal["sha256", "fast"]
+
+# `json.dumps` with non-default options builds a new encoder per call; reuse one instead.
+_CANONICAL_JSON_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"))
+
+
+def canonical_json_bytes(value: Any) -> bytes:
+    """Sorted-key, whitespace-free JSON encoding of `value`."""
+    return _CANONICAL_JSON_ENCODER.encode(value).encode("utf-8")
+
+
+def fingerprint_bytes(data: bytes, *, algorithm: FingerprintAlgorithm = "sha256") -> str:
+    if algorithm == "fast":
+        return f"{zlib.crc32(data):08x}{zlib.adler32(data):08x}"
+    return hashlib.sha256(data).hexdigest()
+
+
+def fingerprint_json(value: Any, *, algorithm: FingerprintAlgorithm = "sha256") -> str:
+    return fingerprint_bytes(canonical_json_bytes(value), algorithm=algorithm)
+
+
+def fingerprint_model(model: BaseModel, *, algorithm: FingerprintAlgorithm = "sha256") -> str:
+    """Fingerprint of a validated request model's JSON form.
+
+    Fields serialize in declaration order, so for request models without free-form dict
+    fields the output is canonical without building a dict and sorting its keys.
+    """
+    return fingerprint_bytes(
+        model.model_dump_json(by_alias=True).encode("utf-8"), algorithm=algorithm
+    )
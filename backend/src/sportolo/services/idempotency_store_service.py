@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Protocol
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+
+from sportolo.models.idempotency_record import IdempotencyRecord
+from sportolo.services.fingerprint_service import FingerprintAlgorithm
+
+DEFAULT_IDEMPOTENCY_TTL_SECONDS = 86_400
+DEFAULT_IDEMPOTENCY_MAX_ENTRIES = 100_000
+
+
+@dataclass(frozen=True)
+class IdempotentReplay:
+    """A response stored under an idempotency key, kept as the serialized JSON body."""
+
+    request_fingerprint: str
+    response_body: bytes
+    stored_at: datetime
+    expires_at: datetime
+
+
+class IdempotencyStore(Protocol):
+    # How callers should fingerprint requests whose replays live in this store.
+    fingerprint_algorithm: FingerprintAlgorithm
+
+    def get(
+        self,
+        scope: str,
+        owner_id: str,
+        idempotency_key: str,
+        *,
+        now: datetime | None = None,
+    ) -> IdempotentReplay | None: ...
+
+    def put(
+        self,
+        scope: str,
+        owner_id: str,
+        idempotency_key: str,
+        *,
+        request_fingerprint: str,
+        response_body: bytes,
+        now: datetime | None = None,
+    ) -> IdempotentReplay: ...
+
+    def reset(self) -> None: ...
+
+
+def _validate_limits(ttl_seconds: int, max_entries: int) -> None:
+    if ttl_seconds < 1:
+        raise ValueError("ttl_seconds must be at least 1")
+    if max_entries < 1:
+        raise ValueError("max_entries must be at least 1")
+
+
+class InMemoryIdempotencyStore:
+    """Process-local idempotency store for tests and single-process deployments.
+
+    Entries expire after `ttl_seconds` and the oldest entries are evicted beyond
+    `max_entries`. With one TTL for every entry, insertion order is expiry order, so
+    both limits are enforced by popping from the front of one ordered dict.
+    """
+
+    fingerprint_algorithm: FingerprintAlgorithm = "fast"
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: int = DEFAULT_IDEMPOTENCY_TTL_SECONDS,
+        max_entries: int = DEFAULT_IDEMPOTENCY_MAX_ENTRIES,
+    ) -> None:
+        _validate_limits(ttl_seconds, max_entries)
+        self._ttl = timedelta(seconds=ttl_seconds)
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, str, str], IdempotentReplay] = OrderedDict()
+
+    def get(
+        self,
+        scope: str,
+        owner_id: str,
+        idempotency_key: str,
+        *,
+        now: datetime | None = None,
+    ) -> IdempotentReplay | None:
+        current_time = now or datetime.now(tz=UTC)
+        with self._lock:
+            replay = self._entries.get((scope, owner_id, idempotency_key))
+        if replay is None or replay.expires_at <= current_time:
+            return None
+        return replay
+
+    def put(
+        self,
+        scope: str,
+        owner_id: str,
+        idempotency_key: str,
+        *,
+        request_fingerprint: str,
+        response_body: bytes,
+        now: datetime | None = None,
+    ) -> IdempotentReplay:
+        current_time = now or datetime.now(tz=UTC)
+        key = (scope, owner_id, idempotency_key)
+        with self._lock:
+            self._evict_expired(current_time)
+            existing = self._entries.get(key)
+            if existing is not None:
+                return existing
+            replay = IdempotentReplay(
+                request_fingerprint=request_fingerprint,
+                response_body=response_body,
+                stored_at=current_time,
+                expires_at=current_time + self._ttl,
+            )
+            self._entries[key] = replay
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+            return replay
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict_expired(self, now: datetime) -> None:
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if oldest.expires_at > now:
+                return
+            self._entries.popitem(last=False)
+
+
+class SqlIdempotencyStore:
+    """Idempotency store backed by the `idempotency_records` table.
+
+    Replays survive restarts and are shared by every API worker. Concurrent first
+    requests race on the primary key; the loser gets the winner's stored response.
+    Expired rows and rows beyond `max_entries` are pruned every `prune_interval` puts.
+    """
+
+    fingerprint_algorithm: FingerprintAlgorithm = "sha256"
+
+    def __init__(
+        self,
+        *,
+        session_factory: sessionmaker[Session],
+        ttl_seconds: int = DEFAULT_IDEMPOTENCY_TTL_SECONDS,
+        max_entries: int = DEFAULT_IDEMPOTENCY_MAX_ENTRIES,
+        prune_interval: int = 100,
+    ) -> None:
+        _validate_limits(ttl_seconds, max_entries)
+        if prune_interval < 1:
+            raise ValueError("prune_interval must be at least 1")
+        self._session_factory = session_factory
+        self._ttl = timedelta(seconds=ttl_seconds)
+        self._max_entries = max_entries
+        self._prune_interval = prune_interval
+        self._lock = threading.Lock()
+        self._puts_since_prune = 0
+
+    def get(
+        self,
+        scope: str,
+        owner_id: str,
+        idempotency_key: str,
+        *,
+        now: datetime | None = None,
+    ) -> IdempotentReplay | None:
+        current_time = now or datetime.now(tz=UTC)
+        with self._session_factory() as session:
+            row = session.get(IdempotencyRecord, (scope, owner_id, idempotency_key))
+            if row is None:
+                return None
+            replay = _to_replay(row)
+        if replay.expires_at <= current_time:
+            return None
+        return replay
+
+    def put(
+        self,
+        scope: str,
+        owner_id: str,
+        idempotency_key: str,
+        *,
+        request_fingerprint: str,
+        response_body: bytes,
+        now: datetime | None = None,
+    ) -> IdempotentReplay:
+        current_time = now or datetime.now(tz=UTC)
+        self._maybe_prune(current_time)
+        primary_key = (scope, owner_id, idempotency_key)
+        with self._session_factory() as session:
+            existing = session.get(IdempotencyRecord, primary_key)
+            if existing is not None:
+                if _as_utc(existing.expires_at) > current_time:
+                    return _to_replay(existing)
+                session.delete(existing)
+                session.flush()
+
+            row = IdempotencyRecord(
+                scope=scope,
+                owner_id=owner_id,
+                idempotency_key=idempotency_key,
+                request_fingerprint=request_fingerprint,
+                response_body=response_body,
+                stored_at=current_time,
+                expires_at=current_time + self._ttl,
+            )
+            session.add(row)
+            try:
+                session.commit()
+            except IntegrityError:
+                session.rollback()
+                winner = session.get(IdempotencyRecord, primary_key, populate_existing=True)
+                if winner is None:  # pragma: no cover - the winning row was pruned immediately
+                    raise
+                return _to_replay(winner)
+            return _to_replay(row)
+
+    def prune(self, now: datetime | None = None) -> int:
+        """Deletes expired rows and the oldest rows beyond `max_entries`."""
+        current_time = now or datetime.now(tz=UTC)
+        with self._session_factory() as session:
+            expired = session.execute(
+                delete(IdempotencyRecord)
+                .where(IdempotencyRecord.expires_at <= current_time)
+                .execution_options(synchronize_session=False)
+            )
+            removed = int(getattr(expired, "rowcount", 0))
+            cutoff = session.scalar(
+                select(IdempotencyRecord.expires_at)
+                .order_by(IdempotencyRecord.expires_at.desc())
+                .offset(self._max_entries)
+                .limit(1)
+            )
+            if cutoff is not None:
+                overflow = session.execute(
+                    delete(IdempotencyRecord)
+                    .where(IdempotencyRecord.expires_at <= cutoff)
+                    .execution_options(synchronize_session=False)
+                )
+                removed += int(getattr(overflow, "rowcount", 0))
+            session.commit()
+        return removed
+
+    def reset(self) -> None:
+        with self._session_factory() as session:
+            session.execute(delete(IdempotencyRecord))
+            session.commit()
+
+    def _maybe_prune(self, now: datetime) -> None:
+        with self._lock:
+            self._puts_since_prune += 1
+            if self._puts_since_prune < self._prune_interval:
+                return
+            self._puts_since_prune = 0
+        self.prune(now)
+
+
+def _to_replay(row: IdempotencyRecord) -> IdempotentReplay:
+    return IdempotentReplay(
+        request_fingerprint=row.request_fingerprint,
+        response_body=row.response_body,
+        stored_at=_as_utc(row.stored_at),
+        expires_at=_as_utc(row.expires_at),
+    )
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite drops tzinfo on round-trip; every stored timestamp is written in UTC.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value.astimezone(UTC)
@@ -8,6 +8,8 @@ from sportolo.api.schemas.muscle_usage import (
     RoutineUsageSummary,
 )
 
+MUSCLE_USAGE_POLICY_VERSION = "v1-muscle-usage"
+
 
 class MuscleUsageService:
     """Deterministic exercise->routine->microcycle muscle usage aggregation."""
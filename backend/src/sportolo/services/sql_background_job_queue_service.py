@@ -0,0 +1,1064 @@
+from __future__ import annotations
+
+import logging
+import os
+import socket
+from collections import Counter
+from collections.abc import Collection, Mapping, Sequence
+from datetime import UTC, datetime, timedelta
+from typing import Any, cast
+from uuid import uuid4
+
+from sqlalchemy import (
+    ColumnElement,
+    and_,
+    case,
+    delete,
+    exists,
+    func,
+    insert,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased, sessionmaker
+
+from sportolo.models.background_job import (
+    BackgroundJob,
+    BackgroundJobAttempt,
+    BackgroundJobCoalescedRequest,
+    BackgroundJobMetricRollup,
+)
+from sportolo.services.background_job_metrics_service import (
+    LATENCY_BUCKET_BOUNDS_MS,
+    THROUGHPUT_WINDOWS_SECONDS,
+    BackgroundJobPipelineMetrics,
+    LatencyHistogramSnapshot,
+    latency_bucket_index,
+)
+from sportolo.services.background_job_queue_service import (
+    BackgroundJobAttemptRecord,
+    BackgroundJobAttemptStatus,
+    BackgroundJobDeadLetterFilter,
+    BackgroundJobEnqueueRequest,
+    BackgroundJobExecutionError,
+    BackgroundJobHandler,
+    BackgroundJobMetrics,
+    BackgroundJobPayloadCoalescer,
+    BackgroundJobPipeline,
+    BackgroundJobProcessOutcome,
+    BackgroundJobRecord,
+    BackgroundJobStatus,
+    LazyAttemptHistory,
+    build_default_handlers,
+    fingerprint_enqueue_request,
+    freeze_job_payload,
+    run_claimed_job,
+    validate_attempt_budget,
+    validate_enqueue_request,
+)
+from sportolo.services.background_job_retry_service import (
+    BackgroundJobRetryController,
+    BackgroundJobRetryDecision,
+)
+
+logger = logging.getLogger(__name__)
+
+_ENQUEUE_ATTEMPTS = 3
+_COMPACT_INTERVAL = timedelta(minutes=1)
+
+# (pipeline, series, status, bucket_index) -> (count, sum_ms, max_ms)
+_RollupKey = tuple[str, str, str, int]
+_RollupIncrements = dict[_RollupKey, tuple[int, float, float]]
+_RollupRow = tuple[str, str, str, int, int, float, float]
+
+
+class _StaleCoalesceTarget(Exception):
+    """A pending job changed between reading it as a coalescing target and merging into it."""
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+
+
+class SqlBackgroundJobQueue:
+    """Durable background job queue backed by the `background_jobs` table.
+
+    Jobs are claimed by moving them to `processing` under a time-bound lease owned by
+    this worker. On PostgreSQL candidate rows are read with `FOR UPDATE SKIP LOCKED`;
+    every backend then claims with a conditional `UPDATE`, so concurrent workers never
+    execute the same attempt twice. Workers renew the lease with `extend_lease` while a
+    handler runs; a job whose lease expires (for example because its worker crashed)
+    becomes claimable again. Lease renewals and attempt results are fenced on the lease
+    owner and the claimed attempt number, so a worker that lost its lease can neither
+    extend nor complete the newer claim.
+
+    Pipelines with an entry in `payload_coalescers` merge new requests into an athlete's
+    not-yet-started job (guarded by an optimistic `coalesced_request_count` check) and
+    are serialized per athlete by a partial unique index over processing rows.
+
+    Metrics come from `background_job_metric_rollups`, which enqueue and attempt writes
+    increment in their own transactions; only throughput windows read the attempt log,
+    through its `finished_at` index. With `attempt_retention_seconds` set, attempts that
+    finished longer ago than that are pruned (at most once a minute, after recording an
+    attempt), so job attempt histories only reach back that far.
+    """
+
+    def __init__(
+        self,
+        *,
+        session_factory: sessionmaker[Session],
+        default_handlers: Mapping[BackgroundJobPipeline, BackgroundJobHandler] | None = None,
+        payload_coalescers: Mapping[BackgroundJobPipeline, BackgroundJobPayloadCoalescer]
+        | None = None,
+        worker_id: str | None = None,
+        lease_seconds: int = 300,
+        claim_batch_size: int = 8,
+        retry_controller: BackgroundJobRetryController | None = None,
+        attempt_retention_seconds: int | None = None,
+    ) -> None:
+        if lease_seconds < 1:
+            raise ValueError("lease_seconds must be at least 1")
+        if claim_batch_size < 1:
+            raise ValueError("claim_batch_size must be at least 1")
+        if (
+            attempt_retention_seconds is not None
+            and attempt_retention_seconds < THROUGHPUT_WINDOWS_SECONDS[-1]
+        ):
+            raise ValueError(
+                "attempt_retention_seconds must cover the longest throughput window "
+                f"({THROUGHPUT_WINDOWS_SECONDS[-1]}s)"
+            )
+        self._session_factory = session_factory
+        self._default_handlers = build_default_handlers(default_handlers)
+        self._payload_coalescers = dict(payload_coalescers or {})
+        self._worker_id = worker_id or default_worker_id()
+        self._lease_duration = timedelta(seconds=lease_seconds)
+        self._claim_batch_size = claim_batch_size
+        self._retry_controller = retry_controller or BackgroundJobRetryController()
+        self._attempt_retention = (
+            timedelta(seconds=attempt_retention_seconds)
+            if attempt_retention_seconds is not None
+            else None
+        )
+        self._next_compact_at = datetime.min.replace(tzinfo=UTC)
+        self._reset_state()
+
+    @property
+    def worker_id(self) -> str:
+        return self._worker_id
+
+    @property
+    def lease_seconds(self) -> float:
+        return self._lease_duration.total_seconds()
+
+    def _reset_state(self) -> None:
+        self._handlers: dict[BackgroundJobPipeline, BackgroundJobHandler] = dict(
+            self._default_handlers
+        )
+        self._retry_controller.reset()
+
+    def reset_for_testing(self) -> None:
+        self._reset_state()
+        with self._session_factory() as session:
+            session.execute(delete(BackgroundJobAttempt))
+            session.execute(delete(BackgroundJobMetricRollup))
+            session.execute(delete(BackgroundJobCoalescedRequest))
+            session.execute(delete(BackgroundJob))
+            session.commit()
+
+    def register_handler(
+        self,
+        pipeline: BackgroundJobPipeline,
+        handler: BackgroundJobHandler,
+    ) -> None:
+        self._handlers[pipeline] = handler
+
+    def handler_for(self, pipeline: BackgroundJobPipeline) -> BackgroundJobHandler:
+        return self._handlers[pipeline]
+
+    def enqueue(self, request: BackgroundJobEnqueueRequest) -> BackgroundJobRecord:
+        return self.enqueue_many([request])[0]
+
+    def enqueue_many(
+        self,
+        requests: Sequence[BackgroundJobEnqueueRequest],
+        *,
+        return_records: bool = True,
+    ) -> list[BackgroundJobRecord]:
+        """Enqueue a batch in one transaction.
+
+        Replay lookups, coalescing-target lookups and inserts each take one statement for
+        the whole batch. If a concurrent writer wins a race on an idempotency key or a
+        coalescing target, the transaction is retried; the final retry skips coalescing.
+        With `return_records=False` no snapshots are built and an empty list is returned.
+        """
+        for request in requests:
+            validate_enqueue_request(request)
+        fingerprints = [fingerprint_enqueue_request(request) for request in requests]
+        if not requests:
+            return []
+
+        attempt = 1
+        while True:
+            with self._session_factory() as session:
+                try:
+                    job_ids = self._enqueue_batch(
+                        session,
+                        requests,
+                        fingerprints,
+                        coalesce=attempt < _ENQUEUE_ATTEMPTS,
+                    )
+                except (IntegrityError, _StaleCoalesceTarget):
+                    session.rollback()
+                    if attempt >= _ENQUEUE_ATTEMPTS:
+                        raise
+                    attempt += 1
+                    continue
+                if not return_records:
+                    return []
+                return self._load_records(session, job_ids)
+
+    def _enqueue_batch(
+        self,
+        session: Session,
+        requests: Sequence[BackgroundJobEnqueueRequest],
+        fingerprints: Sequence[str],
+        *,
+        coalesce: bool,
+    ) -> list[str]:
+        now = datetime.now(tz=UTC)
+        known = self._load_replay_keys(session, requests)
+        pending_targets = self._load_coalesce_targets(session, requests) if coalesce else {}
+        merged_payloads: dict[str, dict[str, Any]] = {}
+        merged_counts: Counter[str] = Counter()
+        new_jobs: list[dict[str, Any]] = []
+        new_targets: dict[tuple[str, str], dict[str, Any]] = {}
+        coalesced_requests: list[dict[str, Any]] = []
+        coalesced_pipelines: Counter[str] = Counter()
+        job_ids: list[str] = []
+
+        for request, fingerprint in zip(requests, fingerprints, strict=True):
+            replay_key = (request.athlete_id, request.idempotency_key)
+            known_job = known.get(replay_key)
+            if known_job is not None:
+                known_job_id, stored_fingerprint = known_job
+                if stored_fingerprint != fingerprint:
+                    raise ValueError("idempotency key already used with a different payload")
+                job_ids.append(known_job_id)
+                continue
+
+            coalescer = self._payload_coalescers.get(request.pipeline) if coalesce else None
+            target_key = (request.athlete_id, request.pipeline)
+            job_id: str | None = None
+            if coalescer is not None:
+                new_target = new_targets.get(target_key)
+                stored_target = pending_targets.get(target_key)
+                if new_target is not None:
+                    merged = coalescer(new_target["payload"], request.payload)
+                    if merged is not None:
+                        new_target["payload"] = merged
+                        new_target["coalesced_request_count"] += 1
+                        job_id = new_target["job_id"]
+                elif stored_target is not None:
+                    current = merged_payloads.get(stored_target.job_id)
+                    if current is None:
+                        current = stored_target.payload
+                    merged = coalescer(current, request.payload)
+                    if merged is not None:
+                        merged_payloads[stored_target.job_id] = merged
+                        merged_counts[stored_target.job_id] += 1
+                        job_id = stored_target.job_id
+
+            if job_id is not None:
+                coalesced_pipelines[request.pipeline] += 1
+                coalesced_requests.append(
+                    {
+                        "athlete_id": request.athlete_id,
+                        "idempotency_key": request.idempotency_key,
+                        "job_id": job_id,
+                        "correlation_id": request.correlation_id,
+                        "payload_fingerprint": fingerprint,
+                        "coalesced_at": now,
+                    }
+                )
+            else:
+                job_id = f"bg-job-{uuid4().hex}"
+                new_job = {
+                    "job_id": job_id,
+                    "athlete_id": request.athlete_id,
+                    "pipeline": request.pipeline,
+                    "idempotency_key": request.idempotency_key,
+                    "correlation_id": request.correlation_id,
+                    "payload": request.payload,
+                    "payload_fingerprint": fingerprint,
+                    "status": "queued",
+                    "attempt_count": 0,
+                    "max_attempts": request.max_attempts,
+                    "retry_delay_seconds": request.retry_delay_seconds,
+                    "serialized": request.pipeline in self._payload_coalescers,
+                    "coalesced_request_count": 0,
+                    "enqueued_at": now,
+                    "available_at": now,
+                }
+                new_jobs.append(new_job)
+                if coalescer is not None and target_key not in pending_targets:
+                    new_targets.setdefault(target_key, new_job)
+            known[replay_key] = (job_id, fingerprint)
+            job_ids.append(job_id)
+
+        targets_by_job_id = {target.job_id: target for target in pending_targets.values()}
+        for job_id, payload in merged_payloads.items():
+            # The count doubles as a version: a concurrent merge or claim loses the race here.
+            coalesced = session.execute(
+                update(BackgroundJob)
+                .where(
+                    BackgroundJob.job_id == job_id,
+                    BackgroundJob.status == "queued",
+                    BackgroundJob.attempt_count == 0,
+                    BackgroundJob.coalesced_request_count
+                    == targets_by_job_id[job_id].coalesced_request_count,
+                )
+                .values(
+                    payload=payload,
+                    coalesced_request_count=(
+                        BackgroundJob.coalesced_request_count + merged_counts[job_id]
+                    ),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            if _rowcount(coalesced) != 1:
+                raise _StaleCoalesceTarget(job_id)
+        if new_jobs:
+            session.execute(insert(BackgroundJob), new_jobs)
+        if coalesced_requests:
+            session.execute(insert(BackgroundJobCoalescedRequest), coalesced_requests)
+        increments: _RollupIncrements = {}
+        for pipeline, count in Counter(job["pipeline"] for job in new_jobs).items():
+            increments[(pipeline, "enqueued", "", 0)] = (count, 0.0, 0.0)
+        for pipeline, count in coalesced_pipelines.items():
+            increments[(pipeline, "coalesced", "", 0)] = (count, 0.0, 0.0)
+        _increment_rollups(session, increments)
+        session.commit()
+
+        for new_job in new_jobs:
+            logger.info(
+                "background_job_enqueued",
+                extra={
+                    "job_id": new_job["job_id"],
+                    "pipeline": new_job["pipeline"],
+                    "athlete_id": new_job["athlete_id"],
+                    "correlation_id": new_job["correlation_id"],
+                },
+            )
+        for coalesced_request in coalesced_requests:
+            logger.info(
+                "background_job_coalesced",
+                extra={
+                    "job_id": coalesced_request["job_id"],
+                    "athlete_id": coalesced_request["athlete_id"],
+                    "correlation_id": coalesced_request["correlation_id"],
+                },
+            )
+        return job_ids
+
+    @staticmethod
+    def _load_replay_keys(
+        session: Session,
+        requests: Sequence[BackgroundJobEnqueueRequest],
+    ) -> dict[tuple[str, str], tuple[str, str]]:
+        """Map each already-used (athlete_id, idempotency_key) to (job_id, fingerprint)."""
+        replay_keys = {(request.athlete_id, request.idempotency_key) for request in requests}
+        known: dict[tuple[str, str], tuple[str, str]] = {}
+        coalesced_rows = session.execute(
+            select(
+                BackgroundJobCoalescedRequest.athlete_id,
+                BackgroundJobCoalescedRequest.idempotency_key,
+                BackgroundJobCoalescedRequest.job_id,
+                BackgroundJobCoalescedRequest.payload_fingerprint,
+            ).where(
+                tuple_(
+                    BackgroundJobCoalescedRequest.athlete_id,
+                    BackgroundJobCoalescedRequest.idempotency_key,
+                ).in_(replay_keys)
+            )
+        )
+        job_rows = session.execute(
+            select(
+                BackgroundJob.athlete_id,
+                BackgroundJob.idempotency_key,
+                BackgroundJob.job_id,
+                BackgroundJob.payload_fingerprint,
+            ).where(
+                tuple_(BackgroundJob.athlete_id, BackgroundJob.idempotency_key).in_(replay_keys)
+            )
+        )
+        for athlete_id, idempotency_key, job_id, fingerprint in [*coalesced_rows, *job_rows]:
+            known[(athlete_id, idempotency_key)] = (job_id, fingerprint)
+        return known
+
+    def _load_coalesce_targets(
+        self,
+        session: Session,
+        requests: Sequence[BackgroundJobEnqueueRequest],
+    ) -> dict[tuple[str, str], Row[str, str, str, dict[str, Any], int]]:
+        """Return the oldest not-yet-started job per (athlete, coalescing pipeline)."""
+        athlete_ids = {
+            request.athlete_id
+            for request in requests
+            if request.pipeline in self._payload_coalescers
+        }
+        if not athlete_ids:
+            return {}
+
+        rows = session.execute(
+            select(
+                BackgroundJob.athlete_id,
+                BackgroundJob.pipeline,
+                BackgroundJob.job_id,
+                BackgroundJob.payload,
+                BackgroundJob.coalesced_request_count,
+            )
+            .where(
+                BackgroundJob.athlete_id.in_(athlete_ids),
+                BackgroundJob.pipeline.in_(sorted(self._payload_coalescers)),
+                BackgroundJob.status == "queued",
+                BackgroundJob.attempt_count == 0,
+            )
+            .order_by(BackgroundJob.enqueued_at, BackgroundJob.job_id)
+            .with_for_update()
+        )
+        targets: dict[tuple[str, str], Row[str, str, str, dict[str, Any], int]] = {}
+        for row in rows:
+            targets.setdefault((row.athlete_id, row.pipeline), row)
+        return targets
+
+    def _load_records(self, session: Session, job_ids: Sequence[str]) -> list[BackgroundJobRecord]:
+        jobs = {
+            job.job_id: job
+            for job in session.scalars(
+                select(BackgroundJob)
+                .where(BackgroundJob.job_id.in_(set(job_ids)))
+                .execution_options(populate_existing=True)
+            )
+        }
+        return [self._snapshot(jobs[job_id]) for job_id in job_ids]
+
+    def get_job(self, job_id: str) -> BackgroundJobRecord | None:
+        with self._session_factory() as session:
+            job = session.get(BackgroundJob, job_id)
+            if job is None:
+                return None
+            return self._snapshot(job)
+
+    def list_dead_letters(
+        self,
+        dead_letter_filter: BackgroundJobDeadLetterFilter | None = None,
+        *,
+        limit: int | None = None,
+    ) -> list[BackgroundJobRecord]:
+        failed_at = func.coalesce(BackgroundJob.last_failed_at, BackgroundJob.enqueued_at)
+        conditions: list[ColumnElement[bool]] = [BackgroundJob.status == "dead_letter"]
+        if dead_letter_filter is not None:
+            if dead_letter_filter.pipeline is not None:
+                conditions.append(BackgroundJob.pipeline == dead_letter_filter.pipeline)
+            if dead_letter_filter.error_code is not None:
+                conditions.append(BackgroundJob.last_error_code == dead_letter_filter.error_code)
+            if dead_letter_filter.athlete_id is not None:
+                conditions.append(BackgroundJob.athlete_id == dead_letter_filter.athlete_id)
+            if dead_letter_filter.failed_after is not None:
+                conditions.append(failed_at >= dead_letter_filter.failed_after)
+            if dead_letter_filter.failed_before is not None:
+                conditions.append(failed_at < dead_letter_filter.failed_before)
+
+        with self._session_factory() as session:
+            jobs = session.scalars(
+                select(BackgroundJob)
+                .where(*conditions)
+                .order_by(failed_at, BackgroundJob.job_id)
+                .limit(limit)
+            ).all()
+            return [self._snapshot(job) for job in jobs]
+
+    def redrive_dead_letters(
+        self,
+        job_ids: Sequence[str],
+        *,
+        attempt_budget: int,
+    ) -> list[BackgroundJobRecord]:
+        """Requeue dead-lettered jobs with `attempt_budget` fresh attempts.
+
+        Attempt numbers keep counting so the attempt log stays append-only; ids that are
+        no longer dead-lettered (for example redriven by another process) are skipped.
+        """
+        validate_attempt_budget(attempt_budget)
+        if not job_ids:
+            return []
+
+        now = datetime.now(tz=UTC)
+        with self._session_factory() as session:
+            redriven_ids = session.scalars(
+                update(BackgroundJob)
+                .where(
+                    BackgroundJob.job_id.in_(set(job_ids)),
+                    BackgroundJob.status == "dead_letter",
+                )
+                .values(
+                    status="queued",
+                    max_attempts=BackgroundJob.attempt_count + attempt_budget,
+                    available_at=now,
+                    completed_at=None,
+                    lease_owner=None,
+                    lease_expires_at=None,
+                )
+                .returning(BackgroundJob.job_id)
+                .execution_options(synchronize_session=False)
+            ).all()
+            session.commit()
+            redriven_set = set(redriven_ids)
+            records = self._load_records(
+                session, [job_id for job_id in dict.fromkeys(job_ids) if job_id in redriven_set]
+            )
+
+        if records:
+            logger.info("background_job_dead_letters_redriven", extra={"count": len(records)})
+        return records
+
+    def metrics_snapshot(self) -> BackgroundJobMetrics:
+        now = datetime.now(tz=UTC)
+        with self._session_factory() as session:
+            # Served by the (status, available_at) index.
+            queue_depth = session.scalar(
+                select(func.count())
+                .select_from(BackgroundJob)
+                .where(BackgroundJob.status == "queued")
+            )
+            rollup_rows = session.execute(
+                select(
+                    BackgroundJobMetricRollup.pipeline,
+                    BackgroundJobMetricRollup.series,
+                    BackgroundJobMetricRollup.status,
+                    BackgroundJobMetricRollup.bucket_index,
+                    BackgroundJobMetricRollup.count,
+                    BackgroundJobMetricRollup.sum_ms,
+                    BackgroundJobMetricRollup.max_ms,
+                )
+            ).all()
+            throughput = self._load_throughput(session, now)
+
+        rollups = [cast(_RollupRow, tuple(row)) for row in rollup_rows]
+        pipelines = _pipeline_metrics_from_rollups(rollups, throughput)
+        total_enqueued_count = sum(row[4] for row in rollups if row[1] == "enqueued")
+        coalesced_request_count = sum(row[4] for row in rollups if row[1] == "coalesced")
+        per_pipeline = pipelines.values()
+        processed_attempt_count = sum(item.processed_attempt_count for item in per_pipeline)
+        succeeded_count = sum(item.succeeded_count for item in per_pipeline)
+        retry_count = sum(item.retry_count for item in per_pipeline)
+        dead_letter_count = sum(item.dead_letter_count for item in per_pipeline)
+        total_processing_latency_ms = sum(item.processing_latency.sum_ms for item in per_pipeline)
+        failed_attempt_count = processed_attempt_count - succeeded_count
+        retry_control = self._retry_controller.metrics_snapshot(now)
+
+        failure_rate = 0.0
+        average_processing_latency_ms = 0.0
+        if processed_attempt_count > 0:
+            failure_rate = failed_attempt_count / processed_attempt_count
+            average_processing_latency_ms = total_processing_latency_ms / processed_attempt_count
+
+        return BackgroundJobMetrics(
+            queue_depth=int(queue_depth or 0),
+            total_enqueued_count=int(total_enqueued_count),
+            processed_attempt_count=processed_attempt_count,
+            succeeded_count=succeeded_count,
+            failed_attempt_count=failed_attempt_count,
+            retry_count=retry_count,
+            dead_letter_count=dead_letter_count,
+            failure_rate=failure_rate,
+            average_processing_latency_ms=average_processing_latency_ms,
+            coalesced_request_count=int(coalesced_request_count),
+            pipelines=pipelines,
+            worker_shed_retry_count=retry_control.worker_shed_retry_count,
+            worker_open_circuit_error_codes=retry_control.worker_open_circuit_error_codes,
+        )
+
+    @staticmethod
+    def _load_throughput(session: Session, now: datetime) -> dict[str, dict[int, float]]:
+        # Only the longest window of the attempt log is read, through its finished_at index.
+        attempt = BackgroundJobAttempt
+        rows = session.execute(
+            select(
+                BackgroundJob.pipeline,
+                *(
+                    _count_where(attempt.finished_at > now - timedelta(seconds=window))
+                    for window in THROUGHPUT_WINDOWS_SECONDS
+                ),
+            )
+            .select_from(attempt)
+            .join(BackgroundJob, BackgroundJob.job_id == attempt.job_id)
+            .where(attempt.finished_at > now - timedelta(seconds=THROUGHPUT_WINDOWS_SECONDS[-1]))
+            .group_by(BackgroundJob.pipeline)
+        ).all()
+        return {
+            row[0]: {
+                window: int(value) / window
+                for window, value in zip(THROUGHPUT_WINDOWS_SECONDS, row[1:], strict=True)
+            }
+            for row in rows
+        }
+
+    def compact(self, now: datetime | None = None) -> int:
+        """Prune attempts past the retention window; returns the number deleted."""
+        if self._attempt_retention is None:
+            return 0
+        cutoff = (now or datetime.now(tz=UTC)) - self._attempt_retention
+        with self._session_factory() as session:
+            pruned = session.execute(
+                delete(BackgroundJobAttempt)
+                .where(BackgroundJobAttempt.finished_at < cutoff)
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+        pruned_count = _rowcount(pruned)
+        if pruned_count:
+            logger.info("background_job_attempts_pruned", extra={"pruned_count": pruned_count})
+        return pruned_count
+
+    def process_next(self) -> BackgroundJobProcessOutcome | None:
+        record = self.claim_next()
+        if record is None:
+            return None
+        return run_claimed_job(self, record)
+
+    def process_until_idle(self, max_attempts: int = 500) -> list[BackgroundJobProcessOutcome]:
+        outcomes: list[BackgroundJobProcessOutcome] = []
+        for _ in range(max_attempts):
+            outcome = self.process_next()
+            if outcome is None:
+                break
+            outcomes.append(outcome)
+        return outcomes
+
+    def claim_next(
+        self,
+        pipelines: Collection[BackgroundJobPipeline] | None = None,
+    ) -> BackgroundJobRecord | None:
+        now = datetime.now(tz=UTC)
+        claimable = self._claimable_condition(now)
+        if pipelines is not None:
+            claimable = and_(claimable, BackgroundJob.pipeline.in_(sorted(pipelines)))
+
+        running = aliased(BackgroundJob)
+        not_blocked = or_(
+            BackgroundJob.serialized.is_(False),
+            ~exists().where(
+                running.athlete_id == BackgroundJob.athlete_id,
+                running.pipeline == BackgroundJob.pipeline,
+                running.serialized.is_(True),
+                running.status == "processing",
+                running.job_id != BackgroundJob.job_id,
+            ),
+        )
+
+        with self._session_factory() as session:
+            candidate_ids = session.scalars(
+                select(BackgroundJob.job_id)
+                .where(claimable, not_blocked)
+                .order_by(
+                    BackgroundJob.available_at,
+                    BackgroundJob.enqueued_at,
+                    BackgroundJob.job_id,
+                )
+                .limit(self._claim_batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+
+            for job_id in candidate_ids:
+                try:
+                    claimed = session.execute(
+                        update(BackgroundJob)
+                        .where(BackgroundJob.job_id == job_id, claimable)
+                        .values(
+                            status="processing",
+                            attempt_count=BackgroundJob.attempt_count + 1,
+                            lease_owner=self._worker_id,
+                            lease_expires_at=now + self._lease_duration,
+                        )
+                        .execution_options(synchronize_session=False)
+                    )
+                except IntegrityError:
+                    # Another worker started a job for the same athlete in the meantime.
+                    session.rollback()
+                    continue
+                if _rowcount(claimed) == 1:
+                    session.commit()
+                    job = session.get(BackgroundJob, job_id, populate_existing=True)
+                    if job is None:  # pragma: no cover - row cannot vanish under our lease
+                        return None
+                    return self._snapshot(job)
+
+            session.rollback()
+        return None
+
+    def extend_lease(self, record: BackgroundJobRecord) -> bool:
+        """Push the lease on a job this worker is running out by another lease period.
+
+        Returns False when the lease was lost, i.e. the job expired and was claimed again
+        or was already completed.
+        """
+        with self._session_factory() as session:
+            extended = session.execute(
+                update(BackgroundJob)
+                .where(self._current_lease_condition(record))
+                .values(lease_expires_at=datetime.now(tz=UTC) + self._lease_duration)
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+        if _rowcount(extended) == 1:
+            return True
+        logger.warning(
+            "background_job_lease_lost",
+            extra={
+                "job_id": record.job_id,
+                "pipeline": record.pipeline,
+                "attempt_count": record.attempt_count,
+                "worker_id": self._worker_id,
+            },
+        )
+        return False
+
+    def complete_claim(
+        self,
+        record: BackgroundJobRecord,
+        failure: BackgroundJobExecutionError | None,
+        *,
+        started_at: datetime,
+        finished_at: datetime,
+        latency_ms: float,
+    ) -> BackgroundJobProcessOutcome:
+        attempt_status = self._record_attempt(
+            record,
+            failure=failure,
+            started_at=started_at,
+            finished_at=finished_at,
+            latency_ms=latency_ms,
+        )
+        return BackgroundJobProcessOutcome(
+            job_id=record.job_id,
+            pipeline=record.pipeline,
+            status=attempt_status,
+            attempt_count=record.attempt_count,
+            latency_ms=latency_ms,
+            error_code=failure.code if failure is not None else None,
+            error_message=failure.message if failure is not None else None,
+        )
+
+    def _record_attempt(
+        self,
+        record: BackgroundJobRecord,
+        *,
+        failure: BackgroundJobExecutionError | None,
+        started_at: datetime,
+        finished_at: datetime,
+        latency_ms: float,
+    ) -> BackgroundJobAttemptStatus:
+        values: dict[str, Any] = {"lease_owner": None, "lease_expires_at": None}
+        attempt_status: BackgroundJobAttemptStatus
+        decision: BackgroundJobRetryDecision | None = None
+        self._retry_controller.record_attempt(
+            record.pipeline,
+            error_code=failure.code if failure is not None else None,
+            now=finished_at,
+        )
+        if failure is None:
+            attempt_status = "succeeded"
+            values.update(
+                status="succeeded",
+                completed_at=finished_at,
+                last_error_code=None,
+                last_error_message=None,
+                last_failed_at=None,
+            )
+        else:
+            values.update(
+                last_error_code=failure.code,
+                last_error_message=failure.message,
+                last_failed_at=finished_at,
+            )
+            if failure.retryable and record.attempt_count < record.max_attempts:
+                decision = self._retry_controller.decide_retry(
+                    record.pipeline,
+                    error_code=failure.code,
+                    attempt_count=record.attempt_count,
+                    retry_delay_seconds=record.retry_delay_seconds,
+                    now=finished_at,
+                )
+            if decision is not None and decision.retry:
+                attempt_status = "retry_scheduled"
+                values.update(
+                    status="queued",
+                    available_at=finished_at + timedelta(seconds=decision.delay_seconds),
+                )
+            else:
+                attempt_status = "dead_letter"
+                values.update(status="dead_letter", completed_at=finished_at)
+
+        queue_wait_ms = max((started_at - record.available_at).total_seconds() * 1000, 0.0)
+        with self._session_factory() as session:
+            recorded = session.execute(
+                update(BackgroundJob)
+                .where(self._current_lease_condition(record))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            if _rowcount(recorded) != 1:
+                session.rollback()
+                logger.warning(
+                    "background_job_lease_lost",
+                    extra={
+                        "job_id": record.job_id,
+                        "pipeline": record.pipeline,
+                        "attempt_count": record.attempt_count,
+                        "worker_id": self._worker_id,
+                    },
+                )
+                return attempt_status
+
+            session.execute(
+                insert(BackgroundJobAttempt).values(
+                    job_id=record.job_id,
+                    attempt_number=record.attempt_count,
+                    started_at=started_at,
+                    finished_at=finished_at,
+                    latency_ms=latency_ms,
+                    queue_wait_ms=queue_wait_ms,
+                    status=attempt_status,
+                    error_code=failure.code if failure is not None else None,
+                    error_message=failure.message if failure is not None else None,
+                )
+            )
+            _increment_rollups(
+                session,
+                {
+                    (
+                        record.pipeline,
+                        "processing",
+                        attempt_status,
+                        latency_bucket_index(latency_ms),
+                    ): (1, latency_ms, latency_ms),
+                    (record.pipeline, "queue_wait", "", latency_bucket_index(queue_wait_ms)): (
+                        1,
+                        queue_wait_ms,
+                        queue_wait_ms,
+                    ),
+                },
+            )
+            session.commit()
+
+        self._log_attempt(record, attempt_status, failure, decision)
+        if self._attempt_retention is not None and finished_at >= self._next_compact_at:
+            self._next_compact_at = finished_at + _COMPACT_INTERVAL
+            self.compact(finished_at)
+        return attempt_status
+
+    @staticmethod
+    def _log_attempt(
+        record: BackgroundJobRecord,
+        attempt_status: BackgroundJobAttemptStatus,
+        failure: BackgroundJobExecutionError | None,
+        decision: BackgroundJobRetryDecision | None,
+    ) -> None:
+        extra: dict[str, object] = {
+            "job_id": record.job_id,
+            "pipeline": record.pipeline,
+            "attempt_count": record.attempt_count,
+        }
+        if failure is not None:
+            extra["error_code"] = failure.code
+        if decision is not None:
+            extra["retry_reason"] = decision.reason
+
+        if attempt_status == "succeeded":
+            logger.info("background_job_succeeded", extra=extra)
+        elif attempt_status == "retry_scheduled":
+            extra["retry_delay_seconds"] = decision.delay_seconds if decision else 0.0
+            logger.warning("background_job_retry_scheduled", extra=extra)
+        else:
+            if decision is not None:
+                logger.warning("background_job_retry_shed", extra=extra)
+            logger.error("background_job_dead_lettered", extra=extra)
+
+    def _current_lease_condition(self, record: BackgroundJobRecord) -> ColumnElement[bool]:
+        # Every claim bumps attempt_count, so it identifies the lease as well as the owner.
+        return and_(
+            BackgroundJob.job_id == record.job_id,
+            BackgroundJob.status == "processing",
+            BackgroundJob.lease_owner == self._worker_id,
+            BackgroundJob.attempt_count == record.attempt_count,
+        )
+
+    @staticmethod
+    def _claimable_condition(now: datetime) -> ColumnElement[bool]:
+        return or_(
+            and_(BackgroundJob.status == "queued", BackgroundJob.available_at <= now),
+            and_(BackgroundJob.status == "processing", BackgroundJob.lease_expires_at < now),
+        )
+
+    def _load_attempts(self, job_id: str) -> tuple[BackgroundJobAttemptRecord, ...]:
+        with self._session_factory() as session:
+            rows = session.scalars(
+                select(BackgroundJobAttempt)
+                .where(BackgroundJobAttempt.job_id == job_id)
+                .order_by(BackgroundJobAttempt.attempt_number)
+            )
+            return tuple(
+                BackgroundJobAttemptRecord(
+                    attempt_number=row.attempt_number,
+                    started_at=_as_utc(row.started_at),
+                    finished_at=_as_utc(row.finished_at),
+                    latency_ms=row.latency_ms,
+                    status=cast(BackgroundJobAttemptStatus, row.status),
+                    error_code=row.error_code,
+                    error_message=row.error_message,
+                )
+                for row in rows
+            )
+
+    def _snapshot(self, job: BackgroundJob) -> BackgroundJobRecord:
+        # Attempt history is only queried when a caller reads it; the handler path and
+        # dead-letter listings usually never do.
+        job_id = job.job_id
+        return BackgroundJobRecord(
+            job_id=job.job_id,
+            athlete_id=job.athlete_id,
+            pipeline=cast(BackgroundJobPipeline, job.pipeline),
+            idempotency_key=job.idempotency_key,
+            correlation_id=job.correlation_id,
+            payload=freeze_job_payload(job.payload),
+            status=cast(BackgroundJobStatus, job.status),
+            attempt_count=job.attempt_count,
+            max_attempts=job.max_attempts,
+            retry_delay_seconds=job.retry_delay_seconds,
+            enqueued_at=_as_utc(job.enqueued_at),
+            available_at=_as_utc(job.available_at),
+            completed_at=_as_utc(job.completed_at) if job.completed_at is not None else None,
+            last_error_code=job.last_error_code,
+            last_error_message=job.last_error_message,
+            last_failed_at=(
+                _as_utc(job.last_failed_at) if job.last_failed_at is not None else None
+            ),
+            attempt_history=LazyAttemptHistory(lambda: self._load_attempts(job_id)),
+            coalesced_request_count=job.coalesced_request_count,
+        )
+
+
+def _increment_rollups(session: Session, increments: _RollupIncrements) -> None:
+    if not increments:
+        return
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        dialect_insert: Any = postgresql.insert
+    elif dialect_name == "sqlite":
+        dialect_insert = sqlite.insert
+    else:
+        raise ValueError(f"background job metric rollups are not supported for {dialect_name}")
+
+    rollup = BackgroundJobMetricRollup
+    # Sorted keys give concurrent writers one lock order over the shared rollup rows.
+    statement = dialect_insert(rollup).values(
+        [
+            {
+                "pipeline": pipeline,
+                "series": series,
+                "status": status,
+                "bucket_index": bucket_index,
+                "count": count,
+                "sum_ms": sum_ms,
+                "max_ms": max_ms,
+            }
+            for (pipeline, series, status, bucket_index), (count, sum_ms, max_ms) in sorted(
+                increments.items()
+            )
+        ]
+    )
+    session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[rollup.pipeline, rollup.series, rollup.status, rollup.bucket_index],
+            set_={
+                "count": rollup.count + statement.excluded.count,
+                "sum_ms": rollup.sum_ms + statement.excluded.sum_ms,
+                "max_ms": case(
+                    (statement.excluded.max_ms > rollup.max_ms, statement.excluded.max_ms),
+                    else_=rollup.max_ms,
+                ),
+            },
+        )
+    )
+
+
+def _pipeline_metrics_from_rollups(
+    rollups: Sequence[_RollupRow],
+    throughput: Mapping[str, Mapping[int, float]],
+) -> dict[str, BackgroundJobPipelineMetrics]:
+    bucket_total = len(LATENCY_BUCKET_BOUNDS_MS) + 1
+    status_counts: dict[str, Counter[str]] = {}
+    histograms: dict[tuple[str, str], tuple[list[int], list[float]]] = {}
+    for pipeline, series, status, bucket_index, count, sum_ms, max_ms in rollups:
+        if series not in ("processing", "queue_wait"):
+            continue
+        if series == "processing":
+            status_counts.setdefault(pipeline, Counter())[status] += count
+        bucket_counts, totals = histograms.setdefault(
+            (pipeline, series), ([0] * bucket_total, [0.0, 0.0])
+        )
+        bucket_counts[bucket_index] += count
+        totals[0] += sum_ms
+        totals[1] = max(totals[1], max_ms)
+
+    def snapshot(pipeline: str, series: str) -> LatencyHistogramSnapshot:
+        histogram = histograms.get((pipeline, series))
+        if histogram is None:
+            return LatencyHistogramSnapshot.empty()
+        bucket_counts, (sum_ms, max_ms) = histogram
+        return LatencyHistogramSnapshot(
+            bucket_bounds_ms=LATENCY_BUCKET_BOUNDS_MS,
+            bucket_counts=tuple(bucket_counts),
+            count=sum(bucket_counts),
+            sum_ms=sum_ms,
+            max_ms=max_ms,
+        )
+
+    pipelines: dict[str, BackgroundJobPipelineMetrics] = {}
+    for pipeline in sorted(status_counts):
+        counts = status_counts[pipeline]
+        pipelines[pipeline] = BackgroundJobPipelineMetrics(
+            pipeline=pipeline,
+            processed_attempt_count=sum(counts.values()),
+            succeeded_count=counts["succeeded"],
+            retry_count=counts["retry_scheduled"],
+            dead_letter_count=counts["dead_letter"],
+            processing_latency=snapshot(pipeline, "processing"),
+            queue_wait=snapshot(pipeline, "queue_wait"),
+            throughput_per_second=dict(
+                throughput.get(pipeline) or {window: 0.0 for window in THROUGHPUT_WINDOWS_SECONDS}
+            ),
+        )
+    return pipelines
+
+
+def _count_where(condition: ColumnElement[bool]) -> ColumnElement[int]:
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite drops tzinfo on round-trip; every stored timestamp is written in UTC.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value.astimezone(UTC)
+
+
+def _rowcount(result: Any) -> int:
+    return int(getattr(result, "rowcount", 0))
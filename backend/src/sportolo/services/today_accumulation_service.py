@@ -23,6 +23,8 @@ from sportolo.api.schemas.fatigue_today import (
     WorkoutType,
 )
 
+TODAY_ACCUMULATION_POLICY_VERSION = "v1-today-accumulation"
+
 
 class TodayAccumulationService:
     """Deterministic completed-only accumulation with sleep-first rollover boundaries."""
@@ -0,0 +1,573 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+import zlib
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, replace
+from datetime import UTC, datetime
+from typing import Literal, Protocol, cast
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from sportolo.api.schemas.wahoo_integration import WahooExecutionHistorySyncRequest
+from sportolo.models.wahoo_bulk_sync_checkpoint import WahooBulkSyncCheckpoint
+from sportolo.services.background_job_queue_service import (
+    BackgroundJobEnqueueRequest,
+    BackgroundJobExecutionError,
+    BackgroundJobPipeline,
+    BackgroundJobQueue,
+    BackgroundJobRecord,
+)
+from sportolo.services.wahoo_integration_service import WahooIntegrationService
+from sportolo.services.wahoo_provider_client import (
+    HttpWahooProviderClient,
+    WahooProviderClient,
+    WahooProviderError,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WAHOO_BULK_SYNC_SHARD_COUNT = 8
+# Shard jobs run on their own pipeline; the payload names their run and shard.
+WAHOO_BULK_SYNC_PIPELINE: BackgroundJobPipeline = "wahoo_bulk_sync"
+BULK_SYNC_RUN_ID_PAYLOAD_KEY = "bulkSyncRunId"
+
+WahooBulkSyncAthleteStatus = Literal["pending", "completed", "failed", "skipped"]
+WahooProviderClientFactory = Callable[[], WahooProviderClient]
+
+
+@dataclass(frozen=True)
+class WahooBulkSyncCheckpointRecord:
+    """Where one athlete stands in a bulk sync run.
+
+    `pending` athletes are synced by the next attempt of their shard job, including
+    after a retryable provider failure; the other statuses are final for the run.
+    """
+
+    run_id: str
+    athlete_id: str
+    shard_index: int
+    status: WahooBulkSyncAthleteStatus
+    attempt_count: int
+    imported_count: int
+    planned_at: datetime
+    finished_at: datetime | None = None
+    last_error: str | None = None
+
+
+@dataclass(frozen=True)
+class WahooBulkSyncRun:
+    run_id: str
+    athlete_count: int
+    shard_job_ids: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class WahooBulkSyncRunMetrics:
+    """Progress, throughput and lag of one bulk sync run.
+
+    `max_completion_lag_seconds` is the longest wait from planning an athlete to
+    checkpointing them, and `oldest_pending_lag_seconds` how long the oldest
+    unfinished athlete has waited so far. A lag that keeps growing between runs means
+    the fleet has too few workers for the connected athletes.
+    """
+
+    run_id: str
+    shard_count: int
+    athlete_count: int
+    pending_count: int
+    completed_count: int
+    failed_count: int
+    skipped_count: int
+    imported_activity_count: int
+    started_at: datetime
+    finished_at: datetime | None
+    elapsed_seconds: float
+    athletes_per_second: float
+    activities_per_second: float
+    max_completion_lag_seconds: float
+    oldest_pending_lag_seconds: float
+
+    @property
+    def done(self) -> bool:
+        return self.pending_count == 0
+
+
+class WahooAccessTokenSource(Protocol):
+    def connected_athlete_ids(self) -> list[str]: ...
+
+    def access_token_for(self, athlete_id: str) -> str | None: ...
+
+
+class InMemoryWahooAccessTokenSource:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tokens: dict[str, str] = {}
+
+    def connect(self, athlete_id: str, access_token: str) -> None:
+        with self._lock:
+            self._tokens[athlete_id] = access_token
+
+    def disconnect(self, athlete_id: str) -> None:
+        with self._lock:
+            self._tokens.pop(athlete_id, None)
+
+    def connected_athlete_ids(self) -> list[str]:
+        with self._lock:
+            return sorted(self._tokens)
+
+    def access_token_for(self, athlete_id: str) -> str | None:
+        with self._lock:
+            return self._tokens.get(athlete_id)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tokens = {}
+
+
+class WahooBulkSyncCheckpointStore(Protocol):
+    def create(self, checkpoints: Sequence[WahooBulkSyncCheckpointRecord]) -> None:
+        """Stores new checkpoints, keeping any that already exist for the run and athlete."""
+        ...
+
+    def list_run(
+        self,
+        run_id: str,
+        *,
+        shard_index: int | None = None,
+    ) -> list[WahooBulkSyncCheckpointRecord]: ...
+
+    def save(self, checkpoint: WahooBulkSyncCheckpointRecord) -> None: ...
+
+    def reset(self) -> None: ...
+
+
+class InMemoryWahooBulkSyncCheckpointStore:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._runs: dict[str, dict[str, WahooBulkSyncCheckpointRecord]] = {}
+
+    def create(self, checkpoints: Sequence[WahooBulkSyncCheckpointRecord]) -> None:
+        with self._lock:
+            for checkpoint in checkpoints:
+                self._runs.setdefault(checkpoint.run_id, {}).setdefault(
+                    checkpoint.athlete_id, checkpoint
+                )
+
+    def list_run(
+        self,
+        run_id: str,
+        *,
+        shard_index: int | None = None,
+    ) -> list[WahooBulkSyncCheckpointRecord]:
+        with self._lock:
+            checkpoints = list(self._runs.get(run_id, {}).values())
+        return sorted(
+            (
+                checkpoint
+                for checkpoint in checkpoints
+                if shard_index is None or checkpoint.shard_index == shard_index
+            ),
+            key=lambda checkpoint: checkpoint.athlete_id,
+        )
+
+    def save(self, checkpoint: WahooBulkSyncCheckpointRecord) -> None:
+        with self._lock:
+            self._runs.setdefault(checkpoint.run_id, {})[checkpoint.athlete_id] = checkpoint
+
+    def reset(self) -> None:
+        with self._lock:
+            self._runs = {}
+
+
+class SqlWahooBulkSyncCheckpointStore:
+    """Checkpoint store backed by the `wahoo_bulk_sync_checkpoints` table.
+
+    Checkpoints outlive the worker process, so a shard job reclaimed after a crash
+    resumes from the athletes its previous attempt had not finished.
+    """
+
+    def __init__(self, *, session_factory: sessionmaker[Session]) -> None:
+        self._session_factory = session_factory
+
+    def create(self, checkpoints: Sequence[WahooBulkSyncCheckpointRecord]) -> None:
+        if not checkpoints:
+            return
+        run_ids = {checkpoint.run_id for checkpoint in checkpoints}
+        with self._session_factory() as session:
+            existing = {
+                (run_id, athlete_id)
+                for run_id, athlete_id in session.execute(
+                    select(
+                        WahooBulkSyncCheckpoint.run_id, WahooBulkSyncCheckpoint.athlete_id
+                    ).where(WahooBulkSyncCheckpoint.run_id.in_(run_ids))
+                )
+            }
+            session.add_all(
+                _to_row(checkpoint)
+                for checkpoint in checkpoints
+                if (checkpoint.run_id, checkpoint.athlete_id) not in existing
+            )
+            session.commit()
+
+    def list_run(
+        self,
+        run_id: str,
+        *,
+        shard_index: int | None = None,
+    ) -> list[WahooBulkSyncCheckpointRecord]:
+        statement = select(WahooBulkSyncCheckpoint).where(WahooBulkSyncCheckpoint.run_id == run_id)
+        if shard_index is not None:
+            statement = statement.where(WahooBulkSyncCheckpoint.shard_index == shard_index)
+        with self._session_factory() as session:
+            rows = session.scalars(statement.order_by(WahooBulkSyncCheckpoint.athlete_id)).all()
+            return [_to_record(row) for row in rows]
+
+    def save(self, checkpoint: WahooBulkSyncCheckpointRecord) -> None:
+        with self._session_factory() as session:
+            session.merge(_to_row(checkpoint))
+            session.commit()
+
+    def reset(self) -> None:
+        with self._session_factory() as session:
+            session.execute(delete(WahooBulkSyncCheckpoint))
+            session.commit()
+
+
+class WahooBulkSyncOrchestrator:
+    """Syncs many athletes' Wahoo histories as sharded `wahoo_bulk_sync` jobs.
+
+    `start_run` assigns every athlete to a shard by a stable hash of the athlete id,
+    records a pending checkpoint per athlete and enqueues one job per non-empty shard
+    in a single batch. A shard job fetches its athletes' histories concurrently
+    through one pooled provider client, runs an incremental sync for each, and
+    checkpoints every athlete as it finishes. The syncs enqueue their pipeline
+    dispatches in one batch per athlete.
+
+    A shard job that crashes, or leaves athletes pending after retryable provider
+    failures, is retried by the queue and skips the athletes already checkpointed.
+    Each athlete's sync reuses one idempotency key per run, so an athlete synced just
+    before a crash replays its stored result instead of importing again.
+    """
+
+    def __init__(
+        self,
+        *,
+        queue: BackgroundJobQueue,
+        integration_service: WahooIntegrationService,
+        checkpoint_store: WahooBulkSyncCheckpointStore,
+        access_token_source: WahooAccessTokenSource,
+        provider_client_factory: WahooProviderClientFactory = HttpWahooProviderClient,
+        shard_count: int = DEFAULT_WAHOO_BULK_SYNC_SHARD_COUNT,
+        shard_max_attempts: int = 5,
+    ) -> None:
+        _validate_shard_count(shard_count)
+        if shard_max_attempts < 1:
+            raise ValueError("shard_max_attempts must be at least 1")
+        self._queue = queue
+        self._integration_service = integration_service
+        self._checkpoint_store = checkpoint_store
+        self._access_token_source = access_token_source
+        self._provider_client_factory = provider_client_factory
+        self._shard_count = shard_count
+        self._shard_max_attempts = shard_max_attempts
+
+    def reset_for_testing(self) -> None:
+        self._checkpoint_store.reset()
+
+    def start_run(
+        self,
+        athlete_ids: Sequence[str] | None = None,
+        *,
+        run_id: str | None = None,
+        shard_count: int | None = None,
+    ) -> WahooBulkSyncRun:
+        """Plans a run over `athlete_ids`, or every connected athlete, and enqueues its shards.
+
+        Starting a run again with the same `run_id` keeps the existing checkpoints and
+        does not enqueue duplicate shard jobs.
+        """
+        shard_count = shard_count if shard_count is not None else self._shard_count
+        _validate_shard_count(shard_count)
+        if athlete_ids is None:
+            athlete_ids = self._access_token_source.connected_athlete_ids()
+        run_id = run_id or f"wahoo-bulk-sync-{uuid.uuid4().hex[:16]}"
+        planned_at = datetime.now(tz=UTC)
+
+        checkpoints = [
+            WahooBulkSyncCheckpointRecord(
+                run_id=run_id,
+                athlete_id=athlete_id,
+                shard_index=shard_for_athlete(athlete_id, shard_count),
+                status="pending",
+                attempt_count=0,
+                imported_count=0,
+                planned_at=planned_at,
+            )
+            for athlete_id in dict.fromkeys(athlete_ids)
+        ]
+        self._checkpoint_store.create(checkpoints)
+
+        shard_indexes = sorted({checkpoint.shard_index for checkpoint in checkpoints})
+        records = self._queue.enqueue_many(
+            [
+                BackgroundJobEnqueueRequest(
+                    # Shard jobs belong to the run; the athletes are in its checkpoints.
+                    athlete_id=run_id,
+                    pipeline=WAHOO_BULK_SYNC_PIPELINE,
+                    idempotency_key=f"wahoo-bulk-sync:{run_id}:{shard_index}",
+                    correlation_id=run_id,
+                    payload={
+                        BULK_SYNC_RUN_ID_PAYLOAD_KEY: run_id,
+                        "shardIndex": shard_index,
+                        "shardCount": shard_count,
+                    },
+                    max_attempts=self._shard_max_attempts,
+                )
+                for shard_index in shard_indexes
+            ]
+        )
+        logger.info(
+            "wahoo_bulk_sync_run_started",
+            extra={
+                "run_id": run_id,
+                "athlete_count": len(checkpoints),
+                "shard_job_count": len(records),
+            },
+        )
+        return WahooBulkSyncRun(
+            run_id=run_id,
+            athlete_count=len(checkpoints),
+            shard_job_ids=tuple(record.job_id for record in records),
+        )
+
+    def handle_shard_job(self, record: BackgroundJobRecord) -> None:
+        run_id = record.payload.get(BULK_SYNC_RUN_ID_PAYLOAD_KEY)
+        shard_index = record.payload.get("shardIndex")
+        if not isinstance(run_id, str) or not isinstance(shard_index, int):
+            raise BackgroundJobExecutionError(
+                code="WAHOO_BULK_SYNC_INVALID_PAYLOAD",
+                message="bulk sync jobs need a string bulkSyncRunId and an integer shardIndex",
+                retryable=False,
+            )
+        self.run_shard(run_id, shard_index)
+
+    def run_shard(self, run_id: str, shard_index: int) -> list[WahooBulkSyncCheckpointRecord]:
+        """Syncs the shard's pending athletes and returns their updated checkpoints.
+
+        Raises a retryable `BackgroundJobExecutionError` while any athlete is still
+        pending, so the queue retries the shard for just those athletes.
+        """
+        pending = [
+            checkpoint
+            for checkpoint in self._checkpoint_store.list_run(run_id, shard_index=shard_index)
+            if checkpoint.status == "pending"
+        ]
+        if not pending:
+            return []
+
+        started = time.perf_counter()
+        finished = asyncio.run(self._sync_shard(pending))
+        still_pending = sum(1 for checkpoint in finished if checkpoint.status == "pending")
+        logger.info(
+            "wahoo_bulk_sync_shard_finished",
+            extra={
+                "run_id": run_id,
+                "shard_index": shard_index,
+                "athlete_count": len(finished),
+                "pending_count": still_pending,
+                "imported_count": sum(checkpoint.imported_count for checkpoint in finished),
+                "elapsed_seconds": time.perf_counter() - started,
+            },
+        )
+        if still_pending:
+            raise BackgroundJobExecutionError(
+                code="WAHOO_BULK_SYNC_INCOMPLETE",
+                message=(
+                    f"{still_pending} athletes in shard {shard_index} of {run_id} are still pending"
+                ),
+                retryable=True,
+            )
+        return finished
+
+    def run_metrics(self, run_id: str, *, now: datetime | None = None) -> WahooBulkSyncRunMetrics:
+        checkpoints = self._checkpoint_store.list_run(run_id)
+        if not checkpoints:
+            raise ValueError(f"unknown Wahoo bulk sync run: {run_id}")
+        return summarize_run(run_id, checkpoints, now=now or datetime.now(tz=UTC))
+
+    async def _sync_shard(
+        self,
+        checkpoints: Sequence[WahooBulkSyncCheckpointRecord],
+    ) -> list[WahooBulkSyncCheckpointRecord]:
+        # One client per shard attempt: its connection pool belongs to this event loop.
+        provider_client = self._provider_client_factory()
+        try:
+            return list(
+                await asyncio.gather(
+                    *(self._sync_athlete(provider_client, checkpoint) for checkpoint in checkpoints)
+                )
+            )
+        finally:
+            await provider_client.aclose()
+
+    async def _sync_athlete(
+        self,
+        provider_client: WahooProviderClient,
+        checkpoint: WahooBulkSyncCheckpointRecord,
+    ) -> WahooBulkSyncCheckpointRecord:
+        athlete_id = checkpoint.athlete_id
+        attempted = replace(checkpoint, attempt_count=checkpoint.attempt_count + 1)
+        access_token = self._access_token_source.access_token_for(athlete_id)
+        if access_token is None:
+            return self._checkpoint(
+                attempted, status="skipped", last_error="athlete has no Wahoo access token"
+            )
+
+        try:
+            activities = await provider_client.fetch_history(
+                athlete_id,
+                access_token,
+                started_after=self._integration_service.provider_history_cursor(athlete_id),
+            )
+        except WahooProviderError as exc:
+            return self._checkpoint(
+                attempted,
+                status="pending" if exc.retryable else "failed",
+                last_error=str(exc),
+            )
+
+        self._integration_service.ingest_provider_activities(athlete_id, activities)
+        summary = self._integration_service.sync_execution_history_summary(
+            athlete_id,
+            WahooExecutionHistorySyncRequest(
+                idempotency_key=f"bulk-sync:{checkpoint.run_id}",
+                mode="incremental",
+            ),
+        )
+        return self._checkpoint(
+            attempted,
+            status="completed",
+            imported_count=summary.imported_count,
+        )
+
+    def _checkpoint(
+        self,
+        checkpoint: WahooBulkSyncCheckpointRecord,
+        *,
+        status: WahooBulkSyncAthleteStatus,
+        imported_count: int = 0,
+        last_error: str | None = None,
+    ) -> WahooBulkSyncCheckpointRecord:
+        updated = replace(
+            checkpoint,
+            status=status,
+            imported_count=imported_count,
+            finished_at=None if status == "pending" else datetime.now(tz=UTC),
+            last_error=last_error,
+        )
+        self._checkpoint_store.save(updated)
+        return updated
+
+
+def shard_for_athlete(athlete_id: str, shard_count: int) -> int:
+    """Stable shard of an athlete; unlike `hash()`, the same in every process."""
+    return zlib.crc32(athlete_id.encode("utf-8")) % shard_count
+
+
+def summarize_run(
+    run_id: str,
+    checkpoints: Sequence[WahooBulkSyncCheckpointRecord],
+    *,
+    now: datetime,
+) -> WahooBulkSyncRunMetrics:
+    status_counts = {"pending": 0, "completed": 0, "failed": 0, "skipped": 0}
+    for checkpoint in checkpoints:
+        status_counts[checkpoint.status] += 1
+    started_at = min(checkpoint.planned_at for checkpoint in checkpoints)
+    finished_times = [
+        checkpoint.finished_at for checkpoint in checkpoints if checkpoint.finished_at is not None
+    ]
+    finished_at = max(finished_times) if status_counts["pending"] == 0 and finished_times else None
+    elapsed_seconds = max(0.0, ((finished_at or now) - started_at).total_seconds())
+    imported_activity_count = sum(checkpoint.imported_count for checkpoint in checkpoints)
+    finished_count = len(checkpoints) - status_counts["pending"]
+
+    return WahooBulkSyncRunMetrics(
+        run_id=run_id,
+        shard_count=len({checkpoint.shard_index for checkpoint in checkpoints}),
+        athlete_count=len(checkpoints),
+        pending_count=status_counts["pending"],
+        completed_count=status_counts["completed"],
+        failed_count=status_counts["failed"],
+        skipped_count=status_counts["skipped"],
+        imported_activity_count=imported_activity_count,
+        started_at=started_at,
+        finished_at=finished_at,
+        elapsed_seconds=elapsed_seconds,
+        athletes_per_second=finished_count / elapsed_seconds if elapsed_seconds > 0 else 0.0,
+        activities_per_second=(
+            imported_activity_count / elapsed_seconds if elapsed_seconds > 0 else 0.0
+        ),
+        max_completion_lag_seconds=max(
+            (
+                (checkpoint.finished_at - checkpoint.planned_at).total_seconds()
+                for checkpoint in checkpoints
+                if checkpoint.finished_at is not None
+            ),
+            default=0.0,
+        ),
+        oldest_pending_lag_seconds=max(
+            (
+                (now - checkpoint.planned_at).total_seconds()
+                for checkpoint in checkpoints
+                if checkpoint.status == "pending"
+            ),
+            default=0.0,
+        ),
+    )
+
+
+def _validate_shard_count(shard_count: int) -> None:
+    if shard_count < 1:
+        raise ValueError("shard_count must be at least 1")
+
+
+def _to_row(checkpoint: WahooBulkSyncCheckpointRecord) -> WahooBulkSyncCheckpoint:
+    return WahooBulkSyncCheckpoint(
+        run_id=checkpoint.run_id,
+        athlete_id=checkpoint.athlete_id,
+        shard_index=checkpoint.shard_index,
+        status=checkpoint.status,
+        attempt_count=checkpoint.attempt_count,
+        imported_count=checkpoint.imported_count,
+        planned_at=checkpoint.planned_at,
+        finished_at=checkpoint.finished_at,
+        last_error=checkpoint.last_error,
+    )
+
+
+def _to_record(row: WahooBulkSyncCheckpoint) -> WahooBulkSyncCheckpointRecord:
+    return WahooBulkSyncCheckpointRecord(
+        run_id=row.run_id,
+        athlete_id=row.athlete_id,
+        shard_index=row.shard_index,
+        status=cast(WahooBulkSyncAthleteStatus, row.status),
+        attempt_count=row.attempt_count,
+        imported_count=row.imported_count,
+        planned_at=_as_utc(row.planned_at),
+        finished_at=_as_utc(row.finished_at) if row.finished_at is not None else None,
+        last_error=row.last_error,
+    )
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite drops tzinfo on round-trip; every stored timestamp is written in UTC.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value.astimezone(UTC)
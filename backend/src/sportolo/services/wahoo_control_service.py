@@ -1,7 +1,13 @@
 from __future__ import annotations
 
-import hashlib
-import json
+import asyncio
+import itertools
+import logging
+import math
+import random
+import threading
+from collections import deque
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from typing import Protocol
@@ -18,6 +24,27 @@ from sportolo.api.schemas.wahoo_integration import (
     WahooTrainerControlRequest,
     WahooTrainerControlResponse,
 )
+from sportolo.services.fingerprint_service import fingerprint_model
+from sportolo.services.idempotency_store_service import (
+    IdempotencyStore,
+    InMemoryIdempotencyStore,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONTROL_MAILBOX_CAPACITY = 8
+DEFAULT_CONTROL_MAILBOX_WAIT_SECONDS = 1.0
+DEFAULT_COMMAND_DEADLINE_SECONDS = 2.0
+DEFAULT_RECONNECT_ATTEMPTS = 3
+DEFAULT_RECONNECT_BASE_DELAY_SECONDS = 0.1
+
+
+class WahooControlMailboxFullError(Exception):
+    """A trainer's mailbox stayed full for the whole admission wait."""
+
+    def __init__(self, message: str, *, retry_after_seconds: int) -> None:
+        super().__init__(message)
+        self.retry_after_seconds = retry_after_seconds
 
 
 @dataclass(frozen=True)
@@ -28,9 +55,9 @@ class TrainerCommandAck:
 
 
 class WahooTrainerProtocolAdapter(Protocol):
-    def reconnect(self, athlete_id: str, trainer_id: str) -> TrainerCommandAck: ...
+    async def reconnect(self, athlete_id: str, trainer_id: str) -> TrainerCommandAck: ...
 
-    def apply_mode(
+    async def apply_mode(
         self,
         athlete_id: str,
         trainer_id: str,
@@ -39,12 +66,42 @@ class WahooTrainerProtocolAdapter(Protocol):
         target_unit: str,
     ) -> TrainerCommandAck: ...
 
-    def apply_safety_fallback(self, athlete_id: str, trainer_id: str) -> TrainerCommandAck: ...
+    async def apply_safety_fallback(
+        self, athlete_id: str, trainer_id: str
+    ) -> TrainerCommandAck: ...
+
 
+class SimulatedWahooTrainerProtocolAdapter:
+    """Trainer adapter for local runs and load tests, with no hardware behind it.
 
-class DefaultWahooTrainerProtocolAdapter:
-    def reconnect(self, athlete_id: str, trainer_id: str) -> TrainerCommandAck:
+    Every call takes `latency_seconds` plus up to `latency_jitter_seconds`, and a
+    `loss_rate` fraction of calls never answer, so only the caller's deadline ends
+    them. Trainer ids containing `offline`, `reconnect-fail`, `disconnect-on-command`,
+    `fail-command` or `fallback-fail` script the matching failures.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency_seconds: float = 0.0,
+        latency_jitter_seconds: float = 0.0,
+        loss_rate: float = 0.0,
+        seed: int | None = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        if latency_seconds < 0 or latency_jitter_seconds < 0:
+            raise ValueError("simulated trainer latency must be zero or greater")
+        if not 0 <= loss_rate <= 1:
+            raise ValueError("loss_rate must be between 0 and 1")
+        self._latency_seconds = latency_seconds
+        self._latency_jitter_seconds = latency_jitter_seconds
+        self._loss_rate = loss_rate
+        self._random = random.Random(seed)
+        self._sleep = sleep
+
+    async def reconnect(self, athlete_id: str, trainer_id: str) -> TrainerCommandAck:
         del athlete_id
+        await self._transmit()
         normalized = trainer_id.strip().lower()
         if "offline" in normalized or "reconnect-fail" in normalized:
             return TrainerCommandAck(
@@ -54,7 +111,7 @@ class DefaultWahooTrainerProtocolAdapter:
             )
         return TrainerCommandAck(acknowledged=True, connection_state="connected")
 
-    def apply_mode(
+    async def apply_mode(
         self,
         athlete_id: str,
         trainer_id: str,
@@ -63,6 +120,7 @@ class DefaultWahooTrainerProtocolAdapter:
         target_unit: str,
     ) -> TrainerCommandAck:
         del athlete_id, mode, target_value, target_unit
+        await self._transmit()
         normalized = trainer_id.strip().lower()
         if "disconnect-on-command" in normalized:
             return TrainerCommandAck(
@@ -78,8 +136,9 @@ class DefaultWahooTrainerProtocolAdapter:
             )
         return TrainerCommandAck(acknowledged=True, connection_state="connected")
 
-    def apply_safety_fallback(self, athlete_id: str, trainer_id: str) -> TrainerCommandAck:
+    async def apply_safety_fallback(self, athlete_id: str, trainer_id: str) -> TrainerCommandAck:
         del athlete_id
+        await self._transmit()
         normalized = trainer_id.strip().lower()
         if "fallback-fail" in normalized:
             return TrainerCommandAck(
@@ -91,11 +150,15 @@ class DefaultWahooTrainerProtocolAdapter:
             )
         return TrainerCommandAck(acknowledged=True, connection_state="connected")
 
-
-@dataclass(frozen=True)
-class _ControlReplay:
-    fingerprint: str
-    response: WahooTrainerControlResponse
+    async def _transmit(self) -> None:
+        if self._loss_rate and self._random.random() < self._loss_rate:
+            # A lost command is never acknowledged; the caller's deadline gives up on it.
+            await asyncio.Event().wait()
+        delay = self._latency_seconds
+        if self._latency_jitter_seconds:
+            delay += self._random.uniform(0, self._latency_jitter_seconds)
+        if delay > 0:
+            await self._sleep(delay)
 
 
 @dataclass
@@ -106,24 +169,108 @@ class _TrainerState:
     active_target_unit: str | None = None
 
 
+@dataclass(frozen=True)
+class WahooControlMailboxMetrics:
+    active_mailbox_count: int
+    queued_command_count: int
+    superseded_count: int
+    rejected_count: int
+
+
+@dataclass(eq=False)
+class _ControlCommand:
+    athlete_id: str
+    request: WahooTrainerControlRequest
+    request_fingerprint: str
+    result: asyncio.Future[bytes]
+
+
+class _TrainerActor:
+    """Mailbox for one (athlete, trainer) pair, drained by at most one worker task.
+
+    The worker exits once the mailbox is empty, so idle trainers hold no task. Every
+    actor lives on the service's control loop. Submissions pass through the FIFO
+    `admission` lock, so the replay lookup they await cannot reorder commands.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.mailbox: deque[_ControlCommand] = deque()
+        self.space_waiters: deque[asyncio.Future[None]] = deque()
+        self.worker: asyncio.Task[None] | None = None
+        self.running: _ControlCommand | None = None
+        self.admission = asyncio.Lock()
+        self.admitting = 0
+
+    def find_command(self, idempotency_key: str) -> _ControlCommand | None:
+        """The running or queued command with this idempotency key, if any."""
+        if self.running is not None and self.running.request.idempotency_key == idempotency_key:
+            return self.running
+        for command in self.mailbox:
+            if command.request.idempotency_key == idempotency_key:
+                return command
+        return None
+
+    def wake_space_waiter(self) -> None:
+        while self.space_waiters:
+            waiter = self.space_waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+
 class WahooControlService:
     _WAHOO_TRAINER_PREFIXES = ("wahoo", "kickr", "elemnt", "bolt", "roam")
     _SAFE_FALLBACK_MODE: WahooControlMode = "resistance"
     _SAFE_FALLBACK_VALUE = 0.0
     _SAFE_FALLBACK_UNIT = "ratio"
+    _CONTROL_REPLAY_SCOPE = "wahoo_control"
 
-    def __init__(self, adapter: WahooTrainerProtocolAdapter | None = None) -> None:
-        self._adapter = adapter or DefaultWahooTrainerProtocolAdapter()
+    def __init__(
+        self,
+        adapter: WahooTrainerProtocolAdapter | None = None,
+        *,
+        idempotency_store: IdempotencyStore | None = None,
+        mailbox_capacity: int = DEFAULT_CONTROL_MAILBOX_CAPACITY,
+        mailbox_wait_seconds: float = DEFAULT_CONTROL_MAILBOX_WAIT_SECONDS,
+        command_deadline_seconds: float = DEFAULT_COMMAND_DEADLINE_SECONDS,
+        reconnect_attempts: int = DEFAULT_RECONNECT_ATTEMPTS,
+        reconnect_base_delay_seconds: float = DEFAULT_RECONNECT_BASE_DELAY_SECONDS,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        if mailbox_capacity < 1:
+            raise ValueError("mailbox_capacity must be at least 1")
+        if command_deadline_seconds <= 0:
+            raise ValueError("command_deadline_seconds must be greater than zero")
+        if reconnect_attempts < 1:
+            raise ValueError("reconnect_attempts must be at least 1")
+        self._adapter = adapter or SimulatedWahooTrainerProtocolAdapter()
+        # An empty in-memory store is falsy (it has `__len__`), so test against None.
+        self._idempotency_store = (
+            idempotency_store if idempotency_store is not None else InMemoryIdempotencyStore()
+        )
+        self._mailbox_capacity = mailbox_capacity
+        self._mailbox_wait_seconds = mailbox_wait_seconds
+        self._command_deadline_seconds = command_deadline_seconds
+        self._reconnect_attempts = reconnect_attempts
+        self._reconnect_base_delay_seconds = reconnect_base_delay_seconds
+        self._sleep = sleep
+        self._actors_lock = threading.Lock()
+        # The one running loop all trainer actors live on; see `_control_loop`.
+        self._loop: asyncio.AbstractEventLoop | None = None
         self._reset_state()
 
     def _reset_state(self) -> None:
-        self._control_replays: dict[tuple[str, str], _ControlReplay] = {}
         self._trainer_state_by_key: dict[tuple[str, str], _TrainerState] = {}
-        self._command_counter = 0
-        self._event_counter = 0
+        self._actors: dict[tuple[str, str], _TrainerActor] = {}
+        self._command_ids = itertools.count(1)
+        self._event_ids = itertools.count(1)
+        self._superseded_count = 0
+        self._rejected_count = 0
 
     def reset_for_testing(self) -> None:
         self._reset_state()
+        self._idempotency_store.reset()
 
     def set_connection_state_for_testing(
         self,
@@ -140,15 +287,218 @@ class WahooControlService:
         athlete_id: str,
         request: WahooTrainerControlRequest,
     ) -> WahooTrainerControlResponse:
-        replay_key = (athlete_id, request.idempotency_key)
+        return WahooTrainerControlResponse.model_validate_json(
+            self.send_control_command_response_body(athlete_id, request)
+        )
+
+    def send_control_command_response_body(
+        self,
+        athlete_id: str,
+        request: WahooTrainerControlRequest,
+    ) -> bytes:
+        """Blocking form of `submit_control_command_response_body` for callers without a loop.
+
+        The command runs on the control loop, so it shares each trainer's mailbox with
+        async callers.
+        """
+        control_loop = self._control_loop()
+        if _running_loop() is control_loop:
+            raise RuntimeError("await submit_control_command_response_body on the control loop")
+        return asyncio.run_coroutine_threadsafe(
+            self._submit(athlete_id, request), control_loop
+        ).result()
+
+    async def submit_control_command_response_body(
+        self,
+        athlete_id: str,
+        request: WahooTrainerControlRequest,
+    ) -> bytes:
+        """Queues a control command on its trainer's mailbox and returns the serialized response.
+
+        Commands for one (athlete, trainer) pair run one at a time, in arrival order;
+        different trainers run in parallel. A queued command that has not started is
+        superseded by a newer command in the same mode, so during fast interval changes
+        only the latest target reaches the trainer. When the mailbox is full the caller
+        waits up to `mailbox_wait_seconds` for space, then the command is rejected.
+
+        Every adapter call must answer within `command_deadline_seconds`. A miss counts
+        as an unacknowledged command, so a stalled apply falls back to the safe mode.
+        Reconnects retry up to `reconnect_attempts` times with exponential backoff.
+
+        Retries with the same idempotency key get the stored bytes back unchanged.
+        Idempotency store calls run in worker threads so a SQL store never blocks the loop.
+        Callers on a loop other than the control loop hand the command over to it.
+        """
+        loop = asyncio.get_running_loop()
+        control_loop = self._control_loop(loop)
+        if control_loop is loop:
+            return await self._submit(athlete_id, request)
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(self._submit(athlete_id, request), control_loop)
+        )
+
+    async def _submit(self, athlete_id: str, request: WahooTrainerControlRequest) -> bytes:
         request_fingerprint = self._fingerprint_request(request)
-        replay = self._control_replays.get(replay_key)
+        key = (athlete_id, request.trainer_id)
+        actor = self._actor_for(key)
+        actor.admitting += 1
+        try:
+            async with actor.admission:
+                replay = await self._load_replay(
+                    athlete_id, request.idempotency_key, request_fingerprint
+                )
+                if replay is not None:
+                    return replay
+                # A retry of a command that is still queued or running waits for that
+                # command's result instead of queueing again (and superseding it).
+                existing = actor.find_command(request.idempotency_key)
+                if existing is not None:
+                    self._assert_matching_fingerprint(
+                        stored_fingerprint=existing.request_fingerprint,
+                        current_fingerprint=request_fingerprint,
+                    )
+                    command = existing
+                else:
+                    command = _ControlCommand(
+                        athlete_id=athlete_id,
+                        request=request,
+                        request_fingerprint=request_fingerprint,
+                        result=actor.loop.create_future(),
+                    )
+                    await self._admit(actor, command)
+                    if actor.worker is None:
+                        actor.worker = actor.loop.create_task(self._drain_mailbox(key, actor))
+        finally:
+            actor.admitting -= 1
+            self._release_idle_actor(key, actor)
+        # A cancelled request still lets its command finish and store its replay.
+        return await asyncio.shield(command.result)
+
+    def metrics_snapshot(self) -> WahooControlMailboxMetrics:
+        with self._actors_lock:
+            actors = list(self._actors.values())
+        return WahooControlMailboxMetrics(
+            active_mailbox_count=len(actors),
+            queued_command_count=sum(len(actor.mailbox) for actor in actors),
+            superseded_count=self._superseded_count,
+            rejected_count=self._rejected_count,
+        )
+
+    def _control_loop(
+        self, caller_loop: asyncio.AbstractEventLoop | None = None
+    ) -> asyncio.AbstractEventLoop:
+        """The running loop that owns every trainer actor.
+
+        The caller's loop takes over when no control loop is running, so API requests
+        run on the server's loop. A blocking caller with no running control loop starts
+        the service's own loop on a daemon thread instead.
+        """
+        with self._actors_lock:
+            if self._loop is None or not self._loop.is_running():
+                self._loop = caller_loop if caller_loop is not None else _start_control_loop()
+                # Actors of a stopped loop can never run again.
+                self._actors.clear()
+            return self._loop
+
+    def _actor_for(self, key: tuple[str, str]) -> _TrainerActor:
+        with self._actors_lock:
+            actor = self._actors.get(key)
+            if actor is None:
+                actor = _TrainerActor(asyncio.get_running_loop())
+                self._actors[key] = actor
+            return actor
+
+    async def _admit(self, actor: _TrainerActor, command: _ControlCommand) -> None:
+        request = command.request
+        await self._supersede_pending(actor, command)
+        while len(actor.mailbox) >= self._mailbox_capacity:
+            waiter = actor.loop.create_future()
+            actor.space_waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, timeout=self._mailbox_wait_seconds)
+            except TimeoutError:
+                self._rejected_count += 1
+                logger.info(
+                    "wahoo_control_mailbox_full",
+                    extra={"athlete_id": command.athlete_id, "trainer_id": request.trainer_id},
+                )
+                # A slot frees up at the latest when the running command hits its deadline.
+                raise WahooControlMailboxFullError(
+                    "trainer control mailbox is full; retry the command",
+                    retry_after_seconds=math.ceil(self._command_deadline_seconds),
+                ) from None
+            await self._supersede_pending(actor, command)
+        actor.mailbox.append(command)
+
+    def _release_idle_actor(self, key: tuple[str, str], actor: _TrainerActor) -> None:
+        with self._actors_lock:
+            idle = not actor.mailbox and actor.worker is None and not actor.admitting
+            if idle and self._actors.get(key) is actor:
+                del self._actors[key]
+
+    async def _supersede_pending(self, actor: _TrainerActor, command: _ControlCommand) -> None:
+        # Commands leave the mailbox before the first await, so the worker never runs them.
+        superseded = [
+            pending for pending in actor.mailbox if pending.request.mode == command.request.mode
+        ]
+        for pending in superseded:
+            actor.mailbox.remove(pending)
+            actor.wake_space_waiter()
+            self._superseded_count += 1
+        for pending in superseded:
+            try:
+                body = await self._store_superseded(pending, command.request.idempotency_key)
+            except ValueError as exc:
+                pending.result.set_exception(exc)
+            else:
+                pending.result.set_result(body)
+
+    async def _drain_mailbox(self, key: tuple[str, str], actor: _TrainerActor) -> None:
+        try:
+            while actor.mailbox:
+                command = actor.mailbox.popleft()
+                actor.running = command
+                actor.wake_space_waiter()
+                try:
+                    body = await self._execute_command(command)
+                except Exception as exc:
+                    command.result.set_exception(exc)
+                else:
+                    command.result.set_result(body)
+                finally:
+                    actor.running = None
+        finally:
+            actor.worker = None
+            self._release_idle_actor(key, actor)
+
+    async def _store_superseded(self, command: _ControlCommand, superseded_by: str) -> bytes:
+        request = command.request
+        state = self._get_or_create_state(
+            athlete_id=command.athlete_id, trainer_id=request.trainer_id
+        )
+        response = self._build_response(
+            request=request,
+            issued_at=datetime.now(tz=UTC),
+            state=state,
+            status="superseded",
+            transition="superseded",
+            failure_reason=None,
+            telemetry_events=[],
+            superseded_by_idempotency_key=superseded_by,
+        )
+        return await self._store_replay(
+            (command.athlete_id, request.idempotency_key), command.request_fingerprint, response
+        )
+
+    async def _execute_command(self, command: _ControlCommand) -> bytes:
+        athlete_id = command.athlete_id
+        request = command.request
+        request_fingerprint = command.request_fingerprint
+        replay_key = (athlete_id, request.idempotency_key)
+        # An identical request may have been queued behind this key's first run.
+        replay = await self._load_replay(athlete_id, request.idempotency_key, request_fingerprint)
         if replay is not None:
-            self._assert_matching_fingerprint(
-                stored_fingerprint=replay.fingerprint,
-                current_fingerprint=request_fingerprint,
-            )
-            return replay.response.model_copy(deep=True)
+            return replay
 
         state = self._get_or_create_state(athlete_id=athlete_id, trainer_id=request.trainer_id)
         issued_at = datetime.now(tz=UTC)
@@ -164,38 +514,18 @@ class WahooControlService:
                 failure_reason="unsupported_trainer",
                 telemetry_events=telemetry_events,
             )
-            self._store_replay(replay_key, request_fingerprint, response)
-            return response.model_copy(deep=True)
+            return await self._store_replay(replay_key, request_fingerprint, response)
 
         reconnected = False
         if state.connection_state == "disconnected":
-            telemetry_events.append(
-                self._telemetry_event(
-                    event_type="reconnect_attempted",
-                    connection_state=state.connection_state,
-                )
-            )
-            reconnect_ack = self._adapter.reconnect(
-                athlete_id=athlete_id, trainer_id=request.trainer_id
+            reconnected = await self._reconnect(
+                athlete_id=athlete_id,
+                trainer_id=request.trainer_id,
+                state=state,
+                telemetry_events=telemetry_events,
             )
-            state.connection_state = reconnect_ack.connection_state
-            if reconnect_ack.acknowledged:
-                reconnected = True
-                telemetry_events.append(
-                    self._telemetry_event(
-                        event_type="reconnect_acknowledged",
-                        connection_state=state.connection_state,
-                    )
-                )
-            else:
-                telemetry_events.append(
-                    self._telemetry_event(
-                        event_type="reconnect_failed",
-                        connection_state=state.connection_state,
-                        error_code=reconnect_ack.error_code,
-                    )
-                )
-                response = self._apply_safety_fallback(
+            if not reconnected:
+                response = await self._apply_safety_fallback(
                     athlete_id=athlete_id,
                     request=request,
                     issued_at=issued_at,
@@ -203,8 +533,7 @@ class WahooControlService:
                     telemetry_events=telemetry_events,
                     failure_reason="reconnect_failed",
                 )
-                self._store_replay(replay_key, request_fingerprint, response)
-                return response.model_copy(deep=True)
+                return await self._store_replay(replay_key, request_fingerprint, response)
 
         telemetry_events.append(
             self._telemetry_event(
@@ -213,12 +542,15 @@ class WahooControlService:
                 mode=request.mode,
             )
         )
-        command_ack = self._adapter.apply_mode(
-            athlete_id=athlete_id,
-            trainer_id=request.trainer_id,
-            mode=request.mode,
-            target_value=request.target_value,
-            target_unit=request.target_unit,
+        command_ack = await self._call_adapter(
+            self._adapter.apply_mode(
+                athlete_id=athlete_id,
+                trainer_id=request.trainer_id,
+                mode=request.mode,
+                target_value=request.target_value,
+                target_unit=request.target_unit,
+            ),
+            state=state,
         )
         state.connection_state = command_ack.connection_state
 
@@ -242,8 +574,7 @@ class WahooControlService:
                 failure_reason=None,
                 telemetry_events=telemetry_events,
             )
-            self._store_replay(replay_key, request_fingerprint, response)
-            return response.model_copy(deep=True)
+            return await self._store_replay(replay_key, request_fingerprint, response)
 
         telemetry_events.append(
             self._telemetry_event(
@@ -253,7 +584,7 @@ class WahooControlService:
                 error_code=command_ack.error_code,
             )
         )
-        response = self._apply_safety_fallback(
+        response = await self._apply_safety_fallback(
             athlete_id=athlete_id,
             request=request,
             issued_at=issued_at,
@@ -261,10 +592,64 @@ class WahooControlService:
             telemetry_events=telemetry_events,
             failure_reason="command_failed",
         )
-        self._store_replay(replay_key, request_fingerprint, response)
-        return response.model_copy(deep=True)
+        return await self._store_replay(replay_key, request_fingerprint, response)
+
+    async def _call_adapter(
+        self,
+        call: Awaitable[TrainerCommandAck],
+        *,
+        state: _TrainerState,
+    ) -> TrainerCommandAck:
+        """Awaits one adapter call, treating a missed deadline as an unacknowledged command."""
+        try:
+            return await asyncio.wait_for(call, timeout=self._command_deadline_seconds)
+        except TimeoutError:
+            return TrainerCommandAck(
+                acknowledged=False,
+                connection_state=state.connection_state,
+                error_code="deadline_exceeded",
+            )
 
-    def _apply_safety_fallback(
+    async def _reconnect(
+        self,
+        *,
+        athlete_id: str,
+        trainer_id: str,
+        state: _TrainerState,
+        telemetry_events: list[WahooControlTelemetryEvent],
+    ) -> bool:
+        for attempt in range(self._reconnect_attempts):
+            if attempt:
+                await self._sleep(self._reconnect_base_delay_seconds * 2 ** (attempt - 1))
+            telemetry_events.append(
+                self._telemetry_event(
+                    event_type="reconnect_attempted",
+                    connection_state=state.connection_state,
+                )
+            )
+            reconnect_ack = await self._call_adapter(
+                self._adapter.reconnect(athlete_id=athlete_id, trainer_id=trainer_id),
+                state=state,
+            )
+            state.connection_state = reconnect_ack.connection_state
+            if reconnect_ack.acknowledged:
+                telemetry_events.append(
+                    self._telemetry_event(
+                        event_type="reconnect_acknowledged",
+                        connection_state=state.connection_state,
+                    )
+                )
+                return True
+            telemetry_events.append(
+                self._telemetry_event(
+                    event_type="reconnect_failed",
+                    connection_state=state.connection_state,
+                    error_code=reconnect_ack.error_code,
+                )
+            )
+        return False
+
+    async def _apply_safety_fallback(
         self,
         *,
         athlete_id: str,
@@ -280,9 +665,12 @@ class WahooControlService:
                 connection_state=state.connection_state,
             )
         )
-        fallback_ack = self._adapter.apply_safety_fallback(
-            athlete_id=athlete_id,
-            trainer_id=request.trainer_id,
+        fallback_ack = await self._call_adapter(
+            self._adapter.apply_safety_fallback(
+                athlete_id=athlete_id,
+                trainer_id=request.trainer_id,
+            ),
+            state=state,
         )
         state.connection_state = fallback_ack.connection_state
 
@@ -336,10 +724,10 @@ class WahooControlService:
         transition: WahooControlTransition,
         failure_reason: str | None,
         telemetry_events: list[WahooControlTelemetryEvent],
+        superseded_by_idempotency_key: str | None = None,
     ) -> WahooTrainerControlResponse:
-        self._command_counter += 1
         return WahooTrainerControlResponse(
-            command_id=f"wahoo-control-{self._command_counter:06d}",
+            command_id=f"wahoo-control-{next(self._command_ids):06d}",
             status=status,
             idempotency_key=request.idempotency_key,
             trainer_id=request.trainer_id,
@@ -352,6 +740,7 @@ class WahooControlService:
             connection_state=state.connection_state,
             transition=transition,
             failure_reason=failure_reason,
+            superseded_by_idempotency_key=superseded_by_idempotency_key,
             issued_at=issued_at,
             telemetry_events=telemetry_events,
         )
@@ -364,9 +753,8 @@ class WahooControlService:
         mode: WahooControlMode | None = None,
         error_code: str | None = None,
     ) -> WahooControlTelemetryEvent:
-        self._event_counter += 1
         return WahooControlTelemetryEvent(
-            event_id=f"wahoo-control-event-{self._event_counter:06d}",
+            event_id=f"wahoo-control-event-{next(self._event_ids):06d}",
             event_type=event_type,
             connection_state=connection_state,
             occurred_at=datetime.now(tz=UTC),
@@ -374,16 +762,42 @@ class WahooControlService:
             error_code=error_code,
         )
 
-    def _store_replay(
+    async def _load_replay(
+        self,
+        athlete_id: str,
+        idempotency_key: str,
+        request_fingerprint: str,
+    ) -> bytes | None:
+        replay = await asyncio.to_thread(
+            self._idempotency_store.get, self._CONTROL_REPLAY_SCOPE, athlete_id, idempotency_key
+        )
+        if replay is None:
+            return None
+        self._assert_matching_fingerprint(
+            stored_fingerprint=replay.request_fingerprint,
+            current_fingerprint=request_fingerprint,
+        )
+        return replay.response_body
+
+    async def _store_replay(
         self,
         replay_key: tuple[str, str],
         request_fingerprint: str,
         response: WahooTrainerControlResponse,
-    ) -> None:
-        self._control_replays[replay_key] = _ControlReplay(
-            fingerprint=request_fingerprint,
-            response=response,
+    ) -> bytes:
+        stored = await asyncio.to_thread(
+            self._idempotency_store.put,
+            self._CONTROL_REPLAY_SCOPE,
+            *replay_key,
+            request_fingerprint=request_fingerprint,
+            response_body=response.model_dump_json(by_alias=True).encode("utf-8"),
+        )
+        # A concurrent request with the same key may have stored its response first.
+        self._assert_matching_fingerprint(
+            stored_fingerprint=stored.request_fingerprint,
+            current_fingerprint=request_fingerprint,
         )
+        return stored.response_body
 
     def _get_or_create_state(self, *, athlete_id: str, trainer_id: str) -> _TrainerState:
         key = (athlete_id, trainer_id)
@@ -406,11 +820,8 @@ class WahooControlService:
             return "disconnected"
         return "connected"
 
-    @staticmethod
-    def _fingerprint_request(request: BaseModel) -> str:
-        payload = request.model_dump(by_alias=True, mode="json", exclude_none=False)
-        serialized = json.dumps(payload, sort_keys=True, separators=(",", ":"))
-        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+    def _fingerprint_request(self, request: BaseModel) -> str:
+        return fingerprint_model(request, algorithm=self._idempotency_store.fingerprint_algorithm)
 
     @staticmethod
     def _assert_matching_fingerprint(
@@ -420,3 +831,19 @@ class WahooControlService:
     ) -> None:
         if stored_fingerprint != current_fingerprint:
             raise ValueError("idempotency key already used with a different payload")
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _start_control_loop() -> asyncio.AbstractEventLoop:
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    loop.call_soon(started.set)
+    threading.Thread(target=loop.run_forever, name="wahoo-control-loop", daemon=True).start()
+    started.wait()
+    return loop
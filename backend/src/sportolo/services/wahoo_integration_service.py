@@ -1,33 +1,45 @@
 from __future__ import annotations
 
+import asyncio
+import bisect
 import hashlib
 import json
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, Sequence
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
-from typing import Protocol
+from operator import itemgetter
+from typing import NamedTuple, Protocol
 
 from pydantic import BaseModel
 
 from sportolo.api.schemas.wahoo_integration import (
     PipelineDispatch,
+    PipelineName,
+    WahooDedupStatus,
     WahooExecutionHistoryEntry,
+    WahooExecutionHistorySyncPage,
     WahooExecutionHistorySyncRequest,
     WahooExecutionHistorySyncResponse,
+    WahooExecutionHistorySyncStreamLine,
+    WahooExecutionHistorySyncSummary,
     WahooWorkoutPushRequest,
     WahooWorkoutPushResponse,
 )
+from sportolo.services.fingerprint_service import fingerprint_model
+from sportolo.services.idempotency_store_service import (
+    IdempotencyStore,
+    InMemoryIdempotencyStore,
+)
+from sportolo.services.wahoo_provider_client import WahooProviderActivity, WahooProviderClient
+from sportolo.services.wahoo_workout_compiler import WahooWorkoutTemplateCache
 
-
-@dataclass(frozen=True)
-class _PushReplay:
-    fingerprint: str
-    response: WahooWorkoutPushResponse
-
-
-@dataclass(frozen=True)
-class _SyncReplay:
-    fingerprint: str
-    response: WahooExecutionHistorySyncResponse
+# Every imported activity is dispatched to these pipelines, in this order.
+_DISPATCH_PIPELINES: tuple[PipelineName, ...] = ("workout_sync", "fatigue_recompute")
+_DISPATCH_BATCH_SIZE = 500
+DEFAULT_PROVIDER_PLAN_CACHE_SIZE = 1024
 
 
 @dataclass(frozen=True)
@@ -40,6 +52,77 @@ class _ProviderHistoryRecord:
     duration_seconds: int
     source_index: int
 
+    @property
+    def sort_key(self) -> tuple[datetime, int, str]:
+        return (self.started_at, self.source_index, self.external_activity_id)
+
+
+class _ProviderHistoryIndex:
+    """One athlete's provider history, kept ordered by `_ProviderHistoryRecord.sort_key`.
+
+    Records are placed on insert, so a window query bisects to its bounds and only
+    walks the records inside them instead of re-sorting the whole history.
+
+    The index also holds the athlete's sync cursor: the length of the leading run of
+    records that have all been imported. A record inserted inside that run (a late
+    upload of an older ride) pulls the cursor back to it, so incremental syncs never
+    skip it.
+    """
+
+    def __init__(self) -> None:
+        self._sort_keys: list[tuple[datetime, int, str]] = []
+        self._records: list[_ProviderHistoryRecord] = []
+        self._activity_ids: set[str] = set()
+        self._imported_through = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, external_activity_id: object) -> bool:
+        return external_activity_id in self._activity_ids
+
+    @property
+    def cursor_started_at(self) -> datetime | None:
+        if self._imported_through == 0:
+            return None
+        return self._records[self._imported_through - 1].started_at
+
+    def insert(self, record: _ProviderHistoryRecord) -> None:
+        sort_key = record.sort_key
+        position = bisect.bisect_right(self._sort_keys, sort_key)
+        self._sort_keys.insert(position, sort_key)
+        self._records.insert(position, record)
+        self._activity_ids.add(record.external_activity_id)
+        self._imported_through = min(self._imported_through, position)
+
+    def advance_cursor(self, is_imported: Callable[[_ProviderHistoryRecord], bool]) -> None:
+        while self._imported_through < len(self._records) and is_imported(
+            self._records[self._imported_through]
+        ):
+            self._imported_through += 1
+
+    def window(
+        self,
+        *,
+        started_after: datetime | None,
+        started_before: datetime | None,
+        after_cursor: bool = False,
+    ) -> list[_ProviderHistoryRecord]:
+        """Records with `started_after <= started_at <= started_before`, in order.
+
+        With `after_cursor`, records at or before the sync cursor are left out too.
+        """
+        start = self._imported_through if after_cursor else 0
+        if started_after is not None:
+            start = max(
+                start,
+                bisect.bisect_left(self._sort_keys, started_after, key=itemgetter(0)),
+            )
+        stop = len(self._sort_keys)
+        if started_before is not None:
+            stop = bisect.bisect_right(self._sort_keys, started_before, key=itemgetter(0))
+        return self._records[start:stop]
+
 
 @dataclass(frozen=True)
 class _StoredActivity:
@@ -53,17 +136,62 @@ class _StoredActivity:
     duration_seconds: int
 
 
+class _SyncResultRow(NamedTuple):
+    """One entry of a completed sync, with everything needed to rebuild it and its dispatches."""
+
+    import_id: str
+    external_activity_id: str
+    external_workout_id: str
+    planned_workout_id: str | None
+    dedup_status: WahooDedupStatus
+    sequence_number: int
+    started_at: datetime
+    completed_at: datetime
+    duration_seconds: int
+    # Dispatches of a new activity are numbered consecutively from here.
+    first_dispatch_number: int | None
+
+    @classmethod
+    def from_activity(
+        cls,
+        stored: _StoredActivity,
+        dedup_status: WahooDedupStatus,
+        first_dispatch_number: int | None,
+    ) -> _SyncResultRow:
+        return cls(
+            import_id=stored.import_id,
+            external_activity_id=stored.external_activity_id,
+            external_workout_id=stored.external_workout_id,
+            planned_workout_id=stored.planned_workout_id,
+            dedup_status=dedup_status,
+            sequence_number=stored.sequence_number,
+            started_at=stored.started_at,
+            completed_at=stored.completed_at,
+            duration_seconds=stored.duration_seconds,
+            first_dispatch_number=first_dispatch_number,
+        )
+
+
+# Called with each batch of newly imported activities, before their dispatches are queued.
+ImportedActivityRecorder = Callable[[str, Sequence[WahooProviderActivity]], None]
+
+
 class PipelineDispatchSink(Protocol):
     def enqueue(self, athlete_id: str, dispatch: PipelineDispatch) -> None: ...
 
+    def enqueue_many(self, athlete_id: str, dispatches: Sequence[PipelineDispatch]) -> None: ...
+
 
 class InMemoryPipelineDispatchSink:
     def __init__(self) -> None:
         self._dispatch_log_by_athlete: dict[str, list[PipelineDispatch]] = {}
 
     def enqueue(self, athlete_id: str, dispatch: PipelineDispatch) -> None:
-        self._dispatch_log_by_athlete.setdefault(athlete_id, []).append(
-            dispatch.model_copy(deep=True)
+        self.enqueue_many(athlete_id, [dispatch])
+
+    def enqueue_many(self, athlete_id: str, dispatches: Sequence[PipelineDispatch]) -> None:
+        self._dispatch_log_by_athlete.setdefault(athlete_id, []).extend(
+            dispatch.model_copy(deep=True) for dispatch in dispatches
         )
 
     def reset(self) -> None:
@@ -73,28 +201,58 @@ class InMemoryPipelineDispatchSink:
 class WahooIntegrationService:
     _DEFAULT_HISTORY_START = datetime(2026, 1, 1, tzinfo=UTC)
     _WAHOO_TRAINER_PREFIXES = ("wahoo", "kickr", "elemnt", "bolt", "roam")
+    _PUSH_REPLAY_SCOPE = "wahoo_push"
+    _SYNC_REPLAY_SCOPE = "wahoo_sync"
+    # Result logs are keyed by sync id and expire with the summaries that point at them.
+    _SYNC_RESULTS_SCOPE = "wahoo_sync_results"
 
-    def __init__(self, dispatch_sink: PipelineDispatchSink | None = None) -> None:
+    def __init__(
+        self,
+        dispatch_sink: PipelineDispatchSink | None = None,
+        *,
+        idempotency_store: IdempotencyStore | None = None,
+        provider_client: WahooProviderClient | None = None,
+        template_cache: WahooWorkoutTemplateCache | None = None,
+        activity_recorder: ImportedActivityRecorder | None = None,
+        provider_plan_cache_size: int = DEFAULT_PROVIDER_PLAN_CACHE_SIZE,
+    ) -> None:
+        if provider_plan_cache_size < 1:
+            raise ValueError("provider_plan_cache_size must be at least 1")
         self._dispatch_sink = dispatch_sink or InMemoryPipelineDispatchSink()
+        # An empty in-memory store is falsy (it has `__len__`), so test against None.
+        self._idempotency_store = (
+            idempotency_store if idempotency_store is not None else InMemoryIdempotencyStore()
+        )
+        self._provider_client = provider_client
+        self._template_cache = template_cache or WahooWorkoutTemplateCache()
+        self._activity_recorder = activity_recorder
+        self._provider_plan_cache_size = provider_plan_cache_size
+        self._provider_plans_lock = threading.Lock()
+        # Routes run on the threadpool, so pushes, syncs and history updates hold this
+        # lock while they read and advance the ledger, history and id counters.
+        self._state_lock = threading.Lock()
         self._reset_state()
 
     def _reset_state(self) -> None:
-        self._push_replays: dict[tuple[str, str], _PushReplay] = {}
-        self._sync_replays: dict[tuple[str, str], _SyncReplay] = {}
         self._planned_to_external: dict[tuple[str, str], str] = {}
         self._external_to_planned: dict[tuple[str, str], str] = {}
-        self._provider_history_by_athlete: dict[str, list[_ProviderHistoryRecord]] = {}
+        self._provider_history_by_athlete: dict[str, _ProviderHistoryIndex] = {}
+        # The athlete's import ledger, used to deduplicate provider activities.
         self._activity_by_key: dict[tuple[str, str], _StoredActivity] = {}
+        # Most recently pushed plans only; older ones are evicted least recently used first.
+        self._provider_plans: OrderedDict[tuple[str, str], bytes] = OrderedDict()
 
         self._push_counter = 0
-        self._sync_counter = 0
         self._import_counter = 0
         self._sequence_counter = 0
         self._history_source_counter = 0
         self._dispatch_counter = 0
 
     def reset_for_testing(self) -> None:
-        self._reset_state()
+        with self._state_lock:
+            self._reset_state()
+        self._idempotency_store.reset()
+        self._template_cache.reset()
         sink_reset = getattr(self._dispatch_sink, "reset", None)
         if callable(sink_reset):
             sink_reset()
@@ -104,190 +262,461 @@ class WahooIntegrationService:
         athlete_id: str,
         request: WahooWorkoutPushRequest,
     ) -> WahooWorkoutPushResponse:
-        replay_key = (athlete_id, request.idempotency_key)
+        return WahooWorkoutPushResponse.model_validate_json(
+            self.push_workout_response_body(athlete_id, request)
+        )
+
+    @property
+    def template_cache(self) -> WahooWorkoutTemplateCache:
+        return self._template_cache
+
+    def provider_plan(self, athlete_id: str, external_workout_id: str) -> bytes | None:
+        """The bound plan payload delivered to Wahoo for an accepted push.
+
+        Only the `provider_plan_cache_size` most recently used plans are kept, so an
+        older push returns None.
+        """
+        key = (athlete_id, external_workout_id)
+        with self._provider_plans_lock:
+            plan = self._provider_plans.get(key)
+            if plan is not None:
+                self._provider_plans.move_to_end(key)
+            return plan
+
+    def _store_provider_plan(self, key: tuple[str, str], plan: bytes) -> None:
+        with self._provider_plans_lock:
+            self._provider_plans[key] = plan
+            self._provider_plans.move_to_end(key)
+            while len(self._provider_plans) > self._provider_plan_cache_size:
+                self._provider_plans.popitem(last=False)
+
+    def push_workout_response_body(
+        self,
+        athlete_id: str,
+        request: WahooWorkoutPushRequest,
+    ) -> bytes:
+        """Pushes a workout and returns the serialized response, replaying stored bytes.
+
+        The steps compile once into a shared, content-hashed plan template; each push
+        only binds the athlete's FTP- and pace-scaled targets into it.
+        """
         request_fingerprint = self._fingerprint_request(request)
-        replay = self._push_replays.get(replay_key)
-        if replay is not None:
-            self._assert_matching_fingerprint(
-                stored_fingerprint=replay.fingerprint,
-                current_fingerprint=request_fingerprint,
+        with self._state_lock:
+            replay = self._load_replay(
+                self._PUSH_REPLAY_SCOPE,
+                athlete_id,
+                request.idempotency_key,
+                request_fingerprint,
             )
-            return replay.response.model_copy(deep=True)
+            if replay is not None:
+                return replay
+
+            self._push_counter += 1
+            push_id = f"wahoo-push-{self._push_counter:06d}"
+            template = self._template_cache.get_or_compile(request.workout_name, request.steps)
+            total_duration_seconds = template.total_duration_seconds
+            received_at = datetime.now(tz=UTC)
+
+            failure_reason = self._push_failure_reason(request.trainer_id)
+            if failure_reason is not None:
+                response = WahooWorkoutPushResponse(
+                    push_id=push_id,
+                    status="failed",
+                    idempotency_key=request.idempotency_key,
+                    planned_workout_id=request.planned_workout_id,
+                    external_workout_id=None,
+                    step_count=len(request.steps),
+                    total_duration_seconds=total_duration_seconds,
+                    received_at=received_at,
+                    failure_reason=failure_reason,
+                )
+                return self._store_replay(
+                    self._PUSH_REPLAY_SCOPE,
+                    athlete_id,
+                    request.idempotency_key,
+                    request_fingerprint,
+                    response,
+                )
 
-        self._push_counter += 1
-        push_id = f"wahoo-push-{self._push_counter:06d}"
-        total_duration_seconds = sum(step.duration_seconds for step in request.steps)
-        received_at = datetime.now(tz=UTC)
+            plan = template.bind(request.athlete_targets)
+            external_workout_id = self._deterministic_external_workout_id(
+                athlete_id=athlete_id,
+                planned_workout_id=request.planned_workout_id,
+                idempotency_key=request.idempotency_key,
+            )
+            self._store_provider_plan((athlete_id, external_workout_id), plan)
+            self._planned_to_external[(athlete_id, request.planned_workout_id)] = (
+                external_workout_id
+            )
+            self._external_to_planned[(athlete_id, external_workout_id)] = (
+                request.planned_workout_id
+            )
+
+            self._append_provider_history(
+                athlete_id=athlete_id,
+                external_workout_id=external_workout_id,
+                total_duration_seconds=total_duration_seconds,
+                planned_start_at=request.planned_start_at,
+            )
 
-        failure_reason = self._push_failure_reason(request.trainer_id)
-        if failure_reason is not None:
             response = WahooWorkoutPushResponse(
                 push_id=push_id,
-                status="failed",
+                status="accepted",
                 idempotency_key=request.idempotency_key,
                 planned_workout_id=request.planned_workout_id,
-                external_workout_id=None,
+                external_workout_id=external_workout_id,
+                template_id=template.template_id,
                 step_count=len(request.steps),
                 total_duration_seconds=total_duration_seconds,
                 received_at=received_at,
-                failure_reason=failure_reason,
+                failure_reason=None,
             )
-            self._push_replays[replay_key] = _PushReplay(
-                fingerprint=request_fingerprint,
-                response=response,
+            return self._store_replay(
+                self._PUSH_REPLAY_SCOPE,
+                athlete_id,
+                request.idempotency_key,
+                request_fingerprint,
+                response,
             )
-            return response.model_copy(deep=True)
 
-        external_workout_id = self._deterministic_external_workout_id(
-            athlete_id=athlete_id,
-            planned_workout_id=request.planned_workout_id,
-            idempotency_key=request.idempotency_key,
+    def sync_execution_history(
+        self,
+        athlete_id: str,
+        request: WahooExecutionHistorySyncRequest,
+    ) -> WahooExecutionHistorySyncResponse:
+        return WahooExecutionHistorySyncResponse.model_validate_json(
+            self.sync_execution_history_response_body(athlete_id, request)
         )
-        self._planned_to_external[(athlete_id, request.planned_workout_id)] = external_workout_id
-        self._external_to_planned[(athlete_id, external_workout_id)] = request.planned_workout_id
 
-        self._append_provider_history(
-            athlete_id=athlete_id,
-            external_workout_id=external_workout_id,
-            total_duration_seconds=total_duration_seconds,
-            planned_start_at=request.planned_start_at,
+    def sync_execution_history_response_body(
+        self,
+        athlete_id: str,
+        request: WahooExecutionHistorySyncRequest,
+    ) -> bytes:
+        """Syncs provider history and returns the full serialized response.
+
+        The response is assembled from the stored summary and the sync's result log, so
+        a replay rebuilds the same entries without them being kept in the replay record.
+        Large imports should use the summary view or the NDJSON stream instead.
+        """
+        summary = self.sync_execution_history_summary(athlete_id, request)
+        page = _result_page(summary.sync_id, self._load_sync_results(athlete_id, summary.sync_id))
+        response = WahooExecutionHistorySyncResponse(
+            **summary.model_dump(exclude={"entry_count", "dispatch_count"}),
+            entries=page.entries,
+            pipeline_dispatches=page.pipeline_dispatches,
         )
+        return response.model_dump_json(by_alias=True).encode("utf-8")
 
-        response = WahooWorkoutPushResponse(
-            push_id=push_id,
-            status="accepted",
-            idempotency_key=request.idempotency_key,
-            planned_workout_id=request.planned_workout_id,
-            external_workout_id=external_workout_id,
-            step_count=len(request.steps),
-            total_duration_seconds=total_duration_seconds,
-            received_at=received_at,
-            failure_reason=None,
-        )
-        self._push_replays[replay_key] = _PushReplay(
-            fingerprint=request_fingerprint,
-            response=response,
+    def sync_execution_history_summary(
+        self,
+        athlete_id: str,
+        request: WahooExecutionHistorySyncRequest,
+    ) -> WahooExecutionHistorySyncSummary:
+        return WahooExecutionHistorySyncSummary.model_validate_json(
+            self.sync_execution_history_summary_body(athlete_id, request)
         )
-        return response.model_copy(deep=True)
 
-    def sync_execution_history(
+    def sync_execution_history_summary_body(
         self,
         athlete_id: str,
         request: WahooExecutionHistorySyncRequest,
-    ) -> WahooExecutionHistorySyncResponse:
-        replay_key = (athlete_id, request.idempotency_key)
+    ) -> bytes:
+        """Syncs provider history and returns the serialized summary, replaying stored bytes.
+
+        Entries are recorded in a compact per-sync result log rather than built as
+        response models, and dispatches are enqueued in batches of
+        `_DISPATCH_BATCH_SIZE`, so the memory a sync needs beyond the log does not grow
+        with the size of the import. The log is stored in the idempotency store next to
+        the summary, so it shares the summary's TTL and entry limit.
+        """
         request_fingerprint = self._fingerprint_request(request)
-        replay = self._sync_replays.get(replay_key)
-        if replay is not None:
-            self._assert_matching_fingerprint(
-                stored_fingerprint=replay.fingerprint,
-                current_fingerprint=request_fingerprint,
+        with self._state_lock:
+            replay = self._load_replay(
+                self._SYNC_REPLAY_SCOPE,
+                athlete_id,
+                request.idempotency_key,
+                request_fingerprint,
+            )
+            if replay is not None:
+                return replay
+
+            started_after = self._coerce_utc(request.started_after)
+            started_before = self._coerce_utc(request.started_before)
+            incremental = request.mode == "incremental"
+            history = self._provider_history_by_athlete.get(athlete_id)
+            window_records = (
+                history.window(
+                    started_after=started_after,
+                    started_before=started_before,
+                    after_cursor=incremental,
+                )
+                if history is not None
+                else []
             )
-            return replay.response.model_copy(deep=True)
-
-        started_after = self._coerce_utc(request.started_after)
-        started_before = self._coerce_utc(request.started_before)
-        history_records = self._provider_history_by_athlete.get(athlete_id, [])
-        ordered_records = sorted(
-            history_records,
-            key=lambda record: (
-                record.started_at,
-                record.source_index,
-                record.external_activity_id,
-            ),
-        )
 
-        entries: list[WahooExecutionHistoryEntry] = []
-        dispatches: list[PipelineDispatch] = []
-        imported_count = 0
-        duplicate_count = 0
-
-        for record in ordered_records:
-            if started_after is not None and record.started_at < started_after:
-                continue
-            if started_before is not None and record.started_at > started_before:
-                continue
-
-            activity_key = (athlete_id, record.external_activity_id)
-            existing = self._activity_by_key.get(activity_key)
-            if existing is not None:
-                duplicate_count += 1
-                entries.append(
-                    WahooExecutionHistoryEntry(
-                        import_id=existing.import_id,
-                        external_activity_id=existing.external_activity_id,
-                        external_workout_id=existing.external_workout_id,
-                        planned_workout_id=existing.planned_workout_id,
-                        dedup_status="duplicate_linked"
-                        if existing.planned_workout_id is not None
-                        else "duplicate_unlinked",
-                        sequence_number=existing.sequence_number,
-                        started_at=existing.started_at,
-                        completed_at=existing.completed_at,
-                        duration_seconds=existing.duration_seconds,
+            result_log: list[_SyncResultRow] = []
+            pending_activities: list[WahooProviderActivity] = []
+            pending_dispatches: list[PipelineDispatch] = []
+            imported_count = 0
+            duplicate_count = 0
+            dispatch_count = 0
+
+            for record in window_records:
+                activity_key = (athlete_id, record.external_activity_id)
+                existing = self._activity_by_key.get(activity_key)
+                if existing is not None:
+                    duplicate_count += 1
+                    if incremental:
+                        continue
+                    result_log.append(
+                        _SyncResultRow.from_activity(
+                            existing,
+                            "duplicate_linked"
+                            if existing.planned_workout_id is not None
+                            else "duplicate_unlinked",
+                            None,
+                        )
                     )
+                    continue
+
+                imported_count += 1
+                self._import_counter += 1
+                self._sequence_counter += 1
+                planned_workout_id = self._external_to_planned.get(
+                    (athlete_id, record.external_workout_id)
                 )
-                continue
-
-            imported_count += 1
-            self._import_counter += 1
-            self._sequence_counter += 1
-            import_id = f"wahoo-import-{self._import_counter:06d}"
-            planned_workout_id = self._external_to_planned.get(
-                (athlete_id, record.external_workout_id)
-            )
 
-            stored = _StoredActivity(
-                import_id=import_id,
-                external_activity_id=record.external_activity_id,
-                external_workout_id=record.external_workout_id,
-                planned_workout_id=planned_workout_id,
-                sequence_number=self._sequence_counter,
-                started_at=record.started_at,
-                completed_at=record.completed_at,
-                duration_seconds=record.duration_seconds,
-            )
-            self._activity_by_key[activity_key] = stored
-
-            entries.append(
-                WahooExecutionHistoryEntry(
-                    import_id=stored.import_id,
-                    external_activity_id=stored.external_activity_id,
-                    external_workout_id=stored.external_workout_id,
-                    planned_workout_id=stored.planned_workout_id,
-                    dedup_status="new_linked"
-                    if stored.planned_workout_id is not None
-                    else "new_unlinked",
-                    sequence_number=stored.sequence_number,
-                    started_at=stored.started_at,
-                    completed_at=stored.completed_at,
-                    duration_seconds=stored.duration_seconds,
+                stored = _StoredActivity(
+                    import_id=f"wahoo-import-{self._import_counter:06d}",
+                    external_activity_id=record.external_activity_id,
+                    external_workout_id=record.external_workout_id,
+                    planned_workout_id=planned_workout_id,
+                    sequence_number=self._sequence_counter,
+                    started_at=record.started_at,
+                    completed_at=record.completed_at,
+                    duration_seconds=record.duration_seconds,
                 )
+                self._activity_by_key[activity_key] = stored
+
+                first_dispatch_number = self._dispatch_counter + 1
+                self._dispatch_counter += len(_DISPATCH_PIPELINES)
+                result_log.append(
+                    _SyncResultRow.from_activity(
+                        stored,
+                        "new_linked" if stored.planned_workout_id is not None else "new_unlinked",
+                        first_dispatch_number,
+                    )
+                )
+                pending_activities.append(
+                    WahooProviderActivity(
+                        external_activity_id=stored.external_activity_id,
+                        external_workout_id=stored.external_workout_id,
+                        started_at=stored.started_at,
+                        duration_seconds=stored.duration_seconds,
+                    )
+                )
+                pending_dispatches.extend(_build_pipeline_dispatches(stored, first_dispatch_number))
+                if len(pending_dispatches) >= _DISPATCH_BATCH_SIZE:
+                    self._flush_imports(athlete_id, pending_activities, pending_dispatches)
+                    dispatch_count += len(pending_dispatches)
+                    pending_activities = []
+                    pending_dispatches = []
+
+            if pending_dispatches:
+                self._flush_imports(athlete_id, pending_activities, pending_dispatches)
+                dispatch_count += len(pending_dispatches)
+
+            cursor_started_at = None
+            if history is not None:
+                history.advance_cursor(
+                    lambda record: (
+                        (athlete_id, record.external_activity_id) in self._activity_by_key
+                    )
+                )
+                cursor_started_at = history.cursor_started_at
+
+            # Sync ids stay unique across processes and restarts that share one store.
+            sync_id = f"wahoo-sync-{uuid.uuid4().hex}"
+            self._idempotency_store.put(
+                self._SYNC_RESULTS_SCOPE,
+                athlete_id,
+                sync_id,
+                request_fingerprint=request_fingerprint,
+                response_body=_encode_result_log(result_log),
             )
-            new_dispatches = self._build_pipeline_dispatches(
-                athlete_id=athlete_id,
-                external_activity_id=stored.external_activity_id,
-                planned_workout_id=stored.planned_workout_id,
-                sequence_number=stored.sequence_number,
+            summary = WahooExecutionHistorySyncSummary(
+                sync_id=sync_id,
+                idempotency_key=request.idempotency_key,
+                mode=request.mode,
+                started_after=started_after,
+                started_before=started_before,
+                cursor_started_at=cursor_started_at,
+                imported_count=imported_count,
+                duplicate_count=duplicate_count,
+                entry_count=len(result_log),
+                dispatch_count=dispatch_count,
+            )
+            return self._store_replay(
+                self._SYNC_REPLAY_SCOPE,
+                athlete_id,
+                request.idempotency_key,
+                request_fingerprint,
+                summary,
             )
-            dispatches.extend(new_dispatches)
 
-        self._sync_counter += 1
-        response = WahooExecutionHistorySyncResponse(
-            sync_id=f"wahoo-sync-{self._sync_counter:06d}",
-            idempotency_key=request.idempotency_key,
-            started_after=started_after,
-            started_before=started_before,
-            imported_count=imported_count,
-            duplicate_count=duplicate_count,
-            entries=entries,
-            pipeline_dispatches=dispatches,
+    def _flush_imports(
+        self,
+        athlete_id: str,
+        activities: Sequence[WahooProviderActivity],
+        dispatches: Sequence[PipelineDispatch],
+    ) -> None:
+        # Recorded first, so the recompute jobs the dispatches start can read the activities.
+        if self._activity_recorder is not None:
+            self._activity_recorder(athlete_id, activities)
+        self._dispatch_sink.enqueue_many(athlete_id, dispatches)
+
+    def sync_result_page(
+        self,
+        athlete_id: str,
+        sync_id: str,
+        *,
+        cursor: str | None = None,
+        limit: int | None = None,
+    ) -> WahooExecutionHistorySyncPage:
+        """One page of a completed sync's entries and their pipeline dispatches.
+
+        `cursor` is the `nextCursor` of the previous page; without `limit` the page runs
+        to the end of the sync.
+        """
+        if limit is not None and limit < 1:
+            raise ValueError("limit must be at least 1")
+        return _result_page(
+            sync_id, self._load_sync_results(athlete_id, sync_id), cursor=cursor, limit=limit
         )
-        self._sync_replays[replay_key] = _SyncReplay(
-            fingerprint=request_fingerprint,
-            response=response,
+
+    def _load_sync_results(self, athlete_id: str, sync_id: str) -> list[_SyncResultRow]:
+        stored = self._idempotency_store.get(self._SYNC_RESULTS_SCOPE, athlete_id, sync_id)
+        if stored is None:
+            raise ValueError(f"Wahoo sync results expired or unknown: {sync_id}")
+        return _decode_result_log(stored.response_body)
+
+    def iter_sync_execution_history_ndjson(
+        self,
+        athlete_id: str,
+        summary: WahooExecutionHistorySyncSummary,
+        *,
+        page_size: int = 500,
+    ) -> Iterator[bytes]:
+        """NDJSON lines for a completed sync: its entry pages, then the summary.
+
+        Streaming starts only after the sync has finished and stored its result log; the
+        log is loaded once, and only one page of entries is materialized at a time.
+        """
+        result_log = self._load_sync_results(athlete_id, summary.sync_id)
+        cursor: str | None = None
+        while True:
+            page = _result_page(summary.sync_id, result_log, cursor=cursor, limit=page_size)
+            if page.entries:
+                line = WahooExecutionHistorySyncStreamLine(type="page", page=page)
+                yield line.model_dump_json(by_alias=True).encode("utf-8") + b"\n"
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        line = WahooExecutionHistorySyncStreamLine(type="summary", summary=summary)
+        yield line.model_dump_json(by_alias=True).encode("utf-8") + b"\n"
+
+    def _load_replay(
+        self,
+        scope: str,
+        athlete_id: str,
+        idempotency_key: str,
+        request_fingerprint: str,
+    ) -> bytes | None:
+        replay = self._idempotency_store.get(scope, athlete_id, idempotency_key)
+        if replay is None:
+            return None
+        self._assert_matching_fingerprint(
+            stored_fingerprint=replay.request_fingerprint,
+            current_fingerprint=request_fingerprint,
+        )
+        return replay.response_body
+
+    def _store_replay(
+        self,
+        scope: str,
+        athlete_id: str,
+        idempotency_key: str,
+        request_fingerprint: str,
+        response: BaseModel,
+    ) -> bytes:
+        stored = self._idempotency_store.put(
+            scope,
+            athlete_id,
+            idempotency_key,
+            request_fingerprint=request_fingerprint,
+            response_body=response.model_dump_json(by_alias=True).encode("utf-8"),
+        )
+        # A concurrent request with the same key may have stored its response first.
+        self._assert_matching_fingerprint(
+            stored_fingerprint=stored.request_fingerprint,
+            current_fingerprint=request_fingerprint,
         )
-        return response.model_copy(deep=True)
+        return stored.response_body
+
+    async def refresh_provider_history(self, athlete_id: str, access_token: str) -> int:
+        """Pulls the athlete's Wahoo history from the provider client into local history.
+
+        The fetch starts at the sync cursor and stops paging once the provider's
+        newest-first pages reach it, so a reconnect refresh does not re-read years of
+        rides. Returns the number of newly added activities.
+        """
+        if self._provider_client is None:
+            raise ValueError("no Wahoo provider client is configured")
+        # The history lock may be held by a long sync, so it is not waited on in the loop.
+        started_after = await asyncio.to_thread(self.provider_history_cursor, athlete_id)
+        activities = await self._provider_client.fetch_history(
+            athlete_id,
+            access_token,
+            started_after=started_after,
+        )
+        return await asyncio.to_thread(self.ingest_provider_activities, athlete_id, activities)
+
+    def provider_history_cursor(self, athlete_id: str) -> datetime | None:
+        """Start of the last activity in the athlete's fully imported history, if any."""
+        with self._state_lock:
+            history = self._provider_history_by_athlete.get(athlete_id)
+            return history.cursor_started_at if history is not None else None
+
+    def ingest_provider_activities(
+        self,
+        athlete_id: str,
+        activities: Sequence[WahooProviderActivity],
+    ) -> int:
+        """Adds provider activities to the athlete's history, skipping known activity ids."""
+        with self._state_lock:
+            history = self._provider_history_by_athlete.setdefault(
+                athlete_id, _ProviderHistoryIndex()
+            )
+            added_count = 0
+            for activity in activities:
+                if activity.external_activity_id in history:
+                    continue
+                self._history_source_counter += 1
+                started_at = activity.started_at.astimezone(UTC)
+                history.insert(
+                    _ProviderHistoryRecord(
+                        athlete_id=athlete_id,
+                        external_activity_id=activity.external_activity_id,
+                        external_workout_id=activity.external_workout_id,
+                        started_at=started_at,
+                        completed_at=started_at + timedelta(seconds=activity.duration_seconds),
+                        duration_seconds=activity.duration_seconds,
+                        source_index=self._history_source_counter,
+                    )
+                )
+                added_count += 1
+            return added_count
 
     def _append_provider_history(
         self,
@@ -309,7 +738,7 @@ class WahooIntegrationService:
             external_workout_id=external_workout_id,
             started_at=start_at,
         )
-        self._provider_history_by_athlete.setdefault(athlete_id, []).append(
+        self._provider_history_by_athlete.setdefault(athlete_id, _ProviderHistoryIndex()).insert(
             _ProviderHistoryRecord(
                 athlete_id=athlete_id,
                 external_activity_id=external_activity_id,
@@ -321,29 +750,6 @@ class WahooIntegrationService:
             )
         )
 
-    def _build_pipeline_dispatches(
-        self,
-        *,
-        athlete_id: str,
-        external_activity_id: str,
-        planned_workout_id: str | None,
-        sequence_number: int,
-    ) -> list[PipelineDispatch]:
-        dispatches: list[PipelineDispatch] = []
-        for pipeline in ("workout_sync", "fatigue_recompute"):
-            self._dispatch_counter += 1
-            dispatch = PipelineDispatch(
-                dispatch_id=f"wahoo-dispatch-{self._dispatch_counter:06d}",
-                pipeline=pipeline,
-                external_activity_id=external_activity_id,
-                planned_workout_id=planned_workout_id,
-                sequence_number=sequence_number,
-                status="queued",
-            )
-            dispatches.append(dispatch)
-            self._dispatch_sink.enqueue(athlete_id, dispatch)
-        return dispatches
-
     @staticmethod
     def _push_failure_reason(trainer_id: str) -> str | None:
         normalized = trainer_id.strip().lower()
@@ -375,11 +781,8 @@ class WahooIntegrationService:
         digest = hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
         return f"wahoo-activity-{digest}"
 
-    @staticmethod
-    def _fingerprint_request(request: BaseModel) -> str:
-        payload = request.model_dump(by_alias=True, mode="json", exclude_none=False)
-        serialized = json.dumps(payload, sort_keys=True, separators=(",", ":"))
-        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+    def _fingerprint_request(self, request: BaseModel) -> str:
+        return fingerprint_model(request, algorithm=self._idempotency_store.fingerprint_algorithm)
 
     @staticmethod
     def _assert_matching_fingerprint(
@@ -397,3 +800,114 @@ class WahooIntegrationService:
         if value.tzinfo is None:
             raise ValueError("datetime values must include timezone information")
         return value.astimezone(UTC)
+
+
+def _build_pipeline_dispatches(
+    stored: _StoredActivity | _SyncResultRow,
+    first_dispatch_number: int,
+) -> list[PipelineDispatch]:
+    return [
+        PipelineDispatch(
+            dispatch_id=f"wahoo-dispatch-{first_dispatch_number + offset:06d}",
+            pipeline=pipeline,
+            external_activity_id=stored.external_activity_id,
+            planned_workout_id=stored.planned_workout_id,
+            sequence_number=stored.sequence_number,
+            activity_started_at=stored.started_at,
+            status="queued",
+        )
+        for offset, pipeline in enumerate(_DISPATCH_PIPELINES)
+    ]
+
+
+def _parse_page_cursor(cursor: str | None, entry_count: int) -> int:
+    if cursor is None:
+        return 0
+    if not cursor.isdigit() or int(cursor) > entry_count:
+        raise ValueError("cursor must be a nextCursor returned for this sync")
+    return int(cursor)
+
+
+def _result_page(
+    sync_id: str,
+    result_log: Sequence[_SyncResultRow],
+    *,
+    cursor: str | None = None,
+    limit: int | None = None,
+) -> WahooExecutionHistorySyncPage:
+    start = _parse_page_cursor(cursor, len(result_log))
+    stop = len(result_log) if limit is None else min(len(result_log), start + limit)
+
+    entries: list[WahooExecutionHistoryEntry] = []
+    dispatches: list[PipelineDispatch] = []
+    for row in result_log[start:stop]:
+        entries.append(
+            WahooExecutionHistoryEntry(
+                import_id=row.import_id,
+                external_activity_id=row.external_activity_id,
+                external_workout_id=row.external_workout_id,
+                planned_workout_id=row.planned_workout_id,
+                dedup_status=row.dedup_status,
+                sequence_number=row.sequence_number,
+                started_at=row.started_at,
+                completed_at=row.completed_at,
+                duration_seconds=row.duration_seconds,
+            )
+        )
+        if row.first_dispatch_number is not None:
+            dispatches.extend(_build_pipeline_dispatches(row, row.first_dispatch_number))
+    return WahooExecutionHistorySyncPage(
+        sync_id=sync_id,
+        entries=entries,
+        pipeline_dispatches=dispatches,
+        next_cursor=str(stop) if stop < len(result_log) else None,
+    )
+
+
+def _encode_result_log(result_log: Sequence[_SyncResultRow]) -> bytes:
+    # Rows are stored as positional arrays, which keeps large logs compact.
+    return json.dumps(
+        [
+            [
+                *row[:6],
+                row.started_at.isoformat(),
+                row.completed_at.isoformat(),
+                row.duration_seconds,
+                row.first_dispatch_number,
+            ]
+            for row in result_log
+        ],
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _decode_result_log(data: bytes) -> list[_SyncResultRow]:
+    rows: list[_SyncResultRow] = []
+    for values in json.loads(data):
+        (
+            import_id,
+            external_activity_id,
+            external_workout_id,
+            planned_workout_id,
+            dedup_status,
+            sequence_number,
+            started_at,
+            completed_at,
+            duration_seconds,
+            first_dispatch_number,
+        ) = values
+        rows.append(
+            _SyncResultRow(
+                import_id=import_id,
+                external_activity_id=external_activity_id,
+                external_workout_id=external_workout_id,
+                planned_workout_id=planned_workout_id,
+                dedup_status=dedup_status,
+                sequence_number=sequence_number,
+                started_at=datetime.fromisoformat(started_at),
+                completed_at=datetime.fromisoformat(completed_at),
+                duration_seconds=duration_seconds,
+                first_dispatch_number=first_dispatch_number,
+            )
+        )
+    return rows
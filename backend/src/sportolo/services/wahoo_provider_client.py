@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import math
+import time
+import weakref
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from types import TracebackType
+from typing import Any, Protocol
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WAHOO_API_BASE_URL = "https://api.wahooligan.com"
+
+
+@dataclass(frozen=True)
+class WahooProviderActivity:
+    """One completed workout as reported by the Wahoo cloud API."""
+
+    external_activity_id: str
+    external_workout_id: str
+    started_at: datetime
+    duration_seconds: int
+
+    @property
+    def completed_at(self) -> datetime:
+        return self.started_at + timedelta(seconds=self.duration_seconds)
+
+
+class WahooProviderError(Exception):
+    def __init__(self, message: str, *, status_code: int | None, retryable: bool) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+
+
+class WahooProviderClient(Protocol):
+    async def fetch_history(
+        self,
+        athlete_id: str,
+        access_token: str,
+        *,
+        started_after: datetime | None = None,
+    ) -> list[WahooProviderActivity]: ...
+
+    async def aclose(self) -> None: ...
+
+
+@dataclass(frozen=True)
+class WahooProviderLimits:
+    """Connection pool, concurrency and retry limits for the Wahoo cloud API.
+
+    `global_concurrency` bounds in-flight requests across all athletes, and
+    `per_athlete_concurrency` bounds the pages fetched at once for one athlete so a
+    single long history cannot take the whole pool.
+    """
+
+    max_connections: int = 64
+    max_keepalive_connections: int = 32
+    keepalive_expiry_seconds: float = 30.0
+    global_concurrency: int = 32
+    per_athlete_concurrency: int = 4
+    page_size: int = 50
+    timeout_seconds: float = 10.0
+    max_retries: int = 3
+    retry_base_delay_seconds: float = 0.5
+
+    def __post_init__(self) -> None:
+        for name in (
+            "max_connections",
+            "max_keepalive_connections",
+            "global_concurrency",
+            "per_athlete_concurrency",
+            "page_size",
+        ):
+            if getattr(self, name) < 1:
+                raise ValueError(f"{name} must be at least 1")
+        if self.max_retries < 0:
+            raise ValueError("max_retries must be zero or greater")
+
+
+class AdaptiveRateLimiter:
+    """Paces request starts from the provider's rate-limit response headers.
+
+    While more than `slow_down_fraction` of the window's quota remains, requests start
+    freely. Below that, starts are spread evenly over the rest of the window, and an
+    exhausted quota or a 429 pauses every request until the reset or `Retry-After`.
+    """
+
+    def __init__(
+        self,
+        *,
+        slow_down_fraction: float = 0.2,
+        default_retry_after_seconds: float = 1.0,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        monotonic: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._slow_down_fraction = slow_down_fraction
+        self._default_retry_after_seconds = default_retry_after_seconds
+        self._sleep = sleep
+        self._monotonic = monotonic
+        self._lock = asyncio.Lock()
+        self._not_before = 0.0
+        self._min_interval = 0.0
+        self._last_start = -math.inf
+        self.throttled_seconds = 0.0
+
+    async def wait(self) -> None:
+        async with self._lock:
+            now = self._monotonic()
+            delay = max(self._not_before - now, self._last_start + self._min_interval - now)
+            if delay > 0:
+                self.throttled_seconds += delay
+                await self._sleep(delay)
+            self._last_start = self._monotonic()
+
+    def observe(self, status_code: int, headers: Mapping[str, str]) -> None:
+        now = self._monotonic()
+        reset_seconds = _parse_seconds(headers.get("x-ratelimit-reset"))
+        if status_code == 429:
+            retry_after = _parse_seconds(headers.get("retry-after"))
+            pause = retry_after or reset_seconds or self._default_retry_after_seconds
+            self._not_before = max(self._not_before, now + pause)
+            return
+
+        limit = _parse_int(headers.get("x-ratelimit-limit"))
+        remaining = _parse_int(headers.get("x-ratelimit-remaining"))
+        if remaining is None or reset_seconds is None:
+            return
+        if remaining <= 0:
+            self._not_before = max(self._not_before, now + reset_seconds)
+            self._min_interval = 0.0
+        elif limit is not None and remaining < limit * self._slow_down_fraction:
+            self._min_interval = reset_seconds / remaining
+        else:
+            self._min_interval = 0.0
+
+
+class HttpWahooProviderClient:
+    """`WahooProviderClient` over one pooled `httpx.AsyncClient`.
+
+    Connections are kept alive across athletes, and HTTP/2 is negotiated when the
+    optional `h2` package is installed. For a full fetch, once the first page reports
+    the total, the remaining pages of an athlete's history are fetched concurrently within the
+    per-athlete and global limits, all paced by one `AdaptiveRateLimiter`.
+    """
+
+    def __init__(
+        self,
+        *,
+        base_url: str = DEFAULT_WAHOO_API_BASE_URL,
+        limits: WahooProviderLimits | None = None,
+        rate_limiter: AdaptiveRateLimiter | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        http2: bool | None = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self._limits = limits or WahooProviderLimits()
+        self._rate_limiter = rate_limiter or AdaptiveRateLimiter(sleep=sleep)
+        self._sleep = sleep
+        if http2 is None:
+            http2 = importlib.util.find_spec("h2") is not None
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            http2=http2,
+            transport=transport,
+            timeout=self._limits.timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=self._limits.max_connections,
+                max_keepalive_connections=self._limits.max_keepalive_connections,
+                keepalive_expiry=self._limits.keepalive_expiry_seconds,
+            ),
+        )
+        self._global_slots = asyncio.Semaphore(self._limits.global_concurrency)
+        self._athlete_slots: weakref.WeakValueDictionary[str, asyncio.Semaphore] = (
+            weakref.WeakValueDictionary()
+        )
+        self.request_count = 0
+
+    @property
+    def rate_limiter(self) -> AdaptiveRateLimiter:
+        return self._rate_limiter
+
+    async def __aenter__(self) -> HttpWahooProviderClient:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def fetch_history(
+        self,
+        athlete_id: str,
+        access_token: str,
+        *,
+        started_after: datetime | None = None,
+    ) -> list[WahooProviderActivity]:
+        """Every workout in the athlete's history, oldest first.
+
+        The list endpoint returns workouts newest first and has no start filter. With
+        `started_after`, pages are read in order until one reaches back past that
+        start, so an incremental refresh reads only the pages that hold new workouts.
+        Without it, the remaining pages are fetched concurrently once the first page
+        reports the total.
+        """
+        athlete_slots = self._athlete_slots.get(athlete_id)
+        if athlete_slots is None:
+            athlete_slots = asyncio.Semaphore(self._limits.per_athlete_concurrency)
+            self._athlete_slots[athlete_id] = athlete_slots
+
+        first_page = await self._fetch_page(athlete_slots, access_token, page=1)
+        total = int(first_page.get("total", 0))
+        page_count = max(1, math.ceil(total / self._limits.page_size))
+        later_pages: list[dict[str, Any]]
+        if started_after is None:
+            later_pages = await asyncio.gather(
+                *(
+                    self._fetch_page(athlete_slots, access_token, page=page)
+                    for page in range(2, page_count + 1)
+                )
+            )
+        else:
+            later_pages = []
+            page_body = first_page
+            while not _page_reaches_before(page_body, started_after):
+                if len(later_pages) + 1 >= page_count:
+                    break
+                page_body = await self._fetch_page(
+                    athlete_slots, access_token, page=len(later_pages) + 2
+                )
+                later_pages.append(page_body)
+            page_count = len(later_pages) + 1
+
+        activities: dict[str, WahooProviderActivity] = {}
+        for page_body in (first_page, *later_pages):
+            for workout in page_body.get("workouts", []):
+                activity = _parse_workout(workout)
+                if started_after is None or activity.started_at >= started_after:
+                    activities[activity.external_activity_id] = activity
+        logger.info(
+            "wahoo_provider_history_fetched",
+            extra={
+                "athlete_id": athlete_id,
+                "page_count": page_count,
+                "activity_count": len(activities),
+            },
+        )
+        return sorted(
+            activities.values(),
+            key=lambda activity: (activity.started_at, activity.external_activity_id),
+        )
+
+    async def _fetch_page(
+        self,
+        athlete_slots: asyncio.Semaphore,
+        access_token: str,
+        *,
+        page: int,
+    ) -> dict[str, Any]:
+        attempt = 0
+        while True:
+            async with athlete_slots, self._global_slots:
+                await self._rate_limiter.wait()
+                self.request_count += 1
+                try:
+                    response = await self._client.get(
+                        "/v1/workouts",
+                        params={"page": page, "per_page": self._limits.page_size},
+                        headers={"Authorization": f"Bearer {access_token}"},
+                    )
+                except httpx.TransportError as exc:
+                    failure = WahooProviderError(str(exc), status_code=None, retryable=True)
+                else:
+                    self._rate_limiter.observe(response.status_code, response.headers)
+                    if response.is_success:
+                        body: dict[str, Any] = response.json()
+                        return body
+                    failure = WahooProviderError(
+                        f"Wahoo API returned {response.status_code} for page {page}",
+                        status_code=response.status_code,
+                        retryable=response.status_code == 429 or response.status_code >= 500,
+                    )
+
+            if not failure.retryable or attempt >= self._limits.max_retries:
+                raise failure
+            attempt += 1
+            # 429s already pause every request through the rate limiter.
+            if failure.status_code != 429:
+                await self._sleep(self._limits.retry_base_delay_seconds * 2 ** (attempt - 1))
+
+
+def _page_reaches_before(page_body: Mapping[str, Any], started_after: datetime) -> bool:
+    """Whether a newest-first page holds a workout that started before `started_after`."""
+    workouts = page_body.get("workouts", [])
+    if not workouts:
+        return True
+    return _parse_workout(workouts[-1]).started_at < started_after
+
+
+def _parse_workout(workout: Mapping[str, Any]) -> WahooProviderActivity:
+    started_at = datetime.fromisoformat(str(workout["starts"]).replace("Z", "+00:00"))
+    summary = workout.get("workout_summary") or {}
+    duration_total = summary.get("duration_total_accum")
+    duration_seconds = (
+        round(float(duration_total))
+        if duration_total is not None
+        else int(workout.get("minutes", 0)) * 60
+    )
+    # Unplanned rides have no plan; the workout id keeps the link key unique.
+    plan_id = workout.get("plan_id")
+    return WahooProviderActivity(
+        external_activity_id=f"wahoo-activity-{workout['id']}",
+        external_workout_id=str(plan_id) if plan_id is not None else f"wahoo-ride-{workout['id']}",
+        started_at=started_at.astimezone(UTC),
+        duration_seconds=max(1, duration_seconds),
+    )
+
+
+def _parse_seconds(raw_value: str | None) -> float | None:
+    if raw_value is None:
+        return None
+    try:
+        value = float(raw_value)
+    except ValueError:
+        return None
+    return value if value > 0 else None
+
+
+def _parse_int(raw_value: str | None) -> int | None:
+    if raw_value is None:
+        return None
+    try:
+        return int(raw_value)
+    except ValueError:
+        return None
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Literal
+
+from sportolo.api.schemas.wahoo_integration import WahooAthleteTargets, WahooWorkoutStep
+from sportolo.services.fingerprint_service import fingerprint_json
+
+# Bumping the format version changes every template id, so stale plans are never reused.
+WAHOO_PLAN_FORMAT_VERSION = "1.0.0"
+DEFAULT_TEMPLATE_CACHE_SIZE = 512
+
+WahooThreshold = Literal["ftp", "threshold_pace"]
+
+_INTENSITY_TYPES = {
+    "warmup": "wu",
+    "interval": "active",
+    "recovery": "recover",
+    "cooldown": "cd",
+    "steady": "active",
+}
+# Step units bound per athlete: the threshold they scale and the provider target type.
+_RELATIVE_TARGET_UNITS: dict[str, tuple[WahooThreshold, str]] = {
+    "percent_ftp": ("ftp", "watts"),
+    "percent_threshold_pace": ("threshold_pace", "seconds_per_km"),
+}
+_ABSOLUTE_TARGET_TYPES = {
+    "power": "watts",
+    "pace": "seconds_per_km",
+    "heart_rate": "bpm",
+    "cadence": "rpm",
+}
+
+_TemplateKey = tuple[str, tuple[tuple[str, int, str, float, str], ...]]
+
+
+@dataclass(frozen=True)
+class _TemplateInterval:
+    """A provider interval, pre-serialized up to the target value when that is bound."""
+
+    serialized: bytes
+    relative_to: WahooThreshold | None = None
+    percent: float = 0.0
+
+
+@dataclass(frozen=True)
+class CompiledWahooWorkoutTemplate:
+    """A structured workout compiled once into the Wahoo plan format.
+
+    Intervals with absolute targets are fully serialized at compile time. Intervals
+    with `percent_ftp` or `percent_threshold_pace` targets keep everything but the
+    target value, which `bind` fills from the athlete's thresholds.
+    """
+
+    template_id: str
+    step_count: int
+    total_duration_seconds: int
+    required_thresholds: frozenset[WahooThreshold]
+    _header: bytes
+    _intervals: tuple[_TemplateInterval, ...]
+
+    def bind(self, athlete_targets: WahooAthleteTargets | None) -> bytes:
+        """The provider plan payload with this athlete's targets filled in."""
+        thresholds: dict[WahooThreshold, float] = {}
+        if athlete_targets is not None:
+            if athlete_targets.ftp_watts is not None:
+                thresholds["ftp"] = athlete_targets.ftp_watts
+            if athlete_targets.threshold_pace_seconds_per_km is not None:
+                thresholds["threshold_pace"] = athlete_targets.threshold_pace_seconds_per_km
+        missing = self.required_thresholds - thresholds.keys()
+        if missing:
+            raise ValueError(
+                f"workout targets require athlete thresholds: {', '.join(sorted(missing))}"
+            )
+
+        parts = [self._header]
+        for interval in self._intervals:
+            if interval.relative_to is None:
+                parts.append(interval.serialized)
+            else:
+                value = _scale_target(interval.relative_to, interval.percent, thresholds)
+                parts.append(interval.serialized + b"%d}]}" % value)
+        return b'{"header":' + parts[0] + b',"intervals":[' + b",".join(parts[1:]) + b"]}"
+
+
+@dataclass(frozen=True)
+class WahooWorkoutTemplateCacheMetrics:
+    hit_count: int
+    miss_count: int
+    eviction_count: int
+    entry_count: int
+
+
+class WahooWorkoutTemplateCache:
+    """LRU cache of compiled workout templates, shared by every athlete's pushes.
+
+    The lookup key is the workout name and the raw step tuples, which is cheap to hash;
+    the SHA-256 content hash that becomes the template id is only computed on a miss.
+    """
+
+    def __init__(self, *, max_entries: int = DEFAULT_TEMPLATE_CACHE_SIZE) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._reset_state()
+
+    def _reset_state(self) -> None:
+        self._templates: OrderedDict[_TemplateKey, CompiledWahooWorkoutTemplate] = OrderedDict()
+        self._hit_count = 0
+        self._miss_count = 0
+        self._eviction_count = 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._reset_state()
+
+    def get_or_compile(
+        self,
+        workout_name: str,
+        steps: Sequence[WahooWorkoutStep],
+    ) -> CompiledWahooWorkoutTemplate:
+        key: _TemplateKey = (
+            workout_name,
+            tuple(
+                (
+                    step.step_type,
+                    step.duration_seconds,
+                    step.target_type,
+                    step.target_value,
+                    step.target_unit,
+                )
+                for step in steps
+            ),
+        )
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self._templates.move_to_end(key)
+                self._hit_count += 1
+                return template
+            self._miss_count += 1
+
+        template = compile_workout_template(workout_name, steps)
+        with self._lock:
+            self._templates[key] = template
+            self._templates.move_to_end(key)
+            while len(self._templates) > self._max_entries:
+                self._templates.popitem(last=False)
+                self._eviction_count += 1
+        return template
+
+    def metrics_snapshot(self) -> WahooWorkoutTemplateCacheMetrics:
+        with self._lock:
+            return WahooWorkoutTemplateCacheMetrics(
+                hit_count=self._hit_count,
+                miss_count=self._miss_count,
+                eviction_count=self._eviction_count,
+                entry_count=len(self._templates),
+            )
+
+
+def compile_workout_template(
+    workout_name: str,
+    steps: Sequence[WahooWorkoutStep],
+) -> CompiledWahooWorkoutTemplate:
+    canonical_steps = [
+        {
+            "stepType": step.step_type,
+            "durationSeconds": step.duration_seconds,
+            "targetType": step.target_type,
+            "targetValue": step.target_value,
+            "targetUnit": step.target_unit,
+        }
+        for step in steps
+    ]
+    content_hash = fingerprint_json(
+        {
+            "formatVersion": WAHOO_PLAN_FORMAT_VERSION,
+            "workoutName": workout_name,
+            "steps": canonical_steps,
+        }
+    )
+    total_duration_seconds = sum(step.duration_seconds for step in steps)
+
+    intervals: list[_TemplateInterval] = []
+    required_thresholds: set[WahooThreshold] = set()
+    for index, step in enumerate(steps, start=1):
+        interval_prefix = {
+            "name": f"{step.step_type.capitalize()} {index}",
+            "exit_trigger_type": "time",
+            "exit_trigger_value": step.duration_seconds,
+            "intensity_type": _INTENSITY_TYPES[step.step_type],
+        }
+        relative = _RELATIVE_TARGET_UNITS.get(step.target_unit)
+        if relative is None:
+            target = {
+                "type": _ABSOLUTE_TARGET_TYPES[step.target_type],
+                "value": step.target_value,
+            }
+            serialized = _compact_json({**interval_prefix, "targets": [target]})
+            intervals.append(_TemplateInterval(serialized=serialized))
+            continue
+
+        threshold, provider_type = relative
+        required_thresholds.add(threshold)
+        # Serialize with an empty target list, then reopen it to leave the value unbound.
+        serialized = _compact_json({**interval_prefix, "targets": []})[: -len(b"]}")]
+        intervals.append(
+            _TemplateInterval(
+                serialized=serialized + b'{"type":"%s","value":' % provider_type.encode(),
+                relative_to=threshold,
+                percent=step.target_value,
+            )
+        )
+
+    header = _compact_json(
+        {
+            "name": workout_name,
+            "version": WAHOO_PLAN_FORMAT_VERSION,
+            "template_id": content_hash,
+            "duration_s": total_duration_seconds,
+        }
+    )
+    return CompiledWahooWorkoutTemplate(
+        template_id=f"wahoo-template-{content_hash[:16]}",
+        step_count=len(steps),
+        total_duration_seconds=total_duration_seconds,
+        required_thresholds=frozenset(required_thresholds),
+        _header=header,
+        _intervals=tuple(intervals),
+    )
+
+
+def _scale_target(
+    threshold: WahooThreshold,
+    percent: float,
+    thresholds: dict[WahooThreshold, float],
+) -> int:
+    if threshold == "threshold_pace":
+        # Pace percentages are of threshold speed, so 105 is faster than threshold.
+        return round(thresholds[threshold] * 100 / percent)
+    return round(thresholds[threshold] * percent / 100)
+
+
+def _compact_json(value: object) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import signal
+import sys
+import threading
+from collections.abc import Sequence
+from types import FrameType
+from typing import cast, get_args
+
+from sportolo.api.dependencies import get_background_job_queue
+from sportolo.config import get_settings
+from sportolo.database import build_session_factory, create_database_engine
+from sportolo.services.background_job_queue_service import (
+    BackgroundJobHandler,
+    BackgroundJobPipeline,
+)
+from sportolo.services.background_worker_service import (
+    BackgroundWorkerConfig,
+    BackgroundWorkerPool,
+)
+from sportolo.services.fatigue_snapshot_service import (
+    FatigueSnapshotService,
+    SqlFatigueHistorySource,
+)
+
+_PIPELINES = cast(tuple[BackgroundJobPipeline, ...], get_args(BackgroundJobPipeline))
+# Wahoo access tokens and integration state live in the API process, so its in-process
+# worker runs `wahoo_bulk_sync` jobs; this process would find no token for any athlete.
+_WORKER_PIPELINES: frozenset[BackgroundJobPipeline] = frozenset(_PIPELINES) - {"wahoo_bulk_sync"}
+
+
+def build_process_handlers() -> dict[BackgroundJobPipeline, BackgroundJobHandler]:
+    # Each worker process opens its own engine; pooled connections must not be shared
+    # across a fork.
+    engine = create_database_engine(get_settings().database_url)
+    session_factory = build_session_factory(engine)
+    service = FatigueSnapshotService(
+        session_factory=session_factory,
+        history_source=SqlFatigueHistorySource(session_factory=session_factory),
+    )
+    return {"fatigue_recompute": service.handle_recompute_job}
+
+
+def _parse_pipeline_limit(raw_value: str) -> tuple[BackgroundJobPipeline, int]:
+    pipeline, separator, limit = raw_value.partition("=")
+    if not separator or pipeline not in _WORKER_PIPELINES or not limit.isdigit() or int(limit) < 1:
+        raise argparse.ArgumentTypeError(
+            f"expected PIPELINE=N with PIPELINE in {', '.join(sorted(_WORKER_PIPELINES))} "
+            "and N >= 1"
+        )
+    return pipeline, int(limit)
+
+
+def _parse_args(argv: Sequence[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run a background job worker against the shared SQL job queue."
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=get_settings().background_worker_concurrency,
+        help="Thread pool size for IO-bound handlers.",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=0,
+        help="Process pool size for CPU-bound fatigue recompute (0 runs it on threads).",
+    )
+    parser.add_argument(
+        "--pipeline-limit",
+        type=_parse_pipeline_limit,
+        action="append",
+        default=[],
+        metavar="PIPELINE=N",
+        help="Maximum concurrent jobs for a pipeline; may be repeated.",
+    )
+    parser.add_argument("--backlog-high-watermark", type=int, default=None)
+    parser.add_argument("--backlog-low-watermark", type=int, default=None)
+    parser.add_argument(
+        "--shutdown-timeout",
+        type=float,
+        default=30.0,
+        help="Seconds to wait for in-flight jobs on SIGTERM/SIGINT.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = _parse_args(argv)
+    settings = get_settings()
+    if settings.background_job_queue_backend != "sql":
+        print(
+            "The worker needs a shared queue; set SPORTOLO_BACKGROUND_JOB_QUEUE_BACKEND=sql.",
+            file=sys.stderr,
+        )
+        return 2
+    if settings.fatigue_history_backend != "sql":
+        # An in-memory history in this process would never see the API's imports, so
+        # every recompute would materialize zero-load snapshots.
+        print(
+            "The worker needs the shared fatigue history; "
+            "set SPORTOLO_FATIGUE_HISTORY_BACKEND=sql.",
+            file=sys.stderr,
+        )
+        return 2
+
+    logging.basicConfig(level=logging.INFO)
+    config = BackgroundWorkerConfig(
+        thread_workers=args.threads,
+        process_workers=args.processes,
+        pipelines=_WORKER_PIPELINES,
+        pipeline_concurrency=dict(args.pipeline_limit),
+        backlog_high_watermark=args.backlog_high_watermark,
+        backlog_low_watermark=args.backlog_low_watermark,
+    )
+    pool = BackgroundWorkerPool(
+        get_background_job_queue(),
+        config,
+        process_handler_factory=build_process_handlers if args.processes > 0 else None,
+    )
+
+    stop_requested = threading.Event()
+
+    def request_stop(signum: int, frame: FrameType | None) -> None:
+        del signum, frame
+        stop_requested.set()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    pool.start()
+    stop_requested.wait()
+    pool.stop(timeout=args.shutdown_timeout)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,6 +3,15 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 
+import pytest
+
 BACKEND_SRC = Path(__file__).resolve().parents[1] / "src"
 if str(BACKEND_SRC) not in sys.path:
     sys.path.insert(0, str(BACKEND_SRC))
+
+
+@pytest.fixture(autouse=True)
+def _reset_computation_cache() -> None:
+    from sportolo.api.dependencies import get_computation_cache
+
+    get_computation_cache().reset_for_testing()
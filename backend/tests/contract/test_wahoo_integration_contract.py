@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 from datetime import UTC, datetime, timedelta
 
 from fastapi.testclient import TestClient
@@ -10,6 +11,7 @@ from sportolo.main import app
 PUSH_ENDPOINT = "/v1/athletes/athlete-1/integrations/wahoo/workouts/push"
 SYNC_ENDPOINT = "/v1/athletes/athlete-1/integrations/wahoo/execution-history/sync"
 CONTROL_ENDPOINT = "/v1/athletes/athlete-1/integrations/wahoo/trainers/control"
+SYNCS_ENDPOINT = "/v1/athletes/athlete-1/integrations/wahoo/execution-history/syncs"
 
 
 def _push_payload(
@@ -286,6 +288,52 @@ def test_wahoo_sync_contract_reconciles_history_and_is_idempotent() -> None:
     assert duplicate_body["pipelineDispatches"] == []
 
 
+def test_wahoo_sync_contract_streams_ndjson_and_pages_completed_syncs() -> None:
+    client = TestClient(app)
+    for index in range(3):
+        client.post(
+            PUSH_ENDPOINT,
+            json=_push_payload(
+                idempotency_key=f"contract-push-stream-{index}",
+                planned_workout_id=f"planned-{index}",
+                planned_start_at=(
+                    datetime(2026, 2, 21, 6, 0, tzinfo=UTC) + timedelta(days=index)
+                ).isoformat(),
+            ),
+        )
+
+    streamed = client.post(
+        SYNC_ENDPOINT,
+        json={"idempotencyKey": "contract-sync-stream"},
+        headers={"Accept": "application/x-ndjson"},
+    )
+    assert streamed.status_code == 200
+    assert streamed.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in streamed.text.splitlines()]
+    assert [line["type"] for line in lines] == ["page", "summary"]
+    assert len(lines[0]["page"]["entries"]) == 3
+    summary = lines[-1]["summary"]
+    assert summary["entryCount"] == 3
+    assert summary["dispatchCount"] == 6
+
+    replayed_summary = client.post(
+        f"{SYNC_ENDPOINT}?view=summary", json={"idempotencyKey": "contract-sync-stream"}
+    )
+    assert replayed_summary.json() == summary
+
+    first_page = client.get(f"{SYNCS_ENDPOINT}/{summary['syncId']}/entries?limit=2").json()
+    second_page = client.get(
+        f"{SYNCS_ENDPOINT}/{summary['syncId']}/entries",
+        params={"limit": 2, "cursor": first_page["nextCursor"]},
+    ).json()
+    assert [len(first_page["entries"]), len(second_page["entries"])] == [2, 1]
+    assert second_page["nextCursor"] is None
+    assert [entry["plannedWorkoutId"] for entry in second_page["entries"]] == ["planned-2"]
+
+    unknown = client.get(f"{SYNCS_ENDPOINT}/wahoo-sync-999999/entries")
+    assert unknown.status_code == 422
+
+
 def test_wahoo_integration_openapi_metadata_matches_contract() -> None:
     openapi = app.openapi()
     push_operation = openapi["paths"]["/v1/athletes/{athleteId}/integrations/wahoo/workouts/push"][
@@ -313,3 +361,6 @@ def test_wahoo_integration_openapi_metadata_matches_contract() -> None:
     assert control_operation["responses"]["422"]["content"]["application/json"]["schema"] == {
         "$ref": "#/components/schemas/ValidationError"
     }
+    assert control_operation["responses"]["429"]["content"]["application/json"]["schema"] == {
+        "$ref": "#/components/schemas/RetryLaterError"
+    }
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import json
+import time
 from datetime import UTC, datetime
 
 from fastapi.testclient import TestClient
 
-from sportolo.api.dependencies import get_background_job_queue
+from sportolo.api.dependencies import (
+    get_background_job_queue,
+    get_wahoo_access_token_source,
+    get_wahoo_bulk_sync_orchestrator,
+)
 from sportolo.api.routes.wahoo_integration import service as wahoo_service
 from sportolo.main import app
 from sportolo.services.background_job_queue_service import BackgroundJobExecutionError
@@ -12,6 +18,9 @@ from sportolo.services.background_job_queue_service import BackgroundJobExecutio
 PUSH_ENDPOINT = "/v1/athletes/athlete-1/integrations/wahoo/workouts/push"
 SYNC_ENDPOINT = "/v1/athletes/athlete-1/integrations/wahoo/execution-history/sync"
 METRICS_ENDPOINT = "/v1/system/background-jobs/metrics"
+PROMETHEUS_ENDPOINT = "/v1/system/background-jobs/metrics/prometheus"
+REDRIVE_ENDPOINT = "/v1/system/background-jobs/dead-letters/redrive"
+BULK_SYNC_ENDPOINT = "/v1/system/wahoo/bulk-sync-runs"
 
 
 def _push_payload(*, idempotency_key: str, planned_workout_id: str) -> dict[str, object]:
@@ -44,6 +53,8 @@ def setup_function() -> None:
     queue = get_background_job_queue()
     queue.reset_for_testing()
     wahoo_service.reset_for_testing()
+    get_wahoo_bulk_sync_orchestrator().reset_for_testing()
+    get_wahoo_access_token_source().reset()
 
 
 def test_sync_jobs_retry_and_duplicate_suppression_are_observable() -> None:
@@ -84,7 +95,12 @@ def test_sync_jobs_retry_and_duplicate_suppression_are_observable() -> None:
     assert before_processing.status_code == 200
     assert before_processing.json()["data"]["queueDepth"] == 2
 
+    # The retry waits out a jittered backoff of at most the default one-second base delay.
     processed = queue.process_until_idle()
+    deadline = time.monotonic() + 5
+    while len(processed) < 3 and time.monotonic() < deadline:
+        time.sleep(0.05)
+        processed.extend(queue.process_until_idle())
     assert len(processed) == 3
 
     after_processing = client.get(METRICS_ENDPOINT)
@@ -94,6 +110,24 @@ def test_sync_jobs_retry_and_duplicate_suppression_are_observable() -> None:
     assert metrics["retryCount"] == 1
     assert metrics["succeededCount"] == 2
     assert metrics["failedAttemptCount"] == 1
+    pipelines = {item["pipeline"]: item for item in metrics["pipelines"]}
+    assert pipelines["workout_sync"]["retryCount"] == 1
+    assert pipelines["workout_sync"]["processingLatency"]["count"] == 2
+    assert pipelines["fatigue_recompute"]["queueWait"]["count"] == 1
+    assert {"p50Ms", "p95Ms", "p99Ms"} <= set(pipelines["fatigue_recompute"]["queueWait"])
+    assert [window["windowSeconds"] for window in pipelines["workout_sync"]["throughput"]] == [
+        60,
+        300,
+        900,
+    ]
+
+    prometheus = client.get(PROMETHEUS_ENDPOINT)
+    assert prometheus.status_code == 200
+    assert prometheus.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert (
+        'sportolo_background_job_queue_wait_seconds_count{pipeline="workout_sync"} 2'
+        in prometheus.text
+    )
 
     duplicate_sync = client.post(SYNC_ENDPOINT, json={"idempotencyKey": "integration-sync-2"})
     assert duplicate_sync.status_code == 200
@@ -102,3 +136,108 @@ def test_sync_jobs_retry_and_duplicate_suppression_are_observable() -> None:
     final_metrics = client.get(METRICS_ENDPOINT)
     assert final_metrics.status_code == 200
     assert final_metrics.json()["data"]["totalEnqueuedCount"] == 2
+
+
+def test_dead_letter_redrive_streams_progress_and_requeues_matching_jobs() -> None:
+    client = TestClient(app)
+    queue = get_background_job_queue()
+
+    def unavailable_provider(_: object) -> None:
+        raise BackgroundJobExecutionError(
+            code="PROVIDER_UNAVAILABLE",
+            message="provider returned 503",
+            retryable=False,
+        )
+
+    queue.register_handler("workout_sync", unavailable_provider)
+    queue.register_handler("fatigue_recompute", lambda _: None)
+    push = client.post(
+        PUSH_ENDPOINT,
+        json=_push_payload(idempotency_key="integration-redrive-push", planned_workout_id="a"),
+    )
+    assert push.status_code == 200
+    sync = client.post(SYNC_ENDPOINT, json={"idempotencyKey": "integration-redrive-sync"})
+    assert sync.status_code == 200
+    queue.process_until_idle()
+    assert len(queue.list_dead_letters()) == 1
+
+    unmatched = client.post(REDRIVE_ENDPOINT, json={"errorCode": "SYNC_TIMEOUT"})
+    assert unmatched.status_code == 200
+    assert [json.loads(line)["done"] for line in unmatched.text.splitlines()] == [True]
+
+    invalid = client.post(REDRIVE_ENDPOINT, json={"attemptBudget": 0})
+    assert invalid.status_code == 422
+
+    response = client.post(
+        REDRIVE_ENDPOINT,
+        json={"pipeline": "workout_sync", "errorCode": "PROVIDER_UNAVAILABLE", "batchSize": 1},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    progress = [json.loads(line) for line in response.text.splitlines()]
+    assert [item["done"] for item in progress] == [False, True]
+    assert progress[-1]["redrivenCount"] == 1
+    assert queue.list_dead_letters() == []
+
+    queue.register_handler("workout_sync", lambda _: None)
+    assert "succeeded" in {outcome.status for outcome in queue.process_until_idle()}
+
+
+def test_bulk_sync_run_is_processed_by_the_wahoo_bulk_sync_pipeline() -> None:
+    client = TestClient(app)
+    queue = get_background_job_queue()
+
+    started = client.post(
+        BULK_SYNC_ENDPOINT,
+        json={
+            "runId": "nightly-integration",
+            "athleteIds": ["athlete-1", "athlete-2", "athlete-3"],
+            "shardCount": 2,
+        },
+    )
+    assert started.status_code == 200
+    run = started.json()["data"]
+    assert run["athleteCount"] == 3
+    assert 1 <= len(run["shardJobIds"]) <= 2
+
+    pending = client.get(f"{BULK_SYNC_ENDPOINT}/nightly-integration/metrics").json()["data"]
+    assert pending["pendingCount"] == 3
+    assert pending["done"] is False
+
+    while queue.process_next() is not None:
+        pass
+
+    # No athlete has a stored Wahoo token here, so each is checkpointed as skipped.
+    finished = client.get(f"{BULK_SYNC_ENDPOINT}/nightly-integration/metrics").json()["data"]
+    assert finished["skippedCount"] == 3
+    assert finished["done"] is True
+    assert finished["finishedAt"] is not None
+    snapshot = queue.metrics_snapshot()
+    assert snapshot.succeeded_count == len(run["shardJobIds"])
+    assert set(snapshot.pipelines) == {"wahoo_bulk_sync"}
+
+    missing = client.get(f"{BULK_SYNC_ENDPOINT}/unknown-run/metrics")
+    assert missing.status_code == 422
+
+
+def test_bulk_sync_run_defaults_to_athletes_connected_through_the_api() -> None:
+    client = TestClient(app)
+    for athlete_id in ("athlete-1", "athlete-2"):
+        connected = client.put(
+            f"/v1/athletes/{athlete_id}/integrations/wahoo/connection",
+            json={"accessToken": f"token-{athlete_id}"},
+        )
+        assert connected.status_code == 204
+    assert client.delete("/v1/athletes/athlete-2/integrations/wahoo/connection").status_code == 204
+    assert (
+        client.put(
+            "/v1/athletes/athlete-3/integrations/wahoo/connection", json={"accessToken": ""}
+        ).status_code
+        == 422
+    )
+
+    started = client.post(BULK_SYNC_ENDPOINT, json={"runId": "connected-only"})
+
+    assert started.status_code == 200
+    assert started.json()["data"]["athleteCount"] == 1
+    assert get_wahoo_access_token_source().access_token_for("athlete-1") == "token-athlete-1"
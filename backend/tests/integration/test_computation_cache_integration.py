@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from sportolo.api.dependencies import get_today_accumulation_service
+from sportolo.api.schemas.fatigue_today import (
+    TodayAccumulationRequest,
+    TodayAccumulationResponse,
+)
+from sportolo.main import app
+
+TODAY_ENDPOINT = "/v1/athletes/athlete-1/fatigue/today/accumulation"
+METRICS_ENDPOINT = "/v1/system/computation-cache/metrics"
+
+
+def _today_payload() -> dict[str, object]:
+    return {
+        "asOf": "2026-02-20T15:00:00Z",
+        "timezone": "America/New_York",
+        "sessions": [
+            {
+                "sessionId": "session-1",
+                "state": "completed",
+                "endedAt": "2026-02-19T15:00:00Z",
+                "fatigueAxes": {
+                    "neural": 3.0,
+                    "metabolic": 4.0,
+                    "mechanical": 2.5,
+                    "recruitment": 3.5,
+                },
+            }
+        ],
+    }
+
+
+def test_repeat_dashboard_requests_are_served_from_cache_with_etag_validation() -> None:
+    client = TestClient(app)
+    compute_calls = 0
+    service = get_today_accumulation_service()
+
+    class CountingTodayAccumulationService:
+        def compute_today_accumulation(
+            self, request: TodayAccumulationRequest
+        ) -> TodayAccumulationResponse:
+            nonlocal compute_calls
+            compute_calls += 1
+            return service.compute_today_accumulation(request)
+
+    app.dependency_overrides[get_today_accumulation_service] = CountingTodayAccumulationService
+    try:
+        first = client.post(TODAY_ENDPOINT, json=_today_payload())
+        second = client.post(TODAY_ENDPOINT, json=_today_payload())
+        not_modified = client.post(
+            TODAY_ENDPOINT,
+            json=_today_payload(),
+            headers={"If-None-Match": first.headers["etag"]},
+        )
+        other_athlete = client.post(
+            "/v1/athletes/athlete-2/fatigue/today/accumulation",
+            json=_today_payload(),
+        )
+        uncached_wildcard = client.post(
+            "/v1/athletes/athlete-3/fatigue/today/accumulation",
+            json=_today_payload(),
+            headers={"If-None-Match": "*"},
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert second.headers["etag"] == first.headers["etag"]
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    # Another athlete's entry is computed separately, but an identical body shares the
+    # body-derived ETag.
+    assert other_athlete.headers["etag"] == first.headers["etag"]
+    assert uncached_wildcard.status_code == 200
+    assert uncached_wildcard.json() == first.json()
+    assert compute_calls == 3
+
+    metrics = client.get(METRICS_ENDPOINT)
+    assert metrics.status_code == 200
+    body = metrics.json()["data"]
+    assert body["lookupCount"] == 5
+    assert body["localHitCount"] == 2
+    assert body["missCount"] == 3
+    assert body["notModifiedCount"] == 1
+
+
+def test_cached_routes_still_reject_invalid_payloads() -> None:
+    client = TestClient(app)
+    payload = _today_payload()
+    payload["timezone"] = "Mars/Olympus"
+
+    response = client.post(TODAY_ENDPOINT, json=payload)
+
+    assert response.status_code == 422
+    assert "etag" not in response.headers
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+from fastapi.testclient import TestClient
+
+from sportolo.api.dependencies import get_background_job_queue, get_fatigue_history_source
+from sportolo.api.routes.wahoo_integration import service as wahoo_service
+from sportolo.api.schemas.axis_scoring import AxisRawLoad, AxisSessionInput
+from sportolo.main import app
+from sportolo.services.fatigue_snapshot_service import FatigueSessionRecord
+
+ATHLETE_ID = "athlete-snapshots"
+PUSH_ENDPOINT = f"/v1/athletes/{ATHLETE_ID}/integrations/wahoo/workouts/push"
+SYNC_ENDPOINT = f"/v1/athletes/{ATHLETE_ID}/integrations/wahoo/execution-history/sync"
+SNAPSHOTS_ENDPOINT = f"/v1/athletes/{ATHLETE_ID}/fatigue/snapshots"
+
+
+def setup_function() -> None:
+    get_background_job_queue().reset_for_testing()
+    get_fatigue_history_source().reset()
+    wahoo_service.reset_for_testing()
+
+
+def test_imported_activity_recompute_job_materializes_snapshots_for_calendar_reads() -> None:
+    client = TestClient(app)
+    get_fatigue_history_source().record_session(
+        ATHLETE_ID,
+        FatigueSessionRecord(
+            session=AxisSessionInput(
+                session_id="ride-1",
+                state="completed",
+                ended_at=datetime(2026, 1, 3, 7, 30, tzinfo=UTC),
+                raw_load=AxisRawLoad(neural=12, metabolic=28, mechanical=9),
+            ),
+            regional_distribution={"lower_body": 0.8, "core": 0.2},
+        ),
+    )
+
+    push = client.post(
+        PUSH_ENDPOINT,
+        json={
+            "idempotencyKey": "snapshot-push-1",
+            "plannedWorkoutId": "planned-ride",
+            "trainerId": "kickr-bike-001",
+            "workoutName": "Sweet spot",
+            "plannedStartAt": "2026-01-03T06:00:00Z",
+            "steps": [
+                {
+                    "stepType": "interval",
+                    "durationSeconds": 5400,
+                    "targetType": "power",
+                    "targetValue": 240,
+                    "targetUnit": "watts",
+                }
+            ],
+        },
+    )
+    sync = client.post(SYNC_ENDPOINT, json={"idempotencyKey": "snapshot-sync-1"})
+    assert push.status_code == 200
+    assert sync.status_code == 200
+    recompute_dispatch = next(
+        dispatch
+        for dispatch in sync.json()["pipelineDispatches"]
+        if dispatch["pipeline"] == "fatigue_recompute"
+    )
+    assert recompute_dispatch["activityStartedAt"] == "2026-01-03T06:00:00Z"
+    history = get_fatigue_history_source().list_sessions(
+        ATHLETE_ID,
+        ended_after=datetime(2026, 1, 1, tzinfo=UTC),
+        ended_before=datetime(2026, 1, 31, tzinfo=UTC),
+    )
+    imported_ids = {entry["externalActivityId"] for entry in sync.json()["entries"]}
+    assert {record.session.session_id for record in history} == {"ride-1", *imported_ids}
+
+    outcomes = get_background_job_queue().process_until_idle()
+    assert [outcome.status for outcome in outcomes] == ["succeeded", "succeeded"]
+
+    response = client.get(
+        SNAPSHOTS_ENDPOINT,
+        params={"startDate": "2026-01-01", "endDate": "2026-01-31"},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["athleteId"] == ATHLETE_ID
+    dates = [snapshot["snapshotDate"] for snapshot in body["snapshots"]]
+    assert dates[0] == "2026-01-03"
+    assert dates == sorted(dates)
+    assert len(dates) == 29
+    first_day = body["snapshots"][0]
+    assert first_day["globalMetabolic"] > 1.0
+    assert set(first_day["regionalMetabolic"]) == {"core", "lower_body"}
+    assert first_day["systemCapacity"] == {"sleep": None, "fuel": 3, "stress": 3}
+
+
+def test_snapshot_reads_reject_inverted_ranges() -> None:
+    client = TestClient(app)
+
+    response = client.get(
+        SNAPSHOTS_ENDPOINT,
+        params={"startDate": "2026-02-10", "endDate": "2026-02-01"},
+    )
+
+    assert response.status_code == 422
+    assert response.json()["code"] == "DSL_VALIDATION_ERROR"
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from collections.abc import Sequence
+from datetime import date
 from pathlib import Path
 
 from alembic import command
@@ -8,9 +9,11 @@ from alembic.config import Config
 from alembic.script import ScriptDirectory
 from sqlalchemy import create_engine, inspect, select, text
 from sqlalchemy.engine import Engine
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 
 from sportolo.models.fatigue_snapshot import FatigueSnapshot
+from sportolo.repositories.fatigue_snapshot_repository import FatigueSnapshotRepository
+from sportolo.services.sql_background_job_queue_service import SqlBackgroundJobQueue
 from sportolo.testing.migration_seed import (
     DEFAULT_FATIGUE_SNAPSHOT_SEEDS,
     reset_and_seed_fatigue_snapshots,
@@ -143,3 +146,91 @@ def test_migration_seed_fixture_strategy_is_repeatable(tmp_path: Path) -> None:
     assert first_seed_ids == second_seed_ids
     assert [seed.snapshot_id for seed in DEFAULT_FATIGUE_SNAPSHOT_SEEDS] == first_seed_ids
     assert second_rows == first_rows
+
+
+def test_regional_axis_migration_backfills_columnar_rows_from_json(tmp_path: Path) -> None:
+    database_path = tmp_path / "migration-regional-backfill.db"
+    database_url = f"sqlite+pysqlite:///{database_path}"
+    config = _build_config(database_url)
+
+    command.upgrade(config, "0003_sprt26")
+    engine = create_engine(database_url, future=True)
+    try:
+        reset_and_seed_fatigue_snapshots(engine)
+        command.upgrade(config, "head")
+
+        with Session(engine) as session:
+            series = FatigueSnapshotRepository(session).list_region_series(
+                athlete_id="athlete-seed-001",
+                region="legs",
+                start_date=date(2026, 2, 1),
+                end_date=date(2026, 2, 28),
+            )
+        with engine.connect() as connection:
+            region_keys = connection.execute(
+                text("SELECT region_key FROM fatigue_regions ORDER BY region_key")
+            ).scalars()
+            assert list(region_keys) == ["legs", "upper"]
+    finally:
+        engine.dispose()
+
+    assert [
+        (point.snapshot_date, point.recruitment, point.metabolic, point.mechanical)
+        for point in series
+    ] == [
+        (date(2026, 2, 1), 6.4, 5.1, 6.7),
+        (date(2026, 2, 2), 5.2, 6.2, 5.9),
+    ]
+
+
+def test_metric_rollup_migration_backfills_counters_from_existing_rows(tmp_path: Path) -> None:
+    database_path = tmp_path / "migration-metric-rollups.db"
+    database_url = f"sqlite+pysqlite:///{database_path}"
+    config = _build_config(database_url)
+
+    command.upgrade(config, "0010_sprt26")
+    engine = create_engine(database_url, future=True)
+    try:
+        with engine.begin() as connection:
+            for job_id, status in (("job-1", "succeeded"), ("job-2", "queued")):
+                connection.execute(
+                    text(
+                        "INSERT INTO background_jobs (job_id, athlete_id, pipeline, "
+                        "idempotency_key, correlation_id, payload, payload_fingerprint, status, "
+                        "attempt_count, max_attempts, retry_delay_seconds, serialized, "
+                        "coalesced_request_count, enqueued_at, available_at) VALUES (:job_id, "
+                        "'athlete-1', 'workout_sync', :job_id, :job_id, '{}', 'fp', :status, "
+                        "1, 3, 0, 0, 0, '2026-03-01 10:00:00', '2026-03-01 10:00:00')"
+                    ),
+                    {"job_id": job_id, "status": status},
+                )
+            for attempt_number, status, latency_ms in (
+                (1, "retry_scheduled", 4.0),
+                (2, "succeeded", 40.0),
+            ):
+                connection.execute(
+                    text(
+                        "INSERT INTO background_job_attempts (job_id, attempt_number, "
+                        "started_at, finished_at, latency_ms, queue_wait_ms, status) VALUES "
+                        "('job-1', :attempt_number, '2026-03-01 10:00:00', "
+                        "'2026-03-01 10:00:01', :latency_ms, 3.0, :status)"
+                    ),
+                    {
+                        "attempt_number": attempt_number,
+                        "status": status,
+                        "latency_ms": latency_ms,
+                    },
+                )
+        command.upgrade(config, "head")
+
+        queue = SqlBackgroundJobQueue(session_factory=sessionmaker(bind=engine))
+        metrics = queue.metrics_snapshot()
+    finally:
+        engine.dispose()
+
+    assert (metrics.total_enqueued_count, metrics.queue_depth) == (2, 1)
+    sync = metrics.pipelines["workout_sync"]
+    assert (sync.processed_attempt_count, sync.succeeded_count, sync.retry_count) == (2, 1, 1)
+    assert sync.processing_latency.sum_ms == 44.0
+    assert sync.processing_latency.max_ms == 40.0
+    assert sync.queue_wait.count == 2
@@ -2,12 +2,17 @@ from __future__ import annotations
 
 from datetime import UTC, datetime
 
+from fastapi.testclient import TestClient
+
+from sportolo.api.dependencies import get_wahoo_control_service
 from sportolo.api.schemas.wahoo_integration import (
     WahooControlMode,
     WahooTrainerControlRequest,
 )
+from sportolo.main import app
 from sportolo.services.wahoo_control_service import (
     TrainerCommandAck,
+    WahooControlMailboxFullError,
     WahooControlService,
     WahooTrainerProtocolAdapter,
 )
@@ -20,13 +25,13 @@ class _ScriptedAdapter(WahooTrainerProtocolAdapter):
         self.fallback_queue: list[TrainerCommandAck] = []
         self.calls: list[str] = []
 
-    def reconnect(self, athlete_id: str, trainer_id: str) -> TrainerCommandAck:
+    async def reconnect(self, athlete_id: str, trainer_id: str) -> TrainerCommandAck:
         self.calls.append(f"reconnect:{athlete_id}:{trainer_id}")
         if self.reconnect_queue:
             return self.reconnect_queue.pop(0)
         return TrainerCommandAck(acknowledged=True, connection_state="connected")
 
-    def apply_mode(
+    async def apply_mode(
         self,
         athlete_id: str,
         trainer_id: str,
@@ -41,7 +46,7 @@ class _ScriptedAdapter(WahooTrainerProtocolAdapter):
             return self.mode_queue.pop(0)
         return TrainerCommandAck(acknowledged=True, connection_state="connected")
 
-    def apply_safety_fallback(self, athlete_id: str, trainer_id: str) -> TrainerCommandAck:
+    async def apply_safety_fallback(self, athlete_id: str, trainer_id: str) -> TrainerCommandAck:
         self.calls.append(f"fallback:{athlete_id}:{trainer_id}")
         if self.fallback_queue:
             return self.fallback_queue.pop(0)
@@ -136,3 +141,32 @@ def test_control_state_machine_uses_mocked_adapter_for_fallback_flow() -> None:
         "apply_mode:athlete-1:kickr-bike-001:erg:280.0:watts",
         "fallback:athlete-1:kickr-bike-001",
     ]
+
+
+def test_full_control_mailbox_is_reported_as_too_many_requests() -> None:
+    class _FullMailboxService:
+        async def submit_control_command_response_body(
+            self, athlete_id: str, request: WahooTrainerControlRequest
+        ) -> bytes:
+            del athlete_id, request
+            raise WahooControlMailboxFullError(
+                "trainer control mailbox is full; retry the command", retry_after_seconds=2
+            )
+
+    app.dependency_overrides[get_wahoo_control_service] = _FullMailboxService
+    try:
+        response = TestClient(app).post(
+            "/v1/athletes/athlete-1/integrations/wahoo/trainers/control",
+            json=_request(
+                key="mailbox-full", mode="erg", target_value=250, target_unit="watts"
+            ).model_dump(by_alias=True, mode="json"),
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "2"
+    assert response.json() == {
+        "code": "WAHOO_CONTROL_MAILBOX_FULL",
+        "message": "trainer control mailbox is full; retry the command",
+    }
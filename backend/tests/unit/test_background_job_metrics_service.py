@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from sportolo.services.background_job_metrics_service import (
+    LatencyHistogram,
+    LatencyHistogramSnapshot,
+    PipelineMetricsRecorder,
+    SlidingWindowCounter,
+    render_prometheus_metrics,
+)
+from sportolo.services.background_job_queue_service import BackgroundJobMetrics
+
+
+def test_histogram_percentiles_interpolate_within_fixed_buckets() -> None:
+    histogram = LatencyHistogram(bucket_bounds_ms=(10.0, 100.0, 1_000.0))
+    for _ in range(90):
+        histogram.observe(5.0)
+    for _ in range(9):
+        histogram.observe(50.0)
+    histogram.observe(4_000.0)
+
+    snapshot = histogram.snapshot()
+
+    assert snapshot.bucket_counts == (90, 9, 0, 1)
+    assert snapshot.count == 100
+    assert snapshot.p50_ms == pytest.approx(50 / 90 * 10, abs=0.001)
+    assert 10.0 < snapshot.p95_ms <= 100.0
+    assert snapshot.p99_ms == pytest.approx(100.0)
+    assert snapshot.quantile(1.0) == pytest.approx(4_000.0)
+    assert LatencyHistogramSnapshot.empty().p95_ms == 0.0
+
+
+def test_histogram_snapshot_from_cumulative_counts_matches_observed_buckets() -> None:
+    bounds = (10.0, 100.0)
+    histogram = LatencyHistogram(bucket_bounds_ms=bounds)
+    for value in (1.0, 20.0, 30.0, 500.0):
+        histogram.observe(value)
+
+    rebuilt = LatencyHistogramSnapshot.from_cumulative_counts(
+        [1, 3],
+        count=4,
+        sum_ms=551.0,
+        max_ms=500.0,
+        bucket_bounds_ms=bounds,
+    )
+
+    assert rebuilt == histogram.snapshot()
+
+
+def test_sliding_window_counter_reports_rates_per_window_and_expires_old_events() -> None:
+    counter = SlidingWindowCounter(windows_seconds=(10, 60))
+    now = datetime(2026, 3, 1, 12, 0, tzinfo=UTC)
+    counter.add(now - timedelta(seconds=30), count=30)
+    counter.add(now - timedelta(seconds=2), count=5)
+    counter.add(now - timedelta(seconds=3), count=5)
+
+    assert counter.rates(now) == {10: 1.0, 60: pytest.approx(40 / 60)}
+    assert counter.rates(now + timedelta(seconds=120)) == {10: 0.0, 60: 0.0}
+
+
+def test_prometheus_rendering_exposes_per_pipeline_histograms() -> None:
+    recorder = PipelineMetricsRecorder()
+    finished_at = datetime(2026, 3, 1, 12, 0, tzinfo=UTC)
+    recorder.record_attempt(
+        "fatigue_recompute",
+        status="succeeded",
+        processing_latency_ms=1_500.0,
+        queue_wait_ms=20.0,
+        finished_at=finished_at,
+    )
+    metrics = BackgroundJobMetrics(
+        queue_depth=2,
+        total_enqueued_count=3,
+        processed_attempt_count=1,
+        succeeded_count=1,
+        failed_attempt_count=0,
+        retry_count=0,
+        dead_letter_count=0,
+        failure_rate=0.0,
+        average_processing_latency_ms=1_500.0,
+        pipelines=recorder.snapshot(finished_at),
+    )
+
+    text = render_prometheus_metrics(metrics)
+
+    assert "# TYPE sportolo_background_job_processing_seconds histogram" in text
+    assert "sportolo_background_job_queue_depth 2\n" in text
+    assert (
+        'sportolo_background_job_processing_seconds_bucket{pipeline="fatigue_recompute",le="1"} 0'
+        in text
+    )
+    assert (
+        'sportolo_background_job_processing_seconds_bucket{pipeline="fatigue_recompute",le="2"} 1'
+        in text
+    )
+    assert (
+        'sportolo_background_job_processing_seconds_count{pipeline="fatigue_recompute"} 1' in text
+    )
+    assert (
+        'sportolo_background_job_attempts_total{pipeline="fatigue_recompute",status="succeeded"} 1'
+        in text
+    )
+    assert (
+        'sportolo_background_job_throughput_per_second{pipeline="fatigue_recompute",window="60s"}'
+        in text
+    )
+    assert text.endswith("\n")
+
+
+def test_prometheus_rendering_escapes_label_values() -> None:
+    metrics = BackgroundJobMetrics(
+        queue_depth=0,
+        total_enqueued_count=0,
+        processed_attempt_count=0,
+        succeeded_count=0,
+        failed_attempt_count=0,
+        retry_count=0,
+        dead_letter_count=0,
+        failure_rate=0.0,
+        average_processing_latency_ms=0.0,
+        worker_open_circuit_error_codes=('PROVIDER_"TIMEOUT"\\\nretry',),
+    )
+
+    text = render_prometheus_metrics(metrics)
+
+    assert (
+        "sportolo_background_job_worker_circuit_open"
+        '{error_code="PROVIDER_\\"TIMEOUT\\"\\\\\\nretry"} 1' in text
+    )
+    assert all(line.startswith(("#", "sportolo_")) for line in text.splitlines())
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import pickle
+from collections.abc import Mapping
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
 import pytest
 
 from sportolo.services.background_job_queue_service import (
     BackgroundJobEnqueueRequest,
     BackgroundJobExecutionError,
     BackgroundJobPipeline,
+    BackgroundJobRecord,
     InMemoryBackgroundJobQueue,
 )
 
@@ -110,3 +116,244 @@ def test_terminal_failure_moves_job_to_dead_letter_with_actionable_metadata() ->
     assert "lineage" in (failed.last_error_message or "")
     assert len(dead_letters) == 1
     assert dead_letters[0].job_id == queued.job_id
+
+
+def test_pipeline_priorities_order_ready_jobs_and_delayed_retries_wait_off_the_ready_heap() -> None:
+    queue = InMemoryBackgroundJobQueue(
+        pipeline_priorities={"workout_sync": 0, "fatigue_recompute": 1}
+    )
+    handled: list[str] = []
+
+    def record_handler(record: BackgroundJobRecord) -> None:
+        handled.append(record.idempotency_key)
+        if record.idempotency_key == "sync-delayed" and record.attempt_count == 1:
+            raise BackgroundJobExecutionError(code="SYNC_TIMEOUT", message="provider timeout")
+
+    queue.register_handler("workout_sync", record_handler)
+    queue.register_handler("fatigue_recompute", record_handler)
+    queue.enqueue(
+        _enqueue_request(
+            pipeline="fatigue_recompute",
+            idempotency_key="recompute-1",
+            payload_suffix="r1",
+        )
+    )
+    queue.enqueue(
+        BackgroundJobEnqueueRequest(
+            athlete_id="athlete-1",
+            pipeline="workout_sync",
+            idempotency_key="sync-delayed",
+            correlation_id="corr-sync-delayed",
+            payload={"externalActivityId": "activity-delayed"},
+            retry_delay_seconds=3600,
+        )
+    )
+    queue.enqueue(_enqueue_request(idempotency_key="sync-1", payload_suffix="s1"))
+
+    outcomes = queue.process_until_idle()
+
+    assert handled == ["sync-delayed", "sync-1", "recompute-1"]
+    assert [outcome.status for outcome in outcomes] == [
+        "retry_scheduled",
+        "succeeded",
+        "succeeded",
+    ]
+    assert queue.metrics_snapshot().queue_depth == 1
+    assert queue.process_next() is None
+
+
+def test_status_counters_and_compaction_keep_idempotency_after_eviction() -> None:
+    queue = InMemoryBackgroundJobQueue(
+        succeeded_retention_seconds=60,
+        max_idempotency_tombstones=1,
+    )
+    after_retention = datetime.now(tz=UTC) + timedelta(minutes=5)
+
+    def fatal_handler(record: BackgroundJobRecord) -> None:
+        if record.idempotency_key == "idem-fatal":
+            raise BackgroundJobExecutionError(code="FATAL", message="fatal", retryable=False)
+
+    queue.register_handler("workout_sync", fatal_handler)
+    first = queue.enqueue(_enqueue_request(idempotency_key="idem-1", payload_suffix="a"))
+    queue.enqueue(_enqueue_request(idempotency_key="idem-fatal", payload_suffix="f"))
+    assert queue.metrics_snapshot().queue_depth == 2
+
+    queue.process_until_idle()
+    assert queue.compact() == 0
+    evicted = queue.compact(after_retention)
+
+    assert evicted == 1
+    assert queue.get_job(first.job_id) is None
+    assert [record.idempotency_key for record in queue.list_dead_letters()] == ["idem-fatal"]
+    assert queue.metrics_snapshot().queue_depth == 0
+
+    replay = queue.enqueue(_enqueue_request(idempotency_key="idem-1", payload_suffix="a"))
+    assert replay.job_id == first.job_id
+    assert replay.status == "succeeded"
+    assert queue.metrics_snapshot().queue_depth == 0
+    with pytest.raises(ValueError, match="idempotency"):
+        queue.enqueue(_enqueue_request(idempotency_key="idem-1", payload_suffix="b"))
+
+    second = queue.enqueue(_enqueue_request(idempotency_key="idem-2", payload_suffix="c"))
+    queue.process_until_idle()
+    assert queue.compact(after_retention) == 1
+    assert queue.enqueue(_enqueue_request(idempotency_key="idem-2", payload_suffix="c")).job_id == (
+        second.job_id
+    )
+    assert queue.enqueue(_enqueue_request(idempotency_key="idem-1", payload_suffix="a")).job_id != (
+        first.job_id
+    )
+
+
+def _merge_activity_ids(pending: Mapping[str, Any], incoming: Mapping[str, Any]) -> dict[str, Any]:
+    pending_ids = pending.get("externalActivityIds") or [pending["externalActivityId"]]
+    return {"externalActivityIds": sorted({*pending_ids, incoming["externalActivityId"]})}
+
+
+def _athlete_request(
+    athlete_id: str, idempotency_key: str, activity_id: str
+) -> BackgroundJobEnqueueRequest:
+    return BackgroundJobEnqueueRequest(
+        athlete_id=athlete_id,
+        pipeline="fatigue_recompute",
+        idempotency_key=idempotency_key,
+        correlation_id=f"corr-{idempotency_key}",
+        payload={"externalActivityId": activity_id},
+    )
+
+
+def test_coalescing_pipeline_merges_pending_jobs_and_serializes_per_athlete() -> None:
+    queue = InMemoryBackgroundJobQueue(
+        payload_coalescers={"fatigue_recompute": _merge_activity_ids}
+    )
+    first = queue.enqueue(_athlete_request("athlete-1", "idem-a", "a"))
+    merged = queue.enqueue(_athlete_request("athlete-1", "idem-b", "b"))
+    replay = queue.enqueue(_athlete_request("athlete-1", "idem-b", "b"))
+    with pytest.raises(ValueError, match="idempotency"):
+        queue.enqueue(_athlete_request("athlete-1", "idem-b", "drift"))
+
+    assert merged.job_id == first.job_id
+    assert replay.job_id == first.job_id
+    assert merged.payload == {"externalActivityIds": ("a", "b")}
+    assert merged.coalesced_request_count == 1
+    assert queue.metrics_snapshot().queue_depth == 1
+    assert queue.metrics_snapshot().coalesced_request_count == 1
+
+    running = queue.claim_next()
+    assert running is not None and running.job_id == first.job_id
+    # The running job no longer absorbs requests; the next one starts a new pending job.
+    queued_behind = queue.enqueue(_athlete_request("athlete-1", "idem-c", "c"))
+    queue.enqueue(_athlete_request("athlete-1", "idem-d", "d"))
+    other_athlete = queue.enqueue(_athlete_request("athlete-2", "idem-e", "e"))
+
+    assert queued_behind.job_id != first.job_id
+    next_claim = queue.claim_next()
+    assert next_claim is not None and next_claim.job_id == other_athlete.job_id
+    assert queue.claim_next() is None
+
+    queue.complete_claim(
+        running,
+        None,
+        started_at=datetime.now(tz=UTC),
+        finished_at=datetime.now(tz=UTC),
+        latency_ms=1.0,
+    )
+    released = queue.claim_next()
+
+    assert released is not None
+    assert released.job_id == queued_behind.job_id
+    assert released.payload == {"externalActivityIds": ("c", "d")}
+
+
+def test_enqueue_many_is_all_or_nothing_and_can_skip_snapshots() -> None:
+    queue = InMemoryBackgroundJobQueue(
+        payload_coalescers={"fatigue_recompute": _merge_activity_ids}
+    )
+    existing = queue.enqueue(_enqueue_request(idempotency_key="idem-1", payload_suffix="a"))
+
+    with pytest.raises(ValueError, match="idempotency"):
+        queue.enqueue_many(
+            [
+                _enqueue_request(idempotency_key="idem-2", payload_suffix="b"),
+                _enqueue_request(idempotency_key="idem-1", payload_suffix="drift"),
+            ]
+        )
+    assert queue.metrics_snapshot().total_enqueued_count == 1
+
+    skipped = queue.enqueue_many(
+        [
+            _enqueue_request(idempotency_key="idem-2", payload_suffix="b"),
+            _athlete_request("athlete-1", "idem-r1", "r1"),
+            _athlete_request("athlete-1", "idem-r2", "r2"),
+        ],
+        return_records=False,
+    )
+    records = queue.enqueue_many(
+        [
+            _enqueue_request(idempotency_key="idem-1", payload_suffix="a"),
+            _enqueue_request(idempotency_key="idem-2", payload_suffix="b"),
+            _athlete_request("athlete-1", "idem-r2", "r2"),
+        ]
+    )
+
+    assert skipped == []
+    assert records[0].job_id == existing.job_id
+    assert records[2].payload == {"externalActivityIds": ("r1", "r2")}
+    metrics = queue.metrics_snapshot()
+    assert metrics.total_enqueued_count == 3
+    assert metrics.coalesced_request_count == 1
+
+
+def test_snapshots_share_one_frozen_payload_and_pickle_with_attempt_history() -> None:
+    queue = InMemoryBackgroundJobQueue()
+    request = BackgroundJobEnqueueRequest(
+        athlete_id="athlete-1",
+        pipeline="workout_sync",
+        idempotency_key="idem-frozen",
+        correlation_id="corr-frozen",
+        payload={"externalActivityIds": ["a", "b"], "options": {"force": True}},
+    )
+    queued = queue.enqueue(request)
+    request.payload["externalActivityIds"].append("c")
+    queue.process_until_idle()
+
+    stored = queue.get_job(queued.job_id)
+    assert stored is not None
+    assert stored.payload is queued.payload
+    assert stored.payload == {"externalActivityIds": ("a", "b"), "options": {"force": True}}
+    with pytest.raises(TypeError):
+        stored.payload["options"]["force"] = False  # type: ignore[index]
+
+    restored = pickle.loads(pickle.dumps(stored))
+    assert restored == stored
+    assert [attempt.status for attempt in restored.attempt_history] == ["succeeded"]
+
+
+def test_metrics_report_latency_and_queue_wait_per_pipeline() -> None:
+    queue = InMemoryBackgroundJobQueue()
+    queue.enqueue(_enqueue_request(idempotency_key="idem-sync", payload_suffix="sync"))
+    queue.enqueue(
+        _enqueue_request(
+            pipeline="fatigue_recompute", idempotency_key="idem-fatigue", payload_suffix="f"
+        )
+    )
+
+    latencies_ms = {"workout_sync": 5.0, "fatigue_recompute": 4_000.0}
+    while (record := queue.claim_next()) is not None:
+        started_at = record.available_at + timedelta(milliseconds=40)
+        latency_ms = latencies_ms[record.pipeline]
+        queue.complete_claim(
+            record,
+            None,
+            started_at=started_at,
+            finished_at=started_at + timedelta(milliseconds=latency_ms),
+            latency_ms=latency_ms,
+        )
+
+    pipelines = queue.metrics_snapshot().pipelines
+
+    assert set(pipelines) == {"workout_sync", "fatigue_recompute"}
+    assert pipelines["workout_sync"].processing_latency.p95_ms <= 5.0
+    assert 2_000.0 < pipelines["fatigue_recompute"].processing_latency.p95_ms <= 4_000.0
+    assert pipelines["fatigue_recompute"].queue_wait.max_ms == pytest.approx(40.0)
+    assert pipelines["fatigue_recompute"].throughput_per_second[60] == pytest.approx(1 / 60)
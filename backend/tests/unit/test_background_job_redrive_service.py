@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import pytest
+
+from sportolo.redrive import main as redrive_main
+from sportolo.services.background_job_queue_service import (
+    BackgroundJobDeadLetterFilter,
+    BackgroundJobEnqueueRequest,
+    BackgroundJobExecutionError,
+    BackgroundJobPipeline,
+    BackgroundJobRecord,
+    InMemoryBackgroundJobQueue,
+)
+from sportolo.services.background_job_redrive_service import (
+    BackgroundJobRedriveOptions,
+    BackgroundJobRedriver,
+)
+
+
+def _fail_with_payload_code(record: BackgroundJobRecord) -> None:
+    raise BackgroundJobExecutionError(
+        code=str(record.payload["errorCode"]),
+        message="provider outage",
+        retryable=False,
+    )
+
+
+def _dead_letter_queue(
+    jobs: list[tuple[BackgroundJobPipeline, str, str]],
+) -> InMemoryBackgroundJobQueue:
+    queue = InMemoryBackgroundJobQueue(
+        default_handlers={
+            "workout_sync": _fail_with_payload_code,
+            "fatigue_recompute": _fail_with_payload_code,
+        }
+    )
+    for index, (pipeline, athlete_id, error_code) in enumerate(jobs):
+        queue.enqueue(
+            BackgroundJobEnqueueRequest(
+                athlete_id=athlete_id,
+                pipeline=pipeline,
+                idempotency_key=f"idem-{index}",
+                correlation_id=f"corr-{index}",
+                payload={"errorCode": error_code},
+                max_attempts=1,
+            )
+        )
+    queue.process_until_idle()
+    return queue
+
+
+def test_redrive_filters_dead_letters_and_grants_fresh_attempts_in_batches() -> None:
+    queue = _dead_letter_queue(
+        [
+            ("workout_sync", "athlete-1", "PROVIDER_DOWN"),
+            ("workout_sync", "athlete-2", "PROVIDER_DOWN"),
+            ("workout_sync", "athlete-3", "PROVIDER_DOWN"),
+            ("workout_sync", "athlete-1", "BAD_PAYLOAD"),
+            ("fatigue_recompute", "athlete-1", "PROVIDER_DOWN"),
+        ]
+    )
+    provider_down = BackgroundJobDeadLetterFilter(
+        pipeline="workout_sync", error_code="PROVIDER_DOWN"
+    )
+    assert len(queue.list_dead_letters(provider_down)) == 3
+    assert len(queue.list_dead_letters(provider_down, limit=2)) == 2
+
+    progress = list(
+        BackgroundJobRedriver(queue, sleep=lambda _: None).iter_redrive(
+            provider_down,
+            BackgroundJobRedriveOptions(attempt_budget=2, batch_size=2, max_jobs_per_second=None),
+        )
+    )
+
+    assert [(item.batch_number, len(item.job_ids), item.done) for item in progress] == [
+        (1, 2, False),
+        (2, 1, False),
+        (2, 0, True),
+    ]
+    assert progress[-1].redriven_count == 3
+    assert queue.metrics_snapshot().queue_depth == 3
+    assert {record.last_error_code for record in queue.list_dead_letters()} == {
+        "BAD_PAYLOAD",
+        "PROVIDER_DOWN",
+    }
+
+    redriven = queue.get_job(progress[0].job_ids[0])
+    assert redriven is not None
+    assert redriven.status == "queued"
+    assert redriven.max_attempts == redriven.attempt_count + 2
+
+    queue.register_handler("workout_sync", lambda _: None)
+    assert [outcome.status for outcome in queue.process_until_idle()] == ["succeeded"] * 3
+    assert queue.redrive_dead_letters([progress[0].job_ids[0]], attempt_budget=1) == []
+
+
+def test_redrive_rate_limits_batches_and_waits_for_queue_capacity() -> None:
+    queue = _dead_letter_queue(
+        [("workout_sync", f"athlete-{index}", "PROVIDER_DOWN") for index in range(4)]
+    )
+    sleeps: list[float] = []
+
+    progress = list(
+        BackgroundJobRedriver(queue, sleep=sleeps.append, monotonic=lambda: 0.0).iter_redrive(
+            BackgroundJobDeadLetterFilter(),
+            BackgroundJobRedriveOptions(batch_size=2, max_jobs_per_second=4, limit=3),
+        )
+    )
+
+    assert sleeps == [0.5, 0.75]
+    assert progress[-1].redriven_count == 3
+    assert len(queue.list_dead_letters()) == 1
+
+    with pytest.raises(ValueError, match="attempt_budget"):
+        BackgroundJobRedriveOptions(attempt_budget=0)
+
+
+def test_redrive_cli_requires_sql_queue_backend(capsys: pytest.CaptureFixture[str]) -> None:
+    assert redrive_main(["--error-code", "PROVIDER_DOWN"]) == 2
+    assert "SPORTOLO_BACKGROUND_JOB_QUEUE_BACKEND=sql" in capsys.readouterr().err
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from sportolo.services.background_job_queue_service import (
+    BackgroundJobEnqueueRequest,
+    BackgroundJobExecutionError,
+    BackgroundJobRecord,
+    InMemoryBackgroundJobQueue,
+)
+from sportolo.services.background_job_retry_service import (
+    BackgroundJobBackoffPolicy,
+    BackgroundJobRetryController,
+    BackgroundJobWorkerCircuitBreakerPolicy,
+    BackgroundJobWorkerRetryBudget,
+)
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=UTC)
+
+
+def _failing_handler(_: BackgroundJobRecord) -> None:
+    raise BackgroundJobExecutionError(
+        code="PROVIDER_UNAVAILABLE",
+        message="provider returned 503",
+        retryable=True,
+    )
+
+
+def _enqueue_request(index: int) -> BackgroundJobEnqueueRequest:
+    return BackgroundJobEnqueueRequest(
+        athlete_id=f"athlete-{index}",
+        pipeline="workout_sync",
+        idempotency_key=f"idem-{index}",
+        correlation_id=f"corr-{index}",
+        payload={"externalActivityId": f"activity-{index}"},
+        max_attempts=5,
+    )
+
+
+def test_backoff_grows_exponentially_with_cap_and_jitter() -> None:
+    exact = BackgroundJobBackoffPolicy(base_delay_seconds=2, max_delay_seconds=30, jitter="none")
+    full = BackgroundJobBackoffPolicy(base_delay_seconds=2, max_delay_seconds=30)
+    equal = BackgroundJobBackoffPolicy(base_delay_seconds=2, max_delay_seconds=30, jitter="equal")
+
+    assert [exact.delay_seconds(attempt, 0.5) for attempt in (1, 2, 3, 4, 5, 50)] == [
+        2,
+        4,
+        8,
+        16,
+        30,
+        30,
+    ]
+    assert full.delay_seconds(3, 0.25) == pytest.approx(2.0)
+    assert equal.delay_seconds(3, 0.0) == pytest.approx(4.0)
+    with pytest.raises(ValueError, match="max_delay_seconds"):
+        BackgroundJobBackoffPolicy(base_delay_seconds=10, max_delay_seconds=5)
+
+
+def test_retry_budget_sheds_retries_once_the_window_allowance_is_spent() -> None:
+    controller = BackgroundJobRetryController(
+        retry_budget=BackgroundJobWorkerRetryBudget(ratio=0.25, min_retries_per_window=1)
+    )
+    decisions = []
+    for index in range(4):
+        controller.record_attempt("workout_sync", error_code="SYNC_TIMEOUT", now=NOW)
+        decisions.append(
+            controller.decide_retry(
+                "workout_sync",
+                error_code="SYNC_TIMEOUT",
+                attempt_count=1,
+                retry_delay_seconds=index,
+                now=NOW,
+            )
+        )
+
+    # Allowance is 1 + 0.25 * attempts: 1.25, 1.5, 1.75, 2.0 retries.
+    assert [decision.retry for decision in decisions] == [True, True, False, False]
+    assert decisions[2].reason == "retry_budget_exhausted"
+    assert controller.metrics_snapshot(NOW).worker_shed_retry_count == 2
+
+    later = NOW + timedelta(seconds=61)
+    controller.record_attempt("workout_sync", error_code="SYNC_TIMEOUT", now=later)
+    assert controller.decide_retry(
+        "workout_sync",
+        error_code="SYNC_TIMEOUT",
+        attempt_count=1,
+        retry_delay_seconds=0,
+        now=later,
+    ).retry
+
+
+def test_circuit_breaker_parks_retries_then_half_opens() -> None:
+    controller = BackgroundJobRetryController(
+        backoff_policies={
+            "workout_sync": BackgroundJobBackoffPolicy(base_delay_seconds=1, jitter="none")
+        },
+        circuit_breaker=BackgroundJobWorkerCircuitBreakerPolicy(
+            failure_threshold=2, open_seconds=30
+        ),
+    )
+    controller.record_attempt("workout_sync", error_code="PROVIDER_UNAVAILABLE", now=NOW)
+    controller.record_attempt("workout_sync", error_code="PROVIDER_UNAVAILABLE", now=NOW)
+
+    parked = controller.decide_retry(
+        "workout_sync",
+        error_code="PROVIDER_UNAVAILABLE",
+        attempt_count=1,
+        retry_delay_seconds=0,
+        now=NOW + timedelta(seconds=10),
+    )
+    other_code = controller.decide_retry(
+        "workout_sync",
+        error_code="SYNC_TIMEOUT",
+        attempt_count=1,
+        retry_delay_seconds=0,
+        now=NOW + timedelta(seconds=10),
+    )
+
+    assert parked.reason == "circuit_open"
+    assert parked.delay_seconds == pytest.approx(21.0)
+    assert other_code.reason == "backoff"
+    assert controller.metrics_snapshot(NOW).worker_open_circuit_error_codes == (
+        "PROVIDER_UNAVAILABLE",
+    )
+
+    probe_failed_at = NOW + timedelta(seconds=31)
+    controller.record_attempt(
+        "workout_sync", error_code="PROVIDER_UNAVAILABLE", now=probe_failed_at
+    )
+    assert controller.metrics_snapshot(probe_failed_at).worker_open_circuit_error_codes == (
+        "PROVIDER_UNAVAILABLE",
+    )
+
+    recovered_at = probe_failed_at + timedelta(seconds=31)
+    controller.record_attempt("workout_sync", error_code=None, now=recovered_at)
+    controller.record_attempt("workout_sync", error_code="PROVIDER_UNAVAILABLE", now=recovered_at)
+    assert controller.metrics_snapshot(recovered_at).worker_open_circuit_error_codes == ()
+
+
+def test_queue_dead_letters_shed_retries_and_delays_the_rest() -> None:
+    controller = BackgroundJobRetryController(
+        backoff_policies={
+            "workout_sync": BackgroundJobBackoffPolicy(base_delay_seconds=60, jitter="none")
+        },
+        retry_budget=BackgroundJobWorkerRetryBudget(ratio=0.0, min_retries_per_window=2),
+    )
+    queue = InMemoryBackgroundJobQueue(
+        default_handlers={"workout_sync": _failing_handler},
+        retry_controller=controller,
+    )
+    for index in range(3):
+        queue.enqueue(_enqueue_request(index))
+
+    outcomes = queue.process_until_idle()
+    metrics = queue.metrics_snapshot()
+
+    assert [outcome.status for outcome in outcomes] == [
+        "retry_scheduled",
+        "retry_scheduled",
+        "dead_letter",
+    ]
+    assert metrics.queue_depth == 2
+    assert metrics.worker_shed_retry_count == 1
+    assert queue.list_dead_letters()[0].last_error_code == "PROVIDER_UNAVAILABLE"
+    retried = queue.get_job(outcomes[0].job_id)
+    assert retried is not None and retried.last_failed_at is not None
+    assert retried.available_at - retried.last_failed_at == timedelta(seconds=60)
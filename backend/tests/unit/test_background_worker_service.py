@@ -0,0 +1,368 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import os
+import threading
+import time
+from collections.abc import Collection
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from sportolo.api.dependencies import get_background_job_queue
+from sportolo.app_factory import create_app
+from sportolo.config import clear_settings_cache, get_settings
+from sportolo.models.base import Base
+from sportolo.services.background_job_queue_service import (
+    BackgroundJobEnqueueRequest,
+    BackgroundJobExecutionError,
+    BackgroundJobHandler,
+    BackgroundJobPipeline,
+    BackgroundJobRecord,
+    InMemoryBackgroundJobQueue,
+)
+from sportolo.services.background_worker_service import (
+    AsyncBackgroundWorker,
+    BackgroundWorkerConfig,
+    BackgroundWorkerPool,
+)
+from sportolo.services.sql_background_job_queue_service import SqlBackgroundJobQueue
+from sportolo.worker import main as worker_main
+
+
+def setup_function() -> None:
+    get_background_job_queue().reset_for_testing()
+
+
+def _enqueue_request(
+    index: int,
+    *,
+    pipeline: BackgroundJobPipeline = "workout_sync",
+    max_attempts: int = 3,
+) -> BackgroundJobEnqueueRequest:
+    return BackgroundJobEnqueueRequest(
+        athlete_id=f"athlete-{index}",
+        pipeline=pipeline,
+        idempotency_key=f"idem-{index}",
+        correlation_id=f"corr-{index}",
+        payload={"externalActivityId": f"activity-{index}", "sequenceNumber": 1},
+        max_attempts=max_attempts,
+        retry_delay_seconds=0,
+    )
+
+
+def _process_pid_handlers() -> dict[BackgroundJobPipeline, BackgroundJobHandler]:
+    def handler(_: BackgroundJobRecord) -> None:
+        raise BackgroundJobExecutionError(
+            code="PROCESS_PID",
+            message=str(os.getpid()),
+            retryable=False,
+        )
+
+    return {"fatigue_recompute": handler}
+
+
+def test_worker_pool_runs_jobs_in_parallel_threads() -> None:
+    barrier = threading.Barrier(4, timeout=5)
+
+    def handler(_: BackgroundJobRecord) -> None:
+        barrier.wait()
+
+    queue = InMemoryBackgroundJobQueue(default_handlers={"workout_sync": handler})
+    for index in range(8):
+        queue.enqueue(_enqueue_request(index))
+
+    with BackgroundWorkerPool(queue, BackgroundWorkerConfig(thread_workers=4)) as pool:
+        assert pool.wait_until_idle(timeout=10)
+
+    metrics = queue.metrics_snapshot()
+    assert metrics.succeeded_count == 8
+    assert metrics.queue_depth == 0
+    assert pool.outcome_counts == {"succeeded": 8}
+
+
+def test_worker_pool_enforces_per_pipeline_concurrency_limit() -> None:
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    def handler(_: BackgroundJobRecord) -> None:
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+
+    queue = InMemoryBackgroundJobQueue(default_handlers={"workout_sync": handler})
+    for index in range(6):
+        queue.enqueue(_enqueue_request(index))
+
+    config = BackgroundWorkerConfig(thread_workers=4, pipeline_concurrency={"workout_sync": 1})
+    with BackgroundWorkerPool(queue, config) as pool:
+        assert pool.wait_until_idle(timeout=10)
+
+    assert max_running == 1
+    assert queue.metrics_snapshot().succeeded_count == 6
+
+
+def test_worker_pool_claims_only_its_configured_pipelines() -> None:
+    queue = InMemoryBackgroundJobQueue(
+        default_handlers={"workout_sync": lambda _: None, "fatigue_recompute": lambda _: None}
+    )
+    queue.enqueue(_enqueue_request(0))
+    queue.enqueue(_enqueue_request(1, pipeline="fatigue_recompute"))
+
+    config = BackgroundWorkerConfig(thread_workers=2, pipelines=frozenset({"fatigue_recompute"}))
+    with BackgroundWorkerPool(queue, config) as pool:
+        assert pool.wait_until_idle(timeout=10)
+
+    assert pool.outcome_counts == {"succeeded": 1}
+    metrics = queue.metrics_snapshot()
+    assert (metrics.succeeded_count, metrics.queue_depth) == (1, 1)
+    with pytest.raises(ValueError, match="pipelines"):
+        BackgroundWorkerConfig(pipelines=frozenset())
+
+
+def test_worker_pool_stops_claiming_at_backlog_high_watermark() -> None:
+    release = threading.Event()
+
+    def handler(_: BackgroundJobRecord) -> None:
+        release.wait(5)
+
+    queue = InMemoryBackgroundJobQueue(default_handlers={"workout_sync": handler})
+    for index in range(5):
+        queue.enqueue(_enqueue_request(index))
+
+    config = BackgroundWorkerConfig(
+        thread_workers=1,
+        backlog_high_watermark=2,
+        backlog_low_watermark=1,
+    )
+    pool = BackgroundWorkerPool(queue, config)
+    pool.start()
+    try:
+        deadline = time.monotonic() + 5
+        while pool.backlog < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+
+        assert pool.backlog == 2
+        assert queue.metrics_snapshot().queue_depth == 3
+    finally:
+        release.set()
+        pool.wait_until_idle(timeout=10)
+        pool.stop(timeout=10)
+
+    assert queue.metrics_snapshot().succeeded_count == 5
+
+
+def test_worker_pool_stop_finishes_in_flight_jobs_and_leaves_the_rest_queued() -> None:
+    started = threading.Event()
+
+    def handler(_: BackgroundJobRecord) -> None:
+        started.set()
+        time.sleep(0.1)
+
+    queue = InMemoryBackgroundJobQueue(default_handlers={"workout_sync": handler})
+    for index in range(3):
+        queue.enqueue(_enqueue_request(index))
+
+    pool = BackgroundWorkerPool(queue, BackgroundWorkerConfig(thread_workers=1))
+    pool.start()
+    assert started.wait(timeout=5)
+    pool.stop(timeout=10)
+
+    metrics = queue.metrics_snapshot()
+    assert metrics.succeeded_count >= 1
+    assert metrics.succeeded_count + metrics.queue_depth == 3
+    assert pool.backlog == 0
+
+
+def test_worker_pool_heartbeat_keeps_long_jobs_leased(tmp_path: Path) -> None:
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'queue.db'}", future=True)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    released = threading.Event()
+
+    def handler(_: BackgroundJobRecord) -> None:
+        released.wait(timeout=5)
+
+    queue = SqlBackgroundJobQueue(
+        session_factory=session_factory,
+        default_handlers={"workout_sync": handler},
+        worker_id="worker-a",
+        lease_seconds=1,
+    )
+    other_worker = SqlBackgroundJobQueue(session_factory=session_factory, worker_id="worker-b")
+    queued = queue.enqueue(_enqueue_request(0))
+
+    pool = BackgroundWorkerPool(
+        queue,
+        BackgroundWorkerConfig(thread_workers=1, lease_heartbeat_seconds=0.2),
+    )
+    pool.start()
+    try:
+        time.sleep(1.5)
+        assert other_worker.claim_next() is None
+    finally:
+        released.set()
+        pool.stop(timeout=10)
+
+    stored = queue.get_job(queued.job_id)
+    assert stored is not None
+    assert stored.status == "succeeded"
+    assert stored.attempt_count == 1
+
+
+class _FlakyClaimQueue(InMemoryBackgroundJobQueue):
+    def __init__(self, failures: int) -> None:
+        super().__init__()
+        self.failures = failures
+
+    def claim_next(
+        self,
+        pipelines: Collection[BackgroundJobPipeline] | None = None,
+    ) -> BackgroundJobRecord | None:
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("database unavailable")
+        return super().claim_next(pipelines)
+
+
+def test_worker_pool_dispatcher_survives_claim_failures() -> None:
+    queue = _FlakyClaimQueue(failures=3)
+    queue.enqueue(_enqueue_request(0))
+
+    with BackgroundWorkerPool(queue, BackgroundWorkerConfig(thread_workers=1)) as pool:
+        assert pool.wait_until_idle(timeout=5)
+
+    assert queue.failures == 0
+    assert queue.metrics_snapshot().succeeded_count == 1
+
+
+def test_async_worker_dispatcher_survives_claim_failures() -> None:
+    queue = _FlakyClaimQueue(failures=3)
+    queue.enqueue(_enqueue_request(0))
+
+    async def run() -> dict[str, int]:
+        worker = AsyncBackgroundWorker(queue)
+        await worker.start()
+        assert await worker.wait_until_idle(timeout=5)
+        await worker.stop()
+        return worker.outcome_counts
+
+    assert asyncio.run(run()) == {"succeeded": 1}
+    assert queue.failures == 0
+
+
+def test_worker_pool_stop_does_not_wait_past_its_timeout() -> None:
+    started = threading.Event()
+    released = threading.Event()
+
+    def handler(_: BackgroundJobRecord) -> None:
+        started.set()
+        released.wait(timeout=10)
+
+    queue = InMemoryBackgroundJobQueue(default_handlers={"workout_sync": handler})
+    queue.enqueue(_enqueue_request(0))
+    queue.enqueue(_enqueue_request(1))
+
+    pool = BackgroundWorkerPool(queue, BackgroundWorkerConfig(thread_workers=1))
+    pool.start()
+    assert started.wait(timeout=5)
+    stop_started = time.monotonic()
+    pool.stop(timeout=0.2)
+    elapsed = time.monotonic() - stop_started
+    released.set()
+
+    assert elapsed < 5
+
+
+def test_worker_pool_runs_process_pipelines_in_worker_processes() -> None:
+    queue = InMemoryBackgroundJobQueue()
+    queued = queue.enqueue(_enqueue_request(1, pipeline="fatigue_recompute", max_attempts=1))
+
+    config = BackgroundWorkerConfig(thread_workers=1, process_workers=1)
+    with BackgroundWorkerPool(queue, config, process_handler_factory=_process_pid_handlers) as pool:
+        assert pool.wait_until_idle(timeout=30)
+
+    dead_letters = queue.list_dead_letters()
+    assert [record.job_id for record in dead_letters] == [queued.job_id]
+    assert dead_letters[0].last_error_code == "PROCESS_PID"
+    assert dead_letters[0].last_error_message != str(os.getpid())
+
+
+def test_worker_pool_requires_process_handler_factory_for_process_workers() -> None:
+    with pytest.raises(ValueError, match="process_handler_factory"):
+        BackgroundWorkerPool(
+            InMemoryBackgroundJobQueue(), BackgroundWorkerConfig(process_workers=1)
+        )
+
+
+def test_async_worker_runs_async_handlers_concurrently() -> None:
+    queue = InMemoryBackgroundJobQueue()
+    for index in range(4):
+        queue.enqueue(_enqueue_request(index))
+
+    async def run() -> dict[str, int]:
+        gate = asyncio.Barrier(4)
+
+        async def handler(_: BackgroundJobRecord) -> None:
+            await asyncio.wait_for(gate.wait(), timeout=5)
+
+        worker = AsyncBackgroundWorker(
+            queue,
+            concurrency=4,
+            async_handlers={"workout_sync": handler},
+        )
+        await worker.start()
+        assert await worker.wait_until_idle(timeout=10)
+        await worker.stop()
+        return worker.outcome_counts
+
+    assert asyncio.run(run()) == {"succeeded": 4}
+    assert queue.metrics_snapshot().succeeded_count == 4
+
+
+def test_app_lifespan_runs_background_worker_when_enabled() -> None:
+    settings = dataclasses.replace(get_settings(), background_workers_enabled=True)
+    queue = get_background_job_queue()
+
+    with TestClient(create_app(settings)):
+        queued = queue.enqueue(_enqueue_request(1))
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            stored = queue.get_job(queued.job_id)
+            if stored is not None and stored.status == "succeeded":
+                break
+            time.sleep(0.02)
+
+    stored = queue.get_job(queued.job_id)
+    assert stored is not None
+    assert stored.status == "succeeded"
+
+
+def test_worker_cli_requires_sql_queue_backend(capsys: pytest.CaptureFixture[str]) -> None:
+    assert worker_main([]) == 2
+    assert "SPORTOLO_BACKGROUND_JOB_QUEUE_BACKEND=sql" in capsys.readouterr().err
+
+
+def test_worker_cli_requires_sql_fatigue_history(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.setenv("SPORTOLO_BACKGROUND_JOB_QUEUE_BACKEND", "sql")
+    monkeypatch.setenv("SPORTOLO_FATIGUE_HISTORY_BACKEND", "memory")
+    clear_settings_cache()
+    try:
+        assert worker_main([]) == 2
+    finally:
+        monkeypatch.undo()
+        clear_settings_cache()
+    assert "SPORTOLO_FATIGUE_HISTORY_BACKEND=sql" in capsys.readouterr().err
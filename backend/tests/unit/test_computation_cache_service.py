@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import pytest
+
+from sportolo.api.schemas.muscle_usage import (
+    ExerciseUsageInput,
+    MicrocycleUsageRequest,
+    MicrocycleUsageResponse,
+    RoutineUsageInput,
+)
+from sportolo.services.computation_cache_service import (
+    ComputationResultCache,
+    InMemoryComputationCacheBackend,
+)
+from sportolo.services.muscle_usage_service import MuscleUsageService
+
+
+def _request(*, workload: float = 10.0) -> MicrocycleUsageRequest:
+    return MicrocycleUsageRequest(
+        microcycle_id="micro-1",
+        routines=[
+            RoutineUsageInput(
+                routine_id="routine-1",
+                exercises=[
+                    ExerciseUsageInput(
+                        exercise_id="exercise-1",
+                        exercise_name="Back Squat",
+                        workload=workload,
+                    )
+                ],
+            )
+        ],
+    )
+
+
+def _key(request: MicrocycleUsageRequest, *, policy_version: str = "v1-muscle-usage") -> str:
+    return ComputationResultCache.cache_key(
+        namespace="muscle_usage",
+        policy_version=policy_version,
+        scope="athlete-1",
+        request=request,
+    )
+
+
+def test_cache_key_is_canonical_and_policy_versioned() -> None:
+    first = _key(_request())
+    replay = _key(MicrocycleUsageRequest.model_validate(_request().model_dump(by_alias=True)))
+
+    assert first == replay
+    assert first != _key(_request(workload=11.0))
+    assert first != _key(_request(), policy_version="v2-muscle-usage")
+
+
+def test_repeat_lookups_skip_computation_and_report_hit_rate() -> None:
+    cache = ComputationResultCache()
+    service = MuscleUsageService()
+    compute_calls = 0
+
+    def compute() -> MicrocycleUsageResponse:
+        nonlocal compute_calls
+        compute_calls += 1
+        return service.aggregate_microcycle(_request())
+
+    key = _key(_request())
+    first = cache.get_or_compute(key, compute)
+    second = cache.get_or_compute(key, compute)
+    metrics = cache.metrics_snapshot()
+
+    assert compute_calls == 1
+    assert first.body == second.body
+    assert first.etag == ComputationResultCache.etag_for_body(first.body)
+    assert (first.cache_hit, second.cache_hit) == (False, True)
+    assert MicrocycleUsageResponse.model_validate_json(first.body) == compute()
+    assert metrics.lookup_count == 2
+    assert metrics.local_hit_count == 1
+    assert metrics.miss_count == 1
+    assert metrics.hit_rate == pytest.approx(0.5)
+
+
+def test_local_tier_evicts_least_recently_used_and_falls_back_to_external_tier() -> None:
+    backend = InMemoryComputationCacheBackend()
+    cache = ComputationResultCache(max_local_entries=1, external_backend=backend)
+    service = MuscleUsageService()
+
+    first_key = _key(_request(workload=1.0))
+    second_key = _key(_request(workload=2.0))
+    cache.get_or_compute(first_key, lambda: service.aggregate_microcycle(_request(workload=1.0)))
+    cache.get_or_compute(second_key, lambda: service.aggregate_microcycle(_request(workload=2.0)))
+
+    def fail_compute() -> MicrocycleUsageResponse:
+        raise AssertionError("external tier should satisfy evicted entries")
+
+    replay = cache.get_or_compute(first_key, fail_compute)
+    metrics = cache.metrics_snapshot()
+
+    assert replay.body == backend.get(first_key)
+    assert metrics.eviction_count == 2
+    assert metrics.external_hit_count == 1
+    assert metrics.local_entry_count == 1
+
+
+def test_in_memory_external_tier_is_bounded() -> None:
+    backend = InMemoryComputationCacheBackend(max_entries=2)
+
+    backend.set("a", b"1")
+    backend.set("b", b"2")
+    assert backend.get("a") == b"1"
+    backend.set("c", b"3")
+
+    assert backend.get("b") is None
+    assert (backend.get("a"), backend.get("c")) == (b"1", b"3")
+    with pytest.raises(ValueError, match="max_entries"):
+        InMemoryComputationCacheBackend(max_entries=0)
+
+
+def test_if_none_match_accepts_strong_weak_and_wildcard_validators() -> None:
+    cache = ComputationResultCache()
+    service = MuscleUsageService()
+    key = _key(_request())
+
+    computed = cache.get_or_compute(key, lambda: service.aggregate_microcycle(_request()))
+    cached = cache.get_or_compute(key, lambda: service.aggregate_microcycle(_request()))
+    etag = cached.etag
+
+    assert cache.matches_etag(cached, None) is False
+    assert cache.matches_etag(cached, '"other"') is False
+    assert cache.matches_etag(cached, f'"other", {etag}') is True
+    assert cache.matches_etag(cached, f"W/{etag}") is True
+    assert cache.matches_etag(cached, "*") is True
+    # Nothing was cached before the first request, so `*` does not match it.
+    assert cache.matches_etag(computed, "*") is False
+    assert cache.matches_etag(computed, etag) is True
+    assert cache.metrics_snapshot().not_modified_count == 4
+
+
+def test_etag_follows_the_response_body_not_the_request() -> None:
+    cache = ComputationResultCache()
+    service = MuscleUsageService()
+
+    first = cache.get_or_compute(_key(_request()), lambda: service.aggregate_microcycle(_request()))
+    other_version = cache.get_or_compute(
+        _key(_request(), policy_version="v2-muscle-usage"),
+        lambda: service.aggregate_microcycle(_request()),
+    )
+    other_body = cache.get_or_compute(
+        _key(_request(workload=11.0)),
+        lambda: service.aggregate_microcycle(_request(workload=11.0)),
+    )
+
+    assert other_version.key != first.key
+    assert other_version.etag == first.etag
+    assert other_body.etag != first.etag
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
-from datetime import date
+from datetime import date, timedelta
 
-from sqlalchemy import create_engine
+import pytest
+from sqlalchemy import create_engine, func, select
 from sqlalchemy.orm import Session
 
 from sportolo.models.base import Base
+from sportolo.models.fatigue_region import FatigueRegion
 from sportolo.models.fatigue_snapshot import FatigueSnapshot
-from sportolo.repositories.fatigue_snapshot_repository import FatigueSnapshotRepository
+from sportolo.repositories.fatigue_snapshot_repository import (
+    FatigueSnapshotRepository,
+    FatigueSnapshotUpsert,
+)
 
 
 def _build_repository() -> tuple[Session, FatigueSnapshotRepository]:
@@ -90,3 +95,193 @@ def test_model_columns_exclude_legacy_lihc_hilc_names() -> None:
     column_names = set(FatigueSnapshot.__table__.columns.keys())
 
     assert column_names.isdisjoint(legacy_column_names)
+
+
+def _upsert_row(
+    *,
+    athlete_id: str = "athlete-bulk",
+    snapshot_date: date,
+    global_neural: float = 4.0,
+    system_capacity_fuel: int = 3,
+) -> FatigueSnapshotUpsert:
+    return FatigueSnapshotUpsert(
+        athlete_id=athlete_id,
+        snapshot_date=snapshot_date,
+        global_neural=global_neural,
+        global_metabolic=3.5,
+        regional_recruitment={"lower": 4.1},
+        regional_metabolic={"lower": 3.2},
+        regional_mechanical={"lower": 4.4},
+        system_capacity_sleep=None,
+        system_capacity_fuel=system_capacity_fuel,
+        system_capacity_stress=3,
+        derived_recruitment=4.1,
+    )
+
+
+def test_bulk_upsert_inserts_in_batches_and_updates_existing_athlete_days() -> None:
+    session, repository = _build_repository()
+    days = [date(2026, 2, 1) + timedelta(days=offset) for offset in range(5)]
+
+    inserted_ids = repository.bulk_upsert_snapshots(
+        [_upsert_row(snapshot_date=day) for day in days],
+        batch_size=2,
+    )
+    updated_ids = repository.bulk_upsert_snapshots(
+        [
+            _upsert_row(snapshot_date=days[4], global_neural=9.0),
+            _upsert_row(snapshot_date=days[0], global_neural=8.0),
+            _upsert_row(snapshot_date=days[0], global_neural=8.5),
+        ]
+    )
+    session.expire_all()
+
+    assert len(set(inserted_ids)) == 5
+    assert updated_ids == [inserted_ids[4], inserted_ids[0], inserted_ids[0]]
+    assert session.scalar(select(func.count()).select_from(FatigueSnapshot)) == 5
+    first_day = repository.get_snapshot(inserted_ids[0])
+    assert first_day is not None
+    assert first_day.global_neural == 8.5
+    assert first_day.regional_mechanical == {"lower": 4.4}
+
+    session.close()
+
+
+def test_bulk_upsert_validates_whole_batch_before_writing() -> None:
+    session, repository = _build_repository()
+
+    with pytest.raises(ValueError, match="fuel must be between 1 and 5"):
+        repository.bulk_upsert_snapshots(
+            [
+                _upsert_row(snapshot_date=date(2026, 2, 1)),
+                _upsert_row(snapshot_date=date(2026, 2, 2), system_capacity_fuel=9),
+            ]
+        )
+
+    assert session.scalar(select(func.count()).select_from(FatigueSnapshot)) == 0
+    assert repository.bulk_upsert_snapshots([]) == []
+
+    session.close()
+
+
+def test_list_range_reads_multiple_athletes_in_index_order() -> None:
+    session, repository = _build_repository()
+    days = [date(2026, 2, 1) + timedelta(days=offset) for offset in range(4)]
+    repository.bulk_upsert_snapshots(
+        [
+            _upsert_row(athlete_id=athlete_id, snapshot_date=day)
+            for athlete_id in ("athlete-b", "athlete-a", "athlete-c")
+            for day in reversed(days)
+        ]
+    )
+
+    rows = repository.list_range(
+        athlete_ids=["athlete-b", "athlete-a", "athlete-b"],
+        start_date=days[1],
+        end_date=days[2],
+    )
+    globals_only = repository.list_range(
+        athlete_ids=["athlete-c"],
+        start_date=days[0],
+        end_date=days[0],
+        include_regional=False,
+    )
+
+    assert [(row.athlete_id, row.snapshot_date) for row in rows] == [
+        ("athlete-a", days[1]),
+        ("athlete-a", days[2]),
+        ("athlete-b", days[1]),
+        ("athlete-b", days[2]),
+    ]
+    assert rows[0].regional_mechanical == {"lower": 4.4}
+    assert len(globals_only) == 1
+    assert globals_only[0].global_neural == 4.0
+    assert globals_only[0].regional_recruitment is None
+    assert repository.list_range(athlete_ids=[], start_date=days[0], end_date=days[3]) == []
+
+    session.close()
+
+
+def test_latest_for_athletes_returns_most_recent_snapshot_per_athlete() -> None:
+    session, repository = _build_repository()
+    repository.bulk_upsert_snapshots(
+        [
+            _upsert_row(athlete_id="athlete-a", snapshot_date=date(2026, 2, 1), global_neural=1.0),
+            _upsert_row(athlete_id="athlete-a", snapshot_date=date(2026, 2, 5), global_neural=5.0),
+            _upsert_row(athlete_id="athlete-b", snapshot_date=date(2026, 2, 3), global_neural=3.0),
+        ]
+    )
+
+    latest = repository.latest_for_athletes(["athlete-a", "athlete-b", "athlete-missing"])
+    as_of = repository.latest_for_athletes(
+        ["athlete-a", "athlete-b"],
+        on_or_before=date(2026, 2, 2),
+        include_regional=False,
+    )
+
+    assert set(latest) == {"athlete-a", "athlete-b"}
+    assert latest["athlete-a"].snapshot_date == date(2026, 2, 5)
+    assert latest["athlete-a"].global_neural == 5.0
+    assert latest["athlete-b"].snapshot_date == date(2026, 2, 3)
+    assert set(as_of) == {"athlete-a"}
+    assert as_of["athlete-a"].global_neural == 1.0
+    assert as_of["athlete-a"].regional_metabolic is None
+    assert repository.latest_for_athletes([]) == {}
+
+    session.close()
+
+
+def test_region_series_reads_columnar_axes_and_tracks_upserted_regions() -> None:
+    session, repository = _build_repository()
+    first_day, second_day = date(2026, 3, 1), date(2026, 3, 2)
+    repository.bulk_upsert_snapshots(
+        [
+            _upsert_row(snapshot_date=first_day),
+            FatigueSnapshotUpsert(
+                athlete_id="athlete-bulk",
+                snapshot_date=second_day,
+                global_neural=4.0,
+                global_metabolic=3.5,
+                regional_recruitment={"lower": 5.0, "upper": 2.0},
+                regional_metabolic={"lower": 4.0},
+                regional_mechanical={"upper": 1.5},
+                system_capacity_sleep=None,
+                system_capacity_fuel=3,
+                system_capacity_stress=3,
+                derived_recruitment=None,
+            ),
+        ]
+    )
+
+    lower = repository.list_region_series(
+        athlete_id="athlete-bulk",
+        region="lower",
+        start_date=first_day,
+        end_date=second_day,
+    )
+    upper = repository.list_region_series(
+        athlete_id="athlete-bulk",
+        region="upper",
+        start_date=first_day,
+        end_date=second_day,
+    )
+
+    assert [(point.snapshot_date, point.recruitment, point.metabolic) for point in lower] == [
+        (first_day, 4.1, 3.2),
+        (second_day, 5.0, 4.0),
+    ]
+    assert lower[1].mechanical is None
+    assert [(point.snapshot_date, point.mechanical) for point in upper] == [(second_day, 1.5)]
+
+    repository.bulk_upsert_snapshots([_upsert_row(snapshot_date=second_day)])
+    upper_after_update = repository.list_region_series(
+        athlete_id="athlete-bulk",
+        region="upper",
+        start_date=first_day,
+        end_date=second_day,
+    )
+
+    assert upper_after_update == []
+    assert session.scalar(select(func.count()).select_from(FatigueRegion)) == 2
+
+    session.close()
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+from datetime import UTC, date, datetime
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from sportolo.api.schemas.axis_scoring import AxisRawLoad, AxisSessionInput
+from sportolo.api.schemas.fatigue_today import SystemCapacityInput
+from sportolo.models.base import Base
+from sportolo.models.fatigue_snapshot import FatigueSnapshot
+from sportolo.services.background_job_queue_service import (
+    BackgroundJobEnqueueRequest,
+    BackgroundJobRecord,
+    InMemoryBackgroundJobQueue,
+)
+from sportolo.services.fatigue_snapshot_service import (
+    FatigueSessionRecord,
+    FatigueSnapshotService,
+    InMemoryFatigueHistorySource,
+    SqlFatigueHistorySource,
+    fatigue_session_from_ride,
+)
+
+
+def _build_service() -> tuple[
+    sessionmaker[Session], InMemoryFatigueHistorySource, FatigueSnapshotService
+]:
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    history_source = InMemoryFatigueHistorySource()
+    service = FatigueSnapshotService(
+        session_factory=session_factory,
+        history_source=history_source,
+    )
+    return session_factory, history_source, service
+
+
+def _session(session_id: str, ended_at: datetime, load: float) -> AxisSessionInput:
+    return AxisSessionInput(
+        session_id=session_id,
+        state="completed",
+        ended_at=ended_at,
+        raw_load=AxisRawLoad(neural=load, metabolic=load, mechanical=load),
+    )
+
+
+def test_recompute_range_writes_one_snapshot_per_day_with_regional_split() -> None:
+    session_factory, history_source, service = _build_service()
+    history_source.record_session(
+        "athlete-1",
+        FatigueSessionRecord(
+            session=_session("squat-day", datetime(2026, 2, 10, 18, tzinfo=UTC), 30),
+            regional_distribution={"lower_body": 0.75, "core": 0.25},
+        ),
+    )
+    history_source.record_system_capacity(
+        "athlete-1", date(2026, 2, 10), SystemCapacityInput(sleep=2, fuel=4, stress=5)
+    )
+
+    result = service.recompute_range(
+        "athlete-1",
+        start_date=date(2026, 2, 9),
+        end_date=date(2026, 2, 12),
+    )
+    listed = service.list_snapshots(
+        "athlete-1",
+        start_date=date(2026, 2, 1),
+        end_date=date(2026, 2, 28),
+    )
+
+    assert len(result.snapshot_ids) == 4
+    assert [day.snapshot_date for day in listed.snapshots] == [
+        date(2026, 2, 9),
+        date(2026, 2, 10),
+        date(2026, 2, 11),
+        date(2026, 2, 12),
+    ]
+    rest_day, session_day, decay_day, _ = listed.snapshots
+    assert rest_day.global_metabolic == 1.0
+    # Regions are scored on their own load share, so a region at rest sits at baseline.
+    assert rest_day.regional_mechanical == {"core": 1.0, "lower_body": 1.0}
+    assert session_day.global_metabolic > 1.0
+    assert set(session_day.regional_mechanical) == {"core", "lower_body"}
+    lower_body = session_day.regional_metabolic["lower_body"]
+    core = session_day.regional_metabolic["core"]
+    assert session_day.global_metabolic > lower_body > core > 1.0
+    assert decay_day.regional_metabolic["lower_body"] < lower_body
+    assert session_day.system_capacity.sleep == 2
+    assert session_day.system_capacity.stress == 5
+    assert decay_day.global_metabolic < session_day.global_metabolic
+    assert decay_day.system_capacity.fuel == 3
+
+    with session_factory() as session:
+        assert session.scalar(select(func.count()).select_from(FatigueSnapshot)) == 4
+
+
+def test_recompute_is_an_upsert_for_existing_athlete_days() -> None:
+    session_factory, history_source, service = _build_service()
+    service.recompute_range("athlete-1", start_date=date(2026, 2, 10), end_date=date(2026, 2, 10))
+    history_source.record_session(
+        "athlete-1",
+        FatigueSessionRecord(
+            session=_session("late-add", datetime(2026, 2, 10, 9, tzinfo=UTC), 20)
+        ),
+    )
+
+    service.recompute_range("athlete-1", start_date=date(2026, 2, 10), end_date=date(2026, 2, 10))
+    listed = service.list_snapshots(
+        "athlete-1", start_date=date(2026, 2, 10), end_date=date(2026, 2, 10)
+    )
+
+    assert len(listed.snapshots) == 1
+    assert listed.snapshots[0].global_neural > 1.0
+    assert listed.snapshots[0].regional_recruitment == {
+        "global_other": listed.snapshots[0].derived_recruitment
+    }
+
+
+def test_recompute_job_handler_derives_window_and_rejects_invalid_payloads() -> None:
+    _, _, service = _build_service()
+    queue = InMemoryBackgroundJobQueue(
+        default_handlers={"fatigue_recompute": service.handle_recompute_job}
+    )
+    queue.enqueue(
+        BackgroundJobEnqueueRequest(
+            athlete_id="athlete-1",
+            pipeline="fatigue_recompute",
+            idempotency_key="recompute-window",
+            correlation_id="corr-window",
+            payload={"recomputeFrom": "2026-02-01", "recomputeTo": "2026-02-20"},
+        )
+    )
+    invalid = queue.enqueue(
+        BackgroundJobEnqueueRequest(
+            athlete_id="athlete-1",
+            pipeline="fatigue_recompute",
+            idempotency_key="recompute-invalid",
+            correlation_id="corr-invalid",
+            payload={"externalActivityId": "activity-1"},
+        )
+    )
+
+    outcomes = queue.process_until_idle()
+    listed = service.list_snapshots(
+        "athlete-1", start_date=date(2026, 2, 1), end_date=date(2026, 2, 28)
+    )
+
+    assert [outcome.status for outcome in outcomes] == ["succeeded", "dead_letter"]
+    assert len(listed.snapshots) == 20
+    dead_letter = queue.get_job(invalid.job_id)
+    assert dead_letter is not None
+    assert dead_letter.last_error_code == "FATIGUE_RECOMPUTE_INVALID_PAYLOAD"
+
+
+def test_coalesced_recompute_jobs_cover_the_union_of_activity_windows() -> None:
+    _, _, service = _build_service()
+    executed: list[BackgroundJobRecord] = []
+
+    def recording_handler(record: BackgroundJobRecord) -> None:
+        executed.append(record)
+        service.handle_recompute_job(record)
+
+    queue = InMemoryBackgroundJobQueue(
+        default_handlers={"fatigue_recompute": recording_handler},
+        payload_coalescers={"fatigue_recompute": service.coalesce_recompute_payloads},
+    )
+    windows = [
+        ("2026-02-01", "2026-02-03"),
+        ("2026-02-03", "2026-02-05"),
+        ("2026-02-20", "2026-02-21"),
+    ]
+    for index, (start, end) in enumerate(windows):
+        queue.enqueue(
+            BackgroundJobEnqueueRequest(
+                athlete_id="athlete-1",
+                pipeline="fatigue_recompute",
+                idempotency_key=f"recompute-{index}",
+                correlation_id=f"corr-{index}",
+                payload={"recomputeFrom": start, "recomputeTo": end},
+            )
+        )
+
+    outcomes = queue.process_until_idle()
+    listed = service.list_snapshots(
+        "athlete-1", start_date=date(2026, 2, 1), end_date=date(2026, 2, 28)
+    )
+
+    assert [outcome.status for outcome in outcomes] == ["succeeded"]
+    assert executed[0].payload["recomputeWindows"] == (
+        {"from": "2026-02-01", "to": "2026-02-05"},
+        {"from": "2026-02-20", "to": "2026-02-21"},
+    )
+    assert len(listed.snapshots) == 7
+    assert (
+        service.coalesce_recompute_payloads(
+            {"recomputeFrom": "2026-02-01", "recomputeTo": "2026-02-02"},
+            {
+                "recomputeFrom": "2026-02-01",
+                "recomputeTo": "2026-02-02",
+                "timezone": "Europe/Paris",
+            },
+        )
+        is None
+    )
+
+
+def test_sql_history_source_is_shared_across_sessions_and_replaces_reimports() -> None:
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    writer = SqlFatigueHistorySource(session_factory=session_factory)
+    reader = SqlFatigueHistorySource(session_factory=session_factory)
+    ride = fatigue_session_from_ride(
+        session_id="wahoo-activity-1",
+        ended_at=datetime(2026, 2, 10, 7, 30, tzinfo=UTC),
+        duration_seconds=3_600,
+    )
+
+    writer.record_sessions("athlete-1", [ride, ride])
+    writer.record_session(
+        "athlete-1",
+        FatigueSessionRecord(
+            session=_session("outside-window", datetime(2026, 3, 1, tzinfo=UTC), 10)
+        ),
+    )
+    sessions = reader.list_sessions(
+        "athlete-1",
+        ended_after=datetime(2026, 2, 1, tzinfo=UTC),
+        ended_before=datetime(2026, 2, 28, tzinfo=UTC),
+    )
+
+    assert [record.session.session_id for record in sessions] == ["wahoo-activity-1"]
+    stored = sessions[0]
+    assert stored.session.ended_at == datetime(2026, 2, 10, 7, 30, tzinfo=UTC)
+    assert stored.session.raw_load == ride.session.raw_load
+    assert stored.regional_distribution == {"lower_body": 0.85, "core": 0.15}
+
+    service = FatigueSnapshotService(session_factory=session_factory, history_source=reader)
+    service.recompute_range("athlete-1", start_date=date(2026, 2, 10), end_date=date(2026, 2, 10))
+    listed = service.list_snapshots(
+        "athlete-1", start_date=date(2026, 2, 10), end_date=date(2026, 2, 10)
+    )
+    assert listed.snapshots[0].global_metabolic > 1.0
+
+    reader.reset()
+    assert (
+        writer.list_sessions(
+            "athlete-1",
+            ended_after=datetime(2026, 1, 1, tzinfo=UTC),
+            ended_before=datetime(2026, 12, 31, tzinfo=UTC),
+        )
+        == []
+    )
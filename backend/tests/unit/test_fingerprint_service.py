@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import hashlib
+import json
+
+import pytest
+
+from sportolo.api.schemas.wahoo_integration import WahooExecutionHistorySyncRequest
+from sportolo.services.background_job_queue_service import (
+    BackgroundJobEnqueueRequest,
+    fingerprint_enqueue_request,
+)
+from sportolo.services.fingerprint_service import (
+    canonical_json_bytes,
+    fingerprint_bytes,
+    fingerprint_json,
+    fingerprint_model,
+)
+from sportolo.services.wahoo_integration_service import WahooIntegrationService
+
+
+def test_json_fingerprints_are_canonical_and_stable() -> None:
+    value = {"b": [1, {"d": None, "c": "x"}], "a": 1.5}
+    expected = hashlib.sha256(
+        json.dumps(value, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+    assert canonical_json_bytes(value) == b'{"a":1.5,"b":[1,{"c":"x","d":null}]}'
+    assert fingerprint_json(value) == expected
+    assert fingerprint_json({"a": 1.5, "b": [1, {"c": "x", "d": None}]}) == expected
+
+    fast = fingerprint_json(value, algorithm="fast")
+    assert len(fast) == 16
+    assert fast != fingerprint_json({**value, "a": 2}, algorithm="fast")
+
+    request = WahooExecutionHistorySyncRequest(idempotency_key="sync-1")
+    assert fingerprint_model(request) == fingerprint_bytes(
+        b'{"idempotencyKey":"sync-1","startedAfter":null,"startedBefore":null,"mode":"full"}'
+    )
+
+
+def test_enqueue_fingerprint_covers_pipeline_and_payload_only() -> None:
+    request = BackgroundJobEnqueueRequest(
+        athlete_id="athlete-1",
+        pipeline="workout_sync",
+        idempotency_key="idem-1",
+        correlation_id="corr-1",
+        payload={"externalActivityId": "activity-1"},
+    )
+    other_key = BackgroundJobEnqueueRequest(
+        athlete_id="athlete-2",
+        pipeline="workout_sync",
+        idempotency_key="idem-2",
+        correlation_id="corr-2",
+        payload={"externalActivityId": "activity-1"},
+    )
+
+    assert fingerprint_enqueue_request(request) == fingerprint_json(
+        {"pipeline": "workout_sync", "payload": {"externalActivityId": "activity-1"}}
+    )
+    assert fingerprint_enqueue_request(request) == fingerprint_enqueue_request(other_key)
+    assert len(fingerprint_enqueue_request(request, algorithm="fast")) == 16
+
+
+def test_request_fingerprint_ignores_body_encoding_and_detects_drift() -> None:
+    service = WahooIntegrationService()
+    request = WahooExecutionHistorySyncRequest.model_validate_json(
+        b'{"idempotencyKey": "sync-raw", "mode": "full"}'
+    )
+    reencoded = WahooExecutionHistorySyncRequest.model_validate_json(
+        b'{\n  "mode":"full",\n  "idempotencyKey":"sync-raw"\n}'
+    )
+
+    first = service.sync_execution_history_summary_body("athlete-1", request)
+    replay = service.sync_execution_history_summary_body("athlete-1", reencoded)
+
+    assert replay is first
+    assert fingerprint_model(reencoded, algorithm="fast") == fingerprint_model(
+        request, algorithm="fast"
+    )
+    with pytest.raises(ValueError, match="idempotency"):
+        service.sync_execution_history_response_body(
+            "athlete-1", request.model_copy(update={"mode": "incremental"})
+        )
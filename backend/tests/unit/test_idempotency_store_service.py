@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from sportolo.api.schemas.wahoo_integration import WahooTrainerControlRequest
+from sportolo.models.base import Base
+from sportolo.services.idempotency_store_service import (
+    InMemoryIdempotencyStore,
+    SqlIdempotencyStore,
+)
+from sportolo.services.wahoo_control_service import WahooControlService
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=UTC)
+
+
+def _session_factory(database_path: Path) -> sessionmaker[Session]:
+    engine = create_engine(f"sqlite+pysqlite:///{database_path}", future=True)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def test_in_memory_store_expires_entries_and_evicts_the_oldest() -> None:
+    store = InMemoryIdempotencyStore(ttl_seconds=60, max_entries=2)
+
+    first = store.put(
+        "scope", "athlete-1", "key-1", request_fingerprint="a", response_body=b"1", now=NOW
+    )
+    racer = store.put(
+        "scope", "athlete-1", "key-1", request_fingerprint="b", response_body=b"2", now=NOW
+    )
+    assert racer is first
+    assert store.get("scope", "athlete-1", "key-1", now=NOW + timedelta(seconds=59)) is first
+    assert store.get("scope", "athlete-1", "key-1", now=NOW + timedelta(seconds=60)) is None
+    assert store.get("other-scope", "athlete-1", "key-1", now=NOW) is None
+
+    store.put("scope", "athlete-1", "key-2", request_fingerprint="c", response_body=b"3", now=NOW)
+    store.put("scope", "athlete-1", "key-3", request_fingerprint="d", response_body=b"4", now=NOW)
+    assert len(store) == 2
+    assert store.get("scope", "athlete-1", "key-1", now=NOW) is None
+
+    store.put(
+        "scope",
+        "athlete-1",
+        "key-4",
+        request_fingerprint="e",
+        response_body=b"5",
+        now=NOW + timedelta(seconds=61),
+    )
+    assert len(store) == 1
+
+    with pytest.raises(ValueError, match="max_entries"):
+        InMemoryIdempotencyStore(max_entries=0)
+
+
+def test_sql_store_replays_across_instances_and_prunes(tmp_path: Path) -> None:
+    session_factory = _session_factory(tmp_path / "idempotency.db")
+    store = SqlIdempotencyStore(session_factory=session_factory, ttl_seconds=60, max_entries=2)
+    restarted = SqlIdempotencyStore(session_factory=session_factory, ttl_seconds=60)
+
+    stored = store.put(
+        "wahoo_push", "athlete-1", "key-1", request_fingerprint="a", response_body=b"{}", now=NOW
+    )
+    loser = restarted.put(
+        "wahoo_push", "athlete-1", "key-1", request_fingerprint="b", response_body=b"[]", now=NOW
+    )
+    assert loser == stored
+    assert restarted.get("wahoo_push", "athlete-1", "key-1", now=NOW) == stored
+    assert restarted.get("wahoo_push", "athlete-1", "key-1", now=NOW + timedelta(minutes=1)) is None
+
+    later = NOW + timedelta(minutes=2)
+    replaced = store.put(
+        "wahoo_push", "athlete-1", "key-1", request_fingerprint="c", response_body=b"[]", now=later
+    )
+    assert replaced.request_fingerprint == "c"
+    assert replaced.expires_at == later + timedelta(seconds=60)
+
+    for index in range(3):
+        store.put(
+            "wahoo_sync",
+            "athlete-1",
+            f"key-{index}",
+            request_fingerprint="d",
+            response_body=b"{}",
+            now=later + timedelta(seconds=index),
+        )
+    assert store.prune(later + timedelta(seconds=3)) == 2
+    assert store.get("wahoo_sync", "athlete-1", "key-2", now=later) is not None
+    assert store.get("wahoo_sync", "athlete-1", "key-0", now=later) is None
+
+
+def test_control_replays_are_shared_through_the_store(tmp_path: Path) -> None:
+    store = SqlIdempotencyStore(session_factory=_session_factory(tmp_path / "idempotency.db"))
+    request = WahooTrainerControlRequest(
+        idempotency_key="control-shared",
+        trainer_id="kickr-bike-001",
+        mode="erg",
+        target_value=250,
+        target_unit="watts",
+    )
+
+    first_body = WahooControlService(idempotency_store=store).send_control_command_response_body(
+        "athlete-1", request
+    )
+    other_worker = WahooControlService(idempotency_store=store)
+    replay_body = other_worker.send_control_command_response_body("athlete-1", request)
+
+    assert replay_body == first_body
+    assert other_worker.send_control_command("athlete-1", request).status == "applied"
+    with pytest.raises(ValueError, match="idempotency"):
+        other_worker.send_control_command(
+            "athlete-1", request.model_copy(update={"target_value": 260})
+        )
@@ -0,0 +1,510 @@
+from __future__ import annotations
+
+import pickle
+import threading
+from collections import Counter
+from collections.abc import Mapping
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from sportolo.models.background_job import BackgroundJob, BackgroundJobAttempt
+from sportolo.models.base import Base
+from sportolo.services.background_job_queue_service import (
+    BackgroundJobDeadLetterFilter,
+    BackgroundJobEnqueueRequest,
+    BackgroundJobExecutionError,
+    BackgroundJobPayloadCoalescer,
+    BackgroundJobPipeline,
+    BackgroundJobRecord,
+)
+from sportolo.services.background_job_retry_service import (
+    BackgroundJobBackoffPolicy,
+    BackgroundJobRetryController,
+    BackgroundJobWorkerCircuitBreakerPolicy,
+)
+from sportolo.services.sql_background_job_queue_service import SqlBackgroundJobQueue
+
+
+def _session_factory(database_path: Path) -> sessionmaker[Session]:
+    engine = create_engine(
+        f"sqlite+pysqlite:///{database_path}",
+        future=True,
+        connect_args={"timeout": 30},
+    )
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def _enqueue_request(
+    *,
+    idempotency_key: str,
+    payload_suffix: str,
+    max_attempts: int = 3,
+) -> BackgroundJobEnqueueRequest:
+    return BackgroundJobEnqueueRequest(
+        athlete_id="athlete-1",
+        pipeline="workout_sync",
+        idempotency_key=idempotency_key,
+        correlation_id=f"corr-{idempotency_key}",
+        payload={
+            "externalActivityId": f"activity-{payload_suffix}",
+            "sequenceNumber": 1,
+        },
+        max_attempts=max_attempts,
+        retry_delay_seconds=0,
+    )
+
+
+def test_sql_enqueue_is_idempotent_and_survives_a_new_queue_instance(tmp_path: Path) -> None:
+    session_factory = _session_factory(tmp_path / "queue.db")
+    queue = SqlBackgroundJobQueue(session_factory=session_factory, worker_id="worker-a")
+
+    first = queue.enqueue(_enqueue_request(idempotency_key="idem-1", payload_suffix="a"))
+    replay = queue.enqueue(_enqueue_request(idempotency_key="idem-1", payload_suffix="a"))
+    with pytest.raises(ValueError, match="idempotency"):
+        queue.enqueue(_enqueue_request(idempotency_key="idem-1", payload_suffix="b"))
+
+    restarted = SqlBackgroundJobQueue(session_factory=session_factory, worker_id="worker-b")
+    outcome = restarted.process_next()
+    stored = restarted.get_job(first.job_id)
+
+    assert replay.job_id == first.job_id
+    assert first.enqueued_at.tzinfo is not None
+    assert outcome is not None
+    assert outcome.job_id == first.job_id
+    assert outcome.status == "succeeded"
+    assert stored is not None
+    assert stored.status == "succeeded"
+    assert stored.payload == {"externalActivityId": "activity-a", "sequenceNumber": 1}
+    assert [attempt.status for attempt in stored.attempt_history] == ["succeeded"]
+    assert restarted.metrics_snapshot().total_enqueued_count == 1
+
+
+def test_sql_retry_then_dead_letter_is_persisted_with_metrics(tmp_path: Path) -> None:
+    queue = SqlBackgroundJobQueue(session_factory=_session_factory(tmp_path / "queue.db"))
+
+    def failing_handler(_: BackgroundJobRecord) -> None:
+        raise BackgroundJobExecutionError(
+            code="SYNC_TIMEOUT",
+            message="provider timeout",
+            retryable=True,
+        )
+
+    queue.register_handler("workout_sync", failing_handler)
+    queued = queue.enqueue(
+        _enqueue_request(idempotency_key="idem-dead", payload_suffix="dead", max_attempts=2)
+    )
+
+    outcomes = queue.process_until_idle()
+    dead_letters = queue.list_dead_letters()
+    metrics = queue.metrics_snapshot()
+
+    assert [outcome.status for outcome in outcomes] == ["retry_scheduled", "dead_letter"]
+    assert [record.job_id for record in dead_letters] == [queued.job_id]
+    assert dead_letters[0].last_error_code == "SYNC_TIMEOUT"
+    assert dead_letters[0].attempt_count == 2
+    assert [attempt.attempt_number for attempt in dead_letters[0].attempt_history] == [1, 2]
+    assert pickle.loads(pickle.dumps(dead_letters[0])) == dead_letters[0]
+    assert metrics.queue_depth == 0
+    assert metrics.processed_attempt_count == 2
+    assert metrics.failed_attempt_count == 2
+    assert metrics.retry_count == 1
+    assert metrics.dead_letter_count == 1
+    assert metrics.failure_rate == pytest.approx(1.0)
+
+
+def test_sql_redrive_filters_dead_letters_and_continues_attempt_numbers(tmp_path: Path) -> None:
+    queue = SqlBackgroundJobQueue(session_factory=_session_factory(tmp_path / "queue.db"))
+
+    def failing_handler(record: BackgroundJobRecord) -> None:
+        raise BackgroundJobExecutionError(
+            code=str(record.payload["externalActivityId"]).upper(),
+            message="provider outage",
+            retryable=False,
+        )
+
+    queue.register_handler("workout_sync", failing_handler)
+    for suffix in ("down", "down", "bad"):
+        queue.enqueue(
+            _enqueue_request(
+                idempotency_key=f"idem-{len(queue.list_dead_letters())}-{suffix}",
+                payload_suffix=suffix,
+                max_attempts=1,
+            )
+        )
+        queue.process_until_idle()
+
+    provider_down = BackgroundJobDeadLetterFilter(
+        pipeline="workout_sync",
+        error_code="ACTIVITY-DOWN",
+        failed_before=datetime.now(tz=UTC) + timedelta(seconds=1),
+    )
+    matching = queue.list_dead_letters(provider_down)
+    assert len(matching) == 2
+    assert len(queue.list_dead_letters(provider_down, limit=1)) == 1
+    assert queue.list_dead_letters(BackgroundJobDeadLetterFilter(athlete_id="athlete-2")) == []
+
+    job_ids = [record.job_id for record in matching]
+    redriven = queue.redrive_dead_letters([*job_ids, job_ids[0]], attempt_budget=2)
+
+    assert sorted(record.job_id for record in redriven) == sorted(job_ids)
+    assert all(record.status == "queued" and record.max_attempts == 3 for record in redriven)
+    assert queue.redrive_dead_letters(job_ids, attempt_budget=2) == []
+    assert [record.last_error_code for record in queue.list_dead_letters()] == ["ACTIVITY-BAD"]
+
+    queue.register_handler("workout_sync", lambda _: None)
+    assert [outcome.status for outcome in queue.process_until_idle()] == ["succeeded"] * 2
+    stored = queue.get_job(job_ids[0])
+    assert stored is not None
+    assert [attempt.attempt_number for attempt in stored.attempt_history] == [1, 2]
+
+
+def test_sql_expired_lease_is_reclaimed_and_stale_worker_cannot_record(tmp_path: Path) -> None:
+    session_factory = _session_factory(tmp_path / "queue.db")
+    crashed = SqlBackgroundJobQueue(session_factory=session_factory, worker_id="worker-crashed")
+    survivor = SqlBackgroundJobQueue(session_factory=session_factory, worker_id="worker-survivor")
+    queued = crashed.enqueue(_enqueue_request(idempotency_key="idem-lease", payload_suffix="l"))
+
+    claimed = crashed.claim_next()
+    assert claimed is not None
+    assert survivor.process_next() is None
+
+    with session_factory() as session:
+        session.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.job_id == queued.job_id)
+            .values(lease_expires_at=datetime.now(tz=UTC) - timedelta(seconds=1))
+        )
+        session.commit()
+
+    reclaimed = survivor.process_next()
+    crashed.complete_claim(
+        claimed,
+        None,
+        started_at=datetime.now(tz=UTC),
+        finished_at=datetime.now(tz=UTC),
+        latency_ms=1.0,
+    )
+    stored = survivor.get_job(queued.job_id)
+
+    assert reclaimed is not None
+    assert reclaimed.attempt_count == 2
+    assert stored is not None
+    assert stored.status == "succeeded"
+    assert [attempt.attempt_number for attempt in stored.attempt_history] == [2]
+
+
+def test_sql_lease_renewal_is_fenced_on_the_claimed_attempt(tmp_path: Path) -> None:
+    session_factory = _session_factory(tmp_path / "queue.db")
+    queue = SqlBackgroundJobQueue(
+        session_factory=session_factory, worker_id="worker-a", lease_seconds=60
+    )
+    queued = queue.enqueue(_enqueue_request(idempotency_key="idem-renew", payload_suffix="r"))
+
+    first_claim = queue.claim_next()
+    assert first_claim is not None
+    with session_factory() as session:
+        session.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.job_id == queued.job_id)
+            .values(lease_expires_at=datetime.now(tz=UTC) + timedelta(seconds=1))
+        )
+        session.commit()
+    assert queue.extend_lease(first_claim)
+    with session_factory() as session:
+        renewed = session.get(BackgroundJob, queued.job_id)
+        assert renewed is not None and renewed.lease_expires_at is not None
+        assert renewed.lease_expires_at.replace(tzinfo=UTC) > datetime.now(tz=UTC) + timedelta(
+            seconds=30
+        )
+
+    # The same worker id reclaims the job after its lease lapses (e.g. another thread).
+    with session_factory() as session:
+        session.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.job_id == queued.job_id)
+            .values(lease_expires_at=datetime.now(tz=UTC) - timedelta(seconds=1))
+        )
+        session.commit()
+    second_claim = queue.claim_next()
+    assert second_claim is not None and second_claim.attempt_count == 2
+
+    assert not queue.extend_lease(first_claim)
+    queue.complete_claim(
+        first_claim,
+        None,
+        started_at=datetime.now(tz=UTC),
+        finished_at=datetime.now(tz=UTC),
+        latency_ms=1.0,
+    )
+    stale = queue.get_job(queued.job_id)
+    assert stale is not None
+    assert stale.status == "processing"
+    assert stale.attempt_history == ()
+
+    queue.complete_claim(
+        second_claim,
+        None,
+        started_at=datetime.now(tz=UTC),
+        finished_at=datetime.now(tz=UTC),
+        latency_ms=1.0,
+    )
+    stored = queue.get_job(queued.job_id)
+    assert stored is not None and stored.status == "succeeded"
+    assert [attempt.attempt_number for attempt in stored.attempt_history] == [2]
+    assert not queue.extend_lease(second_claim)
+
+
+def test_sql_queue_concurrent_workers_execute_each_job_once(tmp_path: Path) -> None:
+    session_factory = _session_factory(tmp_path / "queue.db")
+    executions: Counter[str] = Counter()
+    executions_lock = threading.Lock()
+
+    def handler(record: BackgroundJobRecord) -> None:
+        with executions_lock:
+            executions[record.job_id] += 1
+
+    workers = [
+        SqlBackgroundJobQueue(
+            session_factory=session_factory,
+            default_handlers={"workout_sync": handler},
+            worker_id=f"worker-{index}",
+        )
+        for index in range(4)
+    ]
+    job_ids = [
+        workers[0]
+        .enqueue(_enqueue_request(idempotency_key=f"idem-{index}", payload_suffix=str(index)))
+        .job_id
+        for index in range(40)
+    ]
+
+    threads = [threading.Thread(target=worker.process_until_idle) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(executions) == sorted(job_ids)
+    assert set(executions.values()) == {1}
+    assert workers[0].metrics_snapshot().succeeded_count == 40
+
+
+def _merge_activity_ids(pending: Mapping[str, Any], incoming: Mapping[str, Any]) -> dict[str, Any]:
+    pending_ids = pending.get("externalActivityIds") or [pending["externalActivityId"]]
+    return {"externalActivityIds": sorted({*pending_ids, incoming["externalActivityId"]})}
+
+
+def _recompute_request(athlete_id: str, idempotency_key: str) -> BackgroundJobEnqueueRequest:
+    return BackgroundJobEnqueueRequest(
+        athlete_id=athlete_id,
+        pipeline="fatigue_recompute",
+        idempotency_key=idempotency_key,
+        correlation_id=f"corr-{idempotency_key}",
+        payload={"externalActivityId": idempotency_key},
+    )
+
+
+def test_sql_coalesces_pending_jobs_and_serializes_per_athlete(tmp_path: Path) -> None:
+    session_factory = _session_factory(tmp_path / "queue.db")
+    coalescers: dict[BackgroundJobPipeline, BackgroundJobPayloadCoalescer] = {
+        "fatigue_recompute": _merge_activity_ids
+    }
+    worker_a = SqlBackgroundJobQueue(
+        session_factory=session_factory, payload_coalescers=coalescers, worker_id="worker-a"
+    )
+    worker_b = SqlBackgroundJobQueue(
+        session_factory=session_factory, payload_coalescers=coalescers, worker_id="worker-b"
+    )
+
+    first = worker_a.enqueue(_recompute_request("athlete-1", "a"))
+    merged = worker_b.enqueue(_recompute_request("athlete-1", "b"))
+    replay = worker_a.enqueue(_recompute_request("athlete-1", "b"))
+    with pytest.raises(ValueError, match="idempotency"):
+        worker_a.enqueue(
+            BackgroundJobEnqueueRequest(
+                athlete_id="athlete-1",
+                pipeline="fatigue_recompute",
+                idempotency_key="b",
+                correlation_id="corr-drift",
+                payload={"externalActivityId": "drift"},
+            )
+        )
+
+    assert merged.job_id == first.job_id
+    assert replay.job_id == first.job_id
+    assert merged.payload == {"externalActivityIds": ("a", "b")}
+    assert merged.coalesced_request_count == 1
+    assert worker_a.metrics_snapshot().coalesced_request_count == 1
+
+    running = worker_a.claim_next()
+    assert running is not None and running.job_id == first.job_id
+    queued_behind = worker_b.enqueue(_recompute_request("athlete-1", "c"))
+    other_athlete = worker_b.enqueue(_recompute_request("athlete-2", "d"))
+
+    other_claim = worker_b.claim_next()
+    assert other_claim is not None and other_claim.job_id == other_athlete.job_id
+    assert worker_b.claim_next() is None
+
+    worker_a.complete_claim(
+        running,
+        None,
+        started_at=datetime.now(tz=UTC),
+        finished_at=datetime.now(tz=UTC),
+        latency_ms=1.0,
+    )
+    released = worker_b.claim_next()
+
+    assert released is not None
+    assert released.job_id == queued_behind.job_id
+    assert queued_behind.job_id != first.job_id
+
+
+def test_sql_enqueue_many_writes_one_batch_with_replays_and_coalescing(tmp_path: Path) -> None:
+    queue = SqlBackgroundJobQueue(
+        session_factory=_session_factory(tmp_path / "queue.db"),
+        payload_coalescers={"fatigue_recompute": _merge_activity_ids},
+    )
+    existing = queue.enqueue(_recompute_request("athlete-1", "a"))
+
+    records = queue.enqueue_many(
+        [
+            _recompute_request("athlete-1", "a"),
+            _recompute_request("athlete-1", "b"),
+            _recompute_request("athlete-2", "c"),
+            _recompute_request("athlete-2", "d"),
+            _enqueue_request(idempotency_key="sync-1", payload_suffix="s"),
+            _enqueue_request(idempotency_key="sync-1", payload_suffix="s"),
+        ]
+    )
+    with pytest.raises(ValueError, match="idempotency"):
+        queue.enqueue_many(
+            [
+                _enqueue_request(idempotency_key="sync-2", payload_suffix="t"),
+                _enqueue_request(idempotency_key="sync-1", payload_suffix="drift"),
+            ]
+        )
+    skipped = queue.enqueue_many(
+        [_enqueue_request(idempotency_key="sync-3", payload_suffix="u")],
+        return_records=False,
+    )
+
+    assert skipped == []
+    assert [record.job_id for record in records[:2]] == [existing.job_id, existing.job_id]
+    assert records[1].payload == {"externalActivityIds": ("a", "b")}
+    assert records[2].job_id == records[3].job_id
+    assert records[3].payload == {"externalActivityIds": ("c", "d")}
+    assert records[4].job_id == records[5].job_id
+    metrics = queue.metrics_snapshot()
+    assert metrics.total_enqueued_count == 4
+    assert metrics.coalesced_request_count == 2
+
+
+def test_sql_metrics_aggregate_latency_histograms_per_pipeline(tmp_path: Path) -> None:
+    session_factory = _session_factory(tmp_path / "queue.db")
+    worker_a = SqlBackgroundJobQueue(session_factory=session_factory, worker_id="worker-a")
+    worker_b = SqlBackgroundJobQueue(session_factory=session_factory, worker_id="worker-b")
+    worker_a.enqueue(_enqueue_request(idempotency_key="sync-1", payload_suffix="a"))
+    worker_a.enqueue(_recompute_request("athlete-1", "fatigue-1"))
+
+    latencies_ms = {"workout_sync": 8.0, "fatigue_recompute": 3_000.0}
+    for worker in (worker_a, worker_b):
+        record = worker.claim_next()
+        assert record is not None
+        started_at = record.available_at + timedelta(milliseconds=200)
+        worker.complete_claim(
+            record,
+            None,
+            started_at=started_at,
+            finished_at=started_at + timedelta(milliseconds=latencies_ms[record.pipeline]),
+            latency_ms=latencies_ms[record.pipeline],
+        )
+
+    metrics = worker_b.metrics_snapshot()
+    fatigue = metrics.pipelines["fatigue_recompute"]
+
+    assert metrics.processed_attempt_count == 2
+    assert metrics.pipelines["workout_sync"].processing_latency.p99_ms <= 8.0
+    assert 2_000.0 < fatigue.processing_latency.p95_ms <= 3_000.0
+    assert fatigue.queue_wait.count == 1
+    assert fatigue.queue_wait.max_ms == pytest.approx(200.0)
+    assert fatigue.throughput_per_second[60] == pytest.approx(1 / 60)
+
+
+def test_sql_metrics_come_from_rollups_that_survive_attempt_retention(tmp_path: Path) -> None:
+    session_factory = _session_factory(tmp_path / "queue.db")
+    queue = SqlBackgroundJobQueue(
+        session_factory=session_factory,
+        worker_id="worker-a",
+        attempt_retention_seconds=3_600,
+    )
+    for index in range(3):
+        queue.enqueue(_enqueue_request(idempotency_key=f"idem-{index}", payload_suffix=str(index)))
+    queue.enqueue(_enqueue_request(idempotency_key="idem-0", payload_suffix="0"))
+    assert len(queue.process_until_idle()) == 3
+    with session_factory() as session:
+        session.execute(
+            update(BackgroundJobAttempt).values(
+                finished_at=datetime.now(tz=UTC) - timedelta(hours=2)
+            )
+        )
+        session.commit()
+
+    before = queue.metrics_snapshot()
+    assert queue.compact() == 3
+    after = queue.metrics_snapshot()
+
+    assert after.total_enqueued_count == 3
+    assert after.succeeded_count == before.succeeded_count == 3
+    sync = after.pipelines["workout_sync"]
+    assert sync.processing_latency == before.pipelines["workout_sync"].processing_latency
+    assert sync.queue_wait.count == 3
+    assert sync.throughput_per_second[60] == 0.0
+    stored = queue.get_job(
+        queue.enqueue(_enqueue_request(idempotency_key="idem-0", payload_suffix="0")).job_id
+    )
+    assert stored is not None and stored.attempt_history == ()
+    with pytest.raises(ValueError, match="throughput window"):
+        SqlBackgroundJobQueue(session_factory=session_factory, attempt_retention_seconds=60)
+
+
+def test_sql_retries_back_off_and_park_behind_an_open_circuit(tmp_path: Path) -> None:
+    controller = BackgroundJobRetryController(
+        backoff_policies={
+            "workout_sync": BackgroundJobBackoffPolicy(base_delay_seconds=5, jitter="none")
+        },
+        circuit_breaker=BackgroundJobWorkerCircuitBreakerPolicy(
+            failure_threshold=2, open_seconds=120
+        ),
+    )
+
+    def failing_handler(_: BackgroundJobRecord) -> None:
+        raise BackgroundJobExecutionError(
+            code="PROVIDER_UNAVAILABLE",
+            message="provider returned 503",
+            retryable=True,
+        )
+
+    queue = SqlBackgroundJobQueue(
+        session_factory=_session_factory(tmp_path / "queue.db"),
+        default_handlers={"workout_sync": failing_handler},
+        retry_controller=controller,
+    )
+    first = queue.enqueue(_enqueue_request(idempotency_key="idem-1", payload_suffix="a"))
+    second = queue.enqueue(_enqueue_request(idempotency_key="idem-2", payload_suffix="b"))
+
+    outcomes = queue.process_until_idle()
+    backed_off = queue.get_job(first.job_id)
+    parked = queue.get_job(second.job_id)
+
+    assert [outcome.status for outcome in outcomes] == ["retry_scheduled", "retry_scheduled"]
+    assert backed_off is not None and backed_off.last_failed_at is not None
+    assert parked is not None and parked.last_failed_at is not None
+    assert backed_off.available_at - backed_off.last_failed_at == timedelta(seconds=5)
+    assert parked.available_at - parked.last_failed_at == timedelta(seconds=125)
+    assert queue.metrics_snapshot().worker_open_circuit_error_codes == ("PROVIDER_UNAVAILABLE",)
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from sportolo.api.dependencies import BackgroundJobQueueDispatchSink
+from sportolo.models.base import Base
+from sportolo.services.background_job_queue_service import (
+    BackgroundJobEnqueueRequest,
+    BackgroundJobExecutionError,
+    BackgroundJobRecord,
+    InMemoryBackgroundJobQueue,
+)
+from sportolo.services.wahoo_bulk_sync_service import (
+    InMemoryWahooAccessTokenSource,
+    InMemoryWahooBulkSyncCheckpointStore,
+    SqlWahooBulkSyncCheckpointStore,
+    WahooBulkSyncCheckpointRecord,
+    WahooBulkSyncOrchestrator,
+    shard_for_athlete,
+)
+from sportolo.services.wahoo_integration_service import WahooIntegrationService
+from sportolo.services.wahoo_provider_client import WahooProviderActivity, WahooProviderError
+
+HISTORY_START = datetime(2026, 1, 1, 6, 0, tzinfo=UTC)
+
+
+class _FakeProviderClient:
+    """Serves `activity_count` rides per athlete and raises scripted errors first."""
+
+    def __init__(
+        self,
+        activity_count: int,
+        scripted_errors: dict[str, list[WahooProviderError]],
+        fetch_log: list[str],
+    ) -> None:
+        self._activity_count = activity_count
+        self._scripted_errors = scripted_errors
+        self._fetch_log = fetch_log
+        self.closed = False
+
+    async def fetch_history(
+        self,
+        athlete_id: str,
+        access_token: str,
+        *,
+        started_after: datetime | None = None,
+    ) -> list[WahooProviderActivity]:
+        self._fetch_log.append(athlete_id)
+        errors = self._scripted_errors.get(athlete_id)
+        if errors:
+            raise errors.pop(0)
+        return [
+            WahooProviderActivity(
+                external_activity_id=f"wahoo-activity-{athlete_id}-{index}",
+                external_workout_id=f"wahoo-ride-{athlete_id}-{index}",
+                started_at=HISTORY_START + timedelta(days=index),
+                duration_seconds=2_700,
+            )
+            for index in range(self._activity_count)
+        ]
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class _CrashingCheckpointStore(SqlWahooBulkSyncCheckpointStore):
+    """Dies while saving the `crash_on_save`-th checkpoint, like a killed worker."""
+
+    def __init__(self, *, session_factory: sessionmaker[Session], crash_on_save: int) -> None:
+        super().__init__(session_factory=session_factory)
+        self._saves_left = crash_on_save
+
+    def save(self, checkpoint: WahooBulkSyncCheckpointRecord) -> None:
+        self._saves_left -= 1
+        if self._saves_left == 0:
+            raise RuntimeError("worker killed")
+        super().save(checkpoint)
+
+
+def _session_factory(database_path: Path) -> sessionmaker[Session]:
+    engine = create_engine(f"sqlite+pysqlite:///{database_path}", future=True)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def test_shards_sync_every_connected_athlete_and_retry_pending_ones() -> None:
+    queue = InMemoryBackgroundJobQueue()
+    activity_jobs: list[BackgroundJobRecord] = []
+    tokens = InMemoryWahooAccessTokenSource()
+    for athlete_id in ("athlete-a", "athlete-b", "athlete-c", "athlete-d", "athlete-e"):
+        tokens.connect(athlete_id, f"token-{athlete_id}")
+    fetch_log: list[str] = []
+    clients: list[_FakeProviderClient] = []
+    scripted_errors = {
+        "athlete-b": [
+            WahooProviderError("Wahoo API returned 503", status_code=503, retryable=True)
+        ],
+        "athlete-c": [
+            WahooProviderError("Wahoo API returned 401", status_code=401, retryable=False)
+        ],
+    }
+
+    def client_factory() -> _FakeProviderClient:
+        clients.append(_FakeProviderClient(3, scripted_errors, fetch_log))
+        return clients[-1]
+
+    checkpoint_store = InMemoryWahooBulkSyncCheckpointStore()
+    orchestrator = WahooBulkSyncOrchestrator(
+        queue=queue,
+        integration_service=WahooIntegrationService(BackgroundJobQueueDispatchSink(queue)),
+        checkpoint_store=checkpoint_store,
+        access_token_source=tokens,
+        provider_client_factory=client_factory,
+        shard_count=3,
+    )
+    queue.register_handler("wahoo_bulk_sync", orchestrator.handle_shard_job)
+    queue.register_handler("workout_sync", activity_jobs.append)
+
+    athlete_ids = [*tokens.connected_athlete_ids(), "athlete-disconnected"]
+    run = orchestrator.start_run(athlete_ids, run_id="nightly-2026-03-01")
+    assert run.athlete_count == 6
+    assert len(run.shard_job_ids) == len({shard_for_athlete(a, 3) for a in athlete_ids})
+    replanned = orchestrator.start_run(athlete_ids, run_id="nightly-2026-03-01")
+    assert replanned.shard_job_ids == run.shard_job_ids
+
+    while queue.process_next() is not None:
+        pass
+
+    metrics = orchestrator.run_metrics(run.run_id)
+    assert metrics.done
+    assert (metrics.completed_count, metrics.failed_count, metrics.skipped_count) == (4, 1, 1)
+    assert metrics.imported_activity_count == 12
+    assert metrics.finished_at is not None
+    assert metrics.oldest_pending_lag_seconds == 0
+    assert fetch_log.count("athlete-b") == 2
+    assert all(client.closed for client in clients)
+    # Each imported ride fans out into workout_sync and fatigue_recompute jobs.
+    assert len(activity_jobs) == 12
+    assert all(job.pipeline == "workout_sync" for job in activity_jobs)
+    assert queue.metrics_snapshot().queue_depth == 0
+
+    checkpoints = {
+        checkpoint.athlete_id: checkpoint for checkpoint in checkpoint_store.list_run(run.run_id)
+    }
+    assert checkpoints["athlete-b"].attempt_count == 2
+    assert checkpoints["athlete-c"].status == "failed"
+    assert checkpoints["athlete-c"].last_error == "Wahoo API returned 401"
+
+    with pytest.raises(ValueError, match="unknown Wahoo bulk sync run"):
+        orchestrator.run_metrics("missing-run")
+
+
+def test_shard_resumes_from_sql_checkpoints_after_a_crash(tmp_path: Path) -> None:
+    session_factory = _session_factory(tmp_path / "bulk-sync.db")
+    queue = InMemoryBackgroundJobQueue()
+    service = WahooIntegrationService(BackgroundJobQueueDispatchSink(queue))
+    tokens = InMemoryWahooAccessTokenSource()
+    for athlete_id in ("athlete-a", "athlete-b", "athlete-c"):
+        tokens.connect(athlete_id, f"token-{athlete_id}")
+    fetch_log: list[str] = []
+
+    def orchestrator(store: SqlWahooBulkSyncCheckpointStore) -> WahooBulkSyncOrchestrator:
+        return WahooBulkSyncOrchestrator(
+            queue=queue,
+            integration_service=service,
+            checkpoint_store=store,
+            access_token_source=tokens,
+            provider_client_factory=lambda: _FakeProviderClient(2, {}, fetch_log),
+            shard_count=1,
+        )
+
+    crashing = orchestrator(
+        _CrashingCheckpointStore(session_factory=session_factory, crash_on_save=2)
+    )
+    run = crashing.start_run(run_id="nightly-2026-03-02")
+    with pytest.raises(RuntimeError, match="worker killed"):
+        crashing.run_shard(run.run_id, 0)
+    dispatches_before_resume = queue.metrics_snapshot().total_enqueued_count
+
+    restarted = orchestrator(SqlWahooBulkSyncCheckpointStore(session_factory=session_factory))
+    fetch_log.clear()
+    resumed = restarted.run_shard(run.run_id, 0)
+
+    # Only the athlete whose checkpoint was lost is synced again, and its sync replays.
+    assert fetch_log == ["athlete-b"]
+    assert [checkpoint.imported_count for checkpoint in resumed] == [2]
+    assert queue.metrics_snapshot().total_enqueued_count == dispatches_before_resume
+    metrics = restarted.run_metrics(run.run_id)
+    assert metrics.done
+    assert metrics.imported_activity_count == 6
+    assert metrics.athletes_per_second > 0
+    assert restarted.run_shard(run.run_id, 0) == []
+
+
+def test_invalid_bulk_sync_payload_is_not_retried() -> None:
+    queue = InMemoryBackgroundJobQueue()
+    orchestrator = WahooBulkSyncOrchestrator(
+        queue=queue,
+        integration_service=WahooIntegrationService(),
+        checkpoint_store=InMemoryWahooBulkSyncCheckpointStore(),
+        access_token_source=InMemoryWahooAccessTokenSource(),
+    )
+    queue.register_handler("wahoo_bulk_sync", orchestrator.handle_shard_job)
+    queue.enqueue(
+        BackgroundJobEnqueueRequest(
+            athlete_id="run-1",
+            pipeline="wahoo_bulk_sync",
+            idempotency_key="bad-shard",
+            correlation_id="bad-shard",
+            payload={"bulkSyncRunId": "run-1", "shardIndex": "zero"},
+        )
+    )
+
+    outcome = queue.process_next()
+
+    assert outcome is not None
+    assert queue.metrics_snapshot().dead_letter_count == 1
+    with pytest.raises(BackgroundJobExecutionError, match="shardIndex"):
+        orchestrator.handle_shard_job(queue.list_dead_letters()[0])
+    with pytest.raises(ValueError, match="shard_count"):
+        orchestrator.start_run(["athlete-a"], shard_count=0)
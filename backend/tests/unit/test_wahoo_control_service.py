@@ -1,15 +1,21 @@
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Coroutine
 from datetime import UTC, datetime
+from typing import Any
 
 import pytest
 
 from sportolo.api.schemas.wahoo_integration import (
     WahooControlMode,
     WahooTrainerControlRequest,
+    WahooTrainerControlResponse,
 )
 from sportolo.services.wahoo_control_service import (
+    SimulatedWahooTrainerProtocolAdapter,
     TrainerCommandAck,
+    WahooControlMailboxFullError,
     WahooControlService,
     WahooTrainerProtocolAdapter,
 )
@@ -36,13 +42,13 @@ class _MockTrainerAdapter(WahooTrainerProtocolAdapter):
         self.mode_calls: list[tuple[str, str, str, float, str]] = []
         self.fallback_calls: list[tuple[str, str]] = []
 
-    def reconnect(self, athlete_id: str, trainer_id: str) -> TrainerCommandAck:
+    async def reconnect(self, athlete_id: str, trainer_id: str) -> TrainerCommandAck:
         self.reconnect_calls.append((athlete_id, trainer_id))
         if self.reconnect_results:
             return self.reconnect_results.pop(0)
         return TrainerCommandAck(acknowledged=True, connection_state="connected")
 
-    def apply_mode(
+    async def apply_mode(
         self,
         athlete_id: str,
         trainer_id: str,
@@ -55,7 +61,7 @@ class _MockTrainerAdapter(WahooTrainerProtocolAdapter):
             return self.mode_results.pop(0)
         return TrainerCommandAck(acknowledged=True, connection_state="connected")
 
-    def apply_safety_fallback(self, athlete_id: str, trainer_id: str) -> TrainerCommandAck:
+    async def apply_safety_fallback(self, athlete_id: str, trainer_id: str) -> TrainerCommandAck:
         self.fallback_calls.append((athlete_id, trainer_id))
         if self.fallback_results:
             return self.fallback_results.pop(0)
@@ -189,3 +195,272 @@ def test_control_service_applies_safety_fallback_on_command_failure() -> None:
         "safety_fallback_acknowledged",
     ]
     assert adapter.fallback_calls == [("athlete-1", "kickr-bike-001")]
+
+
+class _GatedTrainerAdapter(_MockTrainerAdapter):
+    """Holds each `apply_mode` call until `release` is set and tracks overlap."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = asyncio.Event()
+        self.started = asyncio.Event()
+        self._in_flight: dict[str, int] = {}
+        self.max_in_flight_per_trainer = 0
+        self.max_in_flight = 0
+
+    async def apply_mode(
+        self,
+        athlete_id: str,
+        trainer_id: str,
+        mode: WahooControlMode,
+        target_value: float,
+        target_unit: str,
+    ) -> TrainerCommandAck:
+        self._in_flight[trainer_id] = self._in_flight.get(trainer_id, 0) + 1
+        self.max_in_flight_per_trainer = max(
+            self.max_in_flight_per_trainer, self._in_flight[trainer_id]
+        )
+        self.max_in_flight = max(self.max_in_flight, sum(self._in_flight.values()))
+        self.started.set()
+        await self.release.wait()
+        await asyncio.sleep(0.01)
+        self._in_flight[trainer_id] -= 1
+        return await super().apply_mode(athlete_id, trainer_id, mode, target_value, target_unit)
+
+
+def test_control_mailbox_serializes_per_trainer_and_coalesces_erg_targets() -> None:
+    adapter = _GatedTrainerAdapter()
+    service = WahooControlService(adapter=adapter)
+
+    async def scenario() -> list[str]:
+        first = asyncio.create_task(
+            service.submit_control_command_response_body(
+                "athlete-1", _control_request(idempotency_key="erg-200", target_value=200)
+            )
+        )
+        await adapter.started.wait()
+        queued = [
+            asyncio.create_task(
+                service.submit_control_command_response_body(
+                    "athlete-1",
+                    _control_request(idempotency_key=f"erg-{watts}", target_value=watts),
+                )
+            )
+            for watts in (210, 220, 230)
+        ]
+        other_trainer = asyncio.create_task(
+            service.submit_control_command_response_body(
+                "athlete-1",
+                _control_request(idempotency_key="other-erg", trainer_id="kickr-bike-002"),
+            )
+        )
+        await asyncio.sleep(0.05)
+        adapter.release.set()
+        bodies = await asyncio.gather(first, *queued, other_trainer)
+        return [WahooTrainerControlResponse.model_validate_json(body).status for body in bodies]
+
+    statuses = asyncio.run(scenario())
+
+    assert statuses == ["applied", "superseded", "superseded", "applied", "applied"]
+    trainer_one_targets = [call[3] for call in adapter.mode_calls if call[1] == "kickr-bike-001"]
+    assert trainer_one_targets == [200, 230]
+    assert adapter.max_in_flight_per_trainer == 1
+    assert adapter.max_in_flight == 2
+    superseded = service.send_control_command(
+        "athlete-1", _control_request(idempotency_key="erg-210", target_value=210)
+    )
+    assert superseded.superseded_by_idempotency_key == "erg-220"
+    metrics = service.metrics_snapshot()
+    assert (metrics.superseded_count, metrics.active_mailbox_count) == (2, 0)
+
+
+def test_control_retry_of_a_pending_command_joins_it_instead_of_superseding_it() -> None:
+    adapter = _GatedTrainerAdapter()
+    service = WahooControlService(adapter=adapter)
+
+    def submit(idempotency_key: str, watts: float) -> Coroutine[Any, Any, bytes]:
+        return service.submit_control_command_response_body(
+            "athlete-1", _control_request(idempotency_key=idempotency_key, target_value=watts)
+        )
+
+    async def scenario() -> list[bytes]:
+        running = asyncio.create_task(submit("erg-200", 200))
+        await adapter.started.wait()
+        queued = asyncio.create_task(submit("erg-210", 210))
+        await asyncio.sleep(0.05)
+        queued_retry = asyncio.create_task(submit("erg-210", 210))
+        running_retry = asyncio.create_task(submit("erg-200", 200))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ValueError, match="different payload"):
+            await submit("erg-210", 215)
+        adapter.release.set()
+        return list(await asyncio.gather(running, running_retry, queued, queued_retry))
+
+    running, running_retry, queued, queued_retry = asyncio.run(scenario())
+
+    assert running_retry == running
+    assert queued_retry == queued
+    assert WahooTrainerControlResponse.model_validate_json(queued).status == "applied"
+    assert [call[3] for call in adapter.mode_calls] == [200, 210]
+    assert service.metrics_snapshot().superseded_count == 0
+
+
+def test_blocking_and_async_callers_share_one_trainer_mailbox() -> None:
+    adapter = _GatedTrainerAdapter()
+    service = WahooControlService(adapter=adapter)
+    request = _control_request(idempotency_key="erg-200", target_value=200)
+
+    async def scenario() -> tuple[bytes, bytes]:
+        running = asyncio.create_task(
+            service.submit_control_command_response_body("athlete-1", request)
+        )
+        await adapter.started.wait()
+        # The blocking retry runs on this loop's actor and joins the running command.
+        blocking = asyncio.create_task(
+            asyncio.to_thread(service.send_control_command_response_body, "athlete-1", request)
+        )
+        await asyncio.sleep(0.05)
+        adapter.release.set()
+        return await running, await blocking
+
+    running, blocking = asyncio.run(scenario())
+
+    assert blocking == running
+    assert len(adapter.mode_calls) == 1
+    assert adapter.max_in_flight_per_trainer == 1
+
+
+def test_full_control_mailbox_applies_backpressure_then_rejects() -> None:
+    adapter = _GatedTrainerAdapter()
+    service = WahooControlService(adapter=adapter, mailbox_capacity=1, mailbox_wait_seconds=0.05)
+
+    async def scenario() -> None:
+        running = asyncio.create_task(
+            service.submit_control_command_response_body(
+                "athlete-1", _control_request(idempotency_key="erg-1")
+            )
+        )
+        await adapter.started.wait()
+        queued = asyncio.create_task(
+            service.submit_control_command_response_body(
+                "athlete-1",
+                _control_request(
+                    idempotency_key="slope-1", mode="slope", target_value=2, target_unit="percent"
+                ),
+            )
+        )
+        await asyncio.sleep(0)
+        with pytest.raises(WahooControlMailboxFullError, match="mailbox is full") as rejected:
+            await service.submit_control_command_response_body(
+                "athlete-1",
+                _control_request(
+                    idempotency_key="resistance-1",
+                    mode="resistance",
+                    target_value=0.3,
+                    target_unit="ratio",
+                ),
+            )
+        assert rejected.value.retry_after_seconds == 2
+        adapter.release.set()
+        await asyncio.gather(running, queued)
+
+    asyncio.run(scenario())
+
+    assert service.metrics_snapshot().rejected_count == 1
+    assert [call[2] for call in adapter.mode_calls] == ["erg", "slope"]
+    with pytest.raises(ValueError, match="mailbox_capacity"):
+        WahooControlService(mailbox_capacity=0)
+
+
+class _StalledTrainerAdapter(_MockTrainerAdapter):
+    """Never answers `apply_mode`, like a trainer that dropped off mid-interval."""
+
+    async def apply_mode(
+        self,
+        athlete_id: str,
+        trainer_id: str,
+        mode: WahooControlMode,
+        target_value: float,
+        target_unit: str,
+    ) -> TrainerCommandAck:
+        self.mode_calls.append((athlete_id, trainer_id, mode, target_value, target_unit))
+        await asyncio.sleep(10)
+        return TrainerCommandAck(acknowledged=True, connection_state="connected")
+
+
+def test_missed_command_deadline_triggers_safety_fallback() -> None:
+    adapter = _StalledTrainerAdapter()
+    service = WahooControlService(adapter=adapter, command_deadline_seconds=0.02)
+
+    response = service.send_control_command(
+        "athlete-1", _control_request(idempotency_key="ctrl-stalled")
+    )
+
+    assert response.status == "safety_fallback"
+    assert response.failure_reason == "command_failed"
+    assert response.applied_mode == "resistance"
+    assert response.telemetry_events[1].event_type == "command_failed"
+    assert response.telemetry_events[1].error_code == "deadline_exceeded"
+    assert adapter.fallback_calls == [("athlete-1", "kickr-bike-001")]
+
+
+def test_reconnect_retries_with_exponential_backoff() -> None:
+    unreachable = TrainerCommandAck(
+        acknowledged=False,
+        connection_state="disconnected",
+        error_code="trainer_unreachable",
+    )
+    backoff_delays: list[float] = []
+
+    async def record_sleep(delay: float) -> None:
+        backoff_delays.append(delay)
+
+    adapter = _MockTrainerAdapter(reconnect_results=[unreachable, unreachable])
+    service = WahooControlService(
+        adapter=adapter,
+        reconnect_attempts=3,
+        reconnect_base_delay_seconds=0.5,
+        sleep=record_sleep,
+    )
+    service.set_connection_state_for_testing(
+        athlete_id="athlete-1",
+        trainer_id="kickr-bike-001",
+        connection_state="disconnected",
+    )
+
+    response = service.send_control_command(
+        "athlete-1", _control_request(idempotency_key="ctrl-backoff")
+    )
+
+    assert response.status == "applied"
+    assert response.transition == "reconnected_mode_changed"
+    assert backoff_delays == [0.5, 1.0]
+    assert len(adapter.reconnect_calls) == 3
+    assert [event.event_type for event in response.telemetry_events][:4] == [
+        "reconnect_attempted",
+        "reconnect_failed",
+        "reconnect_attempted",
+        "reconnect_failed",
+    ]
+
+
+def test_simulated_adapter_latency_and_loss_drive_the_control_path() -> None:
+    slow = WahooControlService(
+        adapter=SimulatedWahooTrainerProtocolAdapter(
+            latency_seconds=0.01, latency_jitter_seconds=0.01, seed=7
+        )
+    )
+    lossy = WahooControlService(
+        adapter=SimulatedWahooTrainerProtocolAdapter(loss_rate=1.0, seed=7),
+        command_deadline_seconds=0.01,
+    )
+
+    applied = slow.send_control_command("athlete-1", _control_request(idempotency_key="slow"))
+    lost = lossy.send_control_command("athlete-1", _control_request(idempotency_key="lost"))
+
+    assert applied.status == "applied"
+    # The fallback is lost too, so the trainer state is unknown.
+    assert lost.status == "failed"
+    assert lost.failure_reason == "safety_fallback_failed"
+    with pytest.raises(ValueError, match="loss_rate"):
+        SimulatedWahooTrainerProtocolAdapter(loss_rate=1.5)
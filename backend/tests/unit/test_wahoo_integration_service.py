@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import threading
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
 
 import pytest
@@ -7,18 +10,29 @@ import pytest
 from sportolo.api.schemas.wahoo_integration import (
     PipelineDispatch,
     WahooExecutionHistorySyncRequest,
+    WahooExecutionHistorySyncResponse,
+    WahooExecutionHistorySyncSummary,
     WahooWorkoutPushRequest,
     WahooWorkoutStep,
 )
+from sportolo.services.idempotency_store_service import InMemoryIdempotencyStore
 from sportolo.services.wahoo_integration_service import WahooIntegrationService
+from sportolo.services.wahoo_provider_client import WahooProviderActivity
 
 
 class _RecordingDispatchSink:
     def __init__(self) -> None:
         self.enqueued: list[tuple[str, PipelineDispatch]] = []
+        self.batch_sizes: list[int] = []
 
     def enqueue(self, athlete_id: str, dispatch: PipelineDispatch) -> None:
-        self.enqueued.append((athlete_id, dispatch.model_copy(deep=True)))
+        self.enqueue_many(athlete_id, [dispatch])
+
+    def enqueue_many(self, athlete_id: str, dispatches: Sequence[PipelineDispatch]) -> None:
+        self.batch_sizes.append(len(dispatches))
+        self.enqueued.extend(
+            (athlete_id, dispatch.model_copy(deep=True)) for dispatch in dispatches
+        )
 
 
 def _push_request(
@@ -188,6 +202,7 @@ def test_sync_execution_history_reconciles_links_and_dispatches_pipelines() -> N
         "athlete-1",
     ]
     assert [dispatch for _, dispatch in sink.enqueued] == first_sync.pipeline_dispatches
+    assert sink.batch_sizes == [4]
 
     replay = service.sync_execution_history(
         "athlete-1",
@@ -203,6 +218,218 @@ def test_sync_execution_history_reconciles_links_and_dispatches_pipelines() -> N
     assert duplicate_scan.duplicate_count == 2
     assert all(entry.dedup_status == "duplicate_linked" for entry in duplicate_scan.entries)
     assert duplicate_scan.pipeline_dispatches == []
+    assert sink.batch_sizes == [4]
+
+
+def test_sync_window_returns_out_of_order_pushes_sorted_with_inclusive_bounds() -> None:
+    service = WahooIntegrationService()
+    base = datetime(2026, 3, 1, 6, 0, tzinfo=UTC)
+    for index, day_offset in enumerate((4, 0, 2, 2, 6, 1)):
+        service.push_workout(
+            "athlete-1",
+            _push_request(
+                idempotency_key=f"push-window-{index}",
+                planned_workout_id=f"planned-{index}",
+                start_at=base + timedelta(days=day_offset),
+            ),
+        )
+
+    window = service.sync_execution_history(
+        "athlete-1",
+        WahooExecutionHistorySyncRequest(
+            idempotency_key="sync-window",
+            started_after=base + timedelta(days=1),
+            started_before=base + timedelta(days=4),
+        ),
+    )
+    empty = service.sync_execution_history(
+        "athlete-1",
+        WahooExecutionHistorySyncRequest(
+            idempotency_key="sync-empty-window",
+            started_after=base + timedelta(days=7),
+        ),
+    )
+
+    assert [entry.planned_workout_id for entry in window.entries] == [
+        "planned-5",
+        "planned-2",
+        "planned-3",
+        "planned-0",
+    ]
+    assert [entry.started_at for entry in window.entries] == sorted(
+        entry.started_at for entry in window.entries
+    )
+    assert empty.entries == []
+
+
+def test_incremental_sync_returns_only_activities_past_the_cursor() -> None:
+    sink = _RecordingDispatchSink()
+    service = WahooIntegrationService(dispatch_sink=sink)
+    base = datetime(2026, 3, 1, 6, 0, tzinfo=UTC)
+
+    def push(index: int, day_offset: int) -> None:
+        service.push_workout(
+            "athlete-1",
+            _push_request(
+                idempotency_key=f"push-cursor-{index}",
+                planned_workout_id=f"planned-{index}",
+                start_at=base + timedelta(days=day_offset),
+            ),
+        )
+
+    def incremental(idempotency_key: str) -> WahooExecutionHistorySyncResponse:
+        return service.sync_execution_history(
+            "athlete-1",
+            WahooExecutionHistorySyncRequest(idempotency_key=idempotency_key, mode="incremental"),
+        )
+
+    push(0, 0)
+    push(1, 2)
+    first = incremental("sync-cursor-1")
+    assert [entry.planned_workout_id for entry in first.entries] == ["planned-0", "planned-1"]
+    assert first.cursor_started_at == base + timedelta(days=2)
+
+    assert incremental("sync-cursor-2").entries == []
+
+    # A late upload of an older ride pulls the cursor back so it is not skipped, and a
+    # windowed full sync ahead of the cursor only shows up as a duplicate count.
+    push(2, 4)
+    push(3, 1)
+    windowed = service.sync_execution_history(
+        "athlete-1",
+        WahooExecutionHistorySyncRequest(
+            idempotency_key="sync-cursor-window", started_after=base + timedelta(days=3)
+        ),
+    )
+    assert [entry.planned_workout_id for entry in windowed.entries] == ["planned-2"]
+    assert windowed.cursor_started_at == base + timedelta(days=0)
+
+    late = incremental("sync-cursor-3")
+    assert late.mode == "incremental"
+    assert [entry.planned_workout_id for entry in late.entries] == ["planned-3"]
+    assert late.imported_count == 1
+    assert late.duplicate_count == 2
+    assert late.cursor_started_at == base + timedelta(days=4)
+    assert len(late.pipeline_dispatches) == 2
+    assert sink.batch_sizes == [4, 2, 2]
+
+
+def test_large_sync_keeps_a_summary_replay_and_pages_its_entries() -> None:
+    sink = _RecordingDispatchSink()
+    service = WahooIntegrationService(dispatch_sink=sink)
+    base = datetime(2026, 1, 1, 6, 0, tzinfo=UTC)
+    service.ingest_provider_activities(
+        "athlete-1",
+        [
+            WahooProviderActivity(
+                external_activity_id=f"wahoo-activity-{index}",
+                external_workout_id=f"wahoo-ride-{index}",
+                started_at=base + timedelta(hours=index),
+                duration_seconds=1_800,
+            )
+            for index in range(260)
+        ],
+    )
+    request = WahooExecutionHistorySyncRequest(idempotency_key="sync-large")
+
+    summary = service.sync_execution_history_summary("athlete-1", request)
+    assert (summary.imported_count, summary.entry_count, summary.dispatch_count) == (260, 260, 520)
+    assert sink.batch_sizes == [500, 20]
+    # The replay record holds the summary only; entries come from the sync's result log.
+    assert b"entries" not in service.sync_execution_history_summary_body("athlete-1", request)
+
+    pages = []
+    cursor = None
+    while True:
+        page = service.sync_result_page("athlete-1", summary.sync_id, cursor=cursor, limit=100)
+        pages.append(page)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert [len(page.entries) for page in pages] == [100, 100, 60]
+    assert [dispatch for page in pages for dispatch in page.pipeline_dispatches] == [
+        dispatch for _, dispatch in sink.enqueued
+    ]
+
+    full = service.sync_execution_history("athlete-1", request)
+    assert full.sync_id == summary.sync_id
+    assert full.entries == [entry for page in pages for entry in page.entries]
+
+    lines = list(service.iter_sync_execution_history_ndjson("athlete-1", summary, page_size=200))
+    assert len(lines) == 3
+    assert lines[-1].startswith(b'{"type":"summary"')
+
+    with pytest.raises(ValueError, match="cursor"):
+        service.sync_result_page("athlete-1", summary.sync_id, cursor="999")
+    with pytest.raises(ValueError, match="expired or unknown"):
+        service.sync_result_page("athlete-2", summary.sync_id)
+
+
+def test_concurrent_syncs_import_each_activity_once() -> None:
+    service = WahooIntegrationService()
+    base = datetime(2026, 1, 1, 6, 0, tzinfo=UTC)
+    activities = [
+        WahooProviderActivity(
+            external_activity_id=f"wahoo-activity-{index}",
+            external_workout_id=f"wahoo-ride-{index}",
+            started_at=base + timedelta(minutes=index),
+            duration_seconds=600,
+        )
+        for index in range(3_000)
+    ]
+    barrier = threading.Barrier(4, timeout=5)
+
+    def sync(worker: int) -> WahooExecutionHistorySyncSummary:
+        barrier.wait()
+        service.ingest_provider_activities("athlete-1", activities[worker::4])
+        service.ingest_provider_activities("athlete-1", activities)
+        return service.sync_execution_history_summary(
+            "athlete-1",
+            WahooExecutionHistorySyncRequest(
+                idempotency_key=f"sync-thread-{worker}", mode="incremental"
+            ),
+        )
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        summaries = list(executor.map(sync, range(4)))
+
+    assert sum(summary.imported_count for summary in summaries) == 3_000
+    assert service.provider_history_cursor("athlete-1") == base + timedelta(minutes=2_999)
+
+
+def test_sync_results_expire_with_the_idempotency_store() -> None:
+    store = InMemoryIdempotencyStore(ttl_seconds=60)
+    service = WahooIntegrationService(idempotency_store=store)
+    service.ingest_provider_activities(
+        "athlete-1",
+        [
+            WahooProviderActivity(
+                external_activity_id="wahoo-activity-1",
+                external_workout_id="wahoo-ride-1",
+                started_at=datetime(2026, 1, 1, 6, 0, tzinfo=UTC),
+                duration_seconds=1_800,
+            )
+        ],
+    )
+
+    first = service.sync_execution_history_summary(
+        "athlete-1", WahooExecutionHistorySyncRequest(idempotency_key="sync-a")
+    )
+    second = service.sync_execution_history_summary(
+        "athlete-1", WahooExecutionHistorySyncRequest(idempotency_key="sync-b")
+    )
+
+    assert first.sync_id != second.sync_id
+    assert first.sync_id.startswith("wahoo-sync-") and len(first.sync_id) == 43
+    page = service.sync_result_page("athlete-1", second.sync_id)
+    assert [entry.dedup_status for entry in page.entries] == ["duplicate_unlinked"]
+    assert page.entries[0].started_at == datetime(2026, 1, 1, 6, 0, tzinfo=UTC)
+
+    later = datetime.now(tz=UTC) + timedelta(seconds=61)
+    assert store.get("wahoo_sync_results", "athlete-1", first.sync_id, now=later) is None
+    store.reset()
+    with pytest.raises(ValueError, match="Wahoo sync results expired"):
+        service.sync_result_page("athlete-1", first.sync_id)
 
 
 def test_sync_rejects_idempotency_payload_drift() -> None:
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import httpx
+import pytest
+from fastapi import FastAPI, Header, Query
+from fastapi.responses import JSONResponse
+
+from sportolo.api.schemas.wahoo_integration import WahooExecutionHistorySyncRequest
+from sportolo.services.wahoo_integration_service import WahooIntegrationService
+from sportolo.services.wahoo_provider_client import (
+    AdaptiveRateLimiter,
+    HttpWahooProviderClient,
+    WahooProviderError,
+    WahooProviderLimits,
+)
+
+HISTORY_START = datetime(2026, 1, 1, 6, 0, tzinfo=UTC)
+
+
+class _FakeWahooCloud:
+    """Local stand-in for the Wahoo cloud `/v1/workouts` endpoint, newest first."""
+
+    def __init__(self, workout_counts: dict[str, int]) -> None:
+        self.workout_counts = dict(workout_counts)
+        self.in_flight: Counter[str] = Counter()
+        self.pages_served: Counter[str] = Counter()
+        self.max_in_flight: Counter[str] = Counter()
+        self.max_total_in_flight = 0
+        self.scripted_responses: list[JSONResponse] = []
+        self.rate_limit_remaining: int | None = None
+        self.app = FastAPI()
+        self.app.get("/v1/workouts")(self._list_workouts)
+
+    async def _list_workouts(
+        self,
+        authorization: str = Header(),
+        page: int = Query(),
+        per_page: int = Query(),
+    ) -> JSONResponse:
+        token = authorization.removeprefix("Bearer ")
+        if token not in self.workout_counts:
+            return JSONResponse({"error": "unauthorized"}, status_code=401)
+        if self.scripted_responses:
+            return self.scripted_responses.pop(0)
+
+        self.pages_served[token] += 1
+        self.in_flight[token] += 1
+        self.max_in_flight[token] = max(self.max_in_flight[token], self.in_flight[token])
+        self.max_total_in_flight = max(self.max_total_in_flight, sum(self.in_flight.values()))
+        await asyncio.sleep(0.01)
+        self.in_flight[token] -= 1
+
+        total = self.workout_counts[token]
+        first = (page - 1) * per_page
+        workouts: list[dict[str, Any]] = [
+            {
+                "id": f"{token}-{index}",
+                "starts": (HISTORY_START + timedelta(days=index))
+                .isoformat()
+                .replace("+00:00", "Z"),
+                "minutes": 45,
+                "plan_id": None,
+                "workout_summary": {"duration_total_accum": "2712.4"},
+            }
+            for index in reversed(range(max(0, total - first - per_page), total - first))
+        ]
+        headers: dict[str, str] = {}
+        if self.rate_limit_remaining is not None:
+            headers = {
+                "X-RateLimit-Limit": "100",
+                "X-RateLimit-Remaining": str(self.rate_limit_remaining),
+                "X-RateLimit-Reset": "0.2",
+            }
+        return JSONResponse(
+            {"workouts": workouts, "total": total, "page": page, "per_page": per_page},
+            headers=headers,
+        )
+
+
+def _client(cloud: _FakeWahooCloud, **limit_overrides: Any) -> HttpWahooProviderClient:
+    return HttpWahooProviderClient(
+        base_url="http://wahoo.test",
+        transport=httpx.ASGITransport(app=cloud.app),
+        limits=WahooProviderLimits(page_size=10, retry_base_delay_seconds=0.01, **limit_overrides),
+    )
+
+
+def test_history_pages_are_fetched_concurrently_within_limits() -> None:
+    cloud = _FakeWahooCloud({"token-a": 95, "token-b": 40, "token-c": 5})
+
+    async def fetch_all() -> list[int]:
+        async with _client(cloud, global_concurrency=4, per_athlete_concurrency=3) as client:
+            histories = await asyncio.gather(
+                client.fetch_history("athlete-a", "token-a"),
+                client.fetch_history("athlete-b", "token-b"),
+                client.fetch_history(
+                    "athlete-c", "token-c", started_after=HISTORY_START + timedelta(days=3)
+                ),
+            )
+            assert client.request_count == 10 + 4 + 1
+            assert histories[0][0].external_activity_id == "wahoo-activity-token-a-0"
+            assert histories[0][0].duration_seconds == 2712
+            assert histories[0][0].external_workout_id == "wahoo-ride-token-a-0"
+            starts = [activity.started_at for activity in histories[0]]
+            assert starts == sorted(starts)
+            return [len(history) for history in histories]
+
+    assert asyncio.run(fetch_all()) == [95, 40, 2]
+    assert 1 < cloud.max_in_flight["token-a"] <= 3
+    assert cloud.max_total_in_flight <= 4
+
+
+def test_incremental_fetch_stops_at_the_page_that_reaches_the_cursor() -> None:
+    cloud = _FakeWahooCloud({"token-a": 95})
+
+    async def fetch() -> list[str]:
+        async with _client(cloud) as client:
+            history = await client.fetch_history(
+                "athlete-a", "token-a", started_after=HISTORY_START + timedelta(days=82)
+            )
+        return [activity.external_activity_id for activity in history]
+
+    # Newest-first pages of ten: page 2 holds days 84 down to 75, so paging stops there.
+    assert asyncio.run(fetch()) == [f"wahoo-activity-token-a-{index}" for index in range(82, 95)]
+    assert cloud.pages_served["token-a"] == 2
+
+
+def test_rate_limit_headers_and_429s_throttle_and_retry() -> None:
+    cloud = _FakeWahooCloud({"token-a": 30})
+    cloud.scripted_responses.append(
+        JSONResponse({"error": "slow down"}, status_code=429, headers={"Retry-After": "0.05"})
+    )
+    cloud.rate_limit_remaining = 5
+
+    async def fetch() -> tuple[int, float]:
+        limiter = AdaptiveRateLimiter()
+        client = HttpWahooProviderClient(
+            base_url="http://wahoo.test",
+            transport=httpx.ASGITransport(app=cloud.app),
+            limits=WahooProviderLimits(page_size=10),
+            rate_limiter=limiter,
+        )
+        async with client:
+            history = await client.fetch_history("athlete-a", "token-a")
+        return len(history), limiter.throttled_seconds
+
+    activity_count, throttled_seconds = asyncio.run(fetch())
+
+    # One 429 pause, then starts spaced by reset / remaining = 0.04s once below 20% quota.
+    assert activity_count == 30
+    assert throttled_seconds >= 0.05 + 0.04
+
+
+def test_non_retryable_provider_errors_are_raised() -> None:
+    cloud = _FakeWahooCloud({"token-a": 3})
+
+    async def fetch() -> None:
+        async with _client(cloud) as client:
+            await client.fetch_history("athlete-a", "revoked-token")
+
+    with pytest.raises(WahooProviderError) as error:
+        asyncio.run(fetch())
+    assert error.value.status_code == 401
+    assert not error.value.retryable
+
+    cloud.scripted_responses.extend(
+        JSONResponse({"error": "unavailable"}, status_code=503) for _ in range(2)
+    )
+
+    async def fetch_with_retries() -> int:
+        async with _client(cloud, max_retries=1) as client:
+            return len(await client.fetch_history("athlete-a", "token-a"))
+
+    with pytest.raises(WahooProviderError, match="503"):
+        asyncio.run(fetch_with_retries())
+    assert asyncio.run(fetch_with_retries()) == 3
+
+
+def test_service_refresh_imports_provider_history_from_the_cursor() -> None:
+    cloud = _FakeWahooCloud({"token-a": 12})
+
+    async def scenario() -> tuple[int, int, int]:
+        async with _client(cloud) as client:
+            service = WahooIntegrationService(provider_client=client)
+            added = await service.refresh_provider_history("athlete-1", "token-a")
+            first_sync = service.sync_execution_history(
+                "athlete-1",
+                WahooExecutionHistorySyncRequest(idempotency_key="sync-1", mode="incremental"),
+            )
+            cloud.workout_counts["token-a"] = 15
+            added_later = await service.refresh_provider_history("athlete-1", "token-a")
+            second_sync = service.sync_execution_history(
+                "athlete-1",
+                WahooExecutionHistorySyncRequest(idempotency_key="sync-2", mode="incremental"),
+            )
+            assert first_sync.imported_count == added
+            return added, added_later, second_sync.imported_count
+
+    assert asyncio.run(scenario()) == (12, 3, 3)
+
+    with pytest.raises(ValueError, match="provider client"):
+        asyncio.run(WahooIntegrationService().refresh_provider_history("athlete-1", "token-a"))
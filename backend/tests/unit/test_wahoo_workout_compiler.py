@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from sportolo.api.schemas.wahoo_integration import (
+    WahooAthleteTargets,
+    WahooWorkoutPushRequest,
+    WahooWorkoutStep,
+)
+from sportolo.services.wahoo_integration_service import WahooIntegrationService
+from sportolo.services.wahoo_workout_compiler import (
+    WahooWorkoutTemplateCache,
+    compile_workout_template,
+)
+
+STEPS = [
+    WahooWorkoutStep(
+        step_type="warmup",
+        duration_seconds=600,
+        target_type="power",
+        target_value=55,
+        target_unit="percent_ftp",
+    ),
+    WahooWorkoutStep(
+        step_type="interval",
+        duration_seconds=300,
+        target_type="power",
+        target_value=105,
+        target_unit="percent_ftp",
+    ),
+    WahooWorkoutStep(
+        step_type="recovery",
+        duration_seconds=180,
+        target_type="heart_rate",
+        target_value=120,
+        target_unit="bpm",
+    ),
+    WahooWorkoutStep(
+        step_type="steady",
+        duration_seconds=900,
+        target_type="pace",
+        target_value=90,
+        target_unit="percent_threshold_pace",
+    ),
+]
+
+
+def _push_request(idempotency_key: str, ftp_watts: float) -> WahooWorkoutPushRequest:
+    return WahooWorkoutPushRequest(
+        idempotency_key=idempotency_key,
+        planned_workout_id="planned-threshold",
+        trainer_id="kickr-bike-001",
+        workout_name="Threshold builder",
+        steps=STEPS,
+        athlete_targets=WahooAthleteTargets(
+            ftp_watts=ftp_watts,
+            threshold_pace_seconds_per_km=240,
+        ),
+    )
+
+
+def test_template_binds_relative_targets_per_athlete() -> None:
+    template = compile_workout_template("Threshold builder", STEPS)
+
+    assert template.total_duration_seconds == 1_980
+    assert template.required_thresholds == {"ftp", "threshold_pace"}
+    plan = json.loads(
+        template.bind(WahooAthleteTargets(ftp_watts=250, threshold_pace_seconds_per_km=240))
+    )
+    assert plan["header"]["duration_s"] == 1_980
+    assert [interval["targets"] for interval in plan["intervals"]] == [
+        [{"type": "watts", "value": 138}],
+        [{"type": "watts", "value": 262}],
+        [{"type": "bpm", "value": 120}],
+        [{"type": "seconds_per_km", "value": 267}],
+    ]
+    assert [interval["intensity_type"] for interval in plan["intervals"]] == [
+        "wu",
+        "active",
+        "recover",
+        "active",
+    ]
+    assert compile_workout_template("Threshold builder", STEPS) == template
+    assert compile_workout_template("Renamed", STEPS).template_id != template.template_id
+    with pytest.raises(ValueError, match="threshold_pace"):
+        template.bind(WahooAthleteTargets(ftp_watts=250))
+
+
+def test_pushes_share_one_compiled_template_across_athletes() -> None:
+    service = WahooIntegrationService()
+
+    first = service.push_workout("athlete-1", _push_request("push-1", ftp_watts=250))
+    second = service.push_workout("athlete-2", _push_request("push-2", ftp_watts=320))
+
+    assert first.template_id is not None
+    assert first.template_id == second.template_id
+    metrics = service.template_cache.metrics_snapshot()
+    assert (metrics.miss_count, metrics.hit_count, metrics.entry_count) == (1, 1, 1)
+    assert first.external_workout_id is not None and second.external_workout_id is not None
+    first_plan = service.provider_plan("athlete-1", first.external_workout_id)
+    second_plan = service.provider_plan("athlete-2", second.external_workout_id)
+    assert first_plan is not None and second_plan is not None
+    assert json.loads(first_plan)["intervals"][1]["targets"][0]["value"] == 262
+    assert json.loads(second_plan)["intervals"][1]["targets"][0]["value"] == 336
+
+
+def test_provider_plans_are_bounded_to_the_most_recently_used() -> None:
+    service = WahooIntegrationService(provider_plan_cache_size=2)
+
+    pushes = [
+        service.push_workout(f"athlete-{index}", _push_request(f"push-{index}", ftp_watts=250))
+        for index in range(3)
+    ]
+    external_ids = [push.external_workout_id for push in pushes]
+    assert all(external_id is not None for external_id in external_ids)
+
+    assert service.provider_plan("athlete-0", str(external_ids[0])) is None
+    assert service.provider_plan("athlete-1", str(external_ids[1])) is not None
+    service.push_workout("athlete-3", _push_request("push-3", ftp_watts=250))
+    assert service.provider_plan("athlete-2", str(external_ids[2])) is None
+    assert service.provider_plan("athlete-1", str(external_ids[1])) is not None
+    with pytest.raises(ValueError, match="provider_plan_cache_size"):
+        WahooIntegrationService(provider_plan_cache_size=0)
+
+
+def test_template_cache_evicts_least_recently_used_workouts() -> None:
+    cache = WahooWorkoutTemplateCache(max_entries=2)
+
+    first = cache.get_or_compile("Workout A", STEPS)
+    cache.get_or_compile("Workout B", STEPS)
+    assert cache.get_or_compile("Workout A", STEPS) is first
+    cache.get_or_compile("Workout C", STEPS)
+    cache.get_or_compile("Workout B", STEPS)
+
+    metrics = cache.metrics_snapshot()
+    assert (metrics.hit_count, metrics.miss_count, metrics.eviction_count) == (1, 4, 2)
+    assert metrics.entry_count == 2
+    with pytest.raises(ValueError, match="max_entries"):
+        WahooWorkoutTemplateCache(max_entries=0)
+
+
+def test_relative_targets_require_matching_type_and_athlete_threshold() -> None:
+    with pytest.raises(ValidationError, match="targetType power"):
+        WahooWorkoutStep(
+            step_type="interval",
+            duration_seconds=60,
+            target_type="pace",
+            target_value=100,
+            target_unit="percent_ftp",
+        )
+    with pytest.raises(ValidationError, match="athleteTargets.ftpWatts"):
+        WahooWorkoutPushRequest(
+            idempotency_key="push-1",
+            planned_workout_id="planned-1",
+            trainer_id="kickr-bike-001",
+            workout_name="Threshold builder",
+            steps=STEPS,
+        )